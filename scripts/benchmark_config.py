@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Config Lookup Benchmark Script
+
+Measures get_config() lookups per second against the flattened ConfigSnapshot and
+against the previous implementation (case-insensitive scan per key level plus a deep
+copy of dict/list results), for scalar, section and missing keys.
+
+Example:
+    python scripts/benchmark_config.py --iterations 200000
+"""
+
+import sys
+import copy
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import settings
+from src.config.settings import get_config, load_config
+
+KEYS = {
+    "scalar": "ai.provider",
+    "nested scalar": "ai.token_budgets.default",
+    "section": "ai",
+    "missing": "ai.not_a_key",
+}
+
+def legacy_get_config(key_path: str, default: Any = None) -> Any:
+    """The lookup get_config() used before snapshots."""
+    value = settings._CONFIG
+    for key in key_path.split('.'):
+        if not isinstance(value, dict):
+            return default
+        found = False
+        for current_key, current_value in value.items():
+            if current_key.lower() == key.lower():
+                value = current_value
+                found = True
+                break
+        if not found:
+            return default
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+def lookups_per_second(lookup: Callable[[str], Any], key: str, iterations: int) -> float:
+    lookup(key)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        lookup(key)
+    return iterations / (time.perf_counter() - start)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark get_config() lookups against the previous scan + deepcopy.")
+    parser.add_argument("--iterations", type=int, default=100000, help="Lookups per measurement")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    load_config()
+
+    print("\n===== Config Lookup Benchmark =====")
+    print(f"Iterations: {args.iterations}  Key paths indexed: {len(settings.get_config_snapshot().keys())}")
+    print(f"  {'key':<14} {'legacy lookups/s':>18} {'snapshot lookups/s':>20} {'speedup':>8}")
+    for label, key in KEYS.items():
+        legacy = lookups_per_second(legacy_get_config, key, args.iterations)
+        current = lookups_per_second(get_config, key, args.iterations)
+        print(f"  {label:<14} {legacy:18,.0f} {current:20,.0f} {current / legacy:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Generation Benchmark Script
+
+Runs generate_tweet_reply / generate_new_tweet over the evaluation golden set against a
+local stub of the xAI /completions endpoint (no network, no API keys), then reports
+throughput, latency percentiles, per-stage breakdown, error rates and evaluation scores.
+Each report is stored under data/benchmarks/ and compared with the previous run.
+--metrics-out writes the run's stage histograms in Prometheus text format and
+--trace-file appends one JSON line per generated response.
+
+Example:
+    python scripts/benchmark_generation.py --concurrency 8 --iterations 5 \
+        --latency-ms 120 --error-rate 0.02 --shapes text=0.6,message=0.3,reasoning=0.1
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config.settings import set_config_value
+from src.evaluation.benchmark import (
+    DEFAULT_RESULTS_DIR,
+    OPERATIONS,
+    BenchmarkConfig,
+    compare_reports,
+    load_latest_report,
+    run_benchmark,
+    save_report,
+)
+from src.evaluation.llm_stub import LATENCY_DISTRIBUTIONS, StubConfig
+from src.evaluation.streaming import iter_golden_cases
+from src.utils.tracing import export_prometheus, get_stage_metrics
+
+def parse_shapes(value: str) -> Dict[str, float]:
+    """Parse 'text=0.6,message=0.3,reasoning=0.1' into shape weights."""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    return weights
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the generation pipeline against a local LLM stub.")
+    parser.add_argument("--golden-set", default="data/input/evaluation_golden_set.json",
+                        help="Golden set file (.json array or .jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent generation requests")
+    parser.add_argument("--iterations", type=int, default=1, help="Passes over the golden set")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="Comma-separated: reply,new_tweet")
+    parser.add_argument("--interaction-mode", default="Default", help="Interaction mode (Default, Professional, Degen)")
+    parser.add_argument("--protocol", default=None, help="Protocol name for prompt templates")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Stub latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="Fixed latency, uniform minimum, or lognormal median (ms)")
+    parser.add_argument("--latency-max-ms", type=float, default=150.0, help="Uniform maximum latency (ms)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429 responses")
+    parser.add_argument("--shapes", type=parse_shapes, default={"text": 1.0},
+                        help="Response shape weights, e.g. text=0.6,message=0.3,reasoning=0.1,truncated=0.0")
+    parser.add_argument("--seed", type=int, default=0, help="Stub random seed")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR, help="Directory for stored reports")
+    parser.add_argument("--compare", default="latest",
+                        help="Report to compare with: 'latest' (previous run), a report path, or 'none'")
+    parser.add_argument("--metrics-out", default=None,
+                        help="Write the stage duration histograms to this file (Prometheus text format)")
+    parser.add_argument("--trace-file", default=None, help="Append per-request stage traces (JSONL) to this file")
+    parser.add_argument("--log-level", default="CRITICAL",
+                        help="Log level for the pipeline (injected errors log tracebacks at ERROR)")
+    return parser.parse_args(argv)
+
+def print_report(report: Dict, comparison: Optional[Dict]) -> None:
+    latency = report["latency_ms"]
+    print("\n===== Generation Benchmark =====")
+    print(f"Requests: {report['requests']}  Wall: {report['wall_seconds']:.2f}s  "
+          f"Throughput: {report['throughput_rps']:.2f} req/s")
+    print(f"Outcomes: {report['outcomes']}  Error rate: {report['error_rate']:.2%}")
+    print(f"Latency ms: p50={latency['p50']:.1f} p90={latency['p90']:.1f} "
+          f"p95={latency['p95']:.1f} p99={latency['p99']:.1f} max={latency['max']:.1f}")
+    print("\nStage breakdown (mean ms, share of request time):")
+    for stage, summary in sorted(report["stages_ms"].items(), key=lambda item: -item[1]["mean"]):
+        print(f"  - {stage:<11} {summary['mean']:9.2f}  {summary['share']:6.1%}")
+    reuse = report.get("prefix_reuse")
+    if reuse:
+        print(f"\nPrompt prefix reuse: {reuse['reused']}/{reuse['prompts']} prompts ({reuse['reuse_rate']:.1%}), "
+              f"{reuse['distinct_prefixes']} distinct prefixes, {reuse['reused_char_ratio']:.1%} of prompt chars")
+    coalescing = report.get("coalescing")
+    if coalescing and coalescing["saved"]:
+        print(f"Coalesced completions: {coalescing['saved']} of {coalescing['requests']} requests shared an in-flight call")
+    batching = report.get("batching")
+    if batching and batching["batched_prompts"]:
+        print(f"Batched completions: {batching['prompts']} prompts sent in {batching['requests']} API requests")
+    tokens = report.get("tokens")
+    if tokens and tokens["reported"]:
+        print(f"Tokens: {tokens['prompt_tokens']} prompt + {tokens['completion_tokens']} completion "
+              f"({tokens['tokens_per_second']:.1f} tokens/s)")
+    print("\nEvaluation:")
+    for metric, value in report["evaluation"].items():
+        print(f"  - {metric}: {value:.4f}" if isinstance(value, float) else f"  - {metric}: {value}")
+    print(f"\nStub: {report['stub']}")
+
+    if comparison:
+        print("\n===== Compared with previous run =====")
+        for metric, values in comparison.items():
+            pct = f"{values['delta_pct']:+.1f}%" if values["delta_pct"] is not None else "n/a"
+            print(f"  - {metric:<28} {values['baseline']:10.4f} -> {values['current']:10.4f}  ({pct})")
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.CRITICAL))
+
+    cases = list(iter_golden_cases(args.golden_set))
+    if not cases:
+        print(f"No test cases found in {args.golden_set}", file=sys.stderr)
+        sys.exit(1)
+
+    config = BenchmarkConfig(
+        concurrency=args.concurrency,
+        iterations=args.iterations,
+        operations=[op.strip() for op in args.operations.split(",") if op.strip()],
+        interaction_mode=args.interaction_mode,
+        protocol_name=args.protocol,
+        stub=StubConfig(
+            latency_distribution=args.latency_dist,
+            latency_ms=args.latency_ms,
+            latency_max_ms=args.latency_max_ms,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            shape_weights=args.shapes,
+            seed=args.seed,
+        ),
+    )
+    if args.trace_file:
+        set_config_value("tracing.trace_file", args.trace_file)
+    get_stage_metrics().reset()
+    report = run_benchmark(cases, config)
+    if args.metrics_out:
+        export_prometheus(args.metrics_out)
+    report_path = save_report(report, args.results_dir)
+
+    baseline = None
+    if args.compare == "latest":
+        baseline = load_latest_report(args.results_dir, exclude=report_path)
+    elif args.compare.lower() != "none":
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+    comparison = compare_reports(report, baseline) if baseline else None
+
+    print_report(report, comparison)
+    print(f"\nReport saved to: {report_path}")
+    if args.metrics_out:
+        print(f"Stage histograms written to: {args.metrics_out}")
+    if args.trace_file:
+        print(f"Traces appended to: {args.trace_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Prompt Build Benchmark Script
+
+Measures the time to build interaction and new-tweet prompts with the compiled
+prompt-plan cache cold (plans recompiled for every prompt, equivalent to the
+previous per-request assembly) and warm (static sections reused, only dynamic
+fields rendered).
+
+Example:
+    python scripts/benchmark_prompts.py --iterations 2000 --protocol ethena --mode Professional
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.ai.prompt_engineering import (
+    clear_prompt_plan_cache,
+    generate_interaction_prompt,
+    generate_new_tweet_prompt,
+    get_prompt_plan_cache_stats,
+)
+from src.config.settings import DEFAULT_PROTOCOL
+from src.models.account import Account, AccountType
+from src.models.category import TweetCategory
+
+def time_builds(build: Callable[[int], str], iterations: int, cold: bool) -> float:
+    """Return mean microseconds per prompt."""
+    clear_prompt_plan_cache()
+    build(0)  # Warm-up (imports, template load)
+    start = time.perf_counter()
+    for i in range(iterations):
+        if cold:
+            clear_prompt_plan_cache()
+        build(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark prompt building with and without compiled prompt plans.")
+    parser.add_argument("--iterations", type=int, default=1000, help="Prompts built per measurement")
+    parser.add_argument("--protocol", default=DEFAULT_PROTOCOL, help="Protocol name for prompt templates")
+    parser.add_argument("--mode", default="Default", help="Interaction mode (Default, Professional, Degen)")
+    parser.add_argument("--platform", default="Twitter", help="Target platform")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.disable(logging.CRITICAL)
+
+    official = Account(account_id="official", username="Official", account_type=AccountType.OFFICIAL)
+    institution = Account(account_id="inst", username="BigBank", account_type=AccountType.INSTITUTION, bio="Bank")
+    category = TweetCategory(name="Product Update", description="Announce new releases.", prompt_keywords=["launch"],
+                             style_guidelines={"tone": "Exciting", "hashtags": ["DeFi"], "length": "Under 240 characters"})
+
+    builders = {
+        "interaction": lambda i: generate_interaction_prompt(
+            original_post_content=f"What are the current yields? (#{i})",
+            active_account_info=official,
+            target_account_info=institution,
+            yieldfi_knowledge_snippet="Vaults auto-compound yield.",
+            platform=args.platform,
+            mode=args.mode,
+            protocol_name=args.protocol,
+        ),
+        "new_tweet": lambda i: generate_new_tweet_prompt(
+            category=category,
+            topic=f"Launch day #{i}",
+            yieldfi_knowledge_snippet="Vaults auto-compound yield.",
+            active_account_info=official,
+            platform=args.platform,
+            mode=args.mode,
+            protocol_name=args.protocol,
+        ),
+    }
+
+    print(f"Prompt build time ({args.iterations} prompts, protocol={args.protocol}, mode={args.mode}):")
+    for name, build in builders.items():
+        cold_us = time_builds(build, args.iterations, cold=True)
+        warm_us = time_builds(build, args.iterations, cold=False)
+        print(f"  - {name:<12} uncached {cold_us:9.1f} us   cached {warm_us:9.1f} us   speedup {cold_us / warm_us:5.1f}x")
+    print(f"Plan cache: {get_prompt_plan_cache_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - NLTK Resource Bundling Script
+
+Downloads the NLTK resources used by the evaluation metrics (punkt, stopwords)
+into the bundled data directory so that evaluation runs fully offline.
+Run this at build time (e.g. in the Dockerfile), not on air-gapped workers.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.evaluation.resources import bundle_resources, get_nltk_data_dir, get_text_resources
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle NLTK resources for offline evaluation.")
+    parser.add_argument("--target-dir", default=None,
+                        help="Directory to download into (default: evaluation.nltk_data_dir from config.yaml)")
+    args = parser.parse_args()
+
+    target_dir = args.target_dir or get_nltk_data_dir()
+    print(f"Bundling NLTK resources into: {target_dir}")
+    failed = bundle_resources(target_dir, quiet=False)
+    if failed:
+        print(f"Failed to download: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Done. Active tokenizer: {get_text_resources().tokenizer_name}")
+
+if __name__ == "__main__":
+    main()
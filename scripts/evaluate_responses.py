@@ -4,11 +4,19 @@ YieldFi AI Agent - Response Evaluation Script
 
 This script demonstrates how to use the evaluation framework to assess the quality
 of AI-generated responses using the predefined golden set.
+
+Use --stream for large golden sets (JSON array or JSONL): cases are read incrementally,
+evaluated in bounded chunks across worker processes, and results are written to a JSONL
+file as they complete, so memory stays flat regardless of golden set size.
+
+Results are cached per case and metric (see src/evaluation/cache.py), so repeated runs
+only score new or changed cases. Use --no-cache to rescore everything.
 """
 
 import sys
 import json
 import logging
+import argparse
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
@@ -20,6 +28,9 @@ if not any(p.endswith("src") for p in sys.path):
 try:
     from src.models.response import AIResponse
     from src.evaluation.evaluator import Evaluator
+    from src.evaluation.streaming import create_ai_response_from_case, iter_golden_cases, stream_evaluate
+    from src.evaluation.cache import EvaluationCache, evaluate_with_cache
+    from src.config.settings import get_config
 except ImportError as e:
     print(f"Error importing required modules: {e}")
     print("Make sure you're running this script from the project root or that src is in PYTHONPATH")
@@ -46,20 +57,6 @@ def load_golden_set(file_path: str = "data/input/evaluation_golden_set.json") ->
         logger.error(f"Invalid JSON in golden set file: {file_path}")
         return []
 
-def create_ai_response_from_case(case: Dict[str, Any]) -> AIResponse:
-    """Create an AIResponse object from a test case in the golden set."""
-    return AIResponse(
-        content=case["ai_response_content"],
-        tone=case["ai_response_analyzed_tone"],
-        response_type="TWEET_REPLY",  # Assuming this for test cases
-        model_used="test_model",
-        prompt_used="test_prompt",
-        source_tweet_id=f"test_{case['id']}",
-        responding_as="OFFICIAL",
-        target_account="COMMUNITY_MEMBER",
-        generation_time=datetime.now()
-    )
-
 def prepare_evaluation_batch(cases: List[Dict[str, Any]]) -> List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]]:
     """Prepare a batch of evaluation data from the test cases."""
     batch_data = []
@@ -115,11 +112,77 @@ def summarize_results(results: List[Dict[str, Any]]) -> Dict[str, float]:
     
     return summary
 
-def main():
+DEFAULT_CACHE_PATH = "data/cache/evaluation_cache.db"
+
+def open_cache(cache_path: Optional[str]) -> Optional[EvaluationCache]:
+    """Open the evaluation cache (None disables caching)."""
+    if not cache_path:
+        return None
+    cache = EvaluationCache(cache_path)
+    logger.info(f"Opened evaluation cache {cache_path} ({len(cache)} metric results)")
+    return cache
+
+def run_streaming_evaluation(golden_set_path: str, output_dir: str, chunk_size: int, workers: int,
+                             cache: Optional[EvaluationCache] = None) -> Path:
+    """Evaluate a golden set incrementally, writing JSONL results and a summary JSON."""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = Path(output_dir) / f"eval_results_{run_id}.jsonl"
+    summary_file = Path(output_dir) / f"eval_summary_{run_id}.json"
+
+    logger.info(f"Streaming evaluation of {golden_set_path} (chunk_size={chunk_size}, workers={workers})")
+    started = datetime.now()
+    with open(output_file, 'w') as f:
+        running_summary = stream_evaluate(
+            iter_golden_cases(golden_set_path), f, chunk_size=chunk_size, workers=workers, cache=cache
+        )
+    elapsed = (datetime.now() - started).total_seconds()
+
+    summary = running_summary.to_dict()
+    with open(summary_file, 'w') as f:
+        json.dump({
+            "golden_set": golden_set_path,
+            "cases": running_summary.cases,
+            "invalid_cases": running_summary.errors,
+            "cached_cases": running_summary.cached,
+            "elapsed_seconds": elapsed,
+            "summary": summary
+        }, f, indent=2)
+
+    logger.info(f"Evaluated {running_summary.cases} cases ({running_summary.cached} cached, "
+                f"{running_summary.errors} invalid) in {elapsed:.2f}s")
+    print(f"\nStreaming results saved to: {output_file}")
+    print(f"Summary saved to: {summary_file}")
+    print("\n===== Summary =====")
+    for metric, value in summary.items():
+        print(f"{metric}: {value:.4f}")
+    return output_file
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate AI responses against a golden set.")
+    parser.add_argument("--golden-set", default="data/input/evaluation_golden_set.json",
+                        help="Golden set file (.json array or .jsonl)")
+    parser.add_argument("--output-dir", default="data/output", help="Directory for result files")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream cases in bounded chunks and write JSONL results as they complete")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Cases per chunk in streaming mode")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes in streaming mode")
+    parser.add_argument("--cache-path", default=get_config("evaluation.cache_path", DEFAULT_CACHE_PATH),
+                        help="Evaluation result cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="Rescore every case without reading or writing the cache")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
     logger.info("Starting evaluation process")
+    cache = None if args.no_cache else open_cache(args.cache_path)
+
+    if args.stream:
+        run_streaming_evaluation(args.golden_set, args.output_dir, args.chunk_size, args.workers, cache)
+        return
     
     # Load the golden set
-    cases = load_golden_set()
+    cases = load_golden_set(args.golden_set)
     if not cases:
         logger.error("No test cases found. Exiting.")
         return
@@ -134,10 +197,15 @@ def main():
     
     # Run batch evaluation
     logger.info("Running batch evaluation...")
-    batch_results = evaluator.run_batch_evaluation(batch_data)
+    if cache is not None:
+        batch_results = evaluate_with_cache(evaluator, batch_data, cache)
+        cache.flush()
+        logger.info(f"Cache: {cache.hits} cases reused, {cache.misses} scored")
+    else:
+        batch_results = evaluator.run_batch_evaluation(batch_data)
     
     # Save results
-    output_file = save_results(batch_results, cases)
+    output_file = save_results(batch_results, cases, args.output_dir)
     
     # Summarize results
     summary = summarize_results(batch_results)
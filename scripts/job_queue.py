@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Durable Job Queue
+
+Batch generation runs on the SQLite job queue (src/service/sqlite_queue.py). Jobs survive
+crashes and restarts: run `work` again and it carries on where the last run stopped.
+
+Commands:
+    enqueue FILE   Queue one job per line of a JSONL file (same requests as POST /jobs; '-' reads stdin)
+    work           Run worker processes until interrupted (or, with --drain, until the queue is empty)
+    status         Print job counts, lag and throughput as JSON
+
+Example:
+    python scripts/job_queue.py enqueue data/input/campaign.jsonl
+    python scripts/job_queue.py work --processes 4 --workers 4 --drain
+    python scripts/job_queue.py status
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config.settings import get_config
+from src.service.jobs import JobValidationError, ServiceMetrics, WorkerPool, parse_job_request
+from src.service.sqlite_queue import open_job_queue
+
+STATUS_INTERVAL = 10.0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Durable SQLite job queue for batch generation runs.")
+    parser.add_argument("--db", default=None, help="Queue database (default: service.sqlite.path)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue job requests from a JSONL file")
+    enqueue.add_argument("file", help="JSONL file with one job request per line, or '-' for stdin")
+
+    work = commands.add_parser("work", help="Run workers")
+    work.add_argument("--processes", type=int, default=1, help="Worker processes")
+    work.add_argument("--workers", type=int, default=get_config("service.workers", 4), help="Threads per process")
+    work.add_argument("--drain", action="store_true", help="Exit once no jobs are queued or running")
+
+    commands.add_parser("status", help="Print queue status as JSON")
+    return parser.parse_args(argv)
+
+def enqueue(db: Optional[str], file: str) -> int:
+    """Queues every valid line; returns the number of rejected lines."""
+    jobs = open_job_queue(db)
+    lines = sys.stdin if file == "-" else open(file, 'r', encoding='utf-8')
+    queued = rejected = 0
+    with lines:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                jobs.submit(parse_job_request(json.loads(line)))
+                queued += 1
+            except (json.JSONDecodeError, JobValidationError) as e:
+                print(f"Line {number}: {e}", file=sys.stderr)
+                rejected += 1
+    print(f"Queued {queued} jobs ({rejected} rejected) in {jobs.path}")
+    return rejected
+
+def _work(db: Optional[str], workers: int, drain: bool, log_level: str) -> None:
+    logging.basicConfig(level=getattr(logging, log_level.upper(), logging.INFO))
+    jobs = open_job_queue(db)
+    pool = WorkerPool(jobs, workers, ServiceMetrics()).start()
+    try:
+        while not (drain and _drained(jobs)):
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+def _drained(jobs) -> bool:
+    try:
+        stats = jobs.stats()
+    except sqlite3.Error as e:
+        logging.getLogger(__name__).warning("Could not read queue status: %s", e)
+        return False
+    return stats["queued"] == 0 and stats["running"] == 0
+
+def work(db: Optional[str], processes: int, workers: int, drain: bool, log_level: str) -> None:
+    """Runs worker processes, printing queue status every STATUS_INTERVAL seconds."""
+    children = [multiprocessing.Process(target=_work, args=(db, workers, drain, log_level), name=f"job-worker-{i}")
+                for i in range(max(1, processes))]
+    for child in children:
+        child.start()
+    jobs = open_job_queue(db)
+    try:
+        while any(child.is_alive() for child in children):
+            for child in children:
+                child.join(STATUS_INTERVAL / len(children))
+            print(json.dumps(jobs.stats()))
+    except KeyboardInterrupt:
+        print("\nStopping workers; unfinished jobs stay queued.")
+        for child in children:
+            child.join()
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    if args.command == "enqueue":
+        sys.exit(1 if enqueue(args.db, args.file) else 0)
+    elif args.command == "work":
+        work(args.db, args.processes, args.workers, args.drain, args.log_level)
+    else:
+        print(json.dumps(open_job_queue(args.db).stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
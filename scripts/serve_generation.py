@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Headless Generation Service
+
+Serves reply / new-tweet generation over a local HTTP/JSON API backed by a bounded job
+queue and a worker pool (see src/service/server.py for the endpoints). Defaults come from
+the 'service' section of config.yaml.
+
+Example:
+    python scripts/serve_generation.py --port 8765 --workers 8
+    curl -X POST localhost:8765/jobs -d '{"type": "reply", "tweet": "How do I stake yUSD?"}'
+    curl localhost:8765/jobs/<job_id>
+    curl localhost:8765/metrics
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config.settings import get_config
+from src.service.server import GenerationService
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve tweet generation over a local HTTP/JSON job API.")
+    parser.add_argument("--host", default=get_config("service.host", "127.0.0.1"), help="Interface to bind")
+    parser.add_argument("--port", type=int, default=get_config("service.port", 8765), help="Port to bind")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads (default: service.workers)")
+    parser.add_argument("--queue-size", type=int, default=None, help="Most queued jobs (default: service.queue_size)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    service = GenerationService(host=args.host, port=args.port, workers=args.workers, queue_size=args.queue_size)
+    print(f"Generation service on {service.base_url} (Ctrl+C to stop)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping.")
+
+if __name__ == "__main__":
+    main()
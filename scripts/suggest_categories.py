@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+YieldFi AI Agent - Category Suggestion Script
+
+Classifies a list of topics (one per line) into the protocol's tweet categories for
+campaign planning, using the cached CategoryCatalog keyword index.
+
+Example:
+    python scripts/suggest_categories.py topics.txt --protocol ethena --top 2
+    python scripts/suggest_categories.py topics.txt --group --json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+# Add src directory to Python path if needed
+if not any(p.endswith("src") for p in sys.path):
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models.category import get_category_catalog
+
+def read_topics(path: str) -> List[str]:
+    stream = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    with stream:
+        return [line.strip() for line in stream if line.strip()]
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Suggest tweet categories for a list of topics.")
+    parser.add_argument("topics", help="Text file with one topic per line ('-' for stdin)")
+    parser.add_argument("--protocol", default=None, help="Protocol directory name (default: configured protocol)")
+    parser.add_argument("--top", type=int, default=1, help="Suggestions per topic")
+    parser.add_argument("--group", action="store_true", help="Group topics by their best category")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    topics = read_topics(args.topics)
+    catalog = get_category_catalog(args.protocol)
+    if not len(catalog):
+        print("No categories found for the protocol.", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.group:
+        result = catalog.group_topics(topics)
+        output = {str(name): grouped for name, grouped in result.items()}
+    else:
+        suggestions = catalog.suggest_bulk(topics, k=args.top)
+        output = [{"topic": topic,
+                   "suggestions": [{"category": s.category.name, "score": s.score} for s in ranked]}
+                  for topic, ranked in zip(topics, suggestions)]
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(output, indent=2))
+    elif args.group:
+        for name, grouped in output.items():
+            print(f"\n{name} ({len(grouped)})")
+            for topic in grouped:
+                print(f"  - {topic}")
+    else:
+        for row in output:
+            ranked = ", ".join(f"{s['category']} ({s['score']:.2f})" for s in row["suggestions"]) or "-"
+            print(f"{row['topic'][:60]:<60}  {ranked}")
+    print(f"\nClassified {len(topics)} topics in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Micro-batching of concurrent completion requests into multi-prompt calls.
+# - 2026-10-19: Off by default; clients that cannot send a multi-prompt request (PaLM fallback, no xAI key)
+#   bypass the batcher. Batched requests are not hedged.
+
+"""
+Micro-batching of completion requests.
+
+The xAI completions endpoint accepts a list of prompts in one request. CompletionBatcher
+collects the prompts that arrive within a short window (config 'ai.batching.max_wait_ms')
+for the same backend, model and sampling parameters and sends them together with
+XAIClient.get_completions(); each caller gets back the response for its own prompt, split
+out of the batch by choice index.
+
+There is no background thread: the first caller of a window leads. It waits until the batch
+is full ('ai.batching.max_batch_size') or the window closes, sends the request from its own
+thread and hands every other caller its part. A window with a single prompt is sent with
+plain XAIClient.get_completion(), so batching costs a lone request at most max_wait.
+
+Batching is off by default ('ai.batching.enabled'): when on, every prompt may wait up to
+max_wait, and a failed request fails every caller in its batch. A client that cannot send a multi-prompt
+request (the PaLM fallback, or no xAI key; XAIClient.supports_batching) skips the batcher, as
+its "batch" would be the prompts sent one after another. Multi-prompt requests are not
+hedged (src/ai/hedging.py): only a batch of one goes through get_completion() and its hedger.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from src.config.settings import get_config
+from src.utils.error_handling import APIError
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class _Batch:
+    __slots__ = ("client", "max_tokens", "temperature", "prompts", "futures", "full", "closed")
+
+    def __init__(self, client: Any, max_tokens: Optional[int], temperature: Optional[float]):
+        self.client = client
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.prompts: List[str] = []
+        self.futures: List[Future] = []
+        self.full = threading.Event()
+        self.closed = False
+
+
+class CompletionBatcher:
+    """Groups concurrent completion requests into multi-prompt API calls."""
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait: float = DEFAULT_MAX_WAIT_MS / 1000.0):
+        """
+        Args:
+            max_batch_size: Most prompts sent in one request.
+            max_wait: Seconds the first prompt of a batch waits for others.
+        """
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait))
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _Batch] = {}
+        self._stats = {"prompts": 0, "requests": 0, "batched_prompts": 0}
+
+    @staticmethod
+    def batch_key(client: Any, max_tokens: Optional[int], temperature: Optional[float]) -> Tuple:
+        """Requests with the same key can share one multi-prompt call."""
+        return (
+            getattr(client, "xai_base_url", None),
+            getattr(client, "xai_api_key", None),
+            getattr(client, "use_fallback", None),
+            getattr(client, "xai_model", None),
+            max_tokens,
+            temperature if temperature is not None else getattr(client, "default_temperature", None),
+        )
+
+    def complete(self, client: Any, prompt: str, max_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Gets the completion of one prompt, possibly as part of a batch. A client that cannot
+        batch (client.supports_batching is false) gets a plain get_completion() call.
+
+        Args:
+            client: The XAIClient to send the request with (the leader's client is used).
+            prompt: The prompt.
+            max_tokens: The maximum number of tokens. Defaults to the client's.
+            temperature: The sampling temperature. Defaults to the client's.
+
+        Returns:
+            The response dict for this prompt, as returned by XAIClient.get_completion().
+
+        Raises:
+            APIError: If the request fails or the batch response has no choice for this prompt.
+        """
+        if not getattr(client, "supports_batching", True):
+            with self._lock:
+                self._stats["prompts"] += 1
+                self._stats["requests"] += 1
+            return client.get_completion(prompt=prompt, **self._options(max_tokens, temperature))
+
+        key = self.batch_key(client, max_tokens, temperature)
+        future: Future = Future()
+        with self._lock:
+            self._stats["prompts"] += 1
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch(client, max_tokens, temperature)
+            batch.prompts.append(str(prompt))
+            batch.futures.append(future)
+            if len(batch.prompts) >= self.max_batch_size:
+                self._close(key, batch)
+
+        if leader:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                self._close(key, batch)
+            self._send(batch)
+        return future.result()
+
+    @staticmethod
+    def _options(max_tokens: Optional[int], temperature: Optional[float]) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"max_tokens": max_tokens}
+        if temperature is not None:
+            options["temperature"] = temperature
+        return options
+
+    def _close(self, key: Hashable, batch: _Batch) -> None:
+        # Caller holds self._lock
+        if not batch.closed:
+            batch.closed = True
+            if self._open.get(key) is batch:
+                del self._open[key]
+            batch.full.set()
+
+    def _send(self, batch: _Batch) -> None:
+        size = len(batch.prompts)
+        with self._lock:
+            self._stats["requests"] += 1
+            if size > 1:
+                self._stats["batched_prompts"] += size
+        options = self._options(batch.max_tokens, batch.temperature)
+        try:
+            if size == 1:
+                results = [batch.client.get_completion(prompt=batch.prompts[0], **options)]
+            else:
+                logger.debug("Sending %d prompts as one completion request", size)
+                results = batch.client.get_completions(batch.prompts, **options)
+        except BaseException as e:
+            for future in batch.futures:
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for i, future in enumerate(batch.futures):
+            result = results[i] if i < len(results) else None
+            if result is None or (size > 1 and not result.get("choices")):
+                future.set_exception(APIError(f"No completion returned for prompt {i + 1} of a batch of {size}",
+                                              status_code=502, details={"batch_size": size, "index": i}))
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        """prompts (callers), requests (API calls made) and batched_prompts (prompts sent in batches of 2+)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {"prompts": 0, "requests": 0, "batched_prompts": 0}
+
+
+_BATCHER: Optional[CompletionBatcher] = None
+_BATCHER_LOCK = threading.Lock()
+
+
+def get_completion_batcher() -> Optional[CompletionBatcher]:
+    """
+    Returns the process-wide CompletionBatcher for generation completions.
+
+    Sized by config 'ai.batching.max_batch_size' and 'ai.batching.max_wait_ms'; None when
+    'ai.batching.enabled' is false.
+    """
+    global _BATCHER
+    if not get_config("ai.batching.enabled", False):
+        return None
+    batcher = _BATCHER
+    if batcher is None:
+        with _BATCHER_LOCK:
+            if _BATCHER is None:
+                _BATCHER = CompletionBatcher(
+                    max_batch_size=get_config("ai.batching.max_batch_size", DEFAULT_MAX_BATCH_SIZE) or DEFAULT_MAX_BATCH_SIZE,
+                    max_wait=float(get_config("ai.batching.max_wait_ms", DEFAULT_MAX_WAIT_MS) or 0) / 1000.0,
+                )
+            batcher = _BATCHER
+    return batcher
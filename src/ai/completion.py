@@ -0,0 +1,192 @@
+# Changelog:
+# - 2026-10-19: Initial creation. CompletionResult: completions API responses parsed once in the client.
+#   - Text, reasoning, finish reason, token usage and backend read from any supported shape.
+#   - Process-wide token usage counters for throughput accounting.
+
+"""
+Parsed completions responses.
+
+The completions backends answer in several shapes: xAI text completions
+({"choices": [{"text": ...}]}), chat messages ({"choices": [{"message": {"content": ...}}]}),
+grok-3-mini's reasoning-only dumps (empty "content" with "reasoning_content") and PaLM
+candidates ({"candidates": [{"output": ...}]}). XAIClient wraps every response in a
+CompletionResult, which reads the text, reasoning, finish reason, token usage and backend
+out of the first choice once. CompletionResult is the response dict itself (a dict subclass),
+so code and tests that index the raw JSON keep working; it must be treated as read-only.
+
+as_completion_result() returns a CompletionResult unchanged and parses plain dicts, so
+consumers accept either. Every response's token usage is also added to process-wide
+counters (get_token_usage()), counted once per API call even when a call served a batch.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+BACKEND_XAI = "xai"
+BACKEND_PALM = "palm"
+BACKEND_UNKNOWN = "unknown"
+
+SHAPE_TEXT = "text"                        # choices[0].text
+SHAPE_MESSAGE = "message"                  # choices[0].message.content
+SHAPE_REASONING = "reasoning"              # choices[0].message.reasoning_content only
+SHAPE_EMPTY_MESSAGE = "empty_message"      # message without content or reasoning
+SHAPE_EMPTY_CHOICE = "empty_choice"        # choice without text or message
+SHAPE_CANDIDATE = "candidate"              # candidates[0].output (PaLM)
+SHAPE_EMPTY_CANDIDATE = "empty_candidate"  # candidate without output
+SHAPE_UNRECOGNIZED = "unrecognized"
+
+USAGE_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def parse_usage(raw: Dict[str, Any]) -> Dict[str, int]:
+    """Token counts from a response's "usage" (plus cached_tokens from prompt_tokens_details)."""
+    usage = raw.get("usage")
+    if not isinstance(usage, dict):
+        return {}
+    counts = {key: usage[key] for key in USAGE_KEYS if isinstance(usage.get(key), int)}
+    details = usage.get("prompt_tokens_details")
+    if isinstance(details, dict) and details.get("cached_tokens") is not None:
+        counts["cached_tokens"] = details["cached_tokens"]
+    return counts
+
+
+class CompletionResult(dict):
+    """
+    A completions API response: the parsed JSON dict, plus its fields read out once.
+
+    Attributes:
+        text: The stripped completion text (choice text, message content or PaLM output), or None.
+        reasoning: The stripped message reasoning_content, or None.
+        finish_reason: The first choice's finish_reason, or None.
+        usage: prompt_tokens / completion_tokens / total_tokens / cached_tokens as reported.
+        backend: "xai", "palm" or "unknown".
+        shape: Which response shape was found (SHAPE_* constants).
+    """
+
+    __slots__ = ("text", "reasoning", "finish_reason", "usage", "backend", "shape")
+
+    def __init__(self, raw: Dict[str, Any], backend: Optional[str] = None):
+        super().__init__(raw)
+        self.text: Optional[str] = None
+        self.reasoning: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.usage: Dict[str, int] = parse_usage(raw)
+        self.shape = SHAPE_UNRECOGNIZED
+
+        choices = raw.get("choices")
+        candidates = raw.get("candidates")
+        if isinstance(choices, list) and choices:
+            self.backend = backend or BACKEND_XAI
+            self._read_choice(choices[0])
+        elif isinstance(candidates, list) and candidates:
+            self.backend = backend or BACKEND_PALM
+            candidate = candidates[0]
+            output = candidate.get("output") if isinstance(candidate, dict) else None
+            if output:
+                self.shape, self.text = SHAPE_CANDIDATE, str(output).strip()
+            else:
+                self.shape = SHAPE_EMPTY_CANDIDATE
+        else:
+            self.backend = backend or BACKEND_UNKNOWN
+
+    def _read_choice(self, choice: Any) -> None:
+        if not isinstance(choice, dict):
+            self.shape = SHAPE_EMPTY_CHOICE
+            return
+        self.finish_reason = choice.get("finish_reason")
+        message = choice.get("message")
+        if isinstance(message, dict) and isinstance(message.get("reasoning_content"), str):
+            self.reasoning = message["reasoning_content"].strip() or None
+        if choice.get("text"):
+            self.shape, self.text = SHAPE_TEXT, str(choice["text"]).strip()
+        elif message:
+            content = message.get("content") if isinstance(message, dict) else None
+            if isinstance(content, str) and content.strip():
+                self.shape, self.text = SHAPE_MESSAGE, content.strip()
+            elif self.reasoning:
+                self.shape = SHAPE_REASONING
+            else:
+                self.shape = SHAPE_EMPTY_MESSAGE
+        else:
+            self.shape = SHAPE_EMPTY_CHOICE
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "length"
+
+    def all_texts(self) -> List[Any]:
+        """Every text in the response (all choices and candidates, any field), for debugging."""
+        texts: List[Any] = []
+        for choice in self.get("choices") or []:
+            if not isinstance(choice, dict):
+                continue
+            if "text" in choice:
+                texts.append(choice["text"])
+            if isinstance(choice.get("message"), dict) and "content" in choice["message"]:
+                texts.append(choice["message"]["content"])
+            if "reasoning_content" in choice:
+                texts.append(choice["reasoning_content"])
+        for candidate in self.get("candidates") or []:
+            if not isinstance(candidate, dict):
+                continue
+            if "output" in candidate:
+                texts.append(candidate["output"])
+            if "content" in candidate:
+                texts.append(candidate["content"])
+        for key in ("response", "text"):
+            if isinstance(self.get(key), str):
+                texts.append(self[key])
+        return texts
+
+
+def as_completion_result(response: Any, backend: Optional[str] = None) -> CompletionResult:
+    """Returns response if it is already a CompletionResult, otherwise parses it (non-dicts parse as empty)."""
+    if isinstance(response, CompletionResult):
+        return response
+    return CompletionResult(response if isinstance(response, dict) else {}, backend=backend)
+
+
+class TokenUsage:
+    """Thread-safe totals of reported token usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = self._empty()
+
+    @staticmethod
+    def _empty() -> Dict[str, int]:
+        return {"responses": 0, "reported": 0, **{key: 0 for key in USAGE_KEYS}, "cached_tokens": 0}
+
+    def record(self, usage: Dict[str, int]) -> None:
+        with self._lock:
+            self._totals["responses"] += 1
+            if usage:
+                self._totals["reported"] += 1
+                for key, value in usage.items():
+                    self._totals[key] = self._totals.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, int]:
+        """responses (API responses seen), reported (those with usage) and the token totals."""
+        with self._lock:
+            return dict(self._totals)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals = self._empty()
+
+
+_TOKEN_USAGE = TokenUsage()
+
+
+def record_token_usage(usage: Dict[str, int]) -> None:
+    """Adds one API response's usage to the process-wide totals."""
+    _TOKEN_USAGE.record(usage)
+
+
+def get_token_usage() -> Dict[str, int]:
+    """Process-wide token usage totals (see TokenUsage.snapshot())."""
+    return _TOKEN_USAGE.snapshot()
+
+
+def reset_token_usage() -> None:
+    _TOKEN_USAGE.reset()
@@ -0,0 +1,207 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Bounded-cost echo detection with shingle fingerprints.
+# - 2026-10-19: detect_echo() slices the windows out of the raw texts and normalizes only the slices.
+# - 2026-10-19: Documented why _clean_response() keeps its own input-tweet check.
+# - 2026-10-19: At most 'ai.echo_check.max_pending' background checks wait; the rest are dropped and counted.
+
+"""
+Echo detection.
+
+Models sometimes return the prompt, or part of it, instead of an answer. detect_echo()
+compares a response with its prompt through fingerprints: the hashes of overlapping
+word shingles (runs of `shingle_size` words) of each text. Only a capped window of each
+text is lowercased and fingerprinted (the first and last `max_chars` of the prompt, the
+first `max_chars` of the response), so the cost does not grow with prompt length. The one
+full-length comparison, for an exact echo, only runs when both texts are the same length.
+
+XAIClient._check_for_echo() uses it to log suspicious responses; with config
+'ai.echo_check.background' (the default) the check runs on a background thread, as its
+result is only logged. Under load at most 'ai.echo_check.max_pending' checks wait for that
+thread; responses beyond that are not checked (echo_check_stats() counts them). 'ai.echo_check.enabled: false' skips it. TextFingerprint is the
+exact-match check _clean_response() uses to reject candidates that repeat the input tweet.
+_clean_response() does not reuse the client's EchoReport: that report compares the response
+with the prompt, not with the tweet, and by default is computed after the completion has
+been returned, so it does not exist yet when the response is cleaned.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from src.config.settings import get_config
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SHINGLE_SIZE = 4
+DEFAULT_MAX_CHARS = 2000
+DEFAULT_MAX_PENDING = 100
+
+ECHO_NONE = "none"
+ECHO_PARTIAL = "partial"          # Part of the prompt repeated (often harmless instruction repetition)
+ECHO_SUSPICIOUS = "suspicious"    # Response is mostly prompt text
+ECHO_EXACT = "exact"              # Response is the prompt
+
+
+def _normalize(text: str) -> str:
+    return text.strip().lower()
+
+
+def shingle_hashes(text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE) -> FrozenSet[int]:
+    """Hashes of the overlapping `shingle_size`-word runs of text (the whole text if shorter)."""
+    words = text.split()
+    if len(words) <= shingle_size:
+        return frozenset([hash(tuple(words))]) if words else frozenset()
+    return frozenset(hash(tuple(words[i:i + shingle_size])) for i in range(len(words) - shingle_size + 1))
+
+
+class TextFingerprint:
+    """Case- and surrounding-whitespace-insensitive identity of a text, computed once."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, text: Optional[str]):
+        self.key = _normalize(text) if text else ""
+
+    def __bool__(self) -> bool:
+        return bool(self.key)
+
+    def matches(self, text: Optional[str]) -> bool:
+        """True when text equals the fingerprinted text, ignoring case and surrounding whitespace."""
+        if not self.key or not text:
+            return False
+        candidate = text.strip()
+        return len(candidate) == len(self.key) and candidate.lower() == self.key
+
+
+@dataclass(frozen=True)
+class EchoReport:
+    """How much of the prompt a response repeats."""
+    level: str = ECHO_NONE
+    response_in_prompt: float = 0.0   # Share of response shingles that occur in the prompt
+    prompt_in_response: float = 0.0   # Share of (windowed) prompt shingles that occur in the response
+    continuation: bool = False        # Response starts with the prompt's last line
+
+
+def detect_echo(prompt: str, response_text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                max_chars: int = DEFAULT_MAX_CHARS) -> EchoReport:
+    """
+    Compares a response with its prompt.
+
+    Args:
+        prompt: The prompt sent.
+        response_text: The text the model returned.
+        shingle_size: Words per shingle.
+        max_chars: Characters of each text that are fingerprinted (per end, for the prompt).
+
+    Returns:
+        The EchoReport.
+    """
+    prompt = (prompt or "").strip()
+    response_text = (response_text or "").strip()
+    if not prompt or not response_text:
+        return EchoReport()
+    if len(prompt) == len(response_text) and _normalize(prompt) == _normalize(response_text):
+        return EchoReport(ECHO_EXACT, 1.0, 1.0)  # Only a response as long as the prompt is normalized in full
+
+    # Slice the windows out first and normalize only them
+    if len(prompt) > 2 * max_chars:
+        prompt_tail = _normalize(prompt[-max_chars:])
+        prompt_window = _normalize(prompt[:max_chars]) + "\n" + prompt_tail
+    else:
+        prompt_window = prompt_tail = _normalize(prompt)
+    response_window = _normalize(response_text[:max_chars])
+    prompt_shingles = shingle_hashes(prompt_window, shingle_size)
+    response_shingles = shingle_hashes(response_window, shingle_size)
+    common = len(prompt_shingles & response_shingles)
+    response_in_prompt = common / len(response_shingles) if response_shingles else 0.0
+    prompt_in_response = common / len(prompt_shingles) if prompt_shingles else 0.0
+
+    # A last line longer than the window is compared by its last max_chars characters
+    last_prompt_line = prompt_tail[prompt_tail.rfind("\n") + 1:]
+    first_response_line = response_window.split("\n", 1)[0]
+    continuation = bool(last_prompt_line) and last_prompt_line == first_response_line
+
+    if prompt_in_response > 0.8 or (response_in_prompt > 0.8 and len(response_text) > 10):
+        level = ECHO_SUSPICIOUS
+    elif prompt_in_response > 0.1 or response_in_prompt > 0.5:
+        level = ECHO_PARTIAL
+    else:
+        level = ECHO_NONE
+    return EchoReport(level, response_in_prompt, prompt_in_response, continuation)
+
+
+def log_echo(prompt: str, response_text: str) -> EchoReport:
+    """Runs detect_echo() with the configured window and logs anything suspicious."""
+    report = detect_echo(
+        prompt, response_text,
+        shingle_size=int(get_config("ai.echo_check.shingle_size", DEFAULT_SHINGLE_SIZE) or DEFAULT_SHINGLE_SIZE),
+        max_chars=int(get_config("ai.echo_check.max_chars", DEFAULT_MAX_CHARS) or DEFAULT_MAX_CHARS),
+    )
+    if report.level == ECHO_EXACT:
+        logger.critical("CRITICAL: API returned the exact prompt as the response - 100%% match!")
+    elif report.level == ECHO_SUSPICIOUS:
+        logger.error("SUSPICIOUS: Response repeats the prompt (%.1f%% of response, %.1f%% of prompt)",
+                     report.response_in_prompt * 100, report.prompt_in_response * 100)
+    elif report.level == ECHO_PARTIAL:
+        logger.warning("Response repeats part of the prompt (%.1f%% of response) - this may be normal instruction repetition",
+                       report.response_in_prompt * 100)
+    if report.continuation:
+        logger.warning("First line of response matches last line of prompt - possible continuation issue")
+    return report
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+_PENDING = 0   # Background checks queued or running
+_DROPPED = 0   # Background checks skipped because max_pending were already waiting
+
+
+def check_echo(prompt: str, response_text: str) -> None:
+    """
+    Logs an echo check of a response, per config 'ai.echo_check'.
+
+    Skipped when 'enabled' is false; queued on a background thread when 'background' is true
+    (the default), otherwise run inline. At most 'max_pending' background checks wait at
+    once; while that many are pending, further responses are not checked (counted as dropped).
+    """
+    global _EXECUTOR, _PENDING, _DROPPED
+    if not get_config("ai.echo_check.enabled", True):
+        return
+    if not get_config("ai.echo_check.background", True):
+        log_echo(prompt, response_text)
+        return
+    max_pending = int(get_config("ai.echo_check.max_pending", DEFAULT_MAX_PENDING) or DEFAULT_MAX_PENDING)
+    with _EXECUTOR_LOCK:
+        if _PENDING >= max_pending:
+            _DROPPED += 1
+            logger.debug("Skipping echo check: %d checks already pending", _PENDING)
+            return
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="echo")
+        executor = _EXECUTOR
+        _PENDING += 1
+    try:
+        executor.submit(_background_check, prompt, response_text)
+    except RuntimeError:  # Interpreter shutting down
+        _finish_background_check()
+
+
+def _background_check(prompt: str, response_text: str) -> None:
+    try:
+        log_echo(prompt, response_text)
+    finally:
+        _finish_background_check()
+
+
+def _finish_background_check() -> None:
+    global _PENDING
+    with _EXECUTOR_LOCK:
+        _PENDING -= 1
+
+
+def echo_check_stats() -> Dict[str, int]:
+    """pending (background checks queued or running) and dropped (skipped while max_pending were pending)."""
+    with _EXECUTOR_LOCK:
+        return {"pending": _PENDING, "dropped": _DROPPED}
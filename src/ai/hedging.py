@@ -0,0 +1,248 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Hedged completion requests to cut tail latency.
+#   - LatencyTracker: recent latencies and their percentiles.
+#   - Hedger: duplicate request after the hedge delay, budget on extra requests, win counters.
+# - 2026-10-19: Primaries no longer queue on the hedge pool: calls that cannot be hedged run on the
+#   caller's thread, the others on their own thread; latency is timed from when the call starts.
+
+"""
+Hedged completion requests.
+
+A small share of completion calls take many times longer than the rest and dominate p99
+latency. With hedging switched on (config 'ai.hedging.enabled'), XAIClient sends the
+request, and if it has not answered after the configured percentile of recent latencies
+('ai.hedging.percentile', never less than 'ai.hedging.min_delay_ms') it sends a duplicate,
+to xAI again or to the PaLM backend ('ai.hedging.backend'). Whichever answers first is
+used and the other is abandoned: a request that has not started is cancelled, one already
+on the wire cannot be interrupted, its result is discarded when it arrives.
+
+Hedges are limited by a budget: every request earns 'ai.hedging.max_extra_ratio' of a
+hedge (up to 'ai.hedging.burst' saved up), so duplicates stay below that share of traffic
+even when the backend slows down as a whole. No hedge is sent until
+'ai.hedging.min_samples' latencies have been seen. Hedger.stats() counts hedges sent,
+hedge wins and hedges refused by the budget.
+
+Only hedges run on the Hedger's thread pool. A call that cannot be hedged (too few samples,
+or no hedge left in the budget) runs on the caller's thread; otherwise it gets a thread of
+its own, so the caller can return the hedge's answer while the primary is still out.
+Latencies are timed from when a call starts running, not from when it was handed over, so
+they do not include time spent waiting for a thread.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.ai.completion import BACKEND_PALM, BACKEND_XAI
+from src.config.settings import get_config
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MIN_DELAY_MS = 500.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_EXTRA_RATIO = 0.05
+DEFAULT_BURST = 5.0
+DEFAULT_WINDOW = 500
+DEFAULT_MAX_WORKERS = 16
+
+
+class LatencyTracker:
+    """The most recent `window` latencies (seconds)."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=max(1, int(window)))
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the recorded latencies; None without samples."""
+        with self._lock:
+            values = sorted(self._samples)
+        if not values:
+            return None
+        rank = max(1, min(len(values), int(round(pct / 100.0 * len(values) + 0.5))))
+        return values[rank - 1]
+
+
+class Hedger:
+    """Runs a call with a delayed duplicate and returns whichever succeeds first."""
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_PERCENTILE,
+        min_delay: float = DEFAULT_MIN_DELAY_MS / 1000.0,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_extra_ratio: float = DEFAULT_MAX_EXTRA_RATIO,
+        burst: float = DEFAULT_BURST,
+        backend: str = BACKEND_XAI,
+        window: int = DEFAULT_WINDOW,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Args:
+            percentile: Latency percentile after which the duplicate is sent.
+            min_delay: Lower bound of the hedge delay in seconds.
+            min_samples: Latencies needed before hedging starts.
+            max_extra_ratio: Hedges earned per request (the share of extra requests allowed).
+            burst: Most hedges that can be saved up.
+            backend: Where the duplicate goes: "xai" or "palm".
+            window: Number of recent latencies the percentile is taken over.
+            max_workers: Threads for hedge requests.
+        """
+        if backend not in (BACKEND_XAI, BACKEND_PALM):
+            raise ValueError(f"Unknown hedge backend '{backend}'. Expected '{BACKEND_XAI}' or '{BACKEND_PALM}'")
+        self.percentile = float(percentile)
+        self.min_delay = max(0.0, float(min_delay))
+        self.min_samples = max(1, int(min_samples))
+        self.max_extra_ratio = max(0.0, float(max_extra_ratio))
+        self.burst = max(1.0, float(burst))
+        self.backend = backend
+        self.latencies = LatencyTracker(window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile) or 0.0)
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._stats["hedged"] += 1
+                return True
+            self._stats["budget_denied"] += 1
+            return False
+
+    def _timed(self, call: Callable[[], Any]) -> Any:
+        """Runs call() on this thread and records its latency if it succeeds."""
+        start = time.perf_counter()
+        result = call()
+        self.latencies.record(time.perf_counter() - start)
+        return result
+
+    def _start_primary(self, primary: Callable[[], Any]) -> Future:
+        """Runs the primary on a thread of its own, so it never waits behind hedges in the pool."""
+        future: Future = Future()
+
+        def target() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._timed(primary))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name="hedge-primary", daemon=True).start()
+        return future
+
+    def run(self, primary: Callable[[], Any], hedge: Callable[[], Any]) -> Any:
+        """
+        Calls primary() and, if it is slower than the hedge delay, hedge() as well.
+
+        Args:
+            primary: The request.
+            hedge: The duplicate request.
+
+        Returns:
+            The result of the first call to succeed.
+
+        Raises:
+            Exception: The primary's error if both calls fail (or the primary fails before hedging).
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            self._tokens = min(self.burst, self._tokens + self.max_extra_ratio)
+            has_budget = self._tokens >= 1.0
+        delay = self.delay()
+        if delay is None or not has_budget:
+            start = time.perf_counter()
+            result = self._timed(primary)
+            if delay is not None and time.perf_counter() - start > delay:
+                with self._lock:
+                    self._stats["budget_denied"] += 1
+            return result
+
+        primary_future = self._start_primary(primary)
+        done, _ = wait([primary_future], timeout=delay)
+        if done or not self._take_budget():
+            return primary_future.result()
+
+        logger.info("Completion slower than %.0f ms; sending hedge request to %s", delay * 1000.0, self.backend)
+        hedge_future = self._executor.submit(hedge)
+        pending = {primary_future, hedge_future}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()  # Only helps if it has not started; otherwise its result is dropped
+                    if future is hedge_future:
+                        with self._lock:
+                            self._stats["hedge_wins"] += 1
+                    return future.result()
+        return primary_future.result()  # Both failed
+
+    def stats(self) -> Dict[str, Any]:
+        """requests, hedged (duplicates sent), hedge_wins, budget_denied and the current delay_ms."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        delay = self.delay()
+        stats["delay_ms"] = delay * 1000.0 if delay is not None else None
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_HEDGER: Optional[Hedger] = None
+_HEDGER_LOCK = threading.Lock()
+
+
+def get_completion_hedger() -> Optional[Hedger]:
+    """
+    Returns the process-wide Hedger for XAIClient completions, built from config 'ai.hedging'.
+
+    None when 'ai.hedging.enabled' is false (the default).
+    """
+    global _HEDGER
+    if not get_config("ai.hedging.enabled", False):
+        return None
+    hedger = _HEDGER
+    if hedger is None:
+        with _HEDGER_LOCK:
+            if _HEDGER is None:
+                _HEDGER = Hedger(
+                    percentile=get_config("ai.hedging.percentile", DEFAULT_PERCENTILE),
+                    min_delay=float(get_config("ai.hedging.min_delay_ms", DEFAULT_MIN_DELAY_MS)) / 1000.0,
+                    min_samples=get_config("ai.hedging.min_samples", DEFAULT_MIN_SAMPLES),
+                    max_extra_ratio=get_config("ai.hedging.max_extra_ratio", DEFAULT_MAX_EXTRA_RATIO),
+                    burst=get_config("ai.hedging.burst", DEFAULT_BURST),
+                    backend=get_config("ai.hedging.backend", BACKEND_XAI),
+                )
+            hedger = _HEDGER
+    return hedger
+
+
+def get_hedging_stats() -> Optional[Dict[str, Any]]:
+    """Hedger.stats() of the completion hedger, or None while hedging is off or unused."""
+    return _HEDGER.stats() if _HEDGER is not None else None
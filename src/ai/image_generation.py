@@ -3,13 +3,27 @@ Image generation module for the YieldFi AI Agent.
 
 This module provides functions to generate poster images based on prompts.
 
+get_poster_image() renders one image synchronously. The response generator instead submits
+images to an ImageJobQueue: a background worker pool renders them while the text response
+is returned right away with an image job handle. Finished URLs are cached by prompt hash,
+and a prompt already rendering is shared rather than submitted twice. Placeholder URLs
+(missing key, API error) complete the job as failed and are never cached.
+
 # Changelog:
 # 2025-05-09 10:30 - Step 24 - Created image generation module with API key handling.
+# 2026-10-19 - Asynchronous image jobs: worker pool, prompt-hash result cache, pollable job handles.
+# 2026-10-19 - Lazy %-style logging in the job worker.
 """
 
+import hashlib
 import logging
 import os
-from typing import Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 import requests  # Added for HTTP calls
 
 try:
@@ -68,4 +82,205 @@ def get_poster_image(prompt: str) -> str:
     except Exception as e:
         logger.error(f"Image generation failed: {e}", exc_info=True)
     # Fallback placeholder on error
-    return "https://placehold.co/512x512?text=Image+Error" 
\ No newline at end of file
+    return "https://placehold.co/512x512?text=Image+Error"
+
+
+PLACEHOLDER_PREFIX = "https://placehold.co/"
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def prompt_hash(prompt: str) -> str:
+    """Cache key of an image prompt (whitespace-normalized)."""
+    return hashlib.sha256(" ".join(prompt.split()).encode("utf-8")).hexdigest()
+
+
+class ImageJob:
+    """Handle of one poster image render; poll status/url or wait with result()."""
+
+    def __init__(self, prompt: str, key: str, cached: bool = False):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.prompt = prompt
+        self.prompt_hash = key
+        self.cached = cached
+        self.status = JOB_PENDING
+        self.url: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._finished = False  # Set under _lock; _done is set once callbacks have run
+        self._done = threading.Event()
+        self._callbacks: List[Callable[["ImageJob"], None]] = []
+        self._lock = threading.Lock()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Waits up to `timeout` seconds and returns the URL (None if still rendering)."""
+        self._done.wait(timeout)
+        return self.url
+
+    def add_done_callback(self, callback: Callable[["ImageJob"], None]) -> None:
+        """Calls callback(job) when the job finishes (immediately if it already has)."""
+        with self._lock:
+            if not self._finished:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, status: str, url: Optional[str], error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = status
+            self.url = url
+            self.error = error
+            self.finished_at = time.time()
+            self._finished = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error("Image job %s callback failed: %s", self.job_id, e, exc_info=True)
+        self._done.set()  # Waiters see the callbacks' effects (e.g. response.image_url)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "url": self.url,
+            "error": self.error,
+            "cached": self.cached,
+            "prompt_hash": self.prompt_hash,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ImageJobQueue:
+    """
+    Background poster image rendering with a prompt-hash cache.
+
+    Jobs are kept by id (the most recent `max_jobs`) so the UI can poll them; successful
+    URLs are kept in an LRU cache of `cache_size` prompts.
+    """
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 256, max_jobs: int = 1000,
+                 render: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            max_workers: Concurrent renders.
+            cache_size: Prompts whose URL is remembered.
+            max_jobs: Finished jobs kept for polling.
+            render: prompt -> URL. Defaults to get_poster_image (looked up at call time).
+        """
+        self.cache_size = cache_size
+        self.max_jobs = max_jobs
+        self._render = render
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="image")
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, ImageJob] = {}
+        self._jobs: "OrderedDict[str, ImageJob]" = OrderedDict()
+        self.stats = {"submitted": 0, "cache_hits": 0, "coalesced": 0, "rendered": 0, "failed": 0}
+
+    def submit(self, prompt: str) -> ImageJob:
+        """
+        Queues a render, or answers from the cache / an identical job already in flight.
+
+        Returns:
+            The job. A cache hit is returned already done with cached=True.
+        """
+        key = prompt_hash(prompt)
+        with self._lock:
+            self.stats["submitted"] += 1
+            url = self._cache.get(key)
+            if url is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                job = ImageJob(prompt, key, cached=True)
+                job._finish(JOB_DONE, url)
+                self._remember(job)
+                return job
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.stats["coalesced"] += 1
+                return job
+            job = ImageJob(prompt, key)
+            self._in_flight[key] = job
+            self._remember(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def _remember(self, job: ImageJob) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+    def _run(self, job: ImageJob) -> None:
+        job.status = JOB_RUNNING
+        render = self._render or get_poster_image
+        try:
+            url, error = render(job.prompt), None
+        except Exception as e:
+            logger.error("Image job %s failed: %s", job.job_id, e, exc_info=True)
+            url, error = PLACEHOLDER_PREFIX + "512x512?text=Image+Error", str(e)
+        failed = error is not None or not url or url.startswith(PLACEHOLDER_PREFIX)
+        with self._lock:
+            self._in_flight.pop(job.prompt_hash, None)
+            if failed:
+                self.stats["failed"] += 1
+            else:
+                self.stats["rendered"] += 1
+                self._cache[job.prompt_hash] = url
+                self._cache.move_to_end(job.prompt_hash)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        job._finish(JOB_FAILED if failed else JOB_DONE, url, error or ("placeholder image" if failed else None))
+
+    def get(self, job_id: str) -> Optional[ImageJob]:
+        return self._jobs.get(job_id)
+
+    def poll(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status dict of a job (see ImageJob.to_dict()), or None for an unknown id."""
+        job = self.get(job_id)
+        return job.to_dict() if job is not None else None
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_JOB_QUEUE: Optional[ImageJobQueue] = None
+_JOB_QUEUE_LOCK = threading.Lock()
+
+
+def get_image_job_queue() -> ImageJobQueue:
+    """Returns the process-wide queue, sized by config 'image_generation.max_workers' / 'cache_size'."""
+    global _JOB_QUEUE
+    queue = _JOB_QUEUE
+    if queue is None:
+        with _JOB_QUEUE_LOCK:
+            if _JOB_QUEUE is None:
+                _JOB_QUEUE = ImageJobQueue(
+                    max_workers=int(get_config("image_generation.max_workers", 2) or 2),
+                    cache_size=int(get_config("image_generation.cache_size", 256) or 256),
+                )
+            queue = _JOB_QUEUE
+    return queue
+
+
+def submit_poster_image(prompt: str) -> ImageJob:
+    """Queues a poster image render on the shared queue; see ImageJobQueue.submit()."""
+    return get_image_job_queue().submit(prompt)
+
+
+def get_image_job(job_id: str) -> Optional[ImageJob]:
+    """Looks up a job of the shared queue by id (for polling from the UI)."""
+    return get_image_job_queue().get(job_id)
@@ -3,6 +3,18 @@
 # 2025-05-07 HH:MM - Step 18 - Updated generate_new_tweet_prompt to use TweetCategory model.
 # 2025-05-19 12:00 - Step 25 - Added interaction mode support with mode-specific instructions.
 # 2025-05-09 18:20 - Step 408 - Refactored to use parameterized prompt templates from protocol-specific JSON files.
+# 2026-10-19 - Treat mode=None as the Default mode (generate_tweet_reply passes None for Default).
+# 2026-10-19 - Compiled prompt plans: static sections cached per (protocol, persona, target type, mode, platform).
+# 2026-10-19 - Cache-friendly layout: static sections form a stable prefix, per-request content comes last.
+#   Prompts carry their prefix hash; prefix reuse is tracked for provider-side prompt caching.
+# 2026-10-19 - Mode instruction files are parsed once (sections split by heading) and reloaded only when they change.
+# 2026-10-19 - Token budgets: optional token_budget trims mode examples, knowledge chunks and relevancy facts to fit.
+# 2026-10-19 - Compiled plans are dropped when the template registry reloads a changed template file.
+# 2026-10-19 - Config subscriptions refresh the core message and check interval, and drop cached plans and
+#   mode instructions when their config keys change.
+# 2026-10-19 - Optional ProtocolBundle: templates and mode instructions come from the bundle's protocol.
+# 2026-10-19 - Plan cache hit/miss counters are updated under a lock (plans are built from several threads).
+# 2026-10-19 - Dropping plans takes the lock and bumps a generation; a plan compiled across a drop is not stored.
 
 """
 Prompt engineering for the YieldFi AI Agent.
@@ -12,15 +24,19 @@ including tweet replies and new tweet generation based on categories.
 """
 
 from enum import Enum
-from typing import Dict, Any, Optional, List # Added List
+from dataclasses import dataclass
+import hashlib
+import threading
+from typing import Dict, Any, Optional, List, Tuple # Added List
 import os
+import time
 from pathlib import Path
 
 # Attempt to import get_config for robust path finding, fallback if necessary
 # This is primarily for modules that might use this utility outside the main app flow
 # For instance, if a script directly calls a prompt generator for testing.
 try:
-    from src.config.settings import get_config, DEFAULT_PROTOCOL
+    from src.config.settings import get_config, subscribe, DEFAULT_PROTOCOL
 except ImportError:
     # Define a fallback get_config if the main one isn't available
     # This is a simplified version and might not cover all edge cases of the real one
@@ -33,9 +49,12 @@ except ImportError:
         return default
     DEFAULT_PROTOCOL = "yieldfi"  # Fallback default protocol
 
+    def subscribe(prefixes: Any, callback: Any) -> None:
+        return None  # No config reloads without the settings module
+
 # Import the prompt template management system
 try:
-    from src.prompt_management import PromptTemplate, PromptKey
+    from src.prompt_management import PromptTemplate, PromptKey, get_template_registry
 except ImportError:
     logger.warning("Could not import PromptTemplate. Using fallback prompt generation.")
     # This will be handled gracefully in the code below
@@ -44,6 +63,13 @@ from src.models.tweet import Tweet # Or a more generic Post model
 from src.models.account import Account, AccountType
 from src.models.response import ResponseType # For typing, if creating different prompt structures per response type
 from src.models.category import TweetCategory # Added for Step 18
+from src.ai.token_budget import (
+    PRIORITY_MODE_EXAMPLES,
+    PRIORITY_RELEVANCY_FACTS,
+    PromptSection,
+    assemble_sections,
+    knowledge_section,
+)
 
 # Logger instance - ensure logging is set up if used
 from src.utils.logging import get_logger # type: ignore
@@ -68,43 +94,194 @@ class InteractionMode(Enum):
     DEGEN = "Degen"
 
 # Step 25: Function to load mode-specific instructions
-def load_mode_instructions(mode: str = "Default") -> str:
+#
+# Mode instruction files are read on every non-default persona build, so they are kept
+# parsed in memory: ModeInstructions holds the text pre-split on "##" (the split every
+# consumer used to repeat) plus a heading index. Entries are keyed on protocol and mode and
+# re-validated by file mtime/size at most once per MODE_INSTRUCTION_CHECK_INTERVAL seconds.
+
+MODE_INSTRUCTION_CHECK_INTERVAL = float(get_config("prompts.mode_instruction_check_interval", 2.0))
+
+
+@dataclass(frozen=True)
+class ModeInstructions:
+    """A parsed mode instruction file."""
+    mode: str
+    text: str
+    sections: Tuple[Tuple[str, str], ...]  # (lowercased section, stripped section), split on "##"
+    headings: Dict[str, str]               # lowercased first line of a section -> stripped section
+
+    def find_section(self, keyword: str) -> str:
+        """Returns the first section mentioning keyword (case-insensitive), or ""."""
+        keyword = keyword.lower()
+        for lowered, section in self.sections:
+            if keyword in lowered:
+                return section
+        return ""
+
+
+def parse_mode_instructions(mode: str, text: str) -> ModeInstructions:
     """
-    Loads the instruction file for a specific interaction mode.
-    
+    Splits mode instruction text into its "##" sections.
+
     Args:
-        mode: The interaction mode (Default, Professional, Degen)
-        
+        mode: The interaction mode the text belongs to.
+        text: The raw instruction text.
+
     Returns:
-        A string with the mode-specific instructions, or a fallback if not found
+        The parsed ModeInstructions.
     """
-    # Convert mode name to standard format for file lookup
-    mode_clean = mode.strip().capitalize().replace(" ", "")
-    
-    # Use protocol paths from Step 27
-    from src.config import get_protocol_path
-    mode_file_path = get_protocol_path("mode-instructions", f"InstructionsFor{mode_clean}.md")
-    
-    if not os.path.exists(mode_file_path):
-        logger.warning(f"Mode instruction file not found for '{mode}' at {mode_file_path}. Using fallback.")
-        return f"""
+    sections = tuple((section.lower(), section.strip()) for section in text.split("##"))
+    headings: Dict[str, str] = {}
+    for _, section in sections:
+        heading = section.split("\n", 1)[0].strip().lower()
+        if heading:
+            headings.setdefault(heading, section)
+    return ModeInstructions(mode=mode, text=text, sections=sections, headings=headings)
+
+
+@dataclass
+class _ModeFileEntry:
+    path: str
+    signature: Optional[Tuple[int, int]]  # (mtime_ns, size), None while the file is missing
+    checked_at: float
+    instructions: ModeInstructions
+
+
+_MODE_INSTRUCTION_CACHE: Dict[Tuple[str, str], _ModeFileEntry] = {}
+_MODE_INSTRUCTION_LOCK = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_mode_instructions(mode: str, path: str, signature: Optional[Tuple[int, int]]) -> Optional[ModeInstructions]:
+    """Reads and parses a mode file; None if it could not be read (the caller must not cache that)."""
+    if signature is None:
+        logger.warning("Mode instruction file not found for '%s' at %s. Using fallback.", mode, path)
+        return parse_mode_instructions(mode, f"""
         This is a fallback instruction set for '{mode}' mode.
         Use a {mode.lower()} tone and style appropriate for the YieldFi brand.
-        """
-    
+        """)
     try:
-        with open(mode_file_path, 'r') as file:
+        with open(path, 'r') as file:
             content = file.read()
-            logger.info(f"Loaded mode instructions for '{mode}'")
-            return content
+        logger.info("Loaded mode instructions for '%s'", mode)
+        return parse_mode_instructions(mode, content)
     except Exception as e:
-        logger.error(f"Error loading mode instructions for '{mode}': {e}")
-        return f"""
+        logger.error("Error loading mode instructions for '%s': %s", mode, e)
+        return None
+
+
+def _unreadable_mode_instructions(mode: str) -> ModeInstructions:
+    return parse_mode_instructions(mode, f"""
         Error loading mode file for '{mode}'. Using fallback.
         Use a standard, professional tone appropriate for the YieldFi brand.
-        """
+        """)
+
+
+def read_mode_instructions(mode: str, path: str) -> ModeInstructions:
+    """
+    Reads and parses one mode instruction file, without caching.
+
+    Args:
+        mode: The interaction mode the file belongs to.
+        path: Path of the InstructionsFor<Mode>.md file.
+
+    Returns:
+        The parsed ModeInstructions, or the same fallbacks get_mode_instructions() uses.
+    """
+    instructions = _read_mode_instructions(mode, path, _file_signature(path))
+    return instructions if instructions is not None else _unreadable_mode_instructions(mode)
+
+
+def mode_file_name(mode: str) -> str:
+    """File name of a mode's instruction file, e.g. 'degen' -> 'InstructionsForDegen.md'."""
+    return f"InstructionsFor{mode.strip().capitalize().replace(' ', '')}.md"
+
+
+def get_mode_instructions(mode: str = "Default") -> ModeInstructions:
+    """
+    Returns the parsed instruction file for an interaction mode of the current protocol.
+
+    The file is read once and re-read only when its mtime or size changes (checked at most
+    every MODE_INSTRUCTION_CHECK_INTERVAL seconds). A reload also drops compiled prompt
+    plans, since they embed mode sections.
+
+    Args:
+        mode: The interaction mode (Default, Professional, Degen)
 
-def get_base_yieldfi_persona(active_account_type: AccountType, mode: str = "Default", protocol_name: str = None) -> str:
+    Returns:
+        The parsed ModeInstructions, or a parsed fallback if the file is missing or unreadable
+    """
+    # Convert mode name to standard format for file lookup
+    mode_clean = mode.strip().capitalize().replace(" ", "")
+    protocol = str(get_config("default_protocol", "ethena")).lower()
+    key = (protocol, mode_clean)
+    now = time.monotonic()
+
+    entry = _MODE_INSTRUCTION_CACHE.get(key)
+    if entry is not None and now - entry.checked_at < MODE_INSTRUCTION_CHECK_INTERVAL:
+        return entry.instructions
+
+    with _MODE_INSTRUCTION_LOCK:
+        entry = _MODE_INSTRUCTION_CACHE.get(key)
+        if entry is None:
+            # Use protocol paths from Step 27
+            from src.config import get_protocol_path
+            path = get_protocol_path("mode-instructions", mode_file_name(mode))
+        else:
+            path = entry.path
+        signature = _file_signature(path)
+        if entry is not None and signature == entry.signature:
+            entry.checked_at = now
+            return entry.instructions
+
+        instructions = _read_mode_instructions(mode, path, signature)
+        if instructions is None:
+            return _unreadable_mode_instructions(mode)
+        _MODE_INSTRUCTION_CACHE[key] = _ModeFileEntry(path, signature, now, instructions)
+
+    if entry is not None:
+        logger.info("Mode instructions for '%s' changed on disk; recompiling prompt plans", mode)
+        _drop_stale_plans()
+    return instructions
+
+
+def load_mode_instructions(mode: str = "Default") -> str:
+    """
+    Loads the instruction file for a specific interaction mode.
+    
+    Args:
+        mode: The interaction mode (Default, Professional, Degen)
+        
+    Returns:
+        A string with the mode-specific instructions, or a fallback if not found
+    """
+    return get_mode_instructions(mode).text
+
+
+def clear_mode_instruction_cache() -> None:
+    """Forgets all parsed mode instruction files."""
+    with _MODE_INSTRUCTION_LOCK:
+        _MODE_INSTRUCTION_CACHE.clear()
+
+def _mode_instructions(mode: str, bundle: Optional[Any] = None) -> ModeInstructions:
+    """Mode instructions from the bundle when given, else from the configured default protocol."""
+    return bundle.get_mode_instructions(mode) if bundle is not None else get_mode_instructions(mode)
+
+
+def get_base_yieldfi_persona(
+    active_account_type: AccountType,
+    mode: str = "Default",
+    protocol_name: str = None,
+    bundle: Optional[Any] = None
+) -> str:
     """
     Defines the base persona for YieldFi's social media voice based on the account type and interaction mode.
     
@@ -113,6 +290,7 @@ def get_base_yieldfi_persona(active_account_type: AccountType, mode: str = "Defa
         mode: The interaction mode (Default, Professional, Degen)
         protocol_name: Optional protocol name to load persona from specific template.
                        If None, uses the default protocol.
+        bundle: Optional ProtocolBundle supplying the mode instructions.
     
     Returns:
         A string describing the persona.
@@ -129,7 +307,7 @@ def get_base_yieldfi_persona(active_account_type: AccountType, mode: str = "Defa
     except (NameError, AttributeError, Exception) as e:
         # NameError would occur if PromptTemplate isn't imported
         # Fall back to hardcoded personas
-        logger.warning(f"Error getting persona from template: {e}. Using fallback.")
+        logger.warning("Error getting persona from template: %s. Using fallback.", e)
         
     # Fallback to hardcoded personas if template system is unavailable or returns empty
     # 1. Default persona for OFFICIAL account:
@@ -165,15 +343,9 @@ def get_base_yieldfi_persona(active_account_type: AccountType, mode: str = "Defa
     
     # Incorporate mode-specific instructions if mode is not Default
     if mode and mode.lower() != "default":
-        mode_instructions = load_mode_instructions(mode)
         # Extract key parts from mode instructions for persona modification
         # We mainly want tone guidelines and example style, not the whole file
-        sections = mode_instructions.split("##")
-        tone_guidelines = ""
-        for section in sections:
-            if "tone guidelines" in section.lower():
-                tone_guidelines = section.strip()
-                break
+        tone_guidelines = _mode_instructions(mode, bundle).find_section("tone guidelines")
         
         if tone_guidelines:
             base_persona += f"\n\nAdapt your voice according to these mode-specific guidelines:\n{tone_guidelines}"
@@ -210,7 +382,7 @@ def get_instruction_set(active_account_type: AccountType, target_account_type: A
     except (NameError, AttributeError, Exception) as e:
         # NameError would occur if PromptTemplate isn't imported
         # Fall back to hardcoded instruction sets
-        logger.warning(f"Error getting instruction set from template: {e}. Using fallback.")
+        logger.warning("Error getting instruction set from template: %s. Using fallback.", e)
     
     # Fallback to hardcoded instruction sets if template system is unavailable or returns empty
     # OFFICIAL account responding to various account types
@@ -243,6 +415,476 @@ def get_instruction_set(active_account_type: AccountType, target_account_type: A
     while maintaining appropriate tone and style for your account type.
     """
 
+# --- Compiled prompt plans ---
+# Everything in a prompt except the per-request fields (post text, target account handle/bio,
+# knowledge snippet, topic, category and interaction_details) depends only on
+# (protocol, active account type, target account type, mode, platform). A PromptPlan holds
+# those static sections fully rendered, so a request only splices in its dynamic fields.
+#
+# Layout: the static sections are emitted first as one byte-identical prefix (critical
+# instructions, persona, core message, mode sections, then the target-specific instruction
+# set), followed by the per-request content and the response prefix. Providers that cache
+# prompt prefixes can then skip re-processing the shared part on every call.
+
+DEFAULT_CRITICAL_INSTRUCTION_BLOCK = """
+CRITICAL INSTRUCTIONS:
+1. Respond with ONLY the final tweet text
+2. Maximum 280 characters for Twitter
+3. NO explanations, reasoning, self-talk, or any other content
+4. NO prefixes like 'Tweet:' or 'Response:'
+5. Do NOT include character counts or drafts
+6. Your ENTIRE response should be JUST the tweet
+"""
+
+PlanKey = Tuple[str, Optional[str], str, Optional[str], Optional[str], str]
+
+
+@dataclass(frozen=True)
+class PromptPlan:
+    """Pre-rendered static sections of an interaction or new-tweet prompt."""
+    key: PlanKey
+    instruction_block: str
+    persona_part: str
+    core_part: str
+    instructions_part: Optional[str]  # Interaction prompts with a target account only
+    mode_parts: Tuple[str, ...]
+    task_intro: str                   # First line of the task section
+    task_suffix: str                  # Platform constraint (interaction prompts)
+    mode_task_line: Optional[str]     # "Use the <mode> interaction style..." (new tweets)
+    response_prefix: str
+    prefix: str                       # All static sections, in prompt order
+    prefix_hash: str                  # Short SHA-256 of prefix
+    static_sections: Tuple[PromptSection, ...]  # The prefix as sections (mode examples are optional)
+
+
+def _hash_prefix(prefix: str) -> str:
+    return hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+
+
+class RenderedPrompt(str):
+    """
+    A prompt string that also carries the hash and length of its static prefix and, when
+    it was assembled against a token budget, the budget report (see AssembledPrompt.report()).
+    """
+    prefix_hash: Optional[str]
+    prefix_chars: int
+    budget_report: Optional[Dict[str, Any]]
+
+    def __new__(cls, text: str, prefix_hash: Optional[str] = None, prefix_chars: int = 0,
+                budget_report: Optional[Dict[str, Any]] = None) -> 'RenderedPrompt':
+        prompt = super().__new__(cls, text)
+        prompt.prefix_hash = prefix_hash
+        prompt.prefix_chars = prefix_chars
+        prompt.budget_report = budget_report
+        return prompt
+
+
+class PrefixReuseStats:
+    """Counts how often rendered prompts start with a prefix that was already sent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self.prompts = 0
+        self.reused = 0
+        self.prompt_chars = 0
+        self.reused_chars = 0
+
+    def record(self, prefix_hash: str, prefix_chars: int, prompt_chars: int) -> bool:
+        """Records one prompt; returns True if its prefix had been seen before."""
+        with self._lock:
+            seen = prefix_hash in self._seen
+            self._seen[prefix_hash] = self._seen.get(prefix_hash, 0) + 1
+            self.prompts += 1
+            self.prompt_chars += prompt_chars
+            if seen:
+                self.reused += 1
+                self.reused_chars += prefix_chars
+            return seen
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seen.clear()
+            self.prompts = self.reused = self.prompt_chars = self.reused_chars = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """prompts, reused, reuse_rate, distinct_prefixes and the share of prompt characters in reused prefixes."""
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "reused": self.reused,
+                "reuse_rate": self.reused / self.prompts if self.prompts else 0.0,
+                "distinct_prefixes": len(self._seen),
+                "prompt_chars": self.prompt_chars,
+                "reused_prefix_chars": self.reused_chars,
+                "reused_char_ratio": self.reused_chars / self.prompt_chars if self.prompt_chars else 0.0,
+            }
+
+
+PREFIX_REUSE_STATS = PrefixReuseStats()
+
+
+_PROMPT_PLAN_CACHE: Dict[PlanKey, PromptPlan] = {}
+_PROMPT_PLAN_STATS = {"hits": 0, "misses": 0}
+_PROMPT_PLAN_LOCK = threading.Lock()
+_PROMPT_PLAN_GENERATION = 0  # Bumped whenever plans are dropped; plans compiled before that are not stored
+
+
+def _account_type_name(account_type: Any) -> str:
+    return account_type.name if isinstance(account_type, AccountType) else str(account_type).upper()
+
+
+def _is_custom_mode(mode: Optional[str]) -> bool:
+    return bool(mode) and mode.lower() != "default"
+
+
+def _render_instruction_block(platform: str, protocol_name: Optional[str]) -> str:
+    critical_instr = PromptTemplate.get_critical_instructions(platform.lower(), protocol_name)
+    if critical_instr:
+        return "CRITICAL INSTRUCTIONS:\n" + "\n".join([f"{i+1}. {instr}" for i, instr in enumerate(critical_instr)])
+    return DEFAULT_CRITICAL_INSTRUCTION_BLOCK
+
+
+def _compile_mode_parts(
+    mode: Optional[str],
+    protocol_name: Optional[str],
+    for_new_tweet: bool,
+    bundle: Optional[Any] = None
+) -> Tuple[str, ...]:
+    """Renders the mode-specific sections from the template, or from the mode instruction file."""
+    if not _is_custom_mode(mode):
+        return ()
+    parts: List[str] = []
+    mode_details = PromptTemplate.get_interaction_mode(mode, protocol_name)
+    if mode_details:
+        if 'tone' in mode_details:
+            parts.append(f"Mode-Specific Tone: {mode_details['tone']}")
+        if 'style' in mode_details:
+            parts.append(f"Mode-Specific Style: {mode_details['style']}")
+        if 'examples' in mode_details and isinstance(mode_details['examples'], (list, tuple)):
+            examples_text = "\n".join([f"- {ex}" for ex in mode_details['examples']])
+            parts.append(f"Mode-Specific Examples:\n{examples_text}")
+        return tuple(parts)
+
+    examples_section = ""
+    style_points = ""
+    for lowered, section in _mode_instructions(mode, bundle).sections:
+        if "examples" in lowered:
+            examples_section = section
+        elif for_new_tweet and "style points" in lowered:
+            style_points = section
+
+    if not for_new_tweet:
+        if examples_section:
+            parts.append(f"Mode-Specific Style Examples: {examples_section}")
+    elif examples_section or style_points:
+        mode_style = f"Mode-Specific Style ({mode}):"
+        if examples_section:
+            mode_style += f"\n{examples_section}"
+        if style_points:
+            mode_style += f"\n{style_points}"
+        parts.append(mode_style)
+    return tuple(parts)
+
+
+def _compile_prompt_plan(
+    key: PlanKey,
+    active_account_type: AccountType,
+    target_account_type: Optional[AccountType],
+    bundle: Optional[Any] = None
+) -> PromptPlan:
+    kind, protocol_name, _, _, mode, platform = key
+    if bundle is not None:
+        protocol_name = bundle.name  # key[1] is the bundle's versioned plan key
+    for_new_tweet = kind == "new_tweet"
+
+    persona = get_base_yieldfi_persona(active_account_type, mode, protocol_name, bundle)
+    core_message = PromptTemplate.get(PromptKey.CORE_MESSAGE, protocol_name) or YIELDFI_CORE_MESSAGE
+
+    instructions_part = None
+    if target_account_type is not None:
+        instructions = get_instruction_set(active_account_type, target_account_type, protocol_name)
+        instructions_part = f"Interaction Instructions: {instructions.strip()}"
+
+    if for_new_tweet:
+        if platform.lower() == "twitter":
+            task_intro = "Task: Create a new tweet that aligns with the persona, core message, and the specified category details."
+        else:
+            task_intro = f"Task: Create a new {platform} post that aligns with the persona, core message, and the specified category details."
+        task_suffix = ""
+        mode_task_line = f"Use the {mode} interaction style as detailed above." if _is_custom_mode(mode) else None
+        default_prefix = "Tweet:"
+    else:
+        task_intro = "Task: Craft a response that aligns with the persona and core message."
+        task_suffix = " Keep the response under 280 characters as per Twitter's limit." if platform.lower() == "twitter" else ""
+        mode_task_line = None
+        default_prefix = "Response:"
+
+    instruction_block = _render_instruction_block(platform, protocol_name)
+    persona_part = f"Persona: {persona}"
+    core_part = f"Core Message: {core_message.strip()}"
+    mode_parts = _compile_mode_parts(mode, protocol_name, for_new_tweet, bundle)
+    # Most widely shared sections first, so prompts for other targets still share a leading run
+    static_sections = [
+        PromptSection("instruction_block", instruction_block),
+        PromptSection("persona", persona_part),
+        PromptSection("core_message", core_part),
+    ]
+    for part in mode_parts:
+        is_examples = part.startswith(("Mode-Specific Examples", "Mode-Specific Style Examples"))
+        static_sections.append(PromptSection("mode_examples", part, PRIORITY_MODE_EXAMPLES) if is_examples
+                               else PromptSection("mode", part))
+    if instructions_part:
+        static_sections.append(PromptSection("instructions", instructions_part))
+    prefix = "\n\n".join(section.text for section in static_sections)
+
+    return PromptPlan(
+        key=key,
+        instruction_block=instruction_block,
+        persona_part=persona_part,
+        core_part=core_part,
+        instructions_part=instructions_part,
+        mode_parts=mode_parts,
+        task_intro=task_intro,
+        task_suffix=task_suffix,
+        mode_task_line=mode_task_line,
+        response_prefix=PromptTemplate.get(PromptKey.RESPONSE_PREFIX, protocol_name) or default_prefix,
+        prefix=prefix,
+        prefix_hash=_hash_prefix(prefix),
+        static_sections=tuple(static_sections),
+    )
+
+
+def get_prompt_plan(
+    kind: str,
+    protocol_name: Optional[str],
+    active_account_type: AccountType,
+    target_account_type: Optional[AccountType],
+    mode: Optional[str],
+    platform: str,
+    bundle: Optional[Any] = None
+) -> PromptPlan:
+    """
+    Returns the compiled plan for a prompt shape, compiling it on first use.
+
+    Args:
+        kind: "interaction" or "new_tweet".
+        protocol_name: Protocol for template lookups (None uses the default protocol).
+        active_account_type: Type of the posting account.
+        target_account_type: Type of the account being replied to (interaction prompts).
+        mode: Interaction mode as passed by the caller (None/Default add no mode sections).
+        platform: Target platform (e.g., Twitter).
+        bundle: Optional ProtocolBundle; overrides protocol_name and supplies mode instructions.
+
+    Returns:
+        The cached PromptPlan.
+    """
+    key: PlanKey = (
+        kind,
+        bundle.plan_key if bundle is not None else protocol_name,
+        _account_type_name(active_account_type),
+        _account_type_name(target_account_type) if target_account_type is not None else None,
+        mode,
+        platform,
+    )
+    if _is_custom_mode(mode) and bundle is None:
+        get_mode_instructions(mode)  # Drops stale plans if the mode file changed
+    with _PROMPT_PLAN_LOCK:
+        plan = _PROMPT_PLAN_CACHE.get(key)
+        if plan is not None:
+            _PROMPT_PLAN_STATS["hits"] += 1
+            return plan
+        generation = _PROMPT_PLAN_GENERATION
+    # Concurrent first requests may compile the same plan twice; both results are identical.
+    plan = _compile_prompt_plan(key, active_account_type, target_account_type, bundle)
+    with _PROMPT_PLAN_LOCK:
+        _PROMPT_PLAN_STATS["misses"] += 1
+        if generation == _PROMPT_PLAN_GENERATION:
+            _PROMPT_PLAN_CACHE[key] = plan
+        # Otherwise the templates changed while compiling: use the plan once, compile afresh next time
+    return plan
+
+
+def clear_prompt_plan_cache() -> None:
+    """Drops all compiled plans. Template and mode file edits on disk do this automatically."""
+    _drop_stale_plans()
+    with _PROMPT_PLAN_LOCK:
+        _PROMPT_PLAN_STATS["hits"] = 0
+        _PROMPT_PLAN_STATS["misses"] = 0
+
+
+def _drop_stale_plans() -> None:
+    """Drops all compiled plans, including any still being compiled from the old sources."""
+    global _PROMPT_PLAN_GENERATION
+    with _PROMPT_PLAN_LOCK:
+        _PROMPT_PLAN_CACHE.clear()
+        _PROMPT_PLAN_GENERATION += 1
+
+
+try:
+    # Preloads all protocol templates; plans are recompiled when a template file changes
+    get_template_registry().add_reload_listener(_drop_stale_plans)
+except NameError:
+    pass  # PromptTemplate unavailable; the fallback prompts do not use templates
+
+
+def _on_config_change(changes: Dict[str, Any]) -> None:
+    """Refreshes config-derived module state; plans embed the core message and mode files."""
+    global YIELDFI_CORE_MESSAGE, MODE_INSTRUCTION_CHECK_INTERVAL
+    if "yieldfi.core_message" in changes:
+        YIELDFI_CORE_MESSAGE = get_config("yieldfi.core_message", YIELDFI_CORE_MESSAGE)
+    if "prompts.mode_instruction_check_interval" in changes:
+        MODE_INSTRUCTION_CHECK_INTERVAL = float(get_config("prompts.mode_instruction_check_interval", 2.0))
+    if "default_protocol" in changes:
+        clear_mode_instruction_cache()  # Mode files are resolved under the default protocol's directory
+    if "yieldfi.core_message" in changes or "default_protocol" in changes:
+        _drop_stale_plans()
+
+
+subscribe(("yieldfi.core_message", "prompts.mode_instruction_check_interval", "default_protocol"), _on_config_change)
+
+
+def get_prompt_plan_cache_stats() -> Dict[str, int]:
+    """Returns plan cache hits, misses and the number of compiled plans."""
+    with _PROMPT_PLAN_LOCK:
+        return {**_PROMPT_PLAN_STATS, "plans": len(_PROMPT_PLAN_CACHE)}
+
+
+def get_prefix_reuse_stats() -> Dict[str, Any]:
+    """Returns prompt prefix reuse counters since start-up (or the last reset)."""
+    return PREFIX_REUSE_STATS.snapshot()
+
+
+def reset_prefix_reuse_stats() -> None:
+    PREFIX_REUSE_STATS.reset()
+
+
+def _relevancy_facts_section(relevancy_facts: Optional[List[str]]) -> Optional[PromptSection]:
+    if not relevancy_facts:
+        return None
+    items = [f"- {fact}" for fact in relevancy_facts]
+    return PromptSection("relevancy_facts", "Relevancy Facts:\n" + "\n".join(items),
+                         PRIORITY_RELEVANCY_FACTS, items, header="Relevancy Facts:\n")
+
+
+def _finish_prompt(
+    plan: PromptPlan,
+    dynamic_parts: List[Any],
+    relevancy_facts: Optional[List[str]] = None,
+    token_budget: Optional[int] = None
+) -> RenderedPrompt:
+    """
+    Appends the per-request sections and response prefix to the plan's static prefix.
+
+    dynamic_parts are strings or PromptSections. Relevancy facts go after the response
+    prefix. With a token_budget, optional sections are trimmed to fit (see token_budget.py).
+    """
+    facts_section = _relevancy_facts_section(relevancy_facts)
+    if token_budget is None:
+        tail = [part.text if isinstance(part, PromptSection) else part for part in dynamic_parts]
+        text = plan.prefix + "\n\n" + "\n\n".join(tail) + "\n\n" + plan.response_prefix
+        if facts_section is not None:
+            text += "\n\n" + facts_section.text
+        PREFIX_REUSE_STATS.record(plan.prefix_hash, len(plan.prefix), len(text))
+        return RenderedPrompt(text, plan.prefix_hash, len(plan.prefix))
+
+    sections = list(plan.static_sections)
+    sections.extend(part if isinstance(part, PromptSection) else PromptSection("dynamic", part)
+                    for part in dynamic_parts)
+    sections.append(PromptSection("response_prefix", plan.response_prefix))
+    if facts_section is not None:
+        sections.append(facts_section)
+    assembled = assemble_sections(sections, token_budget)
+    if assembled.over_budget:
+        logger.warning("Prompt needs ~%s tokens even after trimming; budget is %s", assembled.estimated_tokens, token_budget)
+
+    prefix, prefix_hash = plan.prefix, plan.prefix_hash
+    if "mode_examples" in assembled.dropped:
+        prefix = "\n\n".join(s.text for s in plan.static_sections if s.name != "mode_examples")
+        prefix_hash = _hash_prefix(prefix)
+    PREFIX_REUSE_STATS.record(prefix_hash, len(prefix), len(assembled.text))
+    return RenderedPrompt(assembled.text, prefix_hash, len(prefix), assembled.report())
+
+
+def _render_interaction_prompt(
+    plan: PromptPlan,
+    original_post_content: Optional[str],
+    target_account_info: Optional[Account],
+    yieldfi_knowledge_snippet: Optional[str],
+    interaction_details: Dict[str, Any],
+    relevancy_facts: Optional[List[str]] = None,
+    token_budget: Optional[int] = None
+) -> RenderedPrompt:
+    prompt_parts: List[Any] = []
+    if original_post_content:
+        prompt_parts.append(f"Original Post to Reply To: \"{original_post_content}\"")
+    if target_account_info:
+        target_desc = f"Target Account: @{target_account_info.username} (Type: {target_account_info.account_type.value})"
+        if target_account_info.bio:
+            target_desc += f", Bio: {target_account_info.bio}"
+        prompt_parts.append(target_desc)
+    if yieldfi_knowledge_snippet:
+        prompt_parts.append(knowledge_section("knowledge", "Relevant YieldFi Knowledge: ", yieldfi_knowledge_snippet))
+
+    tone = interaction_details.get('tone', 'default')
+    goal = interaction_details.get('goal', 'engage and inform')
+    style_examples = interaction_details.get('style_examples', '')
+    task_instructions = plan.task_intro
+    if tone != 'default':
+        task_instructions += f" Use a {tone} tone."
+    task_instructions += f" Goal: {goal}."
+    if style_examples:
+        task_instructions += f" Style Examples: {style_examples}"
+    prompt_parts.append(task_instructions + plan.task_suffix)
+    return _finish_prompt(plan, prompt_parts, relevancy_facts, token_budget)
+
+
+def _render_new_tweet_prompt(
+    plan: PromptPlan,
+    category: TweetCategory,
+    topic: Optional[str],
+    yieldfi_knowledge_snippet: Optional[str],
+    platform: str,
+    additional_instructions: Dict[str, Any],
+    token_budget: Optional[int] = None
+) -> RenderedPrompt:
+    prompt_parts: List[Any] = [
+        f"Tweet Category: {category.name}",
+        f"Category Description: {category.description}",
+    ]
+    if hasattr(category, 'style_guidelines') and category.style_guidelines:
+        style_points = []
+        for style_key, style_value in category.style_guidelines.items():
+            if style_key == 'hashtags' and isinstance(style_value, list):
+                hashtags_formatted = ', '.join([f'#{tag}' for tag in style_value])
+                style_points.append(f"Suggested Hashtags: {hashtags_formatted}")
+            elif style_key != 'length': # Length is handled separately in task instructions
+                style_points.append(f"{style_key.replace('_', ' ').title()}: {style_value}")
+        if style_points:
+            prompt_parts.append("Style Guidelines:\n- " + "\n- ".join(style_points))
+    if topic:
+        prompt_parts.append(f"Topic: {topic}")
+    if yieldfi_knowledge_snippet:
+        prompt_parts.append(knowledge_section("knowledge", "Relevant YieldFi Knowledge: ", yieldfi_knowledge_snippet))
+
+    task_instructions_list = [plan.task_intro]
+    if plan.mode_task_line:
+        task_instructions_list.append(plan.mode_task_line)
+    custom_tone = additional_instructions.get('tone')
+    custom_goal = additional_instructions.get('goal')
+    if custom_tone:
+        task_instructions_list.append(f"Ensure the tone is specifically: {custom_tone}.")
+    if custom_goal:
+        task_instructions_list.append(f"The primary goal is: {custom_goal}.")
+    if platform.lower() == "twitter":
+        length_constraint = category.style_guidelines.get('length', "Keep the tweet under 280 characters as per Twitter's limit.")
+        if "characters" not in length_constraint.lower(): # Avoid duplicate length constraints
+            length_constraint = "Keep the tweet under 280 characters as per Twitter's limit. " + length_constraint
+        task_instructions_list.append(length_constraint)
+    prompt_parts.append("\n".join(task_instructions_list))
+    return _finish_prompt(plan, prompt_parts, token_budget=token_budget)
+
+
 def generate_interaction_prompt(
     original_post_content: Optional[str],
     active_account_info: Account,
@@ -251,7 +893,10 @@ def generate_interaction_prompt(
     interaction_details: Optional[Dict[str, Any]] = None,
     platform: str = "Twitter",
     mode: str = "Default",  # Added mode parameter
-    protocol_name: str = None  # Added protocol_name parameter
+    protocol_name: str = None,  # Added protocol_name parameter
+    relevancy_facts: Optional[List[str]] = None,
+    token_budget: Optional[int] = None,
+    bundle: Optional[Any] = None
 ) -> str:
     """
     Constructs a detailed prompt for AI interaction based on context.
@@ -266,6 +911,11 @@ def generate_interaction_prompt(
         mode: The interaction mode (Default, Professional, Degen)
         protocol_name: The name of the protocol to load prompt templates from.
                        If None, uses the default protocol.
+        relevancy_facts: Facts about the post, appended after the response prefix.
+        token_budget: Maximum estimated prompt tokens. If set, mode examples, then trailing
+                      knowledge chunks, then trailing relevancy facts are removed to fit.
+        bundle: Optional ProtocolBundle. Its protocol replaces protocol_name, and mode
+                instructions come from it rather than the configured default protocol.
     
     Returns:
         A formatted string prompt for the AI model.
@@ -274,114 +924,31 @@ def generate_interaction_prompt(
     if interaction_details is None:
         interaction_details = {}
 
-    # Try to use the PromptTemplate manager for generating prompt components
+    # Static sections come from the compiled plan; only the per-request fields are rendered here
     try:
-        # Section 1: Persona Definition with mode
-        persona = get_base_yieldfi_persona(active_account_info.account_type, mode, protocol_name)
-        prompt_parts = [f"Persona: {persona}"]
-
-        # Section 2: Core YieldFi Message
-        # Try to get core message from template, fall back to the constant if not available
-        core_message = PromptTemplate.get(PromptKey.CORE_MESSAGE, protocol_name) or YIELDFI_CORE_MESSAGE
-        prompt_parts.append(f"Core Message: {core_message.strip()}")
-
-        # Section 3: Original Post Context (if replying)
-        if original_post_content:
-            prompt_parts.append(f"Original Post to Reply To: \"{original_post_content}\"")
-
-        # Section 4: Target Account Context (if available)
-        if target_account_info:
-            target_desc = f"Target Account: @{target_account_info.username} (Type: {target_account_info.account_type.value})"
-            if target_account_info.bio:
-                target_desc += f", Bio: {target_account_info.bio}"
-            prompt_parts.append(target_desc)
-            # Add specific instructions based on account types
-            instructions = get_instruction_set(
-                active_account_info.account_type, 
-                target_account_info.account_type, 
-                protocol_name
-            )
-            prompt_parts.append(f"Interaction Instructions: {instructions.strip()}")
-
-        # Section 5: Relevant YieldFi Knowledge (if available)
-        if yieldfi_knowledge_snippet:
-            prompt_parts.append(f"Relevant YieldFi Knowledge: {yieldfi_knowledge_snippet}")
-
-        # Section 6: Task-Specific Instructions (from interaction_details or default)
-        tone = interaction_details.get('tone', 'default')
-        goal = interaction_details.get('goal', 'engage and inform')
-        style_examples = interaction_details.get('style_examples', '')
-        task_instructions = f"Task: Craft a response that aligns with the persona and core message."
-        
-        # If mode is not Default, get mode details from template
-        if mode.lower() != "default":
-            # Try to get mode details from template
-            mode_details = PromptTemplate.get_interaction_mode(mode, protocol_name)
-            if mode_details:
-                # If mode has tone and style information, use it
-                if 'tone' in mode_details:
-                    prompt_parts.append(f"Mode-Specific Tone: {mode_details['tone']}")
-                if 'style' in mode_details:
-                    prompt_parts.append(f"Mode-Specific Style: {mode_details['style']}")
-                if 'examples' in mode_details and isinstance(mode_details['examples'], list):
-                    examples_text = "\n".join([f"- {ex}" for ex in mode_details['examples']])
-                    prompt_parts.append(f"Mode-Specific Examples:\n{examples_text}")
-            else:
-                # Fall back to loading mode instructions from file
-                mode_instructions = load_mode_instructions(mode)
-                sections = mode_instructions.split("##")
-                examples_section = ""
-                for section in sections:
-                    if "examples" in section.lower():
-                        examples_section = section.strip()
-                
-                if examples_section:
-                    prompt_parts.append(f"Mode-Specific Style Examples: {examples_section}")
-        
-        if tone != 'default':
-            task_instructions += f" Use a {tone} tone."
-        task_instructions += f" Goal: {goal}."
-        if style_examples:
-            task_instructions += f" Style Examples: {style_examples}"
-        
-        # Platform-specific constraints
-        if platform.lower() == "twitter":
-            task_instructions += " Keep the response under 280 characters as per Twitter's limit."
-        prompt_parts.append(task_instructions)
-
-        # Assemble the final prompt, prepending critical instructions to ensure they are not truncated
-        # Get critical instructions from template or use default
-        critical_instr = PromptTemplate.get_critical_instructions(platform.lower(), protocol_name)
-        if critical_instr:
-            instruction_block = "CRITICAL INSTRUCTIONS:\n" + "\n".join([f"{i+1}. {instr}" for i, instr in enumerate(critical_instr)])
-        else:
-            # Fallback critical instructions
-            instruction_block = """
-CRITICAL INSTRUCTIONS:
-1. Respond with ONLY the final tweet text
-2. Maximum 280 characters for Twitter
-3. NO explanations, reasoning, self-talk, or any other content
-4. NO prefixes like 'Tweet:' or 'Response:'
-5. Do NOT include character counts or drafts
-6. Your ENTIRE response should be JUST the tweet
-"""
-        
-        final_prompt_body = "\n\n".join(prompt_parts)
-        
-        # Get response prefix from template or use default
-        response_prefix = PromptTemplate.get(PromptKey.RESPONSE_PREFIX, protocol_name) or "Response:"
-        
-        final_prompt = instruction_block + "\n\n" + final_prompt_body + "\n\n" + response_prefix
-        logger.debug(f"Generated INTERACTION prompt: {final_prompt}")
+        plan = get_prompt_plan(
+            "interaction",
+            protocol_name,
+            active_account_info.account_type,
+            target_account_info.account_type if target_account_info else None,
+            mode,
+            platform,
+            bundle,
+        )
+        final_prompt = _render_interaction_prompt(
+            plan, original_post_content, target_account_info, yieldfi_knowledge_snippet, interaction_details,
+            relevancy_facts, token_budget
+        )
+        logger.debug("Generated INTERACTION prompt: %s", final_prompt)
         return final_prompt
         
     except (NameError, AttributeError, Exception) as e:
         # Fall back to the original implementation if PromptTemplate is not available or fails
-        logger.warning(f"Error using PromptTemplate for prompt generation: {e}. Using fallback logic.")
+        logger.warning("Error using PromptTemplate for prompt generation: %s. Using fallback logic.", e)
         
         # Original implementation (fallback)
         # Section 1: Persona Definition with mode
-        persona = get_base_yieldfi_persona(active_account_info.account_type, mode)
+        persona = get_base_yieldfi_persona(active_account_info.account_type, mode, bundle=bundle)
         prompt_parts = [f"Persona: {persona}"]
 
         # Section 2: Core YieldFi Message
@@ -412,14 +979,12 @@ CRITICAL INSTRUCTIONS:
         task_instructions = f"Task: Craft a response that aligns with the persona and core message."
         
         # If mode is not Default, incorporate mode-specific style guidelines
-        if mode.lower() != "default":
+        if mode and mode.lower() != "default":
             # Load full mode instructions to extract style examples specific to this mode
-            mode_instructions = load_mode_instructions(mode)
-            sections = mode_instructions.split("##")
             examples_section = ""
-            for section in sections:
-                if "examples" in section.lower():
-                    examples_section = section.strip()
+            for lowered, section in _mode_instructions(mode, bundle).sections:
+                if "examples" in lowered:
+                    examples_section = section
             
             if examples_section:
                 prompt_parts.append(f"Mode-Specific Style Examples: {examples_section}")
@@ -446,7 +1011,9 @@ CRITICAL INSTRUCTIONS:
 """
         final_prompt_body = "\n\n".join(prompt_parts)
         final_prompt = instruction_block + "\n\n" + final_prompt_body + "\n\nResponse:"
-        logger.debug(f"Generated INTERACTION prompt: {final_prompt}")
+        if relevancy_facts:
+            final_prompt += "\n\n" + _relevancy_facts_section(relevancy_facts).text
+        logger.debug("Generated INTERACTION prompt: %s", final_prompt)
         return final_prompt
 
 def generate_new_tweet_prompt(
@@ -457,7 +1024,9 @@ def generate_new_tweet_prompt(
     platform: str = "Twitter",
     additional_instructions: Optional[Dict[str, Any]] = None, # Added for more flexibility
     mode: str = "Default",  # Added mode parameter
-    protocol_name: str = None  # Added protocol_name parameter
+    protocol_name: str = None,  # Added protocol_name parameter
+    token_budget: Optional[int] = None,
+    bundle: Optional[Any] = None
 ) -> str:
     """
     Constructs a prompt for creating a new tweet based on a category and topic.
@@ -472,6 +1041,9 @@ def generate_new_tweet_prompt(
         mode: The interaction mode (Default, Professional, Degen)
         protocol_name: The name of the protocol to load prompt templates from.
                        If None, uses the default protocol.
+        token_budget: Maximum estimated prompt tokens. If set, mode examples, then trailing
+                      knowledge chunks are removed to fit.
+        bundle: Optional ProtocolBundle (see generate_interaction_prompt).
 
     Returns:
         A formatted string prompt for the AI model.
@@ -480,146 +1052,26 @@ def generate_new_tweet_prompt(
     if additional_instructions is None:
         additional_instructions = {}
     
-    # Try to use the PromptTemplate manager for generating prompt components
+    # Static sections come from the compiled plan; only the per-request fields are rendered here
     try:
-        # Create prompt parts in sequence
-        prompt_parts = []
-
-        # Section 1: Persona Definition with mode
-        if active_account_info is not None:
-            persona = get_base_yieldfi_persona(active_account_info.account_type, mode, protocol_name)
-            prompt_parts.append(f"Persona: {persona}")
-        else:
-            # Use a generic official persona if no active account info provided
-            persona = get_base_yieldfi_persona(AccountType.OFFICIAL, mode, protocol_name) # Fallback to OFFICIAL
-            prompt_parts.append(f"Persona: {persona}")
-
-        # Section 2: Core YieldFi Message
-        # Try to get core message from template, fall back to the constant if not available
-        core_message = PromptTemplate.get(PromptKey.CORE_MESSAGE, protocol_name) or YIELDFI_CORE_MESSAGE
-        prompt_parts.append(f"Core Message: {core_message.strip()}")
-
-        # Section 3: Tweet Category
-        # Handle TweetCategory object for Step 18
-        prompt_parts.append(f"Tweet Category: {category.name}")
-        prompt_parts.append(f"Category Description: {category.description}")
-        
-        # Include category-specific style guidelines if present (Step 18)
-        if hasattr(category, 'style_guidelines') and category.style_guidelines:
-            style_points = []
-            for style_key, style_value in category.style_guidelines.items():
-                # Format each style guideline as a readable point
-                if style_key == 'hashtags' and isinstance(style_value, list):
-                    hashtags_formatted = ', '.join([f'#{tag}' for tag in style_value])
-                    style_points.append(f"Suggested Hashtags: {hashtags_formatted}")
-                elif style_key != 'length': # Length is handled separately in task instructions
-                    style_points.append(f"{style_key.replace('_', ' ').title()}: {style_value}")
-            
-            if style_points:
-                prompt_parts.append("Style Guidelines:\n- " + "\n- ".join(style_points))
-
-        # Section 4: Topic Information (if provided)
-        if topic:
-            prompt_parts.append(f"Topic: {topic}")
-        
-        # Section 4.5: Mode-specific Style (if not Default)
-        if mode.lower() != "default":
-            # Try to get mode details from template
-            mode_details = PromptTemplate.get_interaction_mode(mode, protocol_name)
-            if mode_details:
-                # If mode has tone and style information, use it
-                if 'tone' in mode_details:
-                    prompt_parts.append(f"Mode-Specific Tone: {mode_details['tone']}")
-                if 'style' in mode_details:
-                    prompt_parts.append(f"Mode-Specific Style: {mode_details['style']}")
-                if 'examples' in mode_details and isinstance(mode_details['examples'], list):
-                    examples_text = "\n".join([f"- {ex}" for ex in mode_details['examples']])
-                    prompt_parts.append(f"Mode-Specific Examples:\n{examples_text}")
-            else:
-                # Fall back to loading mode instructions from file
-                mode_instructions = load_mode_instructions(mode)
-                sections = mode_instructions.split("##")
-                examples_section = ""
-                style_points = ""
-                
-                for section in sections:
-                    if "examples" in section.lower():
-                        examples_section = section.strip()
-                    elif "style points" in section.lower():
-                        style_points = section.strip()
-                
-                if examples_section or style_points:
-                    mode_style = f"Mode-Specific Style ({mode}):"
-                    if examples_section:
-                        mode_style += f"\n{examples_section}"
-                    if style_points:
-                        mode_style += f"\n{style_points}"
-                    prompt_parts.append(mode_style)
-
-        # Section 5: Relevant YieldFi Knowledge (if available)
-        if yieldfi_knowledge_snippet:
-            prompt_parts.append(f"Relevant YieldFi Knowledge: {yieldfi_knowledge_snippet}")
-
-        # Section 6: Task Instructions
-        # Define initial task instruction, using 'tweet' wording for Twitter
-        if platform.lower() == "twitter":
-            initial_instruction = "Task: Create a new tweet that aligns with the persona, core message, and the specified category details."
-        else:
-            initial_instruction = f"Task: Create a new {platform} post that aligns with the persona, core message, and the specified category details."
-        task_instructions_list = [
-            initial_instruction
-        ]
-        
-        # Add mode-specific instruction
-        if mode.lower() != "default":
-            task_instructions_list.append(f"Use the {mode} interaction style as detailed above.")
-
-        # Incorporate additional_instructions
-        custom_tone = additional_instructions.get('tone')
-        custom_goal = additional_instructions.get('goal')
-        if custom_tone:
-            task_instructions_list.append(f"Ensure the tone is specifically: {custom_tone}.")
-        if custom_goal:
-            task_instructions_list.append(f"The primary goal is: {custom_goal}.")
-
-        if platform.lower() == "twitter":
-            # Check if category style_guidelines already has length constraint
-            length_constraint = category.style_guidelines.get('length', "Keep the tweet under 280 characters as per Twitter's limit.")
-            if "characters" not in length_constraint.lower(): # Avoid duplicate length constraints
-                length_constraint = "Keep the tweet under 280 characters as per Twitter's limit. " + length_constraint
-            task_instructions_list.append(length_constraint)
-
-        prompt_parts.append("\n".join(task_instructions_list))
-
-        # Assemble the final prompt, prepending critical instructions to avoid truncation
-        # Get critical instructions from template or use default
-        critical_instr = PromptTemplate.get_critical_instructions(platform.lower(), protocol_name)
-        if critical_instr:
-            instruction_block = "CRITICAL INSTRUCTIONS:\n" + "\n".join([f"{i+1}. {instr}" for i, instr in enumerate(critical_instr)])
-        else:
-            # Fallback critical instructions
-            instruction_block = """
-CRITICAL INSTRUCTIONS:
-1. Respond with ONLY the final tweet text
-2. Maximum 280 characters for Twitter
-3. NO explanations, reasoning, self-talk, or any other content
-4. NO prefixes like 'Tweet:' or 'Response:'
-5. Do NOT include character counts or drafts
-6. Your ENTIRE response should be JUST the tweet
-"""
-        
-        final_prompt_body = "\n\n".join(prompt_parts)
-        
-        # Get response prefix from template or use default
-        response_prefix = PromptTemplate.get(PromptKey.RESPONSE_PREFIX, protocol_name) or "Tweet:"
-        
-        final_prompt = instruction_block + "\n\n" + final_prompt_body + "\n\n" + response_prefix
-        logger.debug(f"Generated NEW TWEET prompt: {final_prompt}")
+        plan = get_prompt_plan(
+            "new_tweet",
+            protocol_name,
+            active_account_info.account_type if active_account_info is not None else AccountType.OFFICIAL,
+            None,
+            mode,
+            platform,
+            bundle,
+        )
+        final_prompt = _render_new_tweet_prompt(
+            plan, category, topic, yieldfi_knowledge_snippet, platform, additional_instructions, token_budget
+        )
+        logger.debug("Generated NEW TWEET prompt: %s", final_prompt)
         return final_prompt
         
     except (NameError, AttributeError, Exception) as e:
         # Fall back to the original implementation if PromptTemplate is not available or fails
-        logger.warning(f"Error using PromptTemplate for prompt generation: {e}. Using fallback logic.")
+        logger.warning("Error using PromptTemplate for prompt generation: %s. Using fallback logic.", e)
         
         # Original implementation (fallback)
         # Create prompt parts in sequence
@@ -627,11 +1079,11 @@ CRITICAL INSTRUCTIONS:
 
         # Section 1: Persona Definition with mode
         if active_account_info is not None:
-            persona = get_base_yieldfi_persona(active_account_info.account_type, mode)
+            persona = get_base_yieldfi_persona(active_account_info.account_type, mode, bundle=bundle)
             prompt_parts.append(f"Persona: {persona}")
         else:
             # Use a generic official persona if no active account info provided
-            persona = get_base_yieldfi_persona(AccountType.OFFICIAL, mode) # Fallback to OFFICIAL
+            persona = get_base_yieldfi_persona(AccountType.OFFICIAL, mode, bundle=bundle) # Fallback to OFFICIAL
             prompt_parts.append(f"Persona: {persona}")
 
         # Section 2: Core YieldFi Message
@@ -661,18 +1113,16 @@ CRITICAL INSTRUCTIONS:
             prompt_parts.append(f"Topic: {topic}")
         
         # Section 4.5: Mode-specific Style (if not Default)
-        if mode.lower() != "default":
+        if mode and mode.lower() != "default":
             # Load mode instructions to extract style examples specific to this mode
-            mode_instructions = load_mode_instructions(mode)
-            sections = mode_instructions.split("##")
             examples_section = ""
             style_points = ""
             
-            for section in sections:
-                if "examples" in section.lower():
-                    examples_section = section.strip()
-                elif "style points" in section.lower():
-                    style_points = section.strip()
+            for lowered, section in _mode_instructions(mode, bundle).sections:
+                if "examples" in lowered:
+                    examples_section = section
+                elif "style points" in lowered:
+                    style_points = section
             
             if examples_section or style_points:
                 mode_style = f"Mode-Specific Style ({mode}):"
@@ -697,7 +1147,7 @@ CRITICAL INSTRUCTIONS:
         ]
         
         # Add mode-specific instruction
-        if mode.lower() != "default":
+        if mode and mode.lower() != "default":
             task_instructions_list.append(f"Use the {mode} interaction style as detailed above.")
 
         # Incorporate additional_instructions
@@ -729,7 +1179,7 @@ CRITICAL INSTRUCTIONS:
 """
         final_prompt_body_new = "\n\n".join(prompt_parts)
         final_prompt = instruction_block_new + "\n\n" + final_prompt_body_new + "\n\nTweet:"
-        logger.debug(f"Generated NEW TWEET prompt: {final_prompt}")
+        logger.debug("Generated NEW TWEET prompt: %s", final_prompt)
         return final_prompt
 
 # The old `create_prompt` and its helpers (`_get_system_context`, `_get_examples`, `_get_response_instructions`)
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
 from src.models.tweet import Tweet  # type: ignore
 from src.config import get_protocol_path  # Step 27 - Protocol paths
@@ -8,19 +8,56 @@ from src.config import get_protocol_path  # Step 27 - Protocol paths
 # Changelog:
 # 2025-05-19 14:30 - Step 26 - Initial implementation of relevancy facts.
 # 2025-05-19 15:00 - Step 27 - Updated to use protocol paths.
+# 2026-10-19 - Split parsing/matching out of get_facts so protocol bundles can match pre-parsed rules.
 
-def get_facts(tweet: Tweet) -> List[str]:
+# (lowercased condition, fact) pairs, in file order
+FactRules = Tuple[Tuple[str, str], ...]
+
+
+def parse_relevancy_facts(data: Any) -> FactRules:
+    """
+    Normalizes the contents of a relevancy_facts.json file.
+
+    Args:
+        data: Either a dict mapping conditions to facts, or a list of
+              {"condition": ..., "fact": ...} entries.
+
+    Returns:
+        The (lowercased condition, fact) rules; entries without a condition or fact are skipped.
+    """
+    rules: List[Tuple[str, str]] = []
+    if isinstance(data, dict):
+        for condition, fact in data.items():
+            rules.append((condition.lower(), fact))
+    elif isinstance(data, list):
+        for entry in data:
+            condition = entry.get('condition', '').lower()
+            fact = entry.get('fact')
+            if condition and fact:
+                rules.append((condition, fact))
+    return tuple(rules)
+
+
+def match_facts(rules: FactRules, content: str) -> List[str]:
+    """Returns the facts whose condition appears in content (case-insensitive)."""
+    content_lower = content.lower()
+    return [fact for condition, fact in rules if condition in content_lower]
+
+
+def get_facts(tweet: Tweet, bundle: Optional[Any] = None) -> List[str]:
     """
     Retrieve relevancy facts based on keywords found in the tweet content.
 
     Args:
         tweet: Tweet object to analyze.
+        bundle: Optional ProtocolBundle; its preloaded rules are used instead of reading
+                the default protocol's relevancy_facts.json.
 
     Returns:
         A list of relevant fact strings matching conditions in the tweet content.
     """
-    facts: List[str] = []
-    content_lower = tweet.content.lower()
+    if bundle is not None:
+        return bundle.get_facts(tweet.content)
 
     # Get path to relevancy facts file using protocol paths (Step 27)
     facts_file_path = get_protocol_path('relevancy_facts.json')
@@ -35,17 +72,4 @@ def get_facts(tweet: Tweet) -> List[str]:
         # Invalid JSON format
         return []
 
-    # Data can be a dict mapping conditions to facts
-    if isinstance(data, dict):
-        for condition, fact in data.items():
-            if condition.lower() in content_lower:
-                facts.append(fact)
-    # Data can be a list of dicts with condition/fact keys
-    elif isinstance(data, list):
-        for entry in data:
-            condition = entry.get('condition', '').lower()
-            fact = entry.get('fact')
-            if condition and fact and condition in content_lower:
-                facts.append(fact)
-
-    return facts 
\ No newline at end of file
+    return match_facts(parse_relevancy_facts(data), tweet.content)
@@ -20,13 +20,26 @@ from src.models.category import TweetCategory # Added for Step 18
 from src.ai.xai_client import XAIClient, APIError as XAIAPIError # type: ignore
 from src.ai.prompt_engineering import generate_interaction_prompt, generate_new_tweet_prompt, InteractionMode # type: ignore
 from src.ai.tone_analyzer import analyze_tweet_tone # type: ignore
+from src.ai.token_budget import estimate_tokens, get_prompt_token_budget
 from src.utils.logging import get_logger # type: ignore
-from src.utils.persistence import save_response  # Persist AI responses
+from src.config.settings import get_config
+from src.utils.persistence import save_response, update_saved_image_url  # Persist AI responses
 from src.ai.relevancy import get_facts  # Step 26 relevancy facts
+from src.ai.batching import get_completion_batcher
+from src.ai.completion import (SHAPE_CANDIDATE, SHAPE_EMPTY_CANDIDATE, SHAPE_EMPTY_CHOICE, SHAPE_EMPTY_MESSAGE,
+                               SHAPE_MESSAGE, SHAPE_REASONING, SHAPE_TEXT, SHAPE_UNRECOGNIZED, CompletionResult,
+                               as_completion_result)
+from src.ai.echo_detection import TextFingerprint
+from src.ai.single_flight import completion_key, get_completion_flight
+from src.ai.stage_graph import Stage, StageGraph, get_stage_deadlines
+from src.utils.tracing import finish_trace, span, stage_timings, start_trace, timed
 # from src.knowledge.retrieval import KnowledgeRetriever # Step 11 - Mock for now
 
 logger = get_logger(__name__)
 
+# Completion tokens requested per generation; also reserved out of the model's token budget
+COMPLETION_MAX_TOKENS = 512
+
 # Module-level constant for known Degen mode partial responses
 degen_partials = {
     "s milestone to yieldfi": "This milestone for YieldFi is HUGE! 🚀",
@@ -37,7 +50,7 @@ degen_partials = {
 # --- Mocked Knowledge Retriever --- START
 class MockKnowledgeRetriever:
     def get_relevant_knowledge(self, query: str, limit: int = 1) -> Optional[str]:
-        logger.info(f"MockKnowledgeRetriever: Received query '{query}'. Returning mock knowledge.")
+        logger.info("MockKnowledgeRetriever: Received query '%s'. Returning mock knowledge.", query)
         if "security" in query.lower():
             return "YieldFi employs state-of-the-art multi-layered security protocols, including regular audits and encryption."
         if "staking" in query.lower():
@@ -45,7 +58,7 @@ class MockKnowledgeRetriever:
         return "YieldFi is a decentralized finance platform focused on user empowerment and transparency."
 
     def search_knowledge_for_topic(self, topic: str, category_name: Optional[str] = None) -> Optional[str]:
-        logger.info(f"MockKnowledgeRetriever: Received topic '{topic}' for category '{category_name}'. Returning mock knowledge.")
+        logger.info("MockKnowledgeRetriever: Received topic '%s' for category '%s'. Returning mock knowledge.", topic, category_name)
         if "new product" in topic.lower() or (category_name and "product update" in category_name.lower()):
             return "Our latest product, YieldBoost, offers enhanced returns through automated strategies."
         if category_name and "announcement" in category_name.lower():
@@ -54,6 +67,40 @@ class MockKnowledgeRetriever:
 
 # --- Mocked Knowledge Retriever --- END
 
+# --- Reply enrichment stages --- START
+# Each stage gets {"tweet", "retriever", "bundle"}; none depends on another, so they run concurrently.
+
+def _tone_stage(inputs: Dict[str, Any]) -> Optional[str]:
+    """Tone of the original tweet, analyzed unless already set."""
+    tweet = inputs["tweet"]
+    if tweet.tone is not None:
+        logger.info("Using existing tone of original tweet: %s", tweet.tone)
+        return tweet.tone
+    analyzed_tweet = analyze_tweet_tone(tweet)
+    logger.info("Analyzed tone of original tweet: %s", analyzed_tweet.tone)
+    return analyzed_tweet.tone
+
+
+def _knowledge_stage(inputs: Dict[str, Any]) -> Optional[str]:
+    """Knowledge snippet for the original tweet from the request's retriever."""
+    return inputs["retriever"].get_relevant_knowledge(inputs["tweet"].content)
+
+
+def _facts_stage(inputs: Dict[str, Any]) -> list:
+    """Relevancy facts for the original tweet (Step 26)."""
+    bundle = inputs["bundle"]
+    return get_facts(inputs["tweet"], bundle) if bundle is not None else get_facts(inputs["tweet"])
+
+
+# Deadlines come from config 'pipeline.stage_deadlines'. Tone and knowledge errors fail the reply
+# as before; a failing facts lookup only drops the facts. Add new enrichment via REPLY_STAGES.with_stage().
+REPLY_STAGES = StageGraph([
+    Stage("tone", _tone_stage, required=True),
+    Stage("knowledge", _knowledge_stage, required=True),
+    Stage("facts", _facts_stage, default=[]),
+])
+# --- Reply enrichment stages --- END
+
 def generate_tweet_reply(
     original_tweet: Tweet,
     responding_as: Account,
@@ -64,7 +111,8 @@ def generate_tweet_reply(
     knowledge_retriever: Optional[MockKnowledgeRetriever] = None, # Using Mock for now
     generate_image: bool = False,
     interaction_mode: str = "Default",  # Added for Step 25
-    protocol_name: str = None  # Added for Step 408 - Parameterized prompts
+    protocol_name: str = None,  # Added for Step 408 - Parameterized prompts
+    bundle: Optional[Any] = None
 ) -> AIResponse:
     """
     Generates a reply to a given tweet.
@@ -77,46 +125,55 @@ def generate_tweet_reply(
         platform: Social media platform (default: "Twitter")
         interaction_details: Additional context for response generation
         knowledge_retriever: Service to get relevant knowledge
-        generate_image: Whether to generate an image for the tweet
+        generate_image: Whether to generate an image for the tweet. The image is rendered in the
+                        background: extra_context["image_job_id"] identifies the job and
+                        image_url is set when it finishes. The response is saved to
+                        data/output straight away; the URL is added to the record then.
         interaction_mode: Mode to use for response (Default, Professional, Degen)
         protocol_name: Name of the protocol to use for prompt templates (e.g., "yieldfi")
+        bundle: Optional ProtocolBundle (src.protocols). Supplies templates, mode instructions,
+                relevancy facts and knowledge (unless knowledge_retriever is given) for its
+                protocol, with no file reads and regardless of the configured default protocol.
     
     Returns:
         An AIResponse object with the generated content
     """
     # Use provided Account for responding_as
     responding_as_account = responding_as
+    if bundle is not None:
+        protocol_name = bundle.name
 
-    logger.info(f"Generating reply for tweet ID: {original_tweet.metadata.tweet_id} as {responding_as_account.username} (Type: {responding_as_account.account_type.value})")
-    logger.info(f"Using interaction mode: {interaction_mode}")
+    logger.info("Generating reply for tweet ID: %s as %s (Type: %s)", original_tweet.metadata.tweet_id, responding_as_account.username, responding_as_account.account_type.value)
+    logger.info("Using interaction mode: %s", interaction_mode)
+    trace = start_trace("reply", interaction_mode=interaction_mode, protocol=protocol_name,
+                        tweet_id=original_tweet.metadata.tweet_id)
     prompt_str = ""
+    prompt_cache_context: Dict[str, Any] = {}
     ai_generated_content = "[Error: Could not generate AI response]"
     model_used = "Unknown"
+    completion_shared = False
     final_tone = original_tweet.tone
     response_error = None # To store error messages
 
-    try:
-        # 1. Analyze tone of the original tweet (if not already done)
-        if original_tweet.tone is None:
-            analyzed_tweet = analyze_tweet_tone(original_tweet)
-            final_tone = analyzed_tweet.tone
-            logger.info(f"Analyzed tone of original tweet: {final_tone}")
-        else:
-            final_tone = original_tweet.tone
-            logger.info(f"Using existing tone of original tweet: {final_tone}")
+    enrichment_status: Dict[str, str] = {}
 
-        # 2. Retrieve relevant knowledge (Mocked for now)
-        knowledge_snippet: Optional[str] = None
-        # For Step 11: if knowledge_retriever:
-        current_retriever = knowledge_retriever if knowledge_retriever else MockKnowledgeRetriever()
-        knowledge_snippet = current_retriever.get_relevant_knowledge(original_tweet.content)
+    try:
+        # 1-2. Tone analysis, knowledge retrieval and relevancy facts run concurrently (REPLY_STAGES)
+        current_retriever = knowledge_retriever or bundle or MockKnowledgeRetriever()
+        enrichment = REPLY_STAGES.run(
+            {"tweet": original_tweet, "retriever": current_retriever, "bundle": bundle},
+            deadlines=get_stage_deadlines(),
+        )
+        enrichment_status = enrichment.degraded()
+        final_tone = enrichment["tone"]
+        knowledge_snippet: Optional[str] = enrichment["knowledge"]
         if knowledge_snippet:
-            logger.info(f"Retrieved knowledge snippet: {knowledge_snippet[:100]}...")
+            logger.info("Retrieved knowledge snippet: %.100s...", knowledge_snippet)
         else:
             logger.info("No specific knowledge snippet retrieved for this interaction.")
 
         # 3. Generate prompt with interaction_mode
-        logger.info(f"Generating interaction prompt with mode: {interaction_mode}...")
+        logger.info("Generating interaction prompt with mode: %s...", interaction_mode)
         # Prepare prompt parameters, include mode only if non-default
         prompt_kwargs = {
             'original_post_content': original_tweet.content,
@@ -128,92 +185,42 @@ def generate_tweet_reply(
             'mode': interaction_mode if interaction_mode and interaction_mode != InteractionMode.DEFAULT.value else None,
             'protocol_name': protocol_name
         }
-        prompt_str = generate_interaction_prompt(**prompt_kwargs)
-        logger.debug(f"Generated interaction prompt: {prompt_str[:300]}...")
-        # Step 26: Append relevancy facts to the prompt if any
-        try:
-            relevancy_facts = get_facts(original_tweet)
-            if relevancy_facts:
-                facts_str = "\n".join(f"- {fact}" for fact in relevancy_facts)
-                prompt_str += f"\n\nRelevancy Facts:\n{facts_str}"
-                logger.info(f"Appended relevancy facts to prompt: {relevancy_facts}")
-        except Exception as e:
-            logger.warning(f"Failed to append relevancy facts: {e}")
+        if bundle is not None:
+            prompt_kwargs['bundle'] = bundle
+        # Step 26: Relevancy facts are appended after the response prefix (and trimmed first when over budget)
+        relevancy_facts = enrichment["facts"]
+        if relevancy_facts:
+            prompt_kwargs['relevancy_facts'] = relevancy_facts
+            logger.info("Appending relevancy facts to prompt: %s", relevancy_facts)
 
-        # 4. Call AI client
         # This assumes XAIClient is properly configured (Step 6)
         xai_client = XAIClient() # API keys loaded from config within XAIClient
         model_used = xai_client.xai_model  # Use configured model name
+        prompt_kwargs['token_budget'] = get_prompt_token_budget(model_used, COMPLETION_MAX_TOKENS)
+
+        with span("prompt"):
+            prompt_str = generate_interaction_prompt(**prompt_kwargs)
+        logger.debug("Generated interaction prompt: %.300s...", prompt_str)
+        prompt_cache_context = _prompt_cache_context(prompt_str)
+
+        # 4. Call AI client
+        logger.info("Calling XAIClient.get_completion with model: '%s' for tweet reply.", model_used)
+        with span("completion"):
+            ai_response_data, completion_shared = _complete(xai_client, prompt_str)
+        logger.debug("Raw AI response data for reply: %s", ai_response_data)
         
-        logger.info(f"Calling XAIClient.get_completion with model: '{model_used}' for tweet reply.")
-        ai_response_data = xai_client.get_completion(prompt=prompt_str, max_tokens=512)
-        logger.debug(f"Raw AI response data for reply: {ai_response_data}")
-        
-        # Extract content - this depends on the actual structure of xAI/PaLM response
-        if ai_response_data.get('choices') and isinstance(ai_response_data['choices'], list) and len(ai_response_data['choices']) > 0:
-            choice = ai_response_data['choices'][0]
-            logger.debug(f"Processing AI response choice: {choice}")
-
-            finish_reason = choice.get('finish_reason')
-            if finish_reason == 'length':
-                logger.warning(f"AI response 'finish_reason' is 'length'. The response may be truncated. Full choice: {choice}")
-
-            if choice.get('text'): # Primarily for non-chat models or older formats
-                raw_content = choice['text'].strip()
-                logger.info(f"Extracted 'text' from choice: '{raw_content[:100]}...'")
-                logger.debug(f"Full raw AI output (reply, from 'text'): {raw_content}")
-                ai_generated_content = _clean_response(raw_content, original_input=original_tweet.content)
-                logger.info(f"Cleaned text output (reply, first 100 chars): '{ai_generated_content[:100]}...'")
-            elif choice.get('message'):
-                message_data = choice['message']
-                if message_data.get('content') and message_data['content'].strip():
-                    raw_content = message_data['content'].strip()
-                    logger.info(f"Extracted 'content' from message: '{raw_content[:100]}...'")
-                    logger.debug(f"Full raw AI output (reply, from 'message.content'): {raw_content}")
-                    # Clean the response
-                    ai_generated_content = _clean_response(raw_content, original_input=original_tweet.content)
-                    logger.info(f"Cleaned message content (reply, first 100 chars): '{ai_generated_content[:100]}...'")
-                elif message_data.get('reasoning_content') and message_data['reasoning_content'].strip():
-                    ai_generated_content = message_data['reasoning_content'].strip()
-                    logger.info(f"Extracted 'reasoning_content' from message as fallback: '{ai_generated_content[:100]}...'")
-                    if finish_reason == 'length':
-                         ai_generated_content = "[Warning: Response possibly truncated and extracted from reasoning] " + ai_generated_content
-                    else:
-                         ai_generated_content = "[Info: Extracted from reasoning_content] " + ai_generated_content
-                else:
-                    ai_generated_content = "[Warning: AI response format unclear - message content and reasoning_content are empty]"
-                    response_error = "AI response format unclear: message content and reasoning_content empty."
-                    logger.warning(f"Could not extract text from AI response choice's message: {message_data}. Setting error: {response_error}")
-            else:
-                ai_generated_content = "[Warning: AI response format unclear - no 'text' or 'message' in choice]"
-                response_error = "AI response format unclear from choice (no text/message)."
-                logger.warning(f"Could not extract text/message from AI response choice: {choice}. Setting error: {response_error}")
-        elif ai_response_data.get('candidates') and isinstance(ai_response_data['candidates'], list) and len(ai_response_data['candidates']) > 0:
-             # Fallback for Google PaLM style response (text-bison-001 example)
-            candidate = ai_response_data['candidates'][0]
-            if candidate.get('output'):
-                ai_generated_content = candidate['output'].strip()
-                logger.info(f"Extracted output from candidate (reply): '{ai_generated_content[:100]}...'")
-                # PaLM typically gives clean output, but we can still run it through cleaner
-                ai_generated_content = _clean_response(ai_generated_content)
-                logger.info(f"Cleaned PaLM output (reply): '{ai_generated_content[:100]}...'")
-            else:
-                logger.warning(f"Could not extract text from AI response candidate: {candidate}")
-                ai_generated_content = "[Warning: AI response format unclear (PaLM candidate)]"
-                response_error = "AI response format unclear from candidate (PaLM)."
-        else:
-            logger.warning(f"AI response structure not recognized for content extraction: {ai_response_data}")
-            ai_generated_content = "[Warning: AI response structure not recognized]"
-            response_error = "AI response structure not recognized."
+        completion = as_completion_result(ai_response_data)
+        prompt_cache_context.update(_usage_context(completion))
+        ai_generated_content, response_error = _completion_content(completion, original_tweet.content, "reply")
 
-        logger.info(f"Successfully generated AI reply: {ai_generated_content[:100]}...")
+        logger.info("Successfully generated AI reply: %.100s...", ai_generated_content)
 
     except XAIAPIError as e:
-        logger.error(f"XAIClient APIError in generate_tweet_reply: {e}", exc_info=True)
+        logger.error("XAIClient APIError in generate_tweet_reply: %s", e, exc_info=True)
         ai_generated_content = f"[Error: AI API call failed - {e.message}]"
         response_error = e.message
     except Exception as e:
-        logger.error(f"Unexpected error in generate_tweet_reply: {e}", exc_info=True)
+        logger.error("Unexpected error in generate_tweet_reply: %s", e, exc_info=True)
         ai_generated_content = f"[Error: Unexpected error during response generation - {str(e)}]"
         response_error = str(e)
 
@@ -227,18 +234,28 @@ def generate_tweet_reply(
         target_account=target_account.username if target_account else None,
         generation_time=datetime.now(timezone.utc),
         tone=final_tone,
-        extra_context={"interaction_mode": interaction_mode}  # Store the interaction mode in the response
+        extra_context={
+            "interaction_mode": interaction_mode,  # Store the interaction mode in the response
+            **({"protocol": bundle.name} if bundle is not None else {}),
+            **({"completion_shared": True} if completion_shared else {}),
+            **({"degraded_stages": enrichment_status} if enrichment_status else {}),
+            **prompt_cache_context,
+            **_token_estimates(prompt_str, ai_generated_content, response_error),
+            **stage_timings(trace),
+        }
     )
     # Generate poster image if requested
+    image_job = None
     if generate_image:
-        from src.ai.image_generation import get_poster_image
+        from src.ai.image_generation import submit_poster_image
         try:
-            logger.info(f"generate_image is True. Attempting to generate poster image for reply.")
+            logger.info("generate_image is True. Submitting poster image job for reply.")
             image_prompt = f"Create a visual for a tweet about: {ai_generated_content[:150]}"
-            response.image_url = get_poster_image(image_prompt)
-            logger.info(f"Poster image generation for reply returned URL: {response.image_url}")
+            with span("image"):
+                image_job = _attach_image_job(response, submit_poster_image(image_prompt))
+            logger.info("Poster image job for reply: %s (URL so far: %s)", response.extra_context['image_job_id'], response.image_url)
         except Exception as e:
-            logger.error(f"Failed to generate poster image for reply: {e}", exc_info=True)
+            logger.error("Failed to submit poster image job for reply: %s", e, exc_info=True)
             response.image_url = None
     else:
         logger.info("generate_image is False for reply. Skipping image generation.")
@@ -252,10 +269,12 @@ def generate_tweet_reply(
             'responding_as_type': responding_as_account.account_type.value,
             'target_account': target_account.username if target_account else None,
         }
-        logger.info(f"Saving generated tweet reply with metadata: {metadata}")
-        save_response(response, metadata)
+        logger.info("Saving generated tweet reply with metadata: %s", metadata)
+        with span("persist"):
+            _persist_response(response, metadata, image_job)
     except Exception as e:
-        logger.error(f"Error while saving response: {e}", exc_info=True)
+        logger.error("Error while saving response: %s", e, exc_info=True)
+    finish_trace(trace, error=response_error)
     return response
 
 def generate_new_tweet(
@@ -267,7 +286,8 @@ def generate_new_tweet(
     additional_instructions: Optional[Dict[str, Any]] = None,
     generate_image: bool = False,
     interaction_mode: str = "Default",  # Added for Step 25
-    protocol_name: str = None  # Added for Step 408 - Parameterized prompts
+    protocol_name: str = None,  # Added for Step 408 - Parameterized prompts
+    bundle: Optional[Any] = None
 ) -> AIResponse:
     """
     Generates a new tweet based on a category, topic, and other details.
@@ -280,15 +300,24 @@ def generate_new_tweet(
         knowledge_retriever: Service to get relevant knowledge
         platform: Social media platform (default: "Twitter")
         additional_instructions: Additional context for response generation
-        generate_image: Whether to generate an image for the tweet
+        generate_image: Whether to generate an image for the tweet. The image is rendered in the
+                        background: extra_context["image_job_id"] identifies the job and
+                        image_url is set when it finishes. The response is saved to
+                        data/output straight away; the URL is added to the record then.
         interaction_mode: Mode to use for response (Default, Professional, Degen)
         protocol_name: Name of the protocol to use for prompt templates (e.g., "yieldfi")
+        bundle: Optional ProtocolBundle (see generate_tweet_reply). A category given by name
+                is resolved against the bundle's categories.
     
     Returns:
         An AIResponse object with the generated content
     """
     # Use provided Account for responding_as
     responding_as_account = responding_as
+    if bundle is not None:
+        protocol_name = bundle.name
+        if isinstance(category, str):
+            category = bundle.get_category(category) or category
     # Handle category type (string or TweetCategory)
     original_category = category
     if isinstance(category, str):
@@ -298,31 +327,35 @@ def generate_new_tweet(
         category_name = category.name
         category_obj = category
 
-    logger.info(f"START generate_new_tweet: Category='{category_name}', Persona='{responding_as_account.account_type.value}', Topic='{topic}'")
-    logger.info(f"Using interaction mode: {interaction_mode}")
-    logger.debug(f"Full category details: Name='{category_name}', Description='{category_obj.description}', Keywords='{category_obj.prompt_keywords}', Style='{category_obj.style_guidelines}'")
-    logger.debug(f"Responding as account details: ID='{responding_as_account.account_id}', Username='{responding_as_account.username}', Type='{responding_as_account.account_type.value}'")
-    logger.debug(f"Platform='{platform}', Additional Instructions='{additional_instructions}'")
+    logger.info("START generate_new_tweet: Category='%s', Persona='%s', Topic='%s'", category_name, responding_as_account.account_type.value, topic)
+    logger.info("Using interaction mode: %s", interaction_mode)
+    logger.debug("Full category details: Name='%s', Description='%s', Keywords='%s', Style='%s'", category_name, category_obj.description, category_obj.prompt_keywords, category_obj.style_guidelines)
+    logger.debug("Responding as account details: ID='%s', Username='%s', Type='%s'", responding_as_account.account_id, responding_as_account.username, responding_as_account.account_type.value)
+    logger.debug("Platform='%s', Additional Instructions='%s'", platform, additional_instructions)
 
+    trace = start_trace("new_tweet", interaction_mode=interaction_mode, protocol=protocol_name, category=category_name)
     prompt_str = ""
+    prompt_cache_context: Dict[str, Any] = {}
     ai_generated_content = "[Error: Could not generate AI response]"
     model_used = "Unknown"
+    completion_shared = False
     response_error = None # To store error messages
 
     try:
         # 1. Retrieve relevant knowledge (Mocked for now)
         knowledge_snippet: Optional[str] = None
         # For Step 11: if knowledge_retriever:
-        current_retriever = knowledge_retriever if knowledge_retriever else MockKnowledgeRetriever()
+        current_retriever = knowledge_retriever or bundle or MockKnowledgeRetriever()
         knowledge_query = topic if topic else category_name # Use category name for knowledge query if no topic
-        knowledge_snippet = current_retriever.search_knowledge_for_topic(knowledge_query, category_name)
+        with span("knowledge"):
+            knowledge_snippet = current_retriever.search_knowledge_for_topic(knowledge_query, category_name)
         if knowledge_snippet:
-            logger.info(f"Retrieved knowledge snippet for new tweet: '{knowledge_snippet}'")
+            logger.info("Retrieved knowledge snippet for new tweet: '%s'", knowledge_snippet)
         else:
             logger.info("No specific knowledge snippet retrieved for this topic/category.")
 
         # 2. Generate prompt using TweetCategory object and interaction_mode
-        logger.info(f"Generating new tweet prompt with mode: {interaction_mode}...")
+        logger.info("Generating new tweet prompt with mode: %s...", interaction_mode)
         # Prepare prompt parameters, include mode only if non-default
         new_prompt_kwargs = {
             'category': original_category,
@@ -333,89 +366,44 @@ def generate_new_tweet(
             'additional_instructions': additional_instructions,
             'protocol_name': protocol_name
         }
+        if bundle is not None:
+            new_prompt_kwargs['bundle'] = bundle
         if interaction_mode and interaction_mode != InteractionMode.DEFAULT.value:
             new_prompt_kwargs['mode'] = interaction_mode
-        prompt_str = generate_new_tweet_prompt(**new_prompt_kwargs)
-        logger.debug(f"Generated new tweet prompt (first 500 chars): '{prompt_str[:500]}'")
-        logger.info(f"Full prompt length: {len(prompt_str)} characters")
 
-        # 3. Call AI client
-        logger.info(f"Initializing XAIClient to generate new tweet content.")
+        logger.info("Initializing XAIClient to generate new tweet content.")
         xai_client = XAIClient()
         model_used = xai_client.xai_model  # Use configured model name
-        logger.info(f"Calling XAIClient.get_completion with model: '{model_used}' for new tweet.")
-        ai_response_data = xai_client.get_completion(prompt=prompt_str, max_tokens=512)
-        logger.info(f"Received raw response data from XAIClient for new tweet.")
-        logger.debug(f"Raw AI response data for new tweet: {ai_response_data}")
-
-        # Extract content (same logic as generate_tweet_reply)
-        logger.info("Attempting to extract content from AI response...")
-        if ai_response_data.get('choices') and isinstance(ai_response_data['choices'], list) and len(ai_response_data['choices']) > 0:
-            choice = ai_response_data['choices'][0]
-            logger.debug(f"Processing AI response choice: {choice}")
-
-            finish_reason = choice.get('finish_reason')
-            if finish_reason == 'length':
-                logger.warning(f"AI response 'finish_reason' is 'length'. The response may be truncated. Full choice: {choice}")
-
-            if choice.get('text'): # Primarily for non-chat models or older formats
-                raw_content = choice['text'].strip()
-                logger.info(f"Extracted 'text' from choice (new tweet): '{raw_content[:100]}...'")
-                logger.debug(f"Full raw AI output (new tweet, from 'text'): {raw_content}")
-                ai_generated_content = _clean_response(raw_content, original_input=original_tweet.content)
-                logger.info(f"Cleaned text output (new tweet, first 100 chars): '{ai_generated_content[:100]}...'")
-            elif choice.get('message'):
-                message_data = choice['message']
-                if message_data.get('content') and message_data['content'].strip():
-                    raw_content = message_data['content'].strip()
-                    logger.info(f"Extracted 'content' from message (new tweet): '{raw_content[:100]}...'")
-                    logger.debug(f"Full raw AI output (new tweet, from 'message.content'): {raw_content}")
-                    # Clean the response
-                    ai_generated_content = _clean_response(raw_content, original_input=original_tweet.content)
-                    logger.info(f"Cleaned message content (new tweet, first 100 chars): '{ai_generated_content[:100]}...'")
-                elif message_data.get('reasoning_content') and message_data['reasoning_content'].strip():
-                    ai_generated_content = message_data['reasoning_content'].strip()
-                    logger.info(f"Extracted 'reasoning_content' from message as fallback (new tweet): '{ai_generated_content[:100]}...'")
-                    if finish_reason == 'length':
-                         ai_generated_content = "[Warning: Response possibly truncated and extracted from reasoning] " + ai_generated_content
-                    else:
-                         ai_generated_content = "[Info: Extracted from reasoning_content] " + ai_generated_content
-                else:
-                    ai_generated_content = "[Warning: AI response format unclear - message content and reasoning_content are empty]"
-                    response_error = "AI response format unclear: message content and reasoning_content empty."
-                    logger.warning(f"Could not extract text from AI response choice's message: {message_data}. Setting error: {response_error}")
-            else:
-                ai_generated_content = "[Warning: AI response format unclear - no 'text' or 'message' in choice]"
-                response_error = "AI response format unclear from choice (no text/message)."
-                logger.warning(f"Could not extract text/message from AI response choice: {choice}. Setting error: {response_error}")
-        elif ai_response_data.get('candidates') and isinstance(ai_response_data['candidates'], list) and len(ai_response_data['candidates']) > 0:
-            candidate = ai_response_data['candidates'][0]
-            logger.debug(f"Processing AI response candidate (PaLM style) for new tweet: {candidate}")
-            if candidate.get('output'):
-                ai_generated_content = candidate['output'].strip()
-                logger.info(f"Extracted output from candidate (new tweet): '{ai_generated_content[:100]}...'")
-                ai_generated_content = _clean_response(ai_generated_content)
-                logger.info(f"Cleaned PaLM output (new tweet): '{ai_generated_content[:100]}...'")
-            else:
-                ai_generated_content = "[Warning: AI response format unclear (PaLM candidate)]"
-                response_error = "AI response format unclear from candidate (PaLM)."
-                logger.warning(f"Could not extract output from AI response candidate: {candidate}. Setting error: {response_error}")
-        else:
-            ai_generated_content = "[Warning: AI response structure not recognized]"
-            response_error = "AI response structure not recognized."
-            logger.warning(f"AI response structure not recognized for content extraction: {ai_response_data}. Setting error: {response_error}")
+        new_prompt_kwargs['token_budget'] = get_prompt_token_budget(model_used, COMPLETION_MAX_TOKENS)
+
+        with span("prompt"):
+            prompt_str = generate_new_tweet_prompt(**new_prompt_kwargs)
+        logger.debug("Generated new tweet prompt (first 500 chars): '%.500s'", prompt_str)
+        logger.info("Full prompt length: %s characters", len(prompt_str))
+        prompt_cache_context = _prompt_cache_context(prompt_str)
+
+        # 3. Call AI client
+        logger.info("Calling XAIClient.get_completion with model: '%s' for new tweet.", model_used)
+        with span("completion"):
+            ai_response_data, completion_shared = _complete(xai_client, prompt_str)
+        logger.info("Received raw response data from XAIClient for new tweet.")
+        logger.debug("Raw AI response data for new tweet: %s", ai_response_data)
+
+        completion = as_completion_result(ai_response_data)
+        prompt_cache_context.update(_usage_context(completion))
+        ai_generated_content, response_error = _completion_content(completion, topic, "new tweet")
 
         if not response_error:
-            logger.info(f"Successfully generated and extracted AI tweet content: '{ai_generated_content[:100]}...'")
+            logger.info("Successfully generated and extracted AI tweet content: '%.100s...'", ai_generated_content)
         else:
-            logger.warning(f"Finished content extraction with error: {response_error}. Content set to: '{ai_generated_content}'")
+            logger.warning("Finished content extraction with error: %s. Content set to: '%s'", response_error, ai_generated_content)
 
     except XAIAPIError as e:
-        logger.error(f"XAIClient APIError in generate_new_tweet: {e.message} (Code: {e.status_code}, Details: {e.details})", exc_info=True)
+        logger.error("XAIClient APIError in generate_new_tweet: %s (Code: %s, Details: %s)", e.message, e.status_code, e.details, exc_info=True)
         ai_generated_content = f"[Error: AI API call failed - {e.message}]"
         response_error = e.message
     except Exception as e:
-        logger.error(f"Unexpected error in generate_new_tweet: {e}", exc_info=True)
+        logger.error("Unexpected error in generate_new_tweet: %s", e, exc_info=True)
         ai_generated_content = f"[Error: Unexpected error during new tweet generation - {str(e)}]"
         response_error = str(e)
 
@@ -434,22 +422,29 @@ def generate_new_tweet(
             "category_style_guidelines": category_obj.style_guidelines,
             "topic_provided": topic,
             "error_message": response_error,  # Add error message to AIResponse object
-            "interaction_mode": interaction_mode  # Store the interaction mode in the response
+            "interaction_mode": interaction_mode,  # Store the interaction mode in the response
+            **({"protocol": bundle.name} if bundle is not None else {}),
+            **({"completion_shared": True} if completion_shared else {}),
+            **prompt_cache_context,
+            **_token_estimates(prompt_str, ai_generated_content, response_error),
+            **stage_timings(trace),
         }
     }
-    logger.debug(f"AIResponse object creation arguments: {response_kwargs}")
+    logger.debug("AIResponse object creation arguments: %s", response_kwargs)
     final_response = AIResponse(**response_kwargs)
-    logger.info(f"END generate_new_tweet. Final AIResponse content: '{final_response.content[:100]}...', Model: '{final_response.model_used}'")
+    logger.info("END generate_new_tweet. Final AIResponse content: '%.100s...', Model: '%s'", final_response.content, final_response.model_used)
     # Generate poster image if requested
+    image_job = None
     if generate_image:
-        from src.ai.image_generation import get_poster_image
+        from src.ai.image_generation import submit_poster_image
         try:
-            logger.info(f"generate_image is True. Attempting to generate poster image for new tweet.")
+            logger.info("generate_image is True. Submitting poster image job for new tweet.")
             image_prompt = f"Create a visual for a tweet about: {ai_generated_content[:150]}"
-            final_response.image_url = get_poster_image(image_prompt)
-            logger.info(f"Poster image generation for new tweet returned URL: {final_response.image_url}")
+            with span("image"):
+                image_job = _attach_image_job(final_response, submit_poster_image(image_prompt))
+            logger.info("Poster image job for new tweet: %s (URL so far: %s)", final_response.extra_context['image_job_id'], final_response.image_url)
         except Exception as e:
-            logger.error(f"Failed to generate poster image for new tweet: {e}", exc_info=True)
+            logger.error("Failed to submit poster image job for new tweet: %s", e, exc_info=True)
             final_response.image_url = None
     else:
         logger.info("generate_image is False for new tweet. Skipping image generation.")
@@ -463,12 +458,152 @@ def generate_new_tweet(
             'responding_as': responding_as_account.username,
             'responding_as_type': responding_as_account.account_type.value,
         }
-        logger.info(f"Saving generated new tweet with metadata: {metadata}")
-        save_response(final_response, metadata)
+        logger.info("Saving generated new tweet with metadata: %s", metadata)
+        with span("persist"):
+            _persist_response(final_response, metadata, image_job)
     except Exception as e:
-        logger.error(f"Error while saving response: {e}", exc_info=True)
+        logger.error("Error while saving response: %s", e, exc_info=True)
+    finish_trace(trace, error=response_error)
     return final_response
 
+def _complete(xai_client: XAIClient, prompt: str) -> tuple:
+    """
+    Gets the completion for a prompt, sharing one call among concurrent identical requests.
+
+    Returns:
+        (response data, shared): shared is True when another request's in-flight call
+        answered this one (see src/ai/single_flight.py). Config 'ai.coalesce_requests'
+        switches coalescing off. Different prompts arriving together are sent as one
+        multi-prompt request when 'ai.batching.enabled' is set (see src/ai/batching.py).
+    """
+    batcher = get_completion_batcher()
+    if batcher is not None:
+        call = lambda: batcher.complete(xai_client, prompt, max_tokens=COMPLETION_MAX_TOKENS)
+    else:
+        call = lambda: xai_client.get_completion(prompt=prompt, max_tokens=COMPLETION_MAX_TOKENS)
+    if not get_config("ai.coalesce_requests", True):
+        return call(), False
+    return get_completion_flight().do(completion_key(xai_client, prompt, COMPLETION_MAX_TOKENS), call)
+
+
+def _attach_image_job(response: AIResponse, job: Any) -> Any:
+    """
+    Records an image job on a response and sets response.image_url once the job finishes.
+
+    The text is not held back for the image unless config 'image_generation.wait_seconds' is set.
+
+    Returns:
+        The job.
+    """
+    response.extra_context["image_job_id"] = job.job_id
+    wait_seconds = float(get_config("image_generation.wait_seconds", 0) or 0)
+    if wait_seconds > 0:
+        job.result(wait_seconds)
+
+    def _apply(finished_job: Any) -> None:
+        response.image_url = finished_job.url
+
+    job.add_done_callback(_apply)
+    return job
+
+
+def _persist_response(response: AIResponse, metadata: Dict[str, Any], image_job: Any = None) -> None:
+    """
+    Saves a generated response right away. If its image job is still running, the saved
+    record's image_url is filled in when the job finishes.
+    """
+    save_response(response, metadata)
+    if image_job is not None and response.image_url is None:
+        image_job.add_done_callback(lambda finished_job: update_saved_image_url(finished_job.job_id, finished_job.url))
+
+
+def _token_estimates(prompt: str, content: str, response_error: Optional[str]) -> Dict[str, Any]:
+    """Estimated prompt/completion tokens for extra_context (completion only if generation succeeded)."""
+    estimates = {"estimated_prompt_tokens": estimate_tokens(prompt), "max_completion_tokens": COMPLETION_MAX_TOKENS}
+    if not response_error:
+        estimates["estimated_completion_tokens"] = estimate_tokens(content)
+    return estimates
+
+
+def _prompt_cache_context(prompt: str) -> Dict[str, Any]:
+    """
+    Reads the static prefix hash and length off a rendered prompt.
+
+    Must be called before per-request text (e.g. relevancy facts) is appended, since
+    string concatenation drops the attributes.
+    """
+    context: Dict[str, Any] = {}
+    prefix_hash = getattr(prompt, "prefix_hash", None)
+    if prefix_hash:
+        context.update({"prompt_prefix_hash": prefix_hash, "prompt_prefix_chars": getattr(prompt, "prefix_chars", 0)})
+    budget_report = getattr(prompt, "budget_report", None)
+    if budget_report:
+        context.update({key: value for key, value in budget_report.items() if key != "estimated_prompt_tokens"})
+    return context
+
+
+def _usage_context(completion: CompletionResult) -> Dict[str, Any]:
+    """Provider-reported token usage for extra_context (absent when the response carries none)."""
+    context: Dict[str, Any] = {}
+    if completion.usage:
+        context["usage"] = dict(completion.usage)
+    if completion.usage.get("cached_tokens") is not None:
+        context["prompt_cached_tokens"] = completion.usage["cached_tokens"]
+    return context
+
+
+_UNUSABLE_COMPLETIONS = {
+    SHAPE_EMPTY_MESSAGE: ("[Warning: AI response format unclear - message content and reasoning_content are empty]",
+                          "AI response format unclear: message content and reasoning_content empty."),
+    SHAPE_EMPTY_CHOICE: ("[Warning: AI response format unclear - no 'text' or 'message' in choice]",
+                         "AI response format unclear from choice (no text/message)."),
+    SHAPE_EMPTY_CANDIDATE: ("[Warning: AI response format unclear (PaLM candidate)]",
+                            "AI response format unclear from candidate (PaLM)."),
+    SHAPE_UNRECOGNIZED: ("[Warning: AI response structure not recognized]",
+                         "AI response structure not recognized."),
+}
+
+
+def _completion_content(completion: CompletionResult, original_input: Optional[str], label: str) -> tuple:
+    """
+    Turns a parsed completion into the text of the generated tweet.
+
+    Args:
+        completion: The parsed API response.
+        original_input: The tweet or topic the generation was based on (rejected if echoed back).
+        label: Operation name for log messages ("reply", "new tweet").
+
+    Returns:
+        (content, error): error is None unless the response held no usable text.
+    """
+    if completion.truncated:
+        logger.warning("AI response 'finish_reason' is 'length' (%s). The response may be truncated.", label)
+
+    if completion.shape in (SHAPE_TEXT, SHAPE_MESSAGE):
+        logger.info("Extracted '%s' from choice (%s): '%.100s...'", completion.shape, label, completion.text)
+        logger.debug("Full raw AI output (%s, from '%s'): %s", label, completion.shape, completion.text)
+        content = _clean_response(completion.text, original_input=original_input)
+        logger.info("Cleaned output (%s, first 100 chars): '%.100s...'", label, content)
+        return content, None
+    if completion.shape == SHAPE_REASONING:
+        logger.info("Extracted 'reasoning_content' from message as fallback (%s): '%.100s...'", label, completion.reasoning)
+        if completion.truncated:
+            return "[Warning: Response possibly truncated and extracted from reasoning] " + completion.reasoning, None
+        return "[Info: Extracted from reasoning_content] " + completion.reasoning, None
+    if completion.shape == SHAPE_CANDIDATE:
+        logger.info("Extracted output from candidate (%s): '%.100s...'", label, completion.text)
+        # PaLM typically gives clean output, but we can still run it through cleaner
+        content = _clean_response(completion.text)
+        logger.info("Cleaned PaLM output (%s): '%.100s...'", label, content)
+        return content, None
+
+    content, error = _UNUSABLE_COMPLETIONS[completion.shape]
+    logger.warning("Could not extract text from AI response (%s, shape '%s'): %s. Setting error: %s",
+                   label, completion.shape, dict(completion), error)
+    return content, error
+
+
+@timed("clean")
 def _clean_response(response_text: str, original_input: str = None) -> str:
     """Extract only the final tweet text from model response, removing any reasoning or formatting.
     
@@ -483,18 +618,21 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
         logger.warning("_clean_response received empty response_text")
         return ""
     
-    logger.debug(f"Cleaning raw response (length {len(response_text)}): '{response_text[:200]}...'")
+    logger.debug("Cleaning raw response (length %s): '%.200s...'", len(response_text), response_text)
     
-    # Check if response looks suspiciously like the input tweet (echo-back detection)
-    if original_input and original_input.strip() and original_input.strip().lower() == response_text.strip().lower():
-        logger.error(f"CRITICAL BUG: AI response is identical to input tweet! Rejecting: '{original_input.strip()}'")
+    # Check if response looks suspiciously like the input tweet (echo-back detection). The input is
+    # fingerprinted once for every candidate below; the client's prompt echo check is a separate
+    # comparison and runs in the background (see src/ai/echo_detection.py)
+    input_fingerprint = TextFingerprint(original_input)
+    if input_fingerprint.matches(response_text):
+        logger.error("CRITICAL BUG: AI response is identical to input tweet! Rejecting: '%s'", original_input.strip())
         return "[Error: AI returned input tweet without changes]"
     
     # 1. Check for known Degen partials first
     stripped_lower_response = response_text.strip().lower()
     for partial_key, full_phrase in degen_partials.items():
         if stripped_lower_response.startswith(partial_key):
-            logger.info(f"Degen partial matched: '{response_text.strip()}' -> '{full_phrase}'")
+            logger.info("Degen partial matched: '%s' -> '%s'", response_text.strip(), full_phrase)
             return _ensure_tweet_length(full_phrase)
 
     # 2. Specific known truncation (less reliable, but a targeted fix for a common issue)
@@ -535,21 +673,21 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
                     # For labels, the last match is often best. For quotes, any valid match is good.
                     # If we find a quoted match, it's very likely the intended tweet.
                     if group_name in ["tweet_double", "tweet_single"]:
-                        logger.info(f"Quoted content extracted: '{extracted[:50]}...'")
+                        logger.info("Quoted content extracted: '%.50s...'", extracted)
                         return _ensure_tweet_length(extracted) 
                     best_marker_extraction = extracted # Store label matches, prefer later ones
                 else:
-                    logger.debug(f"Marker extracted '{extracted[:20]}...' but length {len(extracted)} invalid.")
+                    logger.debug("Marker extracted '%.20s...' but length %s invalid.", extracted, len(extracted))
         except re.error as e:
-            logger.error(f"Regex error with pattern: {pattern_details}. Error: {e}")
+            logger.error("Regex error with pattern: %s. Error: %s", pattern_details, e)
             continue
             
     if best_marker_extraction: # This will be from the last valid label match if no quotes found
-        logger.info(f"Label-based marker extracted: '{best_marker_extraction[:50]}...'")
+        logger.info("Label-based marker extracted: '%.50s...'", best_marker_extraction)
         
         # Prevent echo-back: Check if extracted content matches original input
-        if original_input and original_input.strip() and best_marker_extraction.strip().lower() == original_input.strip().lower():
-            logger.error(f"ECHO DETECTION: Marker extraction returned original input. Rejecting: '{best_marker_extraction[:50]}...'")
+        if input_fingerprint.matches(best_marker_extraction):
+            logger.error("ECHO DETECTION: Marker extraction returned original input. Rejecting: '%.50s...'", best_marker_extraction)
             return "[Error: AI response contains only the original tweet]"
             
         return _ensure_tweet_length(best_marker_extraction)
@@ -577,11 +715,11 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
 
     if potential_paragraphs:
         best_paragraph = potential_paragraphs[-1] # Prefer the last clean paragraph
-        logger.info(f"Paragraph logic selected: '{best_paragraph[:50]}...'")
+        logger.info("Paragraph logic selected: '%.50s...'", best_paragraph)
         
         # Prevent echo-back: Check if paragraph matches original input
-        if original_input and original_input.strip() and best_paragraph.strip().lower() == original_input.strip().lower():
-            logger.error(f"ECHO DETECTION: Paragraph extraction returned original input. Rejecting: '{best_paragraph[:50]}...'")
+        if input_fingerprint.matches(best_paragraph):
+            logger.error("ECHO DETECTION: Paragraph extraction returned original input. Rejecting: '%.50s...'", best_paragraph)
             return "[Error: AI response contains only the original tweet]"
             
         return _ensure_tweet_length(best_paragraph)
@@ -613,10 +751,10 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
             tweet_like_run = list(reversed(tweet_like_run))
             combined = ' '.join(tweet_like_run)
             if 15 <= len(combined) <= 280:
-                logger.info(f"Sentence extraction (combined last run): '{combined[:50]}...'")
+                logger.info("Sentence extraction (combined last run): '%.50s...'", combined)
                 return _ensure_tweet_length(combined)
             # If not combinable, return the last one in the run
-            logger.info(f"Sentence extraction (last valid sentence in run): '{tweet_like_run[-1][:50]}...'")
+            logger.info("Sentence extraction (last valid sentence in run): '%.50s...'", tweet_like_run[-1])
             return _ensure_tweet_length(tweet_like_run[-1])
         # Fallback: scan all sentences in reverse for any tweet-like, non-reasoning sentence
         for s in reversed(sentences):
@@ -633,7 +771,7 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
             if len(s_stripped) < 30 and s_stripped.endswith(':'):
                 continue
             if 15 <= len(s_stripped) <= 280:
-                logger.info(f"Sentence extraction (fallback single sentence): '{s_stripped[:50]}...'")
+                logger.info("Sentence extraction (fallback single sentence): '%.50s...'", s_stripped)
                 return _ensure_tweet_length(s_stripped)
     
     # 6. Final Fallback: Only if original text was ALREADY tweet-like and not clearly instructions.
@@ -649,10 +787,10 @@ def _clean_response(response_text: str, original_input: str = None) -> str:
         if not is_clearly_instruction_or_system_message:
             # Before returning, ensure it doesn't start with a typical reasoning phrase that was missed
             if not any(stripped_response_text.lower().startswith(rt + ":") or stripped_response_text.lower().startswith(rt + " ") for rt in ["response", "tweet", "final"]):
-                 logger.warning(f"All specific cleaning failed. Using original short text as last resort: '{stripped_response_text[:50]}...'")
+                 logger.warning("All specific cleaning failed. Using original short text as last resort: '%.50s...'", stripped_response_text)
                  return _ensure_tweet_length(stripped_response_text)
 
-    logger.error(f"_clean_response: Could not reliably extract tweet. Raw start: '{response_text[:100]}...'. Returning empty.")
+    logger.error("_clean_response: Could not reliably extract tweet. Raw start: '%.100s...'. Returning empty.", response_text)
     return ""
 
 def _ensure_tweet_length(tweet_text: str) -> str:
@@ -663,16 +801,16 @@ def _ensure_tweet_length(tweet_text: str) -> str:
     # Check both original degen partial keys (lowercase) and their expanded values
     if cleaned.lower() in degen_partials or cleaned in degen_partials.values():
         if len(cleaned) > 280: # Should not happen for degen_partials but as a safeguard
-             logger.warning(f"Degen partial was unexpectedly long and truncated: '{cleaned}'")
+             logger.warning("Degen partial was unexpectedly long and truncated: '%s'", cleaned)
              return cleaned[:277].strip() + "..."
         return cleaned # Return as is, it's a known valid (potentially short) phrase
 
     if len(cleaned) < 10: # Arbitrary minimum length for a meaningful tweet
-        logger.warning(f"Cleaned tweet is too short ('{cleaned}'), indicating poor extraction or meaningless content. Returning empty.")
+        logger.warning("Cleaned tweet is too short ('%s'), indicating poor extraction or meaningless content. Returning empty.", cleaned)
         return ""
         
     if len(cleaned) > 280:
-        logger.warning(f"Cleaned AI output exceeds 280 chars ('{cleaned[:50]}...'), truncating.")
+        logger.warning("Cleaned AI output exceeds 280 chars ('%.50s...'), truncating.", cleaned)
         truncated_text = cleaned[:277] # Leave space for "..."
         last_space = truncated_text.rfind(' ')
         
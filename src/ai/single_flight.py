@@ -0,0 +1,126 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Single-flight coalescing of identical in-flight completion calls.
+
+"""
+Single-flight request coalescing.
+
+When several threads ask for the same completion at the same time (operators replying to
+the same viral tweet with the same persona and mode, or batch jobs overlapping), only the
+first caller (the leader) calls the API; the others wait for it and receive the same
+result, or the same exception. Nothing is cached: once the call returns the key is
+released and the next request calls the API again.
+
+The generation layer keys completions by completion_key(): the backend, model and sampling
+parameters plus the final prompt. The prompt already encodes the tweet content, persona,
+target account, interaction mode, protocol, knowledge and facts, so identical requests
+produce identical keys. Shared results must be treated as read-only.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome with concurrent callers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"requests": 0, "executed": 0, "saved": 0}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Calls func() unless a call with the same key is in flight, in which case waits for it.
+
+        Args:
+            key: Identity of the call.
+            func: The call to make when this caller leads.
+
+        Returns:
+            (result, shared): shared is True when the result came from another caller's call.
+
+        Raises:
+            Exception: Whatever the leading call raised.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["saved"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info("Coalesced %d identical in-flight request(s) into one call", call.waiters)
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """requests (total callers), executed (calls made) and saved (callers served by another's call)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {"requests": 0, "executed": 0, "saved": 0}
+
+
+_COMPLETIONS = SingleFlight()
+
+
+def get_completion_flight() -> SingleFlight:
+    """The process-wide SingleFlight used for generation completions."""
+    return _COMPLETIONS
+
+
+def completion_key(client: Any, prompt: str, max_tokens: Optional[int], temperature: Optional[float] = None) -> Tuple:
+    """Coalescing key of a completion request made through an XAIClient."""
+    return (
+        getattr(client, "xai_base_url", None),
+        getattr(client, "use_fallback", None),
+        getattr(client, "xai_model", None),
+        max_tokens,
+        temperature if temperature is not None else getattr(client, "default_temperature", None),
+        str(prompt),
+    )
+
+
+def get_coalescing_stats() -> Dict[str, int]:
+    """Counters of the generation completion SingleFlight (see SingleFlight.stats())."""
+    return _COMPLETIONS.stats()
@@ -0,0 +1,244 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Declared stage graph for concurrent pre-generation enrichment.
+#   - Stage: name, function, dependencies, deadline and fallback value.
+#   - StageGraph.run(): runs independent stages concurrently on a shared thread pool.
+# - 2026-10-19: Stage failure warnings use lazy %-style logging arguments.
+
+"""
+Concurrent enrichment stages.
+
+Work that has to happen before a prompt can be built (tone analysis, knowledge retrieval,
+relevancy facts, ...) is declared as a StageGraph of Stage objects. Each stage receives a
+read-only mapping of the request inputs plus the values of the stages it depends on, so
+stages without dependencies run at the same time and the pre-generation latency is that of
+the slowest chain rather than the sum of all stages. Adding an enrichment stage that
+depends on nothing does not lengthen the critical path.
+
+Every stage may have a deadline (seconds from when it was started). A stage that misses its
+deadline, or fails without being `required`, resolves to its `default` and the run carries
+on; the request is served with less context instead of waiting. Python threads cannot be
+interrupted, so a late stage keeps its worker until it returns and its result is discarded.
+Stage durations are added to the caller's trace (src/utils/tracing.py) under the stage names.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from src.config.settings import get_config
+from src.utils.logging import get_logger
+from src.utils.tracing import current_trace
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One enrichment step."""
+    name: str
+    func: Callable[[Mapping[str, Any]], Any]  # Receives the inputs plus dependency values
+    depends_on: Tuple[str, ...] = ()
+    deadline: Optional[float] = None          # Seconds; None waits indefinitely
+    default: Any = None                       # Value on timeout, or on error if not required
+    required: bool = False                    # Errors propagate out of StageGraph.run()
+
+
+@dataclass
+class StageOutcome:
+    """Result of one stage in one run."""
+    name: str
+    value: Any
+    status: str = STATUS_OK
+    elapsed_ms: float = 0.0
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class StageRun:
+    """Outcomes of a StageGraph run; indexing returns stage values."""
+    outcomes: Dict[str, StageOutcome] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.outcomes[name].value
+
+    def degraded(self) -> Dict[str, str]:
+        """{stage: status} of stages that timed out or failed."""
+        return {name: o.status for name, o in self.outcomes.items() if o.status != STATUS_OK}
+
+
+class StageGraph:
+    """
+    A validated set of stages, run in dependency order with independent stages in parallel.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        """
+        Args:
+            stages: The stages. Names must be unique and dependencies must name other stages.
+
+        Raises:
+            ValueError: On duplicate names, unknown dependencies or a dependency cycle.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            unknown = [dep for dep in stage.depends_on if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items() if all(dep in order for dep in stage.depends_on)]
+            if not ready:
+                raise ValueError(f"Dependency cycle among stages {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def with_stage(self, stage: Stage) -> "StageGraph":
+        """A new graph with `stage` added (or replacing the stage of the same name)."""
+        stages = [s for s in self.stages.values() if s.name != stage.name]
+        return StageGraph(stages + [stage])
+
+    def run(
+        self,
+        inputs: Mapping[str, Any],
+        executor: Optional[Executor] = None,
+        deadlines: Optional[Mapping[str, float]] = None,
+    ) -> StageRun:
+        """
+        Runs every stage and returns their outcomes.
+
+        Args:
+            inputs: Request inputs passed to every stage (stage values are added under the
+                    stage names for dependents).
+            executor: Pool to run stages on. Defaults to the shared stage pool; with
+                      'pipeline.concurrent' set to false stages run inline, in order.
+            deadlines: Per-stage deadline overrides in seconds.
+
+        Returns:
+            The StageRun.
+
+        Raises:
+            Exception: The error of a `required` stage.
+        """
+        deadlines = {**{name: s.deadline for name, s in self.stages.items()}, **(deadlines or {})}
+        if executor is None:
+            executor = get_stage_executor()
+        run = StageRun()
+        if executor is None:
+            self._run_inline(inputs, run)
+        else:
+            self._run_concurrent(inputs, executor, deadlines, run)
+        trace = current_trace()
+        if trace is not None:
+            for outcome in run.outcomes.values():
+                trace.add(outcome.name, outcome.elapsed_ms)
+        for name, status in run.degraded().items():
+            logger.warning("Stage '%s' %s; continuing without it", name,
+                           "missed its deadline" if status == STATUS_TIMEOUT else "failed")
+        return run
+
+    def _stage_inputs(self, stage: Stage, inputs: Mapping[str, Any], run: StageRun) -> Mapping[str, Any]:
+        values = dict(inputs)
+        for dep in stage.depends_on:
+            values[dep] = run[dep]
+        return MappingProxyType(values)
+
+    def _finish(self, stage: Stage, run: StageRun, value: Any, elapsed_ms: float,
+                error: Optional[BaseException]) -> None:
+        if error is None:
+            run.outcomes[stage.name] = StageOutcome(stage.name, value, STATUS_OK, elapsed_ms)
+            return
+        if stage.required:
+            raise error
+        logger.warning("Stage '%s' raised %r", stage.name, error)
+        run.outcomes[stage.name] = StageOutcome(stage.name, stage.default, STATUS_ERROR, elapsed_ms, error)
+
+    def _run_inline(self, inputs: Mapping[str, Any], run: StageRun) -> None:
+        for name in self.order:
+            stage = self.stages[name]
+            start = time.perf_counter()
+            try:
+                value, error = stage.func(self._stage_inputs(stage, inputs, run)), None
+            except Exception as e:
+                value, error = None, e
+            self._finish(stage, run, value, (time.perf_counter() - start) * 1000.0, error)
+
+    def _run_concurrent(self, inputs: Mapping[str, Any], executor: Executor,
+                        deadlines: Mapping[str, Optional[float]], run: StageRun) -> None:
+        running: Dict[Future, Tuple[Stage, float]] = {}
+        pending = list(self.order)
+
+        def submit_ready() -> None:
+            for name in list(pending):
+                stage = self.stages[name]
+                if all(dep in run.outcomes for dep in stage.depends_on):
+                    pending.remove(name)
+                    future = executor.submit(stage.func, self._stage_inputs(stage, inputs, run))
+                    running[future] = (stage, time.perf_counter())
+
+        submit_ready()
+        while running:
+            now = time.perf_counter()
+            expiries = [start + deadlines[stage.name] for stage, start in running.values()
+                        if deadlines.get(stage.name) is not None]
+            timeout = max(0.0, min(expiries) - now) if expiries else None
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+            for future in done:
+                stage, start = running.pop(future)
+                error = future.exception()
+                self._finish(stage, run, None if error else future.result(), (now - start) * 1000.0, error)
+            for future, (stage, start) in list(running.items()):
+                deadline = deadlines.get(stage.name)
+                if deadline is not None and now - start >= deadline:
+                    del running[future]
+                    future.cancel()  # Only prevents the call if it has not started yet
+                    run.outcomes[stage.name] = StageOutcome(stage.name, stage.default, STATUS_TIMEOUT, deadline * 1000.0)
+            submit_ready()
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_stage_executor() -> Optional[ThreadPoolExecutor]:
+    """
+    Returns the shared pool for enrichment stages.
+
+    Sized by config 'pipeline.max_workers'; None when 'pipeline.concurrent' is false.
+    """
+    global _EXECUTOR
+    if not get_config("pipeline.concurrent", True):
+        return None
+    executor = _EXECUTOR
+    if executor is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                workers = int(get_config("pipeline.max_workers", DEFAULT_MAX_WORKERS) or DEFAULT_MAX_WORKERS)
+                _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage")
+            executor = _EXECUTOR
+    return executor
+
+
+def get_stage_deadlines() -> Dict[str, float]:
+    """Per-stage deadlines in seconds from config 'pipeline.stage_deadlines'."""
+    configured = get_config("pipeline.stage_deadlines", {}) or {}
+    return {name: float(seconds) for name, seconds in configured.items() if seconds is not None}
@@ -0,0 +1,188 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Local token estimation and budget-aware prompt assembly.
+#   - estimate_tokens(): BPE-approximating count, no tokenizer download or network.
+#   - Per-model request budgets from config 'ai.token_budgets'.
+#   - assemble_sections(): drops/trims the lowest-priority prompt sections to fit a budget.
+
+"""
+Token budgets for prompt assembly.
+
+Prompts are assembled from PromptSection objects. Required sections (priority None) are
+always kept; optional ones carry an integer priority, and while the estimated size exceeds
+the budget the lowest-priority section is shrunk first: sections with `items` (knowledge
+chunks, relevancy facts) lose their last item, other sections are dropped whole. A prompt
+that already fits is joined unchanged.
+
+Token counts come from estimate_tokens(), which approximates a GPT-style BPE tokenizer:
+common words are one token, long words, numbers and non-ASCII text cost more, and each
+punctuation mark is its own token. It typically lands within ~15% of the real count for
+English prose, which is enough to keep requests under a cost/latency budget.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from src.config import get_config
+except ImportError:
+    from src.config.settings import get_config
+
+DEFAULT_TOKEN_BUDGET = 4096
+
+# Section priorities: lower numbers are shrunk first
+PRIORITY_MODE_EXAMPLES = 10
+PRIORITY_KNOWLEDGE = 20
+PRIORITY_RELEVANCY_FACTS = 30
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|\n+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estimates the BPE token count of text without a tokenizer.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        Estimated token count (0 for empty text).
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        first = piece[0]
+        if first.isalpha() and first.isascii():
+            # Words up to ~7 letters are usually a single merge; longer ones split every ~5
+            tokens += 1 if len(piece) <= 7 else (len(piece) + 4) // 5
+        elif first.isdigit():
+            tokens += (len(piece) + 2) // 3  # Numbers are split into groups of up to 3 digits
+        elif first == "\n":
+            tokens += 1
+        elif first.isascii():
+            tokens += 1
+        else:
+            tokens += len(piece.encode('utf-8')) // 2 or 1  # Emoji and non-Latin scripts cost several tokens
+    return tokens
+
+
+def get_token_budget(model: Optional[str] = None) -> int:
+    """
+    Returns the per-request token budget (prompt + completion) for a model.
+
+    Looks up config 'ai.token_budgets.<model>', then 'ai.token_budgets.default'.
+    """
+    budgets = get_config("ai.token_budgets", {}) or {}
+    if model and model in budgets:
+        return int(budgets[model])
+    return int(budgets.get("default", DEFAULT_TOKEN_BUDGET))
+
+
+def get_prompt_token_budget(model: Optional[str] = None, max_tokens: int = 0) -> int:
+    """Returns the tokens left for the prompt once `max_tokens` are reserved for the completion."""
+    return max(0, get_token_budget(model) - (max_tokens or 0))
+
+
+@dataclass
+class PromptSection:
+    """One block of a prompt."""
+    name: str
+    text: str
+    priority: Optional[int] = None   # None = required; lower numbers are shrunk first
+    items: List[str] = field(default_factory=list)  # Ranked best-first; trimmed from the end
+    header: str = ""                 # Re-rendered text after trimming is header + joined items
+    item_separator: str = "\n"
+
+    def trim_last_item(self) -> None:
+        self.items.pop()
+        self.text = self.header + self.item_separator.join(self.items) if self.items else ""
+
+
+@dataclass
+class AssembledPrompt:
+    """Result of assemble_sections()."""
+    text: str
+    estimated_tokens: int
+    budget: Optional[int]
+    dropped: List[str] = field(default_factory=list)       # Names of sections removed entirely
+    trimmed: Dict[str, int] = field(default_factory=dict)  # Section name -> items removed
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.estimated_tokens > self.budget
+
+    def report(self) -> Dict[str, Any]:
+        """Summary suitable for AIResponse.extra_context."""
+        return {
+            "estimated_prompt_tokens": self.estimated_tokens,
+            "prompt_token_budget": self.budget,
+            "prompt_sections_dropped": list(self.dropped),
+            "prompt_items_trimmed": dict(self.trimmed),
+        }
+
+
+def assemble_sections(
+    sections: Sequence[PromptSection],
+    budget: Optional[int] = None,
+    separator: str = "\n\n"
+) -> AssembledPrompt:
+    """
+    Joins sections, shrinking optional ones (lowest priority first) until the prompt fits.
+
+    Args:
+        sections: Sections in prompt order. Empty sections are skipped.
+        budget: Maximum estimated prompt tokens. None disables trimming.
+        separator: Text placed between sections.
+
+    Returns:
+        The AssembledPrompt. If the required sections alone exceed the budget, everything
+        optional is removed and the result has over_budget set.
+    """
+    kept = [s for s in sections if s.text]
+    text = separator.join(s.text for s in kept)
+    estimated = estimate_tokens(text)
+    if budget is None or estimated <= budget:
+        return AssembledPrompt(text=text, estimated_tokens=estimated, budget=budget)
+
+    dropped: List[str] = []
+    trimmed: Dict[str, int] = {}
+    kept = [PromptSection(s.name, s.text, s.priority, list(s.items), s.header, s.item_separator) for s in kept]
+    # Among equal priorities, later sections are shrunk first
+    order = sorted((i for i, s in enumerate(kept) if s.priority is not None),
+                   key=lambda i: (kept[i].priority, -i))
+    for i in order:
+        section = kept[i]
+        # Running estimate; sections are separated by blank lines, so counts are close to additive
+        if section.items:
+            while section.items and estimated > budget:
+                before = estimate_tokens(section.text)
+                section.trim_last_item()
+                estimated -= before - estimate_tokens(section.text)
+                trimmed[section.name] = trimmed.get(section.name, 0) + 1
+        else:
+            estimated -= estimate_tokens(section.text)
+            section.text = ""
+        if not section.text:
+            dropped.append(section.name)
+        if estimated <= budget:
+            break
+
+    text = separator.join(s.text for s in kept if s.text)
+    return AssembledPrompt(text=text, estimated_tokens=estimate_tokens(text), budget=budget,
+                           dropped=dropped, trimmed=trimmed)
+
+
+def knowledge_section(name: str, header: str, snippet: str, priority: int = PRIORITY_KNOWLEDGE) -> PromptSection:
+    """
+    Builds a section whose items are the snippet's chunks, ranked best first.
+
+    Paragraphs are the chunks when there are several; a single paragraph is split into
+    sentences. The untrimmed text is header + snippet, exactly as given.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", snippet) if p.strip()]
+    if len(paragraphs) > 1:
+        return PromptSection(name, header + snippet, priority, paragraphs, header, "\n\n")
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", snippet.strip()) if s]
+    return PromptSection(name, header + snippet, priority, sentences, header, " ")
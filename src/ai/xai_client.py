@@ -5,6 +5,7 @@ This module provides a client for interacting with the xAI API for generating re
 In the future, this will be replaced with the actual xAI API client when it's available.
 """
 
+import logging
 import requests
 import os
 from typing import Dict, Any, List, Optional
@@ -15,7 +16,11 @@ try:
 except ImportError:
     from src.config.settings import get_config
 
-from src.utils.logging import get_logger
+from src.ai.completion import (BACKEND_PALM, BACKEND_XAI, CompletionResult, as_completion_result, parse_usage,
+                               record_token_usage)
+from src.ai.echo_detection import check_echo
+from src.ai.hedging import get_completion_hedger
+from src.utils.logging import get_logger, log_sampled_prompt
 from src.utils.error_handling import APIError, handle_api_error
 
 # Logger instance
@@ -52,6 +57,11 @@ class XAIClient:
         self.default_max_tokens = get_config("ai.default_max_tokens", 1500)
         self.default_temperature = get_config("ai.default_temperature", 0.7)
 
+    @property
+    def supports_batching(self) -> bool:
+        """Whether get_completions() sends several prompts in one request (xAI only, not the PaLM fallback)."""
+        return bool(self.xai_api_key) and not self.use_fallback
+
     def get_completion(
         self,
         prompt: str,
@@ -70,7 +80,8 @@ class XAIClient:
             **kwargs: Additional arguments for the API call.
 
         Returns:
-            A dictionary containing the API response.
+            The API response: a CompletionResult (the response dict, with its text, reasoning,
+            finish reason and token usage already read out; see src/ai/completion.py).
 
         Raises:
             APIError: If API call fails or no API is available.
@@ -78,17 +89,15 @@ class XAIClient:
         current_max_tokens = max_tokens if max_tokens is not None else self.default_max_tokens
         current_temperature = temperature if temperature is not None else self.default_temperature
 
-        headers = {"Content-Type": "application/json"}
-        logger.info(f"XAIClient.get_completion called. Prompt (first 500 chars): '{prompt[:500]}...'")
-        logger.debug(f"Params: max_tokens={current_max_tokens}, temperature={current_temperature}, other_kwargs={kwargs}")
+        logger.info("XAIClient.get_completion called. Prompt (first 500 chars): '%.500s...'", prompt)
+        logger.debug("Params: max_tokens=%s, temperature=%s, other_kwargs=%s", current_max_tokens, current_temperature, kwargs)
+        log_sampled_prompt(logger, "completion", prompt)
         
         use_xai_api = bool(self.xai_api_key) and not self.use_fallback
         use_google_api = bool(self.google_api_key) and (self.use_fallback or not bool(self.xai_api_key))
 
         try:
             if use_xai_api:
-                logger.info(f"Attempting to call xAI API. Endpoint: {self.xai_base_url}/completions, Model: {self.xai_model}")
-                # Construct the payload for xAI completions
                 payload = {
                     "prompt": prompt,
                     "model": self.xai_model,
@@ -96,61 +105,17 @@ class XAIClient:
                     "temperature": current_temperature,
                     **kwargs
                 }
-                headers["Authorization"] = f"Bearer {self.xai_api_key}"
-                logger.debug(f"xAI API Request Payload (excluding Authorization header): {payload}")
-                
-                # Log the exact prompt being sent to identify potential pattern issues
-                prompt_len = len(prompt)
-                prompt_first_100 = prompt[:100] if prompt_len > 0 else 'empty'
-                prompt_last_100 = prompt[-100:] if prompt_len > 100 else prompt
-                logger.info(f"Sending to xAI API: prompt length={prompt_len}, first 100 chars='{prompt_first_100}...', last 100 chars='...{prompt_last_100}'")
-                
-                # Make the API request
-                response = requests.post(f"{self.xai_base_url}/completions", json=payload, headers=headers, timeout=30)
-                logger.info(f"xAI API raw response status: {response.status_code}")
-                
-                # Debug the raw response
-                response_text = response.text
-                logger.debug(f"xAI API raw response text: {response_text}")
-                response.raise_for_status()
-                
-                # Parse and debug the JSON response
-                json_response = response.json()
-                logger.debug(f"xAI API parsed JSON response: {json_response}")
-                
-                # Check for potential echo issues in the response
-                self._check_for_echo(prompt, json_response)
-                
-                return json_response
+                hedger = get_completion_hedger()
+                if hedger is None:
+                    return self._xai_completion(prompt, payload)
+                if hedger.backend == BACKEND_PALM and self.google_api_key:
+                    hedge = lambda: self._palm_completion(prompt)
+                else:
+                    hedge = lambda: self._xai_completion(prompt, payload)
+                return hedger.run(lambda: self._xai_completion(prompt, payload), hedge)
             
             elif use_google_api:
-                logger.info(f"Attempting to call Google PaLM API. Fallback active or xAI key missing. Using model: text-bison-001 (example)")
-                # PaLM API structure can vary; this is a common pattern for older models
-                # For newer Gemini via Vertex or AI Studio, the endpoint and payload would differ.
-                # Assuming a text generation model like 'text-bison-001' for this example.
-                palm_payload = {
-                    "prompt": {
-                        "text": prompt
-                    },
-                    # "temperature": current_temperature, # PaLM might have different ways to set this
-                    # "maxOutputTokens": current_max_tokens,
-                }
-                # Add other PaLM specific params from kwargs if necessary
-                # e.g., safetySettings, stopSequences
-
-                # The actual model name might need to be part of the URL or payload
-                # This is a generic example:
-                palm_api_url = f"{self.google_palm_base_url}/models/text-bison-001:generateText?key={self.google_api_key}"
-                logger.debug(f"Google PaLM API Request URL: {palm_api_url}")
-                logger.debug(f"Google PaLM API Request Payload: {palm_payload}")
-                
-                response = requests.post(palm_api_url, json=palm_payload, headers=headers, timeout=30)
-                logger.info(f"Google PaLM API raw response status: {response.status_code}")
-                logger.debug(f"Google PaLM API raw response text: {response.text}")
-                response.raise_for_status()
-                json_response = response.json()
-                logger.debug(f"Google PaLM API parsed JSON response: {json_response}")
-                return json_response
+                return self._palm_completion(prompt)
 
             else:
                 # This case should ideally be caught by upfront config checks,
@@ -162,36 +127,182 @@ class XAIClient:
                 )
         
         except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response is not None else 500
-            error_text = "Unknown HTTP error"
-            details = {}
-            if e.response is not None:
-                error_text = e.response.text
-                try:
-                    details = e.response.json() # Attempt to get JSON error details
-                    # If 'error' and 'message' keys exist, use that as a more specific message
-                    if isinstance(details, dict) and 'error' in details and isinstance(details['error'], dict) and 'message' in details['error']:
-                        error_text = details['error']['message']
-                    elif isinstance(details, dict) and MESSAGE_KEY in details : # MESSAGE_KEY is 'message'
-                         error_text = details[MESSAGE_KEY]
-
-                except ValueError: # Not JSON
-                    details = {"raw_response": error_text} # Keep raw text if not JSON
-            
-            logger.error(f"API request failed: {status_code} - {error_text}", exc_info=True)
-            raise APIError(f"API request failed with status {status_code}: {error_text}", status_code=status_code, details=details) from e
+            raise self._http_error(e) from e
         
         except requests.exceptions.RequestException as e: # Catches ConnectionError, Timeout, etc.
-            logger.error(f"API request failed due to a network/connection issue: {e}", exc_info=True)
-            raise APIError(f"API request failed due to a network/connection issue: {str(e)}", status_code=500) from e
+            raise self._network_error(e) from e
         
         except Exception as e:
             # Catch any other unexpected error during the process
-            logger.error(f"An unexpected error occurred in XAIClient.get_completion: {e}", exc_info=True)
+            logger.error("An unexpected error occurred in XAIClient.get_completion: %s", e, exc_info=True)
             raise APIError(f"An unexpected error occurred in XAIClient.get_completion: {str(e)}", status_code=500) from e
+
+    def get_completions(
+        self,
+        prompts: List[str],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        **kwargs: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Generates completions for several prompts with one xAI request.
+
+        The completions endpoint takes a list as "prompt" and returns the choices of all
+        prompts in one list, each with the "index" of its prompt. They are split back into
+        one response per prompt, shaped like get_completion()'s ({"choices": [...], ...}).
+        A single prompt, or the Google PaLM fallback (one prompt per request), goes through
+        get_completion().
+
+        Args:
+            prompts: The prompts, sent in this order.
+            max_tokens: The maximum number of tokens per completion. Defaults to config value.
+            temperature: The sampling temperature. Defaults to config value.
+            **kwargs: Additional arguments for the API call (shared by all prompts).
+
+        Returns:
+            One CompletionResult per prompt, in prompt order. A prompt the API returned no choice
+            for gets "choices": []. The batch's token usage is under "batch" -> "usage".
+
+        Raises:
+            APIError: If the request fails or the response is not a JSON object (for all prompts).
+        """
+        prompts = list(prompts)
+        if len(prompts) <= 1 or not self.supports_batching:
+            return [self.get_completion(prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
+                    for prompt in prompts]
+
+        payload = {
+            "prompt": prompts,
+            "model": self.xai_model,
+            "max_tokens": max_tokens if max_tokens is not None else self.default_max_tokens,
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            **kwargs
+        }
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.xai_api_key}"}
+        logger.info("Sending %d prompts to xAI API in one request (%d chars)", len(prompts), sum(len(p) for p in prompts))
+        try:
+            response = requests.post(f"{self.xai_base_url}/completions", json=payload, headers=headers, timeout=30)
+            logger.info("xAI API batch response status: %s", response.status_code)
+            response.raise_for_status()
+            json_response = response.json()
+            logger.debug("xAI API parsed batch JSON response: %s", json_response)
+        except requests.exceptions.HTTPError as e:
+            raise self._http_error(e) from e
+        except requests.exceptions.RequestException as e:
+            raise self._network_error(e) from e
+        except Exception as e:
+            logger.error("An unexpected error occurred in XAIClient.get_completions: %s", e, exc_info=True)
+            raise APIError(f"An unexpected error occurred in XAIClient.get_completions: {str(e)}", status_code=500) from e
+
+        if not isinstance(json_response, dict):
+            logger.error("xAI API batch response is not a JSON object: %.200r", json_response)
+            raise APIError("Unexpected batch response from xAI API: expected a JSON object, got "
+                           f"{type(json_response).__name__}", status_code=502)
+        record_token_usage(parse_usage(json_response))  # Once for the whole batch
+        parts = split_batch_response(json_response, len(prompts), choices_per_prompt=int(kwargs.get("n", 1) or 1))
+        results = [CompletionResult(part, backend=BACKEND_XAI) for part in parts]
+        for prompt, result in zip(prompts, results):
+            if result["choices"]:
+                self._check_for_echo(prompt, result)
+        return results
+
+    def _xai_completion(self, prompt: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Sends one xAI completions request. Errors are translated by the caller."""
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.xai_api_key}"}
+        logger.info("Attempting to call xAI API. Endpoint: %s/completions, Model: %s", self.xai_base_url, self.xai_model)
+        logger.debug("xAI API Request Payload (excluding Authorization header): %s", payload)
+        
+        # Log the exact prompt being sent to identify potential pattern issues
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sending to xAI API: prompt length=%s, first 100 chars='%.100s...', last 100 chars='...%s'",
+                        len(prompt), prompt or 'empty', prompt[-100:])
+        
+        # Make the API request
+        response = requests.post(f"{self.xai_base_url}/completions", json=payload, headers=headers, timeout=30)
+        logger.info("xAI API raw response status: %s", response.status_code)
+        
+        # Debug the raw response (reading .text decodes the body, so only when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("xAI API raw response text: %s", response.text)
+        response.raise_for_status()
+        
+        # Parse and debug the JSON response
+        json_response = self._parsed(response.json(), BACKEND_XAI)
+        logger.debug("xAI API parsed JSON response: %s", json_response)
+        
+        # Check for potential echo issues in the response
+        self._check_for_echo(prompt, json_response)
+        
+        return json_response
+
+    def _palm_completion(self, prompt: str) -> Dict[str, Any]:
+        """Sends one Google PaLM generateText request. Errors are translated by the caller."""
+        headers = {"Content-Type": "application/json"}
+        logger.info("Attempting to call Google PaLM API. Fallback active or xAI key missing. Using model: text-bison-001 (example)")
+        # PaLM API structure can vary; this is a common pattern for older models
+        # For newer Gemini via Vertex or AI Studio, the endpoint and payload would differ.
+        # Assuming a text generation model like 'text-bison-001' for this example.
+        palm_payload = {
+            "prompt": {
+                "text": prompt
+            },
+            # "temperature": current_temperature, # PaLM might have different ways to set this
+            # "maxOutputTokens": current_max_tokens,
+        }
+        # Add other PaLM specific params from kwargs if necessary
+        # e.g., safetySettings, stopSequences
+
+        # The actual model name might need to be part of the URL or payload
+        # This is a generic example:
+        palm_api_url = f"{self.google_palm_base_url}/models/text-bison-001:generateText?key={self.google_api_key}"
+        logger.debug("Google PaLM API Request URL: %s", palm_api_url)
+        logger.debug("Google PaLM API Request Payload: %s", palm_payload)
+        
+        response = requests.post(palm_api_url, json=palm_payload, headers=headers, timeout=30)
+        logger.info("Google PaLM API raw response status: %s", response.status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Google PaLM API raw response text: %s", response.text)
+        response.raise_for_status()
+        json_response = self._parsed(response.json(), BACKEND_PALM)
+        logger.debug("Google PaLM API parsed JSON response: %s", json_response)
+        return json_response
+
+    @staticmethod
+    def _parsed(json_response: Any, backend: str) -> Any:
+        """Wraps a response dict in a CompletionResult and counts its token usage."""
+        if not isinstance(json_response, dict):
+            return json_response
+        result = CompletionResult(json_response, backend=backend)
+        record_token_usage(result.usage)
+        return result
+
+    def _http_error(self, e: requests.exceptions.HTTPError) -> APIError:
+        """Converts an HTTP error response into an APIError (using the JSON error message if any)."""
+        status_code = e.response.status_code if e.response is not None else 500
+        error_text = "Unknown HTTP error"
+        details = {}
+        if e.response is not None:
+            error_text = e.response.text
+            try:
+                details = e.response.json() # Attempt to get JSON error details
+                # If 'error' and 'message' keys exist, use that as a more specific message
+                if isinstance(details, dict) and 'error' in details and isinstance(details['error'], dict) and 'message' in details['error']:
+                    error_text = details['error']['message']
+                elif isinstance(details, dict) and MESSAGE_KEY in details : # MESSAGE_KEY is 'message'
+                     error_text = details[MESSAGE_KEY]
+
+            except ValueError: # Not JSON
+                details = {"raw_response": error_text} # Keep raw text if not JSON
+
+        logger.error("API request failed: %s - %s", status_code, error_text, exc_info=True)
+        return APIError(f"API request failed with status {status_code}: {error_text}", status_code=status_code, details=details)
+
+    def _network_error(self, e: requests.exceptions.RequestException) -> APIError:
+        logger.error("API request failed due to a network/connection issue: %s", e, exc_info=True)
+        return APIError(f"API request failed due to a network/connection issue: {str(e)}", status_code=500)
             
     def _check_for_echo(self, prompt: str, response: Dict[str, Any]) -> None:
-        """Check if the response appears to be echoing the prompt.
+        """Check if the response appears to be echoing the prompt (see src/ai/echo_detection.py).
         
         Args:
             prompt: The original prompt sent to the API
@@ -199,63 +310,54 @@ class XAIClient:
         """
         # Skip if response is not in expected format
         if not isinstance(response, dict):
-            logger.warning(f"Cannot check for echo: response is not a dictionary")
+            logger.warning("Cannot check for echo: response is not a dictionary")
             return
             
-        # Extract response text from various possible formats
-        response_text = None
-        if 'choices' in response and isinstance(response['choices'], list) and len(response['choices']) > 0:
-            choice = response['choices'][0]
-            if isinstance(choice, dict):
-                if 'text' in choice:
-                    response_text = choice['text']
-                elif 'message' in choice and isinstance(choice['message'], dict) and 'content' in choice['message']:
-                    response_text = choice['message']['content']
-        elif 'candidates' in response and isinstance(response['candidates'], list) and len(response['candidates']) > 0:
-            candidate = response['candidates'][0]
-            if isinstance(candidate, dict) and 'output' in candidate:
-                response_text = candidate['output']
-                
+        response_text = as_completion_result(response).text
         if not response_text:
             logger.warning("Could not extract response text for echo checking")
             return
             
-        # Check for exact echo - highly suspicious
-        if prompt.strip() == response_text.strip():
-            logger.critical(f"CRITICAL: API returned the exact prompt as the response - 100% match!")
-            return
-            
-        # Check for high similarity - might be partial echo
-        prompt_stripped = prompt.strip().lower()
-        response_stripped = response_text.strip().lower()
-        
-        # Check if response is contained in prompt
-        if len(response_stripped) > 10 and response_stripped in prompt_stripped:
-            coverage = (len(response_stripped) / len(prompt_stripped)) * 100 if len(prompt_stripped) > 0 else 0
-            logger.error(f"SUSPICIOUS: Response text appears to be a subset of the prompt ({coverage:.1f}% coverage)")
-            
-        # Check if prompt is contained in response (common for instruct models to repeat instructions)
-        elif len(prompt_stripped) > 10 and prompt_stripped in response_stripped:
-            coverage = (len(prompt_stripped) / len(response_stripped)) * 100 if len(response_stripped) > 0 else 0
-            if coverage > 80:  # If prompt makes up over 80% of response, likely echo
-                logger.error(f"SUSPICIOUS: Response contains most of the prompt ({coverage:.1f}% coverage)")
-            else:
-                logger.warning(f"Response contains part of the prompt ({coverage:.1f}% coverage) - this may be normal instruction repetition")
-                
-        # Quick check for first/last line matches
-        prompt_lines = prompt_stripped.split('\n')
-        response_lines = response_stripped.split('\n')
-        
-        if prompt_lines and response_lines:
-            if prompt_lines[-1] == response_lines[0]:
-                logger.warning("First line of response matches last line of prompt - possible continuation issue")
-                
-        logger.debug(f"Echo check complete: prompt={len(prompt_stripped)} chars, response={len(response_stripped)} chars")
+        # Fingerprint comparison over a capped window, off the request thread by default
+        check_echo(prompt, response_text)
 
 # Helper for the JSON error response test if MESSAGE_KEY is used in XAIClient for extracting error messages from JSON.
 # If not, the literal string 'message' should be used in the assertEqual.
 MESSAGE_KEY = 'message' # Or whatever key the actual XAI client uses for the error message in JSON 
 
+def split_batch_response(raw_json_response: Dict[str, Any], prompt_count: int,
+                         choices_per_prompt: int = 1) -> List[Dict[str, Any]]:
+    """
+    Splits a multi-prompt completions response into one response per prompt.
+
+    Choice i belongs to prompt index // choices_per_prompt; choices without an "index" are
+    assigned in order. Each part keeps the top-level fields (id, model, ...) except usage,
+    which covers the whole batch and is moved to part["batch"]["usage"].
+
+    Args:
+        raw_json_response: The parsed response of a request with a list of prompts.
+        prompt_count: Number of prompts sent.
+        choices_per_prompt: The request's "n".
+
+    Returns:
+        prompt_count response dicts; a prompt without choices gets "choices": [].
+    """
+    shared = {key: value for key, value in raw_json_response.items() if key not in ("choices", "usage")}
+    parts: List[Dict[str, Any]] = [
+        {**shared, "choices": [], "batch": {"size": prompt_count, "index": i, "usage": raw_json_response.get("usage")}}
+        for i in range(prompt_count)
+    ]
+    for position, choice in enumerate(raw_json_response.get("choices") or []):
+        if not isinstance(choice, dict):
+            continue
+        index = choice.get("index", position)
+        prompt_index = index // choices_per_prompt if isinstance(index, int) else -1
+        if 0 <= prompt_index < prompt_count:
+            part = parts[prompt_index]
+            part["choices"].append({**choice, "index": len(part["choices"])})
+    return parts
+
+
 # Debug helpers
 def extract_responses(raw_json_response: Dict[str, Any]) -> List[str]:
     """Extract all possible response texts from an API response for debugging.
@@ -266,51 +368,6 @@ def extract_responses(raw_json_response: Dict[str, Any]) -> List[str]:
     Returns:
         A list of extracted texts from the response
     """
-    texts = []
-    
-    # Try to extract from all common response formats
     if not isinstance(raw_json_response, dict):
         return [str(raw_json_response)]
-        
-    # Extract from 'choices' format (OpenAI, xAI)
-    if 'choices' in raw_json_response and isinstance(raw_json_response['choices'], list):
-        for choice in raw_json_response['choices']:
-            if not isinstance(choice, dict):
-                continue
-                
-            # Text completion format
-            if 'text' in choice:
-                texts.append(choice['text'])
-                
-            # Chat completion format
-            if 'message' in choice and isinstance(choice['message'], dict):
-                if 'content' in choice['message']:
-                    texts.append(choice['message']['content'])
-                    
-            # Reasoning format sometimes used
-            if 'reasoning_content' in choice:
-                texts.append(choice['reasoning_content'])
-                
-    # Extract from 'candidates' format (PaLM, Gemini, etc)
-    if 'candidates' in raw_json_response and isinstance(raw_json_response['candidates'], list):
-        for candidate in raw_json_response['candidates']:
-            if not isinstance(candidate, dict):
-                continue
-                
-            if 'output' in candidate:
-                texts.append(candidate['output'])
-                
-            if 'content' in candidate:
-                texts.append(candidate['content'])
-                
-    # Extract from 'response' key (less common)
-    if 'response' in raw_json_response:
-        if isinstance(raw_json_response['response'], str):
-            texts.append(raw_json_response['response'])
-            
-    # Extract from 'text' key (less common)
-    if 'text' in raw_json_response:
-        if isinstance(raw_json_response['text'], str):
-            texts.append(raw_json_response['text'])
-            
-    return texts
\ No newline at end of file
+    return as_completion_result(raw_json_response).all_texts()
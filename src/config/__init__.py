@@ -2,6 +2,8 @@
 # 2025-05-07 HH:MM - Step 5 - Export get_config and load_config functions.
 # 2025-05-07 HH:MM - Step 1 - Initial creation.
 # 2025-05-19 15:00 - Step 27 - Added get_protocol_path for protocol-specific resources.
+# 2026-10-19 - Export reload_config, get_config_snapshot and ConfigSnapshot.
+# 2026-10-19 - Export subscribe for config change notifications.
 
 """
 Configuration module for the YieldFi AI Agent.
@@ -11,15 +13,30 @@ loaded from config.yaml and environment variables.
 
 Functions:
     load_config: Loads or reloads the configuration.
+    reload_config: Re-reads the configuration and atomically swaps in a new snapshot.
     get_config: Retrieves a specific configuration value.
+    get_config_snapshot: Returns the current immutable ConfigSnapshot.
     get_protocol_path: Constructs a path for protocol-specific resources.
+    subscribe: Registers a callback for changes under config key prefixes.
 """
 
-from .settings import get_config, load_config, get_protocol_path
+from .settings import (
+    ConfigSnapshot,
+    get_config,
+    get_config_snapshot,
+    get_protocol_path,
+    load_config,
+    reload_config,
+    subscribe,
+)
 
 __all__ = [
     'get_config',
     'load_config',
+    'reload_config',
+    'get_config_snapshot',
+    'ConfigSnapshot',
+    'subscribe',
     'get_protocol_path'
 ]
 
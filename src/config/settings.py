@@ -2,23 +2,43 @@
 # 2025-05-07 HH:MM - Step 5 - Clean implementation of configuration loading from YAML and .env.
 # 2025-05-07 HH:MM - Step 20 (Fix) - Modified load_config to use _CONFIG_FILE_PATH for base, making DEFAULT_TEMPLATE a true fallback.
 # 2025-05-07 HH:MM - Step 20 (Fix) - Normalize keys from .env to lowercase and improve os.environ override logic.
+# 2026-10-19 - get_config reads an immutable, flattened ConfigSnapshot (one dict lookup, read-only views
+#   instead of deep copies); load_config/set_config_value/reload_config swap snapshots atomically.
+# 2026-10-19 - subscribe(): key-prefix subscriptions notified with a diff when a new snapshot changes them.
+# 2026-10-19 - unset_config_value(): removes a runtime override instead of leaving a None entry behind.
 
 """
 Configuration settings for the YieldFi AI Agent.
 
 This module provides functionality for loading and managing configuration settings
 from environment variables and configuration files.
+
+Lookups go through a ConfigSnapshot: a frozen copy of the loaded configuration with
+every dotted key path pre-lowercased into one flat dict, so get_config() is a single
+dict lookup. Dict values come back as read-only mappings and lists as tuples (use
+dict()/list() for a mutable copy). Each load_config(), reload_config() or
+set_config_value() builds a new snapshot and swaps it in whole, so readers in other
+threads see either the old or the new configuration, never a mix.
+
+Components that cache config-derived state call subscribe() with the key prefixes they
+depend on. Whenever a new snapshot is published, each subscriber whose prefixes cover a
+changed leaf key is called once with {dotted_key: (old_value, new_value)} for those keys
+(None stands for an absent key), after the config lock has been released.
 """
 
 import os
+import logging
+import threading
 import yaml
 from dotenv import load_dotenv
-from typing import Any, Dict, Optional, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 import copy # For deepcopy
 
 # Global variable to store the loaded configuration
 _CONFIG: Dict[str, Any] = {}
 _CONFIG_LOADED = False
+_CONFIG_LOCK = threading.RLock()
 
 # Correctly determine project root and file paths
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
@@ -87,8 +107,215 @@ def _update_dict_from_env(config_dict: Dict[str, Any]) -> None:
                     # print(f"Warning: Env var {env_key} path conflicts at '{part}'. Skipping override.")
                     break 
 
+_MISSING = object()
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively converts dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze: returns plain, mutable dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class ConfigSnapshot:
+    """An immutable configuration with O(1) case-insensitive dotted-path lookups."""
+
+    __slots__ = ("data", "source", "version", "_flat")
+
+    def __init__(self, config: Dict[str, Any], version: int):
+        """
+        Args:
+            config: The configuration dict to freeze.
+            version: Increases by one with every published snapshot.
+        """
+        self.source = config  # Identity check: _CONFIG reassigned directly means the snapshot is stale
+        self.version = version
+        self.data: Mapping[str, Any] = _freeze(config)
+        self._flat: Dict[str, Any] = {}
+        self._index(self.data, "")
+
+    def _index(self, mapping: Mapping[str, Any], prefix: str) -> None:
+        for key, value in mapping.items():
+            path = prefix + str(key).lower()
+            # Like the original scan, the first key matching case-insensitively wins
+            if path in self._flat:
+                continue
+            self._flat[path] = value
+            if isinstance(value, Mapping):
+                self._index(value, path + ".")
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        value = self._flat.get(key_path, _MISSING)
+        if value is _MISSING:
+            value = self._flat.get(key_path.lower(), _MISSING)
+            if value is _MISSING:
+                return default
+        return value
+
+    def keys(self):
+        """All dotted key paths (lowercase), including intermediate sections."""
+        return self._flat.keys()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A mutable deep copy of the configuration."""
+        return _thaw(self.data)
+
+    def leaves(self) -> Dict[str, Any]:
+        """Dotted key path -> value for every non-section entry."""
+        return {path: value for path, value in self._flat.items() if not isinstance(value, Mapping)}
+
+    def diff(self, previous: Optional["ConfigSnapshot"]) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Compares leaf values with an earlier snapshot.
+
+        Args:
+            previous: The earlier snapshot, or None to treat every key as added.
+
+        Returns:
+            {dotted_key: (old_value, new_value)} for added, removed and changed keys.
+        """
+        old = previous.leaves() if previous is not None else {}
+        new = self.leaves()
+        changes: Dict[str, Tuple[Any, Any]] = {}
+        for path, value in new.items():
+            before = old.get(path, _MISSING)
+            if before is _MISSING or before != value:
+                changes[path] = (None if before is _MISSING else before, value)
+        for path, value in old.items():
+            if path not in new:
+                changes[path] = (value, None)
+        return changes
+
+
+ConfigChanges = Dict[str, Tuple[Any, Any]]
+
+
+class ConfigSubscription:
+    """A registered interest in one or more key prefixes; see subscribe()."""
+
+    def __init__(self, prefixes: Tuple[str, ...], callback: Callable[[ConfigChanges], None]):
+        self.prefixes = prefixes
+        self.callback = callback
+
+    def matches(self, path: str) -> bool:
+        for prefix in self.prefixes:
+            if not prefix or path == prefix or path.startswith(prefix + "."):
+                return True
+        return False
+
+    def unsubscribe(self) -> None:
+        with _CONFIG_LOCK:
+            if self in _SUBSCRIPTIONS:
+                _SUBSCRIPTIONS.remove(self)
+
+
+_SNAPSHOT: Optional[ConfigSnapshot] = None
+_SUBSCRIPTIONS: List[ConfigSubscription] = []
+_PENDING_CHANGES: List[Tuple[Optional[ConfigSnapshot], ConfigSnapshot]] = []
+_logger = logging.getLogger(__name__)
+
+
+def subscribe(prefixes: Union[str, Iterable[str]], callback: Callable[[ConfigChanges], None]) -> ConfigSubscription:
+    """
+    Calls `callback` whenever a published snapshot changes a key under one of `prefixes`.
+
+    Args:
+        prefixes: Dotted key prefix(es), case-insensitive. 'ai' matches 'ai.provider' but
+                  not 'aim'; '' matches every key.
+        callback: Receives {dotted_key: (old_value, new_value)} limited to the matching keys.
+                  Exceptions are logged and do not affect other subscribers.
+
+    Returns:
+        The subscription; call .unsubscribe() to stop notifications.
+    """
+    if isinstance(prefixes, str):
+        prefixes = (prefixes,)
+    subscription = ConfigSubscription(tuple(p.lower().strip(".") for p in prefixes), callback)
+    with _CONFIG_LOCK:
+        _SUBSCRIPTIONS.append(subscription)
+    return subscription
+
+
+def _publish_snapshot() -> ConfigSnapshot:
+    """Freezes _CONFIG into a new snapshot and swaps it in (caller holds _CONFIG_LOCK)."""
+    global _SNAPSHOT
+    previous = _SNAPSHOT
+    version = previous.version + 1 if previous is not None else 1
+    _SNAPSHOT = ConfigSnapshot(_CONFIG, version)
+    if _SUBSCRIPTIONS:
+        _PENDING_CHANGES.append((previous, _SNAPSHOT))
+    return _SNAPSHOT
+
+
+def _deliver_notifications() -> None:
+    """Notifies subscribers of snapshots published since the last call, in publish order."""
+    while True:
+        with _CONFIG_LOCK:
+            if not _PENDING_CHANGES:
+                return
+            previous, current = _PENDING_CHANGES.pop(0)
+            subscriptions = list(_SUBSCRIPTIONS)
+        changes = current.diff(previous)
+        if not changes:
+            continue
+        for subscription in subscriptions:
+            relevant = {path: change for path, change in changes.items() if subscription.matches(path)}
+            if not relevant:
+                continue
+            try:
+                subscription.callback(relevant)
+            except Exception:
+                _logger.exception(f"Config subscriber {subscription.callback!r} failed for {sorted(relevant)}")
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """
+    Returns the current configuration snapshot, loading the configuration first if needed.
+
+    Hold on to the returned snapshot to read several values from one consistent version.
+    """
+    snapshot = _SNAPSHOT
+    if snapshot is not None and _CONFIG_LOADED and snapshot.source is _CONFIG:
+        return snapshot
+    with _CONFIG_LOCK:
+        if not _CONFIG_LOADED:
+            _load_config_locked()
+        elif _SNAPSHOT is None or _SNAPSHOT.source is not _CONFIG:
+            _publish_snapshot()
+        snapshot = _SNAPSHOT
+    _deliver_notifications()
+    return snapshot
+
+
+def reload_config() -> ConfigSnapshot:
+    """Re-reads config.yaml, .env and the environment, and swaps in the new snapshot."""
+    with _CONFIG_LOCK:
+        _load_config_locked()
+        snapshot = _SNAPSHOT
+    _deliver_notifications()
+    return snapshot
+
+
 def load_config() -> Dict[str, Any]:
     """Loads configuration from YAML file, then overrides with .env, then direct os.environ variables."""
+    with _CONFIG_LOCK:
+        config = _load_config_locked()
+    _deliver_notifications()
+    return config
+
+
+def _load_config_locked() -> Dict[str, Any]:
     global _CONFIG, _CONFIG_LOADED
 
     # Determine base configuration from YAML file or use minimal default
@@ -152,6 +379,7 @@ def load_config() -> Dict[str, Any]:
         #     _CONFIG[config_key] = processed_value # Add as new key
 
     _CONFIG_LOADED = True
+    _publish_snapshot()
     return copy.deepcopy(_CONFIG)
 
 def get_config(key_path: str, default: Any = None) -> Any:
@@ -164,62 +392,54 @@ def get_config(key_path: str, default: Any = None) -> Any:
         default: Default value to return if the key is not found.
 
     Returns:
-        The configuration value or the default.
+        The configuration value or the default. Sections are read-only mappings and lists
+        are tuples; copy them (dict()/list()) before modifying.
     """
-    global _CONFIG_LOADED, _CONFIG
-    if not _CONFIG_LOADED:
-        load_config()
-    
-    # Use lowercase keys for retrieval to match normalization
-    keys = key_path.lower().split('.')
-    current_level = _CONFIG
-    for key in keys:
-        # Dictionary key access should be case-sensitive if _CONFIG wasn't normalized,
-        # but since we normalize on load from env, we primarily expect lowercase keys.
-        # However, YAML could have mixed case. We should ideally normalize YAML keys too,
-        # or perform case-insensitive lookup here.
-        # Simple approach: try lowercase first, then original if needed?
-        # For now, assuming keys are mostly lowercase due to env override normalization.
-        
-        # Let's refine: Check case-insensitively for dict keys
-        found_key = None
-        if isinstance(current_level, dict):
-            for current_key in current_level:
-                if current_key.lower() == key:
-                    found_key = current_key
-                    break
-        
-        if found_key is not None:
-            current_level = current_level[found_key]
-        else:
-            # Add this debug print statement before returning default
-            # if key_path.lower() == "ai.xai_api_key":
-            #     print(f"DEBUG: get_config for 'ai.xai_api_key' - key '{key}' not found in current_level. Returning default: {default}")
-            return default # Key not found at this level
-            
-    # Add this debug print statement before the final return
-    # if key_path.lower() == "ai.xai_api_key":
-    #     print(f"DEBUG: get_config for 'ai.xai_api_key' is returning: {current_level}")
-
-    if isinstance(current_level, (dict, list)):
-        return copy.deepcopy(current_level)
-    return current_level
+    snapshot = _SNAPSHOT
+    if snapshot is None or not _CONFIG_LOADED or snapshot.source is not _CONFIG:
+        snapshot = get_config_snapshot()
+    return snapshot.get(key_path, default)
 
 # Removed automatic load_config() on import
 
 def set_config_value(key: str, value: Any) -> None:
     """Sets a configuration value using dot notation (for testing/runtime changes)."""
     global _CONFIG, _CONFIG_LOADED
-    if not _CONFIG_LOADED:
-        load_config()
-        
-    keys = key.lower().split('.') # Use lowercase keys
-    d = _CONFIG
-    for part in keys[:-1]:
-        if part not in d or not isinstance(d[part], dict):
-            d[part] = {}
-        d = d[part]
-    d[keys[-1]] = value
+    with _CONFIG_LOCK:
+        if not _CONFIG_LOADED:
+            _load_config_locked()
+
+        keys = key.lower().split('.') # Use lowercase keys
+        d = _CONFIG
+        for part in keys[:-1]:
+            if part not in d or not isinstance(d[part], dict):
+                d[part] = {}
+            d = d[part]
+        d[keys[-1]] = _thaw(value)
+        _publish_snapshot()
+    _deliver_notifications()
+
+def unset_config_value(key: str) -> None:
+    """Removes a configuration value set with set_config_value (sections left empty are removed too)."""
+    with _CONFIG_LOCK:
+        if not _CONFIG_LOADED:
+            _load_config_locked()
+
+        keys = key.lower().split('.')
+        path = [_CONFIG]
+        for part in keys[:-1]:
+            if not isinstance(path[-1].get(part), dict):
+                return
+            path.append(path[-1][part])
+        if keys[-1] not in path[-1]:
+            return
+        del path[-1][keys[-1]]
+        for parent, part in zip(reversed(path[:-1]), reversed(keys[:-1])):
+            if parent[part]:
+                break
+            del parent[part]
+        _publish_snapshot()
+    _deliver_notifications()
 
 def get_protocol_path(*parts: str) -> str:
     """
@@ -254,5 +474,14 @@ def get_protocol_path(*parts: str) -> str:
 # Default protocol setting, used throughout the app
 DEFAULT_PROTOCOL = get_config("protocols.default_protocol", "yieldfi")
 
+
+def _refresh_default_protocol(changes: ConfigChanges) -> None:
+    global DEFAULT_PROTOCOL
+    DEFAULT_PROTOCOL = get_config("protocols.default_protocol", "yieldfi")
+
+
+subscribe("protocols.default_protocol", _refresh_default_protocol)
+
 # Export publicly
-__all__ = ['get_config', 'load_config', 'set_config_value', 'get_protocol_path', 'DEFAULT_PROTOCOL'] 
\ No newline at end of file
+__all__ = ['get_config', 'load_config', 'reload_config', 'get_config_snapshot', 'ConfigSnapshot',
+           'subscribe', 'ConfigSubscription', 'set_config_value', 'get_protocol_path', 'DEFAULT_PROTOCOL'] 
\ No newline at end of file
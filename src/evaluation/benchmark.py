@@ -0,0 +1,346 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Offline generation-with-evaluation regression benchmark.
+#   - Runs generate_tweet_reply / generate_new_tweet over the golden set against StubLLMServer.
+#   - Reports throughput, latency percentiles, per-stage breakdown, outcomes and evaluation scores.
+#   - Stores reports as JSON and compares them run over run.
+# - 2026-10-19: Report prompt prefix reuse (share of prompts whose static prefix was already sent).
+# - 2026-10-19: Per-stage breakdown comes from the pipeline's own tracing spans instead of wrappers.
+# - 2026-10-19: Report completion calls saved by request coalescing.
+# - 2026-10-19: Report how many prompts were sent in multi-prompt batches.
+# - 2026-10-19: Report provider-reported token usage and token throughput.
+# - 2026-10-19: Config overrides that were absent before the run are removed afterwards; stub replies
+#   are set on a copy of the caller's StubConfig.
+
+"""
+End-to-end benchmark of the generation pipeline.
+
+run_benchmark() starts a StubLLMServer (src/evaluation/llm_stub.py), points XAIClient at
+it, and calls generate_tweet_reply / generate_new_tweet for every golden set case from a
+thread pool of `concurrency` workers. Each call is timed end to end, and tracing
+(src/utils/tracing.py) is switched on for the run so each request also gets a per-stage
+breakdown (tone analysis, knowledge lookup, relevancy facts, prompt building, the
+completion call, response cleaning, persistence) from its stage_timings_ms. Responses are
+scored with Evaluator against the case's ground truth.
+
+Reports are plain JSON (see save_report()); compare_reports() diffs two of them.
+Persistence is redirected to a temporary directory so benchmark runs never touch
+data/output.
+"""
+
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import get_config, set_config_value, unset_config_value
+from src.models.account import Account, AccountType
+from src.models.category import TweetCategory, load_categories
+from src.models.response import AIResponse
+from src.models.tweet import Tweet, TweetMetadata
+from src.ai import response_generator
+from src.ai.prompt_engineering import get_prefix_reuse_stats, reset_prefix_reuse_stats
+from src.ai.batching import get_completion_batcher
+from src.ai.completion import get_token_usage, reset_token_usage
+from src.ai.single_flight import get_completion_flight
+from src.ai.xai_client import XAIClient
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.llm_stub import StubConfig, StubLLMServer
+from src.utils import persistence
+
+OPERATIONS = ("reply", "new_tweet")
+DEFAULT_RESULTS_DIR = "data/benchmarks"
+
+@dataclass
+class BenchmarkConfig:
+    """Parameters of one benchmark run."""
+    concurrency: int = 4
+    iterations: int = 1                 # passes over the golden set
+    operations: List[str] = field(default_factory=lambda: list(OPERATIONS))
+    interaction_mode: str = "Default"
+    protocol_name: Optional[str] = None
+    stub: StubConfig = field(default_factory=StubConfig)
+    use_golden_replies: bool = True     # stub answers each case with its golden ai_response_content
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(values_ms: List[float]) -> Dict[str, float]:
+    """count/mean/p50/p90/p95/p99/max of latencies in milliseconds."""
+    ordered = sorted(values_ms)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+@contextmanager
+def _stub_environment(base_url: str) -> Iterator[None]:
+    """
+    Points XAIClient at the stub, enables stage tracing and redirects persistence to a temporary directory.
+
+    On exit each overridden key gets its previous value back, or is removed if it was not set.
+    """
+    overrides = {
+        "ai.xai_base_url": base_url,
+        "ai.xai_api_key": "benchmark-stub-key",
+        "ai.use_fallback": False,
+        "tracing.enabled": True,
+    }
+    missing = object()
+    previous = {key: get_config(key, missing) for key in overrides}
+    previous_output = (persistence.OUTPUT_DIR, persistence.GENERATED_FILE)
+    with tempfile.TemporaryDirectory(prefix="benchmark_output_") as tmp_dir:
+        for key, value in overrides.items():
+            set_config_value(key, value)
+        persistence.OUTPUT_DIR = Path(tmp_dir)
+        persistence.GENERATED_FILE = Path(tmp_dir) / "replies_to_tweets.json"
+        try:
+            yield
+        finally:
+            for key, value in previous.items():
+                if value is missing:
+                    unset_config_value(key)
+                else:
+                    set_config_value(key, value)
+            persistence.OUTPUT_DIR, persistence.GENERATED_FILE = previous_output
+
+
+def _classify(content: str) -> str:
+    if content.startswith("[Error"):
+        return "error"
+    if content.startswith("[Warning") or content.startswith("[Info"):
+        return "degraded"
+    return "ok"
+
+
+def _run_one(operation: str, case: Dict[str, Any], account: Account, category: TweetCategory,
+             config: BenchmarkConfig) -> Dict[str, Any]:
+    """Generates one response and returns its timing record."""
+    start = time.perf_counter()
+    if operation == "reply":
+        tweet = Tweet(
+            content=case["original_tweet_content"],
+            metadata=TweetMetadata(tweet_id=f"bench_{case.get('id')}", author_username="benchmark_user"),
+        )
+        response = response_generator.generate_tweet_reply(
+            original_tweet=tweet,
+            responding_as=account,
+            interaction_mode=config.interaction_mode,
+            protocol_name=config.protocol_name,
+        )
+    else:
+        response = response_generator.generate_new_tweet(
+            category=category,
+            responding_as=account,
+            topic=case["original_tweet_content"],
+            interaction_mode=config.interaction_mode,
+            protocol_name=config.protocol_name,
+        )
+    latency_ms = (time.perf_counter() - start) * 1000.0
+    stages = dict(response.extra_context.get("stage_timings_ms", {}))
+    return {
+        "operation": operation,
+        "case": case,
+        "response": response,
+        "latency_ms": latency_ms,
+        "stages_ms": stages,
+        "outcome": _classify(response.content),
+    }
+
+
+def _summarize_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    outcomes = {"ok": 0, "degraded": 0, "error": 0}
+    for record in records:
+        outcomes[record["outcome"]] += 1
+    stage_names = sorted({stage for record in records for stage in record["stages_ms"]})
+    total_latency = sum(record["latency_ms"] for record in records) or 1.0
+    stages = {}
+    for stage in stage_names:
+        values = [record["stages_ms"].get(stage, 0.0) for record in records]
+        stage_summary = latency_summary(values)
+        stage_summary["share"] = sum(values) / total_latency
+        stages[stage] = stage_summary
+    return {
+        "requests": len(records),
+        "outcomes": outcomes,
+        "error_rate": outcomes["error"] / len(records) if records else 0.0,
+        "latency_ms": latency_summary([record["latency_ms"] for record in records]),
+        "stages_ms": stages,
+    }
+
+
+def _evaluate_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Scores ok/degraded responses against their case's ground truth."""
+    evaluable = [record for record in records if record["outcome"] != "error"]
+    if not evaluable:
+        return {}
+    evaluator = Evaluator()
+    results = evaluator.run_batch_evaluation([
+        (record["response"], record["case"]["original_tweet_content"],
+         record["case"].get("knowledge_snippet_used"), record["case"].get("ground_truth_data"))
+        for record in evaluable
+    ])
+    summary: Dict[str, Any] = {}
+    for metric in evaluator.metrics_to_run:
+        values = [r[metric] for r in results if isinstance(r.get(metric), (int, float))]
+        if values:
+            summary[f"avg_{metric}"] = sum(values) / len(values)
+    summary["evaluated"] = len(evaluable)
+    return summary
+
+
+def _benchmark_account() -> Account:
+    return Account(
+        account_id="benchmark_official", username="BenchmarkOfficial", display_name="Benchmark Official",
+        account_type=AccountType.OFFICIAL, platform="Twitter", follower_count=10000,
+    )
+
+
+def run_benchmark(cases: List[Dict[str, Any]], config: Optional[BenchmarkConfig] = None) -> Dict[str, Any]:
+    """
+    Runs the generation pipeline over the golden set against a local completions stub.
+
+    Args:
+        cases: Golden set cases (original_tweet_content, ground_truth_data, ...).
+        config: Benchmark parameters. Defaults to BenchmarkConfig().
+
+    Returns:
+        The report: config, stub counters, wall time, throughput, latency percentiles,
+        per-stage breakdown, outcomes, prompt prefix reuse, coalesced and batched completions,
+        token usage and evaluation scores (overall and per operation).
+    """
+    config = config or BenchmarkConfig()
+    unknown = set(config.operations) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations {sorted(unknown)}. Expected {OPERATIONS}")
+    stub_config = config.stub
+    if config.use_golden_replies:
+        stub_config = replace(config.stub, replies=[(case["original_tweet_content"], case["ai_response_content"])
+                                                    for case in cases if case.get("ai_response_content")])
+
+    account = _benchmark_account()
+    categories = load_categories() or [TweetCategory(name="General", description="", prompt_keywords=[], style_guidelines={})]
+    jobs = [
+        (operation, case, categories[i % len(categories)])
+        for _ in range(config.iterations)
+        for operation in config.operations
+        for i, case in enumerate(cases)
+    ]
+
+    started_at = datetime.now()
+    reset_prefix_reuse_stats()
+    get_completion_flight().reset_stats()
+    reset_token_usage()
+    batcher = get_completion_batcher()
+    if batcher is not None:
+        batcher.reset_stats()
+    with StubLLMServer(stub_config) as stub, _stub_environment(stub.base_url):
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, config.concurrency), thread_name_prefix="bench") as executor:
+            records = list(executor.map(
+                lambda job: _run_one(job[0], job[1], account, job[2], config), jobs
+            ))
+        wall_seconds = time.perf_counter() - wall_start
+        stub_stats = stub.stats()
+    prefix_reuse = get_prefix_reuse_stats()
+    coalescing = get_completion_flight().stats()
+    tokens = get_token_usage()
+    tokens["tokens_per_second"] = tokens["total_tokens"] / wall_seconds if wall_seconds > 0 else 0.0
+
+    report: Dict[str, Any] = {
+        "run_id": started_at.strftime('%Y%m%d_%H%M%S'),
+        "started_at": started_at.isoformat(),
+        "config": asdict(config),
+        "stub": stub_stats,
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(records) / wall_seconds if wall_seconds > 0 else 0.0,
+        **_summarize_records(records),
+        "evaluation": _evaluate_records(records),
+        "prefix_reuse": prefix_reuse,
+        "coalescing": coalescing,
+        "batching": batcher.stats() if batcher is not None else None,
+        "tokens": tokens,
+        "by_operation": {},
+    }
+    report["config"]["stub"].pop("replies", None)  # Derived from the golden set; keeps reports small
+    for operation in config.operations:
+        op_records = [record for record in records if record["operation"] == operation]
+        report["by_operation"][operation] = {
+            **_summarize_records(op_records),
+            "evaluation": _evaluate_records(op_records),
+        }
+    return report
+
+
+def save_report(report: Dict[str, Any], results_dir: str = DEFAULT_RESULTS_DIR) -> Path:
+    """Writes the report to <results_dir>/bench_<run_id>.json and returns the path."""
+    Path(results_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(results_dir) / f"bench_{report['run_id']}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_latest_report(results_dir: str = DEFAULT_RESULTS_DIR, exclude: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Loads the most recent stored report (ignoring `exclude`), or None if there is none."""
+    paths = sorted(p for p in Path(results_dir).glob("bench_*.json") if exclude is None or p != exclude)
+    if not paths:
+        return None
+    with open(paths[-1], 'r') as f:
+        return json.load(f)
+
+
+def _flatten_for_comparison(report: Dict[str, Any]) -> Dict[str, float]:
+    values = {
+        "throughput_rps": report.get("throughput_rps", 0.0),
+        "error_rate": report.get("error_rate", 0.0),
+    }
+    for key in ("p50", "p95", "p99"):
+        values[f"latency_{key}_ms"] = report.get("latency_ms", {}).get(key, 0.0)
+    for stage, stage_summary in report.get("stages_ms", {}).items():
+        values[f"stage_{stage}_mean_ms"] = stage_summary.get("mean", 0.0)
+    if "prefix_reuse" in report:
+        values["prefix_reuse_rate"] = report["prefix_reuse"].get("reuse_rate", 0.0)
+    for metric, value in report.get("evaluation", {}).items():
+        if metric.startswith("avg_"):
+            values[f"eval_{metric}"] = value
+    return values
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Diffs the headline numbers of two reports.
+
+    Returns:
+        {metric: {"baseline", "current", "delta", "delta_pct"}} for metrics present in both.
+    """
+    current_values = _flatten_for_comparison(current)
+    baseline_values = _flatten_for_comparison(baseline)
+    comparison: Dict[str, Dict[str, Optional[float]]] = {}
+    for metric, value in current_values.items():
+        if metric not in baseline_values:
+            continue
+        base = baseline_values[metric]
+        comparison[metric] = {
+            "baseline": base,
+            "current": value,
+            "delta": value - base,
+            "delta_pct": (value - base) / base * 100.0 if base else None,
+        }
+    return comparison
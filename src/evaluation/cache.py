@@ -0,0 +1,188 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Evaluation result cache for incremental evaluation runs.
+#   - Per-case, per-metric results keyed on a hash of the case inputs and the metric version.
+#   - Append-only JSONL store, loaded once and flushed after each run.
+#   - evaluate_with_cache() scores only new or changed cases.
+# - 2026-10-19: Back the cache with SQLite instead of loading the whole JSONL file into a dict, so
+#   memory and startup cost stay flat however many cases are cached.
+
+"""
+Evaluation result cache.
+
+Re-running the evaluation over an unchanged golden set used to rescore every case.
+EvaluationCache stores each metric result under a key built from:
+
+- a SHA-256 of the case inputs (response content, response tone, original tweet
+  content, knowledge snippet and ground truth data), and
+- the metric name and its version (`get_metric_version()` in metrics.py).
+
+Editing any input, or bumping a metric's version, produces a new key, so only new
+or changed cases are recomputed. Error scores are never cached.
+
+The store is a SQLite database with one row per key. Lookups query it directly, so
+nothing is loaded up front and memory does not grow with the cache; only results stored
+since the last flush() are held in memory. compact() reclaims space left by replaced rows.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.models.response import AIResponse
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.metrics import get_metric_version
+
+
+def case_input_hash(
+    content: Optional[str],
+    tone: Optional[str],
+    original_tweet_content: Optional[str],
+    knowledge_snippet_used: Optional[str],
+    ground_truth_data: Optional[Dict[str, Any]]
+) -> str:
+    """
+    Hashes everything a metric can read from one evaluation case.
+
+    Returns:
+        Hex SHA-256 digest of a canonical JSON encoding of the inputs.
+    """
+    payload = json.dumps(
+        [content, tone, original_tweet_content, knowledge_snippet_used, ground_truth_data or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_MISSING = object()
+
+
+def _is_cacheable(score: Any) -> bool:
+    """Scores and N/A markers are deterministic; errors may be transient."""
+    return not (isinstance(score, str) and score.startswith("Error"))
+
+
+class EvaluationCache:
+    """Stores metric results keyed on case input hash and metric version."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file backing the cache. None keeps the cache in memory only.
+        """
+        self.path = path
+        self._pending: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, score TEXT NOT NULL)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        stored = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return stored + sum(1 for key in self._pending if self._get(key, pending=False) is _MISSING)
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def _get(self, key: str, pending: bool = True) -> Any:
+        """The stored score for key, or _MISSING."""
+        if pending and key in self._pending:
+            return self._pending[key]
+        row = self._conn.execute("SELECT score FROM entries WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else _MISSING
+
+    @staticmethod
+    def metric_key(metric_name: str, input_hash: str) -> str:
+        """Builds the cache key for one metric of one case."""
+        return f"{metric_name}:{get_metric_version(metric_name)}:{input_hash}"
+
+    def lookup(self, input_hash: str, metrics: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns cached scores for every requested metric, or None if any is missing.
+
+        Args:
+            input_hash: The case_input_hash() of the case.
+            metrics: Metric names to fetch, in output order.
+        """
+        scores: Dict[str, Any] = {}
+        for metric_name in metrics:
+            score = self._get(self.metric_key(metric_name, input_hash))
+            if score is _MISSING:
+                self.misses += 1
+                return None
+            scores[metric_name] = score
+        self.hits += 1
+        return scores
+
+    def store(self, input_hash: str, scores: Dict[str, Any]) -> None:
+        """Records a case's freshly computed scores (error scores are skipped)."""
+        for metric_name, score in scores.items():
+            if not _is_cacheable(score):
+                continue
+            key = self.metric_key(metric_name, input_hash)
+            if self._get(key) != score:
+                self._pending[key] = score
+
+    def flush(self) -> None:
+        """Writes entries stored since the last flush to the database in one transaction."""
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, score) VALUES (?, ?)",
+                [(key, json.dumps(score)) for key, score in self._pending.items()],
+            )
+        self._pending.clear()
+
+    def compact(self) -> None:
+        """Flushes pending entries and reclaims space left by replaced rows."""
+        self.flush()
+        self._conn.execute("VACUUM")
+
+
+def evaluate_with_cache(
+    evaluator: Evaluator,
+    evaluation_data: List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]],
+    cache: EvaluationCache
+) -> List[Dict[str, Any]]:
+    """
+    Runs Evaluator.run_batch_evaluation() on cache misses only.
+
+    Args:
+        evaluator: The evaluator whose metrics_to_run are requested.
+        evaluation_data: Same tuples as Evaluator.run_batch_evaluation().
+        cache: The cache to read from and store fresh results in (not flushed here).
+
+    Returns:
+        Score dictionaries aligned with evaluation_data, cached and fresh results merged.
+    """
+    results: List[Optional[Dict[str, Any]]] = []
+    misses: List[int] = []
+    hashes: List[str] = []
+    for ai_response, orig_content, knowledge_snippet, gt_data in evaluation_data:
+        input_hash = case_input_hash(
+            getattr(ai_response, 'content', None), getattr(ai_response, 'tone', None),
+            orig_content, knowledge_snippet, gt_data
+        )
+        hashes.append(input_hash)
+        cached = cache.lookup(input_hash, evaluator.metrics_to_run) if evaluator.metrics_to_run else None
+        if cached is None:
+            misses.append(len(results))
+        results.append(cached)
+
+    if misses:
+        fresh = evaluator.run_batch_evaluation([evaluation_data[i] for i in misses])
+        for i, scores in zip(misses, fresh):
+            results[i] = scores
+            if evaluator.metrics_to_run:
+                cache.store(hashes[i], scores)
+    return results  # type: ignore[return-value]
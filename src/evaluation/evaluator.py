@@ -1,4 +1,6 @@
 # Changelog:
+# - 2026-10-19: run_batch_evaluation now scores relevance and factual accuracy with the
+#   vectorized BatchMetricsEngine (falls back to per-item evaluation if NumPy is unavailable).
 # - 2025-05-16: Initial creation for Step 21 (Evaluation Framework).
 #   - Added Evaluator class to orchestrate metric calculations based on calculate_* functions from metrics.py.
 
@@ -34,6 +36,12 @@ except ImportError:
         calculate_factual_accuracy_score # type: ignore
     )
 
+# Vectorized batch engine needs NumPy; run_batch_evaluation falls back to the per-item loop without it.
+try:
+    from src.evaluation.batch import BatchMetricsEngine
+except ImportError:
+    BatchMetricsEngine = None # type: ignore
+
 class Evaluator:
     """
     Orchestrates the evaluation of AI-generated responses using a set of metrics
@@ -149,24 +157,35 @@ class Evaluator:
 
     def run_batch_evaluation(
         self,
-        evaluation_data: List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]]
+        evaluation_data: List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]],
+        vectorized: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Evaluates a batch of AI responses.
 
+        Relevance and factual accuracy are computed for the whole batch at once with
+        BatchMetricsEngine; the scores are identical to evaluate_response() per item.
+
         Args:
             evaluation_data: A list of tuples, where each tuple contains:
                 - ai_response (AIResponse): The AI response object.
                 - original_tweet_content (Optional[str]): Context for relevance.
                 - knowledge_snippet_used (Optional[str]): Knowledge for relevance.
                 - ground_truth_data (Optional[Dict[str, Any]]): Ground truth for metrics.
+            vectorized: Use the vectorized engine (default). If False, or NumPy is not
+                        installed, each item is scored with evaluate_response().
 
         Returns:
             A list of score dictionaries, one for each evaluated response.
         """
+        if vectorized and BatchMetricsEngine is not None and self.metrics_to_run:
+            try:
+                return self._run_vectorized_batch(evaluation_data)
+            except Exception as e:
+                print(f"Vectorized batch evaluation failed ({e}); falling back to per-item evaluation.")
+
         batch_scores_results: List[Dict[str, Any]] = []
-        for i, (ai_response, orig_content, knowledge_snippet, gt_data) in enumerate(evaluation_data):
-            # print(f"Evaluating item {i+1}/{len(evaluation_data)}")
+        for ai_response, orig_content, knowledge_snippet, gt_data in evaluation_data:
             scores = self.evaluate_response(
                 ai_response=ai_response,
                 original_tweet_content=orig_content,
@@ -176,6 +195,62 @@ class Evaluator:
             batch_scores_results.append(scores)
         return batch_scores_results
 
+    def _run_vectorized_batch(
+        self,
+        evaluation_data: List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """Scores a batch with BatchMetricsEngine, mirroring evaluate_response() output per item."""
+        engine = BatchMetricsEngine()
+        items = [(ai_response, orig_content, knowledge_snippet, gt_data or {})
+                 for ai_response, orig_content, knowledge_snippet, gt_data in evaluation_data]
+        has_content = [hasattr(ai_response, 'content') for ai_response, _, _, _ in items]
+
+        relevance_scores: Dict[int, float] = {}
+        if 'relevance' in self.metrics_to_run:
+            rows = [i for i, (_, orig_content, _, _) in enumerate(items) if orig_content is not None and has_content[i]]
+            values = engine.relevance_scores(
+                [items[i][0].content for i in rows],
+                [items[i][1] for i in rows],
+                [items[i][2] for i in rows]
+            )
+            relevance_scores = dict(zip(rows, values.tolist()))
+
+        factual_scores: Dict[int, float] = {}
+        if 'factual_accuracy' in self.metrics_to_run:
+            rows = [i for i in range(len(items)) if has_content[i]]
+            values = engine.factual_accuracy_scores(
+                [items[i][0].content for i in rows],
+                [items[i][3].get('ground_truth_facts') for i in rows]
+            )
+            factual_scores = dict(zip(rows, values.tolist()))
+
+        batch_scores_results: List[Dict[str, Any]] = []
+        for i, (ai_response, orig_content, _, gt_data) in enumerate(items):
+            scores: Dict[str, Any] = {}
+            for metric_name in self.metrics_to_run:
+                if metric_name == 'tone_match':
+                    expected_tone = gt_data.get('expected_tone')
+                    if not hasattr(ai_response, 'tone'):
+                        scores[metric_name] = "Error: AIResponse object missing 'tone' attribute."
+                    elif expected_tone is not None:
+                        scores[metric_name] = calculate_tone_match_score(ai_response.tone, expected_tone)
+                    else:
+                        scores[metric_name] = "N/A (no 'expected_tone' in ground_truth_data)"
+                elif metric_name == 'relevance':
+                    if orig_content is None:
+                        scores[metric_name] = "N/A (no 'original_tweet_content' provided for relevance)"
+                    elif not has_content[i]:
+                        scores[metric_name] = "Error: AIResponse object missing 'content' attribute."
+                    else:
+                        scores[metric_name] = relevance_scores[i]
+                elif metric_name == 'factual_accuracy':
+                    if not has_content[i]:
+                        scores[metric_name] = "Error: AIResponse object missing 'content' attribute."
+                    else:
+                        scores[metric_name] = factual_scores[i]
+            batch_scores_results.append(scores)
+        return batch_scores_results
+
 
 if __name__ == '__main__':
     # This is a placeholder for local testing.
@@ -0,0 +1,249 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Local HTTP stub of the xAI /completions endpoint for offline benchmarks.
+#   - Configurable latency distribution (fixed, uniform, lognormal) and injected error rates.
+#   - Response shapes: text, chat message, reasoning-only dump, truncated (finish_reason=length).
+# - 2026-10-19: Accept a list of prompts in one request (batched completions), one indexed choice per prompt.
+
+"""
+Local stand-in for the xAI completions API.
+
+StubLLMServer listens on 127.0.0.1 and answers `POST <base>/completions` the way the
+real API does, so XAIClient and the generation pipeline can be exercised end to end
+without network access or API keys:
+
+- Latency: each request sleeps for a sample from the configured distribution.
+- Errors: a fraction of requests fail with HTTP 500 or 429 (xAI error body shape).
+- Shapes: responses are drawn by weight from `text` ({"choices": [{"text": ...}]}),
+  `message` (chat format), `reasoning` (empty content with a `reasoning_content` dump,
+  as grok-3-mini returns when it runs out of tokens) and `truncated`.
+
+Reply text is chosen from `replies` (first trigger found in the prompt wins), otherwise
+from `default_replies` by a hash of the prompt, so runs are reproducible.
+
+Usage:
+    with StubLLMServer(StubConfig(latency_ms=80, error_rate=0.02)) as stub:
+        set_config_value("ai.xai_base_url", stub.base_url)
+        ...
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+RESPONSE_SHAPES = ("text", "message", "reasoning", "truncated")
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+DEFAULT_REPLIES = [
+    "Great question! Our vaults auto-compound yield so your assets keep working for you.",
+    "Security comes first: audited contracts, monitored positions and transparent reporting.",
+    "Thanks for the support! More integrations are shipping soon, stay tuned.",
+]
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub completions endpoint."""
+    latency_distribution: str = "lognormal"
+    latency_ms: float = 50.0           # fixed value, uniform lower bound, or lognormal median
+    latency_max_ms: float = 150.0      # uniform upper bound
+    latency_sigma: float = 0.5         # lognormal shape
+    error_rate: float = 0.0            # fraction of HTTP 500 responses
+    rate_limit_rate: float = 0.0       # fraction of HTTP 429 responses
+    shape_weights: Dict[str, float] = field(default_factory=lambda: {"text": 1.0})
+    replies: List[Tuple[str, str]] = field(default_factory=list)   # (trigger substring, reply)
+    default_replies: List[str] = field(default_factory=lambda: list(DEFAULT_REPLIES))
+    reasoning_words: int = 120         # length of the reasoning dump for the 'reasoning' shape
+    seed: Optional[int] = 0
+
+    def __post_init__(self):
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{self.latency_distribution}'. "
+                             f"Expected one of {LATENCY_DISTRIBUTIONS}")
+        unknown_shapes = set(self.shape_weights) - set(RESPONSE_SHAPES)
+        if unknown_shapes:
+            raise ValueError(f"Unknown response shapes {sorted(unknown_shapes)}. Expected {RESPONSE_SHAPES}")
+        if not any(weight > 0 for weight in self.shape_weights.values()):
+            raise ValueError("At least one response shape needs a positive weight")
+        if self.error_rate + self.rate_limit_rate > 1:
+            raise ValueError("error_rate + rate_limit_rate must not exceed 1")
+
+
+class StubLLMServer:
+    """Threaded HTTP server emulating the xAI /completions endpoint."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config: Stub behaviour. Defaults to StubConfig().
+            host: Interface to bind.
+            port: Port to bind (0 picks a free port).
+        """
+        self.config = config or StubConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"requests": 0, "errors_500": 0, "errors_429": 0, "batched_prompts": 0}
+        self._stats.update({f"shape_{shape}": 0 for shape in RESPONSE_SHAPES})
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Value for config 'ai.xai_base_url' (XAIClient appends /completions)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'StubLLMServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'StubLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Request, injected-error and per-shape counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    # --- Request handling ---
+
+    def _plan_request(self) -> Tuple[float, Optional[int], str]:
+        """Draws (latency seconds, error status or None, shape) for one request."""
+        config = self.config
+        with self._lock:
+            if config.latency_distribution == "fixed":
+                latency_ms = config.latency_ms
+            elif config.latency_distribution == "uniform":
+                latency_ms = self._random.uniform(config.latency_ms, config.latency_max_ms)
+            else:
+                latency_ms = self._random.lognormvariate(0.0, config.latency_sigma) * config.latency_ms
+
+            roll = self._random.random()
+            if roll < config.error_rate:
+                status: Optional[int] = 500
+            elif roll < config.error_rate + config.rate_limit_rate:
+                status = 429
+            else:
+                status = None
+
+            shapes = [s for s in RESPONSE_SHAPES if config.shape_weights.get(s, 0) > 0]
+            shape = self._random.choices(shapes, weights=[config.shape_weights[s] for s in shapes])[0]
+
+            self._stats["requests"] += 1
+            if status is not None:
+                self._stats[f"errors_{status}"] += 1
+            else:
+                self._stats[f"shape_{shape}"] += 1
+        return latency_ms / 1000.0, status, shape
+
+    def _pick_reply(self, prompt: str) -> str:
+        for trigger, reply in self.config.replies:
+            if trigger and trigger in prompt:
+                return reply
+        replies = self.config.default_replies or DEFAULT_REPLIES
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        return replies[int.from_bytes(digest[:4], 'big') % len(replies)]
+
+    def build_body(self, prompt: str, shape: str, model: str) -> Dict[str, Any]:
+        """Builds a completions response body of the given shape."""
+        reply = self._pick_reply(prompt)
+        if shape == "text":
+            choice: Dict[str, Any] = {"index": 0, "text": reply, "finish_reason": "stop"}
+        elif shape == "message":
+            choice = {"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}
+        elif shape == "reasoning":
+            filler = " ".join(["Considering tone, facts and length constraints."] * max(1, self.config.reasoning_words // 6))
+            choice = {
+                "index": 0,
+                "message": {"role": "assistant", "content": "", "reasoning_content": f"{filler} Draft: {reply}"},
+                "finish_reason": "length",
+            }
+        else:  # truncated
+            choice = {"index": 0, "text": reply[: max(1, len(reply) * 2 // 3)], "finish_reason": "length"}
+
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(reply.split())
+        return {
+            "id": f"stub-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [choice],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def build_batch_body(self, prompts: List[str], shape: str, model: str) -> Dict[str, Any]:
+        """Builds the response to a request with a list of prompts: one choice per prompt, indexed."""
+        bodies = [self.build_body(prompt, shape, model) for prompt in prompts]
+        with self._lock:
+            self._stats["batched_prompts"] += len(prompts)
+        body = dict(bodies[0]) if bodies else {"id": "stub-empty", "object": "text_completion", "model": model}
+        body["choices"] = [{**b["choices"][0], "index": i} for i, b in enumerate(bodies)]
+        body["usage"] = {key: sum(b["usage"][key] for b in bodies)
+                         for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+        return body
+
+    def _make_handler(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/completions"):
+                    self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._reply(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+
+                latency, status, shape = stub._plan_request()
+                time.sleep(latency)
+                if status == 500:
+                    self._reply(500, {"error": {"message": "Stub injected server error"}})
+                elif status == 429:
+                    self._reply(429, {"error": {"message": "Stub injected rate limit"}})
+                else:
+                    prompt = payload.get("prompt", "")
+                    model = str(payload.get("model", "stub-model"))
+                    if isinstance(prompt, list):
+                        self._reply(200, stub.build_batch_body([str(p) for p in prompt], shape, model))
+                    else:
+                        self._reply(200, stub.build_body(str(prompt), shape, model))
+
+            def _reply(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Keep benchmark output clean; stats() carries the counters
+                pass
+
+        return _Handler
@@ -1,4 +1,7 @@
 # Changelog:
+# - 2026-10-19: Added METRIC_VERSIONS and get_metric_version() for the evaluation result cache.
+# - 2026-10-19: NLTK resources now resolved offline via src.evaluation.resources (no nltk.download at import).
+#   - Tokenizer chosen once and cached; removed per-call fallback warning in _preprocess_text.
 # - 2025-05-17: Removed runtime NLTK download attempts. Added check for resources.
 # - 2025-05-17: Made NLTK resource download more verbose for diagnostics.
 # - 2025-05-16: Refined for Step 21 (Evaluation Framework).
@@ -17,47 +20,40 @@ Provides functions to assess response quality based on the Step 21 Implementatio
 """
 
 from typing import List, Optional, Set, Dict, Any # Added Dict, Any for broader use if Evaluator needs them
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import sys # For printing to stderr
-import re  # Added for regex-based fallback tokenization
+
+from src.evaluation.resources import get_text_resources
 
 # --- NLTK Resource Check ---
-# Ensure required NLTK resources are available; download if missing.
-_resources_to_download = [
-    ('tokenizers/punkt', 'punkt'),
-    ('corpora/stopwords', 'stopwords'),
-]
-for resource_path, download_name in _resources_to_download:
-    try:
-        nltk.data.find(resource_path)
-    except LookupError:
-        print(f"NLTK resource '{download_name}' not found. Downloading...", file=sys.stderr)
-        nltk.download(download_name, quiet=True)
-# Define default stopwords list, falling back to manual if NLTK resources not available
-try:
-    _stopwords = stopwords.words('english')
-    word_tokenize("Test sentence.")
-    NLTK_RESOURCES_AVAILABLE = True
-    DEFAULT_STOP_WORDS: Set[str] = set(_stopwords)
-except LookupError:
-    NLTK_RESOURCES_AVAILABLE = False
-    # Fallback manual stopwords list (English stopwords + literal 'stopwords')
-    DEFAULT_STOP_WORDS: Set[str] = {
-        'i','me','my','myself','we','our','ours','ourselves','you','your','yours','yourself','yourselves',
-        'he','him','his','himself','she','her','hers','herself','it','its','itself','they','them','their','theirs','themselves',
-        'what','which','who','whom','this','that','these','those','am','is','are','was','were','be','been','being',
-        'have','having','do','does','did','doing','a','an','the','and','but','if','or','because','as','until','while',
-        'of','at','by','for','with','about','against','between','into','through','during','before','after','above','below',
-        'to','from','up','down','in','out','on','off','over','under','again','further','then','once','here','there','when',
-        'where','why','how','all','any','both','each','few','more','most','other','some','such','no','nor','not','only','own',
-        'same','so','than','too','very','s','t','can','will','just','don','should','now',
-        'stopwords'
-    }
-    print("ERROR: Failed to load NLTK resources; using manual stopwords list.", file=sys.stderr)
+# Resolved once from the bundled data directory; never downloads at import.
+# Falls back to a regex tokenizer and the manual stopwords list when NLTK data is missing.
+_TEXT_RESOURCES = get_text_resources()
+NLTK_RESOURCES_AVAILABLE = _TEXT_RESOURCES.nltk_available
+DEFAULT_STOP_WORDS: Set[str] = set(_TEXT_RESOURCES.stop_words)
+_tokenize = _TEXT_RESOURCES.tokenize
 # --- End NLTK Resource Check ---
 
+# Bump a metric's version whenever its scoring logic changes; cached results
+# (src.evaluation.cache) keyed on an older version are then recomputed.
+METRIC_VERSIONS: Dict[str, str] = {
+    'tone_match': '1',
+    'relevance': '1',
+    'factual_accuracy': '1',
+}
+
+
+def get_metric_version(metric_name: str) -> str:
+    """
+    Returns the version string for a metric, as used in evaluation cache keys.
+
+    Relevance scores depend on the tokenizer and stopwords in use, so its version
+    also carries the resolved tokenizer name (nltk or regex).
+    """
+    version = METRIC_VERSIONS.get(metric_name, '0')
+    if metric_name == 'relevance':
+        return f"{version}+{_TEXT_RESOURCES.tokenizer_name}"
+    return version
+
 def calculate_tone_match_score(generated_tone: Optional[str], expected_tone: Optional[str]) -> float:
     """
     Calculates the tone match score.
@@ -70,15 +66,8 @@ def calculate_tone_match_score(generated_tone: Optional[str], expected_tone: Opt
 
 def _preprocess_text(text: str, stop_words_set: Set[str]) -> Set[str]:
     """Helper function to tokenize, lowercase, and remove stopwords."""
-    if not NLTK_RESOURCES_AVAILABLE:
-        print("Warning: NLTK resources unavailable, using regex fallback for preprocessing.", file=sys.stderr)
-        # Use regex to extract words, stripping punctuation
-        tokens = re.findall(r"\b\w+\b", text.lower())
-        return {word for word in tokens if word not in stop_words_set}
-    
-    tokens = word_tokenize(text.lower())
-    # Keep alphanumeric words not in stopwords
-    return {word for word in tokens if word.isalnum() and word not in stop_words_set}
+    # Tokenizer is resolved once: NLTK word_tokenize (alphanumeric tokens) or the regex fallback
+    return {word for word in _tokenize(text.lower()) if word not in stop_words_set}
 
 def calculate_relevance_score(
     generated_text: str,
@@ -142,7 +131,7 @@ if __name__ == '__main__':
     # Check NLTK status first
     if not NLTK_RESOURCES_AVAILABLE:
         print("\nCannot run __main__ tests because NLTK resources are missing.", file=sys.stderr)
-        print("Please download them first.", file=sys.stderr)
+        print("Please bundle them first: python scripts/bundle_nltk_data.py", file=sys.stderr)
         sys.exit(1)
         
     print("--- Metric Function Tests (requires NLTK resources) ---")
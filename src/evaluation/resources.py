@@ -0,0 +1,161 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Offline NLTK resource resolution for evaluation metrics.
+#   - Resolves punkt/stopwords from the bundled data directory (never downloads at import).
+#   - Falls back to a regex tokenizer and built-in stopword set.
+#   - Caches the chosen tokenizer and stopwords for the lifetime of the process.
+
+"""
+NLTK resource management for the evaluation metrics.
+
+Resolves the tokenizer and stopword list used by `src.evaluation.metrics` without
+touching the network. NLTK data is looked up in the bundled directory
+(`evaluation.nltk_data_dir` in config.yaml, default `data/nltk_data`) and in NLTK's
+standard search path. If the resources are missing (or NLTK is not installed), a
+regex tokenizer and a built-in English stopword set are used instead.
+
+The resolved resources are cached, so the lookup happens once per process.
+Use `bundle_resources()` (or `scripts/bundle_nltk_data.py`) at build time to
+vendor the data into the bundled directory.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, FrozenSet, List, Optional
+
+try:
+    import nltk
+except ImportError:  # NLTK is optional; the regex fallback covers its absence.
+    nltk = None  # type: ignore
+
+try:
+    from src.config.settings import get_config
+except ImportError:
+    def get_config(key_path, default=None):  # type: ignore
+        return default
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+DEFAULT_NLTK_DATA_DIR = os.path.join(_PROJECT_ROOT, "data", "nltk_data")
+
+# (nltk.data lookup path, downloader package name)
+NLTK_PACKAGES = (
+    ('tokenizers/punkt_tab', 'punkt_tab'),  # Required by word_tokenize on NLTK >= 3.8.2
+    ('tokenizers/punkt', 'punkt'),
+    ('corpora/stopwords', 'stopwords'),
+)
+
+# Fallback manual stopwords list (English stopwords + literal 'stopwords')
+FALLBACK_STOP_WORDS: FrozenSet[str] = frozenset({
+    'i','me','my','myself','we','our','ours','ourselves','you','your','yours','yourself','yourselves',
+    'he','him','his','himself','she','her','hers','herself','it','its','itself','they','them','their','theirs','themselves',
+    'what','which','who','whom','this','that','these','those','am','is','are','was','were','be','been','being',
+    'have','having','do','does','did','doing','a','an','the','and','but','if','or','because','as','until','while',
+    'of','at','by','for','with','about','against','between','into','through','during','before','after','above','below',
+    'to','from','up','down','in','out','on','off','over','under','again','further','then','once','here','there','when',
+    'where','why','how','all','any','both','each','few','more','most','other','some','such','no','nor','not','only','own',
+    'same','so','than','too','very','s','t','can','will','just','don','should','now',
+    'stopwords'
+})
+
+_WORD_PATTERN = re.compile(r"\b\w+\b")
+
+
+@dataclass(frozen=True)
+class TextResources:
+    """The tokenizer and stopword set chosen for this process."""
+    tokenize: Callable[[str], List[str]]
+    stop_words: FrozenSet[str]
+    nltk_available: bool
+    tokenizer_name: str
+
+
+def _regex_tokenize(text: str) -> List[str]:
+    """Extracts words with a regex, stripping punctuation."""
+    return _WORD_PATTERN.findall(text)
+
+
+def _nltk_tokenize(text: str) -> List[str]:
+    """Tokenizes with NLTK's word_tokenize, keeping alphanumeric tokens only."""
+    return [token for token in nltk.word_tokenize(text) if token.isalnum()]
+
+
+def get_nltk_data_dir() -> str:
+    """Returns the absolute path of the bundled NLTK data directory."""
+    configured = get_config("evaluation.nltk_data_dir", None)
+    if not configured:
+        return DEFAULT_NLTK_DATA_DIR
+    if os.path.isabs(configured):
+        return configured
+    return os.path.join(_PROJECT_ROOT, configured)
+
+
+def _register_data_dir(data_dir: str) -> None:
+    """Puts the bundled directory first on NLTK's search path (idempotent)."""
+    if os.path.isdir(data_dir) and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+
+@lru_cache(maxsize=1)
+def get_text_resources() -> TextResources:
+    """
+    Resolves the tokenizer and stopwords once, without any network access.
+
+    Returns:
+        TextResources using NLTK when its data is available locally,
+        otherwise the regex tokenizer and FALLBACK_STOP_WORDS.
+    """
+    if nltk is not None:
+        _register_data_dir(get_nltk_data_dir())
+        try:
+            stop_words = frozenset(nltk.corpus.stopwords.words('english'))
+            nltk.word_tokenize("Test sentence.")  # Raises LookupError if punkt data is missing
+            return TextResources(
+                tokenize=_nltk_tokenize,
+                stop_words=stop_words,
+                nltk_available=True,
+                tokenizer_name="nltk",
+            )
+        except LookupError:
+            pass
+
+    return TextResources(
+        tokenize=_regex_tokenize,
+        stop_words=FALLBACK_STOP_WORDS,
+        nltk_available=False,
+        tokenizer_name="regex",
+    )
+
+
+def reset_text_resources() -> None:
+    """Clears the cached resources so the next call re-resolves them (e.g. after bundling)."""
+    get_text_resources.cache_clear()
+
+
+def bundle_resources(target_dir: Optional[str] = None, quiet: bool = True) -> List[str]:
+    """
+    Downloads the NLTK packages into the bundled directory.
+
+    This is the only function in this module that uses the network; call it at
+    build time (Dockerfile, CI), never on the request path.
+
+    Args:
+        target_dir: Directory to download into. Defaults to get_nltk_data_dir().
+        quiet: Suppress NLTK downloader output.
+
+    Returns:
+        The package names that failed to download (empty on success).
+    """
+    if nltk is None:
+        raise RuntimeError("NLTK is not installed; cannot bundle NLTK resources.")
+
+    target_dir = target_dir or get_nltk_data_dir()
+    os.makedirs(target_dir, exist_ok=True)
+
+    failed = []
+    for _, package in NLTK_PACKAGES:
+        if not nltk.download(package, download_dir=target_dir, quiet=quiet):
+            failed.append(package)
+
+    reset_text_resources()
+    return failed
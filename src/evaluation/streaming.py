@@ -0,0 +1,363 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Streaming evaluation for large golden sets.
+#   - Incremental golden-set reader (JSON array or JSONL).
+#   - Bounded-size chunks evaluated in parallel, results written as they complete.
+#   - Running summary statistics with constant memory.
+# - 2026-10-19: Optional EvaluationCache: cached cases are emitted without re-scoring,
+#   only misses are sent to workers, and the cache is flushed after every chunk.
+
+"""
+Streaming evaluation of large golden sets.
+
+`scripts/evaluate_responses.py` originally loaded the whole golden set, evaluated it
+and wrote one results JSON. This module evaluates with flat memory instead:
+
+- iter_golden_cases() yields cases one at a time from a JSON array or a JSONL file.
+- stream_evaluate() groups cases into chunks of `chunk_size`, keeps at most
+  `max_in_flight` chunks queued on a process pool, writes each result to a JSONL
+  file as soon as its chunk completes, and folds scores into a RunningSummary.
+  With an EvaluationCache, only new or changed cases are scored.
+"""
+
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from src.models.response import AIResponse
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.cache import EvaluationCache, case_input_hash
+
+_READ_CHUNK_CHARS = 1 << 16
+
+
+def create_ai_response_from_case(case: Dict[str, Any]) -> AIResponse:
+    """Create an AIResponse object from a test case in the golden set."""
+    return AIResponse(
+        content=case["ai_response_content"],
+        tone=case["ai_response_analyzed_tone"],
+        response_type="TWEET_REPLY",  # Assuming this for test cases
+        model_used="test_model",
+        prompt_used="test_prompt",
+        source_tweet_id=f"test_{case['id']}",
+        responding_as="OFFICIAL",
+        target_account="COMMUNITY_MEMBER",
+        generation_time=datetime.now()
+    )
+
+
+def _iter_json_array(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Yields the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between elements
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(_READ_CHUNK_CHARS), 0
+            eof = buffer == ""
+
+        if pos >= len(buffer):
+            if started:
+                raise ValueError("Unexpected end of file inside JSON array")
+            return
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("Golden set JSON must be a top-level array")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A scalar ending exactly at the buffer edge may continue in the next read
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            # Element spans the buffer boundary; read more and retry
+            more = f.read(_READ_CHUNK_CHARS)
+            eof = more == ""
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_golden_cases(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields golden set cases one at a time.
+
+    Files ending in .jsonl (or whose first character is not '[') are read as JSON Lines;
+    otherwise the file is parsed incrementally as a JSON array.
+
+    Args:
+        file_path: Path to the golden set (.json array or .jsonl).
+
+    Yields:
+        Case dictionaries, in file order.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        first = ""
+        while first == "" or first.isspace():
+            first = f.read(1)
+            if first == "":
+                return
+        f.seek(0)
+        if file_path.endswith(".jsonl") or first != "[":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def chunked(cases: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Groups an iterable of cases into lists of at most chunk_size."""
+    chunk: List[Dict[str, Any]] = []
+    for case in cases:
+        chunk.append(case)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class RunningSummary:
+    """
+    Constant-memory summary statistics over streamed score dictionaries.
+
+    Produces the same avg_/min_/max_ keys as summarize_results() in
+    scripts/evaluate_responses.py; non-numeric scores (N/A, errors) are skipped.
+    """
+
+    def __init__(self):
+        self.cases = 0
+        self.errors = 0
+        self.cached = 0
+        self._count: Dict[str, int] = {}
+        self._sum: Dict[str, float] = {}
+        self._min: Dict[str, float] = {}
+        self._max: Dict[str, float] = {}
+
+    def add(self, scores: Dict[str, Any], cached: bool = False) -> None:
+        """Folds one case's scores (fresh or from the cache) into the running statistics."""
+        self.cases += 1
+        if cached:
+            self.cached += 1
+        for metric, value in scores.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if metric in self._count:
+                self._count[metric] += 1
+                self._sum[metric] += value
+                self._min[metric] = min(self._min[metric], value)
+                self._max[metric] = max(self._max[metric], value)
+            else:
+                self._count[metric] = 1
+                self._sum[metric] = value
+                self._min[metric] = value
+                self._max[metric] = value
+
+    def add_error(self) -> None:
+        """Counts a case that could not be scored."""
+        self.cases += 1
+        self.errors += 1
+
+    def merge(self, other: 'RunningSummary') -> None:
+        """Merges another summary into this one."""
+        self.cases += other.cases
+        self.errors += other.errors
+        self.cached += other.cached
+        for metric, count in other._count.items():
+            if metric in self._count:
+                self._count[metric] += count
+                self._sum[metric] += other._sum[metric]
+                self._min[metric] = min(self._min[metric], other._min[metric])
+                self._max[metric] = max(self._max[metric], other._max[metric])
+            else:
+                self._count[metric] = count
+                self._sum[metric] = other._sum[metric]
+                self._min[metric] = other._min[metric]
+                self._max[metric] = other._max[metric]
+
+    def to_dict(self) -> Dict[str, float]:
+        """Returns avg_/min_/max_ values per metric."""
+        summary: Dict[str, float] = {}
+        for metric, count in self._count.items():
+            summary[f"avg_{metric}"] = self._sum[metric] / count
+            summary[f"min_{metric}"] = self._min[metric]
+            summary[f"max_{metric}"] = self._max[metric]
+        return summary
+
+
+# Per-process evaluator, created once by the pool initializer
+_WORKER_EVALUATOR: Optional[Evaluator] = None
+
+
+def _init_worker(metrics_to_run: Optional[List[str]]) -> None:
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = Evaluator(metrics_to_run=metrics_to_run)
+
+
+def evaluate_chunk(
+    cases: List[Dict[str, Any]],
+    metrics_to_run: Optional[List[str]] = None,
+    evaluator: Optional[Evaluator] = None
+) -> List[Dict[str, Any]]:
+    """
+    Evaluates one chunk of golden set cases.
+
+    Cases that cannot be turned into an AIResponse get an 'error' entry instead of
+    failing the whole chunk.
+
+    Args:
+        cases: The chunk of golden set cases.
+        metrics_to_run: Metrics for the Evaluator, if one has to be created.
+        evaluator: Evaluator to use. Defaults to the worker process's evaluator.
+
+    Returns:
+        One result record per case: id, description, timestamp, scores (or error).
+    """
+    if evaluator is None:
+        if _WORKER_EVALUATOR is None:
+            _init_worker(metrics_to_run)
+        evaluator = _WORKER_EVALUATOR
+
+    records: List[Dict[str, Any]] = []
+    batch: List[Tuple[AIResponse, Optional[str], Optional[str], Optional[Dict[str, Any]]]] = []
+    batch_positions: List[int] = []
+    for case in cases:
+        record: Dict[str, Any] = {
+            "id": case.get("id"),
+            "description": case.get("description"),
+        }
+        try:
+            batch.append((
+                create_ai_response_from_case(case),
+                case["original_tweet_content"],
+                case.get("knowledge_snippet_used"),
+                case["ground_truth_data"]
+            ))
+            batch_positions.append(len(records))
+        except (KeyError, TypeError, ValueError) as e:
+            record["timestamp"] = datetime.now().isoformat()
+            record["error"] = f"Invalid case: {e!r}"
+        records.append(record)
+
+    timestamp = datetime.now().isoformat()
+    for position, scores in zip(batch_positions, evaluator.run_batch_evaluation(batch)):
+        records[position]["timestamp"] = timestamp
+        records[position]["scores"] = scores
+    return records
+
+
+def _hash_case(case: Dict[str, Any]) -> str:
+    """case_input_hash() of a raw golden set case (same inputs create_ai_response_from_case uses)."""
+    return case_input_hash(
+        case.get("ai_response_content"),
+        case.get("ai_response_analyzed_tone"),
+        case.get("original_tweet_content"),
+        case.get("knowledge_snippet_used"),
+        case.get("ground_truth_data"),
+    )
+
+
+def stream_evaluate(
+    cases: Iterable[Dict[str, Any]],
+    output: IO[str],
+    metrics_to_run: Optional[List[str]] = None,
+    chunk_size: int = 500,
+    workers: int = 1,
+    max_in_flight: Optional[int] = None,
+    cache: Optional[EvaluationCache] = None
+) -> RunningSummary:
+    """
+    Evaluates cases chunk by chunk and writes one JSON line per result as chunks complete.
+
+    Args:
+        cases: Iterable of golden set cases (e.g. from iter_golden_cases()).
+        output: Text stream receiving JSONL result records.
+        metrics_to_run: Metrics for the Evaluator (None runs all defaults).
+        chunk_size: Cases per chunk.
+        workers: Worker processes. 1 evaluates inline in this process.
+        max_in_flight: Maximum chunks queued at once (default: 2 * workers). Bounds memory.
+        cache: Optional EvaluationCache. Cached cases are written immediately (with
+               "cached": true) and only misses are scored; the cache is flushed per chunk.
+
+    Returns:
+        The RunningSummary over every evaluated case.
+    """
+    summary = RunningSummary()
+    evaluator = Evaluator(metrics_to_run=metrics_to_run)
+
+    def _consume(records: List[Dict[str, Any]], hashes: Optional[List[str]] = None) -> None:
+        for i, record in enumerate(records):
+            output.write(json.dumps(record) + "\n")
+            if "scores" in record:
+                summary.add(record["scores"], cached=record.get("cached", False))
+                if hashes is not None:
+                    cache.store(hashes[i], record["scores"])
+            else:
+                summary.add_error()
+        if cache is not None:
+            cache.flush()
+
+    def _split(chunk: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[List[str]]]:
+        """Emits cached cases and returns the misses (with their hashes) still to score."""
+        if cache is None or not evaluator.metrics_to_run:
+            return chunk, None
+        misses: List[Dict[str, Any]] = []
+        miss_hashes: List[str] = []
+        for case in chunk:
+            input_hash = _hash_case(case)
+            scores = cache.lookup(input_hash, evaluator.metrics_to_run)
+            if scores is None:
+                misses.append(case)
+                miss_hashes.append(input_hash)
+            else:
+                output.write(json.dumps({
+                    "id": case.get("id"),
+                    "description": case.get("description"),
+                    "timestamp": datetime.now().isoformat(),
+                    "scores": scores,
+                    "cached": True,
+                }) + "\n")
+                summary.add(scores, cached=True)
+        return misses, miss_hashes
+
+    if workers <= 1:
+        for chunk in chunked(cases, chunk_size):
+            misses, miss_hashes = _split(chunk)
+            if misses:
+                _consume(evaluate_chunk(misses, evaluator=evaluator), miss_hashes)
+        return summary
+
+    max_in_flight = max_in_flight or 2 * workers
+    pending: Dict[Future, Optional[List[str]]] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(metrics_to_run,)) as executor:
+        for chunk in chunked(cases, chunk_size):
+            misses, miss_hashes = _split(chunk)
+            if not misses:
+                continue
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _consume(future.result(), pending.pop(future))
+            pending[executor.submit(evaluate_chunk, misses, metrics_to_run)] = miss_hashes
+        for future in wait(pending).done:
+            _consume(future.result(), pending[future])
+    return summary
@@ -1,6 +1,8 @@
 # Changelog:
 # 2025-05-07 20:12 - Step 10.3 - Implemented StaticJSONKnowledgeSource and YieldFiDocsKnowledgeSource.
 # 2025-05-19 15:00 - Step 27 - Updated to use protocol paths.
+# 2026-10-19 - Cache the default protocol name (used in every chunk's source name) and refresh it via config subscription.
+# 2026-10-19 - YieldFiDocsKnowledgeSource takes an optional protocol for its name (protocol bundles).
 
 import json
 import logging
@@ -8,10 +10,22 @@ import os
 from typing import List, Dict, Any, Optional
 
 from src.config import get_config, get_protocol_path
+from src.config.settings import subscribe
 from .base import KnowledgeSource, RelevantChunk
 
 logger = logging.getLogger(__name__)
 
+# Read for every search result's source name; kept current by the config subscription below
+_DEFAULT_PROTOCOL = get_config("default_protocol", "ethena")
+
+
+def _refresh_default_protocol(changes: Dict[str, Any]) -> None:
+    global _DEFAULT_PROTOCOL
+    _DEFAULT_PROTOCOL = get_config("default_protocol", "ethena")
+
+
+subscribe("default_protocol", _refresh_default_protocol)
+
 class StaticJSONKnowledgeSource(KnowledgeSource):
     """Knowledge source that loads data from a static JSON file."""
 
@@ -101,16 +115,16 @@ class StaticJSONKnowledgeSource(KnowledgeSource):
 class YieldFiDocsKnowledgeSource(KnowledgeSource):
     """Knowledge source that loads data from YieldFi's Markdown documentation."""
 
-    def __init__(self, file_path: Optional[str] = None):
+    def __init__(self, file_path: Optional[str] = None, protocol: Optional[str] = None):
         # Now uses protocol path by default
         self._file_path = file_path or get_protocol_path("docs.md")
+        self._protocol = protocol  # None names the source after the configured default protocol
         self._paragraphs: List[str] = []
         self.load_data()
 
     @property
     def name(self) -> str:
-        protocol = get_config("default_protocol", "ethena")
-        return f"{protocol.capitalize()}DocsKnowledgeSource ({os.path.basename(self._file_path)})"
+        return f"{(self._protocol or _DEFAULT_PROTOCOL).capitalize()}DocsKnowledgeSource ({os.path.basename(self._file_path)})"
 
     def load_data(self):
         """Loads and preprocesses the Markdown document."""
@@ -1,6 +1,7 @@
 # Changelog:
 # 2025-05-07 HH:MM - Step 17 - Initial creation with TweetCategory dataclass and load_categories function.
 # 2025-05-19 15:00 - Step 27 - Updated to use protocol paths.
+# 2026-10-19 - CategoryCatalog: cached per categories file, keyword index, suggest_categories() and bulk suggestions.
 
 """
 Models for tweet categories.
@@ -10,13 +11,17 @@ Purpose: Defines the data structure for tweet categories and provides
 Rationale: A structured way to define and load categories is essential
            for managing them and for the AI to generate targeted content.
 Usage: Import TweetCategory and use load_categories() to get a list of available
-       tweet categories.
+       tweet categories. get_category_catalog() returns the cached CategoryCatalog
+       for a protocol, which also suggests categories for a topic.
 """
 
 import json
+import math
 import os
+import re
+import threading
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
 
 from src.config import get_config, get_protocol_path  # Step 27 - Protocol paths
 
@@ -81,6 +86,198 @@ def load_categories(categories_file_path: Optional[str] = None) -> List[TweetCat
         print(f"An unexpected error occurred while loading categories: {e}")
         return []
 
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it",
+    "its", "of", "on", "or", "our", "the", "this", "to", "we", "with", "you", "your",
+})
+PHRASE_BONUS = 1.0  # Added when every word of a keyword phrase appears in the topic
+
+
+def _normalize_word(word: str) -> str:
+    # Light plural folding so "rewards"/"reward" and "votes"/"vote" match
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _index_words(text: str) -> List[str]:
+    """Lowercased, plural-folded content words of text, in order."""
+    return [_normalize_word(word) for word in _WORD_PATTERN.findall(text.lower()) if word not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class CategorySuggestion:
+    """A category ranked for a topic."""
+    category: TweetCategory
+    score: float
+    matched_words: Tuple[str, ...]
+
+
+class CategoryCatalog:
+    """
+    Immutable set of categories with a word index over their prompt keywords and names.
+
+    Each indexed word maps to the categories using it, weighted by inverse category
+    frequency (a word shared by every category carries little signal). A topic is scored
+    in one pass over its distinct words; keyword phrases whose words all appear add
+    PHRASE_BONUS.
+    """
+
+    def __init__(self, categories: Sequence[TweetCategory]):
+        """
+        Args:
+            categories: The categories, in display order (also the tie-break order).
+        """
+        self.categories: Tuple[TweetCategory, ...] = tuple(categories)
+        self._by_name = {category.name.lower(): category for category in reversed(self.categories)}
+
+        words_per_category: List[set] = []
+        phrases: List[Tuple[int, frozenset]] = []  # (category index, words of one keyword phrase)
+        for i, category in enumerate(self.categories):
+            words = set(_index_words(category.name))
+            for keyword in category.prompt_keywords:
+                keyword_words = frozenset(_index_words(keyword))
+                words |= keyword_words
+                if len(keyword_words) > 1:
+                    phrases.append((i, keyword_words))
+            words_per_category.append(words)
+
+        document_frequency: Dict[str, int] = {}
+        for words in words_per_category:
+            for word in words:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        total = max(len(self.categories), 1)
+        self._index: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        for i, words in enumerate(words_per_category):
+            for word in words:
+                weight = math.log(1.0 + total / document_frequency[word])
+                self._index[word] = self._index.get(word, ()) + ((i, weight),)
+
+        # Phrases are checked only when their rarest word occurs in the topic
+        self._phrases_by_word: Dict[str, Tuple[Tuple[int, frozenset], ...]] = {}
+        for i, words in phrases:
+            anchor = min(words, key=lambda word: (document_frequency[word], word))
+            self._phrases_by_word[anchor] = self._phrases_by_word.get(anchor, ()) + ((i, words),)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def get(self, name: str) -> Optional[TweetCategory]:
+        """The category with this name (case-insensitive), or None."""
+        return self._by_name.get(name.lower())
+
+    def names(self) -> List[str]:
+        return [category.name for category in self.categories]
+
+    def suggest_categories(self, topic_text: str, k: int = 3) -> List[CategorySuggestion]:
+        """
+        Ranks categories for a topic.
+
+        Args:
+            topic_text: Free-text topic or brief.
+            k: Maximum number of suggestions.
+
+        Returns:
+            Up to k suggestions with a positive score, best first (ties keep catalog order).
+        """
+        topic_words = set(_index_words(topic_text or ""))
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+        for word in topic_words:
+            for i, weight in self._index.get(word, ()):
+                scores[i] = scores.get(i, 0.0) + weight
+                matched.setdefault(i, []).append(word)
+            for i, phrase_words in self._phrases_by_word.get(word, ()):
+                if phrase_words <= topic_words:
+                    scores[i] += PHRASE_BONUS
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))[:k]
+        return [CategorySuggestion(self.categories[i], round(scores[i], 4), tuple(sorted(matched[i])))
+                for i in ranked]
+
+    def suggest_bulk(self, topics: Iterable[str], k: int = 1) -> List[List[CategorySuggestion]]:
+        """
+        suggest_categories() for many topics; repeated topics are scored once.
+
+        Args:
+            topics: Topic texts, e.g. a campaign plan.
+            k: Suggestions per topic.
+
+        Returns:
+            One suggestion list per topic, in input order.
+        """
+        memo: Dict[str, List[CategorySuggestion]] = {}
+        results = []
+        for topic in topics:
+            suggestions = memo.get(topic)
+            if suggestions is None:
+                suggestions = memo[topic] = self.suggest_categories(topic, k)
+            results.append(suggestions)
+        return results
+
+    def group_topics(self, topics: Iterable[str]) -> Dict[Optional[str], List[str]]:
+        """
+        Assigns each topic to its best category.
+
+        Returns:
+            Category name -> topics, in catalog order; topics matching no category are under None.
+        """
+        topics = list(topics)
+        groups: Dict[Optional[str], List[str]] = {name: [] for name in self.names()}
+        for topic, suggestions in zip(topics, self.suggest_bulk(topics, k=1)):
+            groups.setdefault(suggestions[0].category.name if suggestions else None, []).append(topic)
+        return {name: grouped for name, grouped in groups.items() if grouped}
+
+
+_CATALOGS: Dict[str, Tuple[Optional[Tuple[int, int]], CategoryCatalog]] = {}
+_CATALOG_LOCK = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_category_catalog(protocol: Optional[str] = None, categories_file_path: Optional[str] = None) -> CategoryCatalog:
+    """
+    Returns the cached catalog for a protocol's categories.json.
+
+    The file is parsed once and re-parsed only when its mtime or size changes.
+
+    Args:
+        protocol: Protocol directory name under data/protocols. None uses the configured default protocol.
+        categories_file_path: Explicit file path; overrides protocol.
+
+    Returns:
+        The CategoryCatalog (empty if the file is missing or invalid).
+    """
+    path = categories_file_path
+    if path is None:
+        path = get_protocol_path("categories.json")
+        if protocol:
+            path = os.path.join(os.path.dirname(os.path.dirname(path)), protocol, "categories.json")
+    signature = _file_signature(path)
+    cached = _CATALOGS.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _CATALOG_LOCK:
+        cached = _CATALOGS.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        catalog = CategoryCatalog(load_categories(path))
+        _CATALOGS[path] = (signature, catalog)
+        return catalog
+
+
+def clear_category_catalog_cache() -> None:
+    """Forgets all cached catalogs."""
+    with _CATALOG_LOCK:
+        _CATALOGS.clear()
+
+
 if __name__ == '__main__':
     # This is for basic testing of this module
     # To run this, ensure your project root is in PYTHONPATH
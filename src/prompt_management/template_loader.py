@@ -1,5 +1,10 @@
 # Changelog:
 # 2025-05-09 18:15 - Step 408 - Created template_loader for centralized prompt management.
+# 2026-10-19 - TemplateRegistry: all protocols preloaded into frozen, pre-resolved templates;
+#   thread-safe lookups, atomic swap when a prompt_templates.json file changes.
+# 2026-10-19 - The shared registry follows prompts.template_check_interval config changes.
+# 2026-10-19 - PromptTemplate reads DEFAULT_PROTOCOL from the config snapshot per call instead of once.
+# 2026-10-19 - Registry log messages use lazy %-style arguments.
 
 """
 Template loader for managing prompt templates.
@@ -7,12 +12,23 @@ Template loader for managing prompt templates.
 This module provides functionality to load prompt templates from JSON files,
 cache them for performance, and access different components of the templates
 based on the selected protocol.
+
+Templates live in a TemplateRegistry that loads every data/protocols/*/prompt_templates.json
+up front. Each file becomes a FrozenTemplate: nested dicts are read-only mappings, lists are
+tuples, and the fallbacks section is merged in ahead of time, so lookups are plain dict reads.
+The registry publishes its templates as one dict that is replaced, never mutated, so worker
+threads can read without locking. Files are re-checked by mtime at most every
+prompts.template_check_interval seconds and a changed file swaps in a new snapshot.
 """
 
 import os
 import json
+import threading
+import time
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 from pathlib import Path
 
 # Logger instance
@@ -32,31 +48,314 @@ class PromptKey(Enum):
     FALLBACKS = "fallbacks"
 
 
+def _freeze(value: Any) -> Any:
+    """Recursively converts dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _empty() -> Mapping[str, Any]:
+    return _EMPTY
+
+
+@dataclass(frozen=True)
+class FrozenTemplate:
+    """An immutable, pre-resolved prompt template for one protocol."""
+    protocol: Optional[str]
+    path: Optional[str]
+    signature: Optional[Tuple[int, int]]   # (mtime_ns, size) of the file it was loaded from
+    data: Mapping[str, Any] = field(default_factory=_empty)       # The file contents, frozen
+    resolved: Mapping[str, Any] = field(default_factory=_empty)   # Top-level keys with fallbacks merged in
+    personas: Mapping[str, str] = field(default_factory=_empty)
+    interaction_modes: Mapping[str, Any] = field(default_factory=_empty)   # Upper-cased mode names
+    instruction_sets: Mapping[Tuple[str, str], str] = field(default_factory=_empty)  # (active, target) -> text
+    critical_instructions: Mapping[str, Tuple[str, ...]] = field(default_factory=_empty)  # Lower-cased platform names
+    persona_fallback: str = ""
+    instruction_set_fallback: str = ""
+    mode_fallback: Mapping[str, Any] = field(default_factory=_empty)
+
+    @classmethod
+    def build(cls, protocol: Optional[str], path: Optional[str], signature: Optional[Tuple[int, int]],
+              raw: Dict[str, Any]) -> 'FrozenTemplate':
+        """Freezes a parsed template file and precomputes its lookup tables."""
+        data = _freeze(raw)
+        fallbacks = data.get(PromptKey.FALLBACKS.value) or _EMPTY
+        resolved = dict(fallbacks)
+        resolved.update({key: value for key, value in data.items() if value is not None})
+
+        def mapping(key: PromptKey) -> Mapping[str, Any]:
+            value = resolved.get(key.value)
+            return value if isinstance(value, Mapping) else _EMPTY
+
+        instruction_sets = {}
+        for key, text in mapping(PromptKey.INSTRUCTION_SETS).items():
+            active, sep, target = key.partition("_TO_")
+            if sep:
+                instruction_sets[(active, target)] = text
+        mode_fallback = fallbacks.get('interaction_mode')
+        return cls(
+            protocol=protocol,
+            path=path,
+            signature=signature,
+            data=data,
+            resolved=MappingProxyType(resolved),
+            personas=mapping(PromptKey.PERSONA),
+            interaction_modes=MappingProxyType({str(k).upper(): v for k, v in mapping(PromptKey.INTERACTION_MODES).items()}),
+            instruction_sets=MappingProxyType(instruction_sets),
+            critical_instructions=MappingProxyType({str(k).lower(): v for k, v in mapping(PromptKey.CRITICAL_INSTRUCTIONS).items()}),
+            persona_fallback=fallbacks.get('persona') or "",
+            instruction_set_fallback=fallbacks.get('instruction_set') or "",
+            mode_fallback=mode_fallback if isinstance(mode_fallback, Mapping) else _EMPTY,
+        )
+
+
+EMPTY_TEMPLATE = FrozenTemplate(protocol=None, path=None, signature=None)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class TemplateRegistry:
+    """
+    Holds the frozen templates of every protocol.
+
+    Lookups read `self._snapshot`, a dict that is only ever replaced as a whole (under
+    `_lock`), so readers need no lock and never see a half-updated registry. Requested names
+    that have no file (or fail to parse) are resolved once to the default protocol's template,
+    or EMPTY_TEMPLATE, and remembered, so they are not re-probed on every call.
+    """
+
+    def __init__(self, protocols_dir: Optional[str] = None, check_interval: Optional[float] = None):
+        """
+        Args:
+            protocols_dir: Directory holding one sub-directory per protocol. Defaults to data/protocols.
+            check_interval: Seconds between file change checks. Defaults to config
+                            'prompts.template_check_interval' (2.0). 0 checks on every lookup.
+        """
+        self.protocols_dir = protocols_dir or os.path.abspath(
+            os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'protocols'))
+        if check_interval is None:
+            try:
+                from src.config.settings import get_config
+                check_interval = float(get_config("prompts.template_check_interval", 2.0))
+            except (ImportError, AttributeError, TypeError, ValueError):
+                check_interval = 2.0
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Dict[str, FrozenTemplate] = {}
+        self._aliases: Dict[str, FrozenTemplate] = {}
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[], None]] = []
+        self.reloads = 0
+
+    def template_path(self, protocol_name: str) -> str:
+        return os.path.join(self.protocols_dir, protocol_name, 'prompt_templates.json')
+
+    def _load_file(self, protocol_name: str) -> Optional[FrozenTemplate]:
+        path = self.template_path(protocol_name)
+        signature = _file_signature(path)
+        if signature is None:
+            return None
+        try:
+            with open(path, 'r') as f:
+                raw = json.load(f)
+        except Exception as e:
+            logger.error("Error loading template for protocol '%s': %s", protocol_name, e)
+            return None
+        if not isinstance(raw, dict):
+            logger.error("Template for protocol '%s' is not a JSON object; ignoring it", protocol_name)
+            return None
+        logger.info("Loaded template for protocol: %s", protocol_name)
+        return FrozenTemplate.build(protocol_name, path, signature, raw)
+
+    def _discover(self) -> List[str]:
+        try:
+            names = sorted(os.listdir(self.protocols_dir))
+        except OSError:
+            return []
+        return [name for name in names if os.path.isfile(self.template_path(name))]
+
+    def preload(self) -> List[str]:
+        """
+        Loads every protocol's template file and publishes them as a new snapshot.
+
+        Returns:
+            The protocol names that were loaded.
+        """
+        with self._lock:
+            snapshot = {}
+            for name in self._discover():
+                template = self._load_file(name)
+                if template is not None:
+                    snapshot[name] = template
+            self._publish(snapshot)
+            return sorted(snapshot)
+
+    def _publish(self, snapshot: Dict[str, FrozenTemplate]) -> None:
+        """Swaps in a new snapshot (caller holds _lock)."""
+        self._snapshot = snapshot
+        self._aliases = {}
+        self._checked_at = time.monotonic()
+
+    def add_reload_listener(self, callback: Callable[[], None]) -> None:
+        """Registers a callback run after templates change on disk (e.g. to drop derived caches)."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def check_for_changes(self) -> bool:
+        """
+        Re-stats every template file and swaps in a new snapshot if any was added, changed
+        or removed.
+
+        Returns:
+            True if a new snapshot was published.
+        """
+        with self._lock:
+            current = self._snapshot
+            names = set(self._discover()) | set(current)
+            changed = False
+            snapshot = dict(current)
+            for name in names:
+                template = current.get(name)
+                signature = _file_signature(self.template_path(name))
+                if template is not None and signature == template.signature:
+                    continue
+                reloaded = self._load_file(name) if signature is not None else None
+                if reloaded is not None:
+                    snapshot[name] = reloaded
+                elif signature is None:
+                    snapshot.pop(name, None)
+                else:
+                    continue  # Unreadable edit in progress: keep serving the previous version
+                changed = True
+            if not changed:
+                self._checked_at = time.monotonic()
+                return False
+            self._publish(snapshot)
+            self.reloads += 1
+            listeners = list(self._listeners)
+        logger.info("Prompt templates changed on disk; published a new snapshot")
+        for callback in listeners:
+            callback()
+        return True
+
+    def _maybe_check(self) -> None:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.check_for_changes()
+
+    def protocols(self) -> List[str]:
+        """Protocols that currently have a loaded template."""
+        return sorted(self._snapshot)
+
+    def get_template(self, protocol_name: str, default_protocol: Optional[str] = None) -> FrozenTemplate:
+        """
+        Returns the frozen template for a protocol.
+
+        Args:
+            protocol_name: The protocol to look up.
+            default_protocol: Protocol to fall back to if protocol_name has no template.
+
+        Returns:
+            The protocol's template, the default protocol's template, or EMPTY_TEMPLATE.
+        """
+        self._maybe_check()
+        template = self._snapshot.get(protocol_name)
+        if template is not None:
+            return template
+        aliases = self._aliases
+        template = aliases.get(protocol_name)
+        if template is not None:
+            return template
+
+        if default_protocol and protocol_name != default_protocol and default_protocol in self._snapshot:
+            logger.warning("Template file not found for protocol '%s' at %s. Falling back to default protocol: %s",
+                           protocol_name, self.template_path(protocol_name), default_protocol)
+            template = self._snapshot[default_protocol]
+        else:
+            logger.warning("No prompt template for protocol '%s' (default '%s' not found either); using built-in prompts.",
+                           protocol_name, default_protocol)
+            template = EMPTY_TEMPLATE
+        with self._lock:
+            if self._aliases is aliases:  # Skip if a reload published a new snapshot meanwhile
+                self._aliases = {**aliases, protocol_name: template}
+        return template
+
+
+_REGISTRY: Optional[TemplateRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Returns the process-wide registry, preloading all protocols on first use."""
+    global _REGISTRY
+    registry = _REGISTRY
+    if registry is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                registry = TemplateRegistry()
+                registry.preload()
+                _REGISTRY = registry
+                _follow_check_interval(registry)
+            registry = _REGISTRY
+    return registry
+
+
+def _follow_check_interval(registry: TemplateRegistry) -> None:
+    """Keeps the shared registry's check interval in step with config."""
+    try:
+        from src.config.settings import get_config, subscribe
+    except ImportError:
+        return
+
+    def on_change(changes: Dict[str, Any]) -> None:
+        try:
+            registry.check_interval = float(get_config("prompts.template_check_interval", 2.0))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid prompts.template_check_interval; keeping %ss", registry.check_interval)
+
+    subscribe("prompts.template_check_interval", on_change)
+
+
 class PromptTemplate:
     """
-    Manages loading and access to prompt templates from JSON files.
-    
-    This class implements the Singleton pattern to ensure template caching
-    and consistent access across the application.
+    Read access to the prompt templates in the TemplateRegistry.
+
+    All lookups are classmethods over the shared registry; the Singleton instance is kept
+    for existing callers.
     """
     _instance = None
-    _templates: Dict[str, Dict[str, Any]] = {}
-    _default_protocol: str = "yieldfi"  # Default fallback
+    _default_protocol: str = "yieldfi"  # Fallback when DEFAULT_PROTOCOL is not configured
 
     def __new__(cls):
         """Singleton pattern implementation."""
         if cls._instance is None:
             cls._instance = super(PromptTemplate, cls).__new__(cls)
-            # Initialize instance attributes
-            cls._instance._templates = {}
-            # Try to get default protocol from settings
-            try:
-                from src.config.settings import get_config
-                cls._instance._default_protocol = get_config("DEFAULT_PROTOCOL", "yieldfi")
-            except (ImportError, AttributeError):
-                logger.warning("Could not load DEFAULT_PROTOCOL from settings, using fallback: yieldfi")
         return cls._instance
 
+    @classmethod
+    def default_protocol(cls) -> str:
+        """
+        The DEFAULT_PROTOCOL config value, read from the current config snapshot on every
+        call (a dict lookup), so it follows config reloads.
+        """
+        try:
+            from src.config.settings import get_config
+        except ImportError:
+            return cls._default_protocol
+        return get_config("DEFAULT_PROTOCOL", cls._default_protocol) or cls._default_protocol
+
     @classmethod
     def _get_protocol_path(cls, protocol_name: str) -> str:
         """
@@ -68,11 +367,17 @@ class PromptTemplate:
         Returns:
             The path to the protocol's prompt templates file.
         """
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'protocols'))
-        return os.path.join(base_dir, protocol_name, 'prompt_templates.json')
+        return get_template_registry().template_path(protocol_name)
 
     @classmethod
-    def load_template(cls, protocol_name: str = None) -> Dict[str, Any]:
+    def _template(cls, protocol_name: Optional[str]) -> FrozenTemplate:
+        default_protocol = cls.default_protocol()
+        if protocol_name is None:
+            protocol_name = default_protocol
+        return get_template_registry().get_template(protocol_name, default_protocol)
+
+    @classmethod
+    def load_template(cls, protocol_name: str = None) -> Mapping[str, Any]:
         """
         Load a prompt template for a specific protocol.
         
@@ -81,44 +386,15 @@ class PromptTemplate:
                           If None, uses the default protocol.
                           
         Returns:
-            The loaded template as a dictionary.
+            The template as a read-only mapping (empty if neither the protocol nor the
+            default protocol has a template).
         """
-        # Use default if not specified
-        if protocol_name is None:
-            protocol_name = cls._default_protocol
-            
-        # Return cached template if available
-        if protocol_name in cls._templates:
-            return cls._templates[protocol_name]
-            
-        # Load template from file
-        template_path = cls._get_protocol_path(protocol_name)
-        try:
-            if not os.path.exists(template_path):
-                logger.warning(f"Template file not found for protocol '{protocol_name}' at {template_path}. "
-                               f"Falling back to default protocol: {cls._default_protocol}")
-                
-                # If protocol not found and it's not already the default, try loading the default
-                if protocol_name != cls._default_protocol:
-                    return cls.load_template(cls._default_protocol)
-                    
-                # If it is the default that's missing, we have a bigger problem
-                logger.error(f"Default protocol template not found at {template_path}.")
-                return {}
-                
-            with open(template_path, 'r') as f:
-                template = json.load(f)
-                cls._templates[protocol_name] = template
-                logger.info(f"Loaded template for protocol: {protocol_name}")
-                return template
-                
-        except Exception as e:
-            logger.error(f"Error loading template for protocol '{protocol_name}': {e}")
-            # If this wasn't the default protocol, try loading the default
-            if protocol_name != cls._default_protocol:
-                logger.warning(f"Falling back to default protocol: {cls._default_protocol}")
-                return cls.load_template(cls._default_protocol)
-            return {}
+        return cls._template(protocol_name).data
+
+    @classmethod
+    def reload(cls) -> bool:
+        """Checks template files for changes now; returns True if any were reloaded."""
+        return get_template_registry().check_for_changes()
 
     @classmethod
     def get(cls, key: Union[str, PromptKey], protocol_name: Optional[str] = None, 
@@ -139,20 +415,13 @@ class PromptTemplate:
         # Convert PromptKey enum to string if needed
         if isinstance(key, PromptKey):
             key = key.value
-            
-        # Load template if not already loaded
-        template = cls.load_template(protocol_name)
-        
-        # Get base value from template
-        value = template.get(key)
-        if value is None:
-            # Try to get fallback from template
-            fallbacks = template.get('fallbacks', {})
-            value = fallbacks.get(key, default)
-            
+
+        # Fallbacks are already merged into `resolved`
+        value = cls._template(protocol_name).resolved.get(key, default)
+
         # Process subkeys for nested access
         for sub_key in sub_keys:
-            if isinstance(value, dict) and sub_key in value:
+            if isinstance(value, Mapping) and sub_key in value:
                 value = value.get(sub_key)
             else:
                 # If any subkey is missing, return default
@@ -174,12 +443,11 @@ class PromptTemplate:
         Returns:
             The persona description as a string.
         """
-        persona = cls.get(PromptKey.PERSONA, protocol_name, default={})
-        return persona.get(account_type, default or cls.get(
-            PromptKey.FALLBACKS, protocol_name, 'persona', default=""))
+        template = cls._template(protocol_name)
+        return template.personas.get(account_type, default or template.persona_fallback)
 
     @classmethod
-    def get_interaction_mode(cls, mode: str, protocol_name: Optional[str] = None) -> Dict[str, Any]:
+    def get_interaction_mode(cls, mode: str, protocol_name: Optional[str] = None) -> Mapping[str, Any]:
         """
         Get interaction mode details.
         
@@ -188,12 +456,11 @@ class PromptTemplate:
             protocol_name: The protocol name.
             
         Returns:
-            A dictionary with mode details.
+            A read-only mapping with mode details.
         """
-        interaction_modes = cls.get(PromptKey.INTERACTION_MODES, protocol_name, default={})
+        template = cls._template(protocol_name)
         mode_upper = mode.upper() if isinstance(mode, str) else "DEFAULT"
-        return interaction_modes.get(mode_upper, 
-                                     cls.get(PromptKey.FALLBACKS, protocol_name, 'interaction_mode', default={}))
+        return template.interaction_modes.get(mode_upper, template.mode_fallback)
 
     @classmethod
     def get_instruction_set(cls, active_type: str, target_type: str, 
@@ -210,13 +477,11 @@ class PromptTemplate:
         Returns:
             The instruction set as a string.
         """
-        key = f"{active_type}_TO_{target_type}"
-        instruction_sets = cls.get(PromptKey.INSTRUCTION_SETS, protocol_name, default={})
-        return instruction_sets.get(key, default or cls.get(
-            PromptKey.FALLBACKS, protocol_name, 'instruction_set', default=""))
+        template = cls._template(protocol_name)
+        return template.instruction_sets.get((active_type, target_type), default or template.instruction_set_fallback)
 
     @classmethod
-    def get_critical_instructions(cls, platform: str, protocol_name: Optional[str] = None) -> List[str]:
+    def get_critical_instructions(cls, platform: str, protocol_name: Optional[str] = None) -> Tuple[str, ...]:
         """
         Get critical instructions for a specific platform.
         
@@ -225,8 +490,7 @@ class PromptTemplate:
             protocol_name: The protocol name.
             
         Returns:
-            A list of critical instructions.
+            The critical instructions, in order.
         """
-        critical_instr = cls.get(PromptKey.CRITICAL_INSTRUCTIONS, protocol_name, default={})
         platform_lower = platform.lower() if isinstance(platform, str) else "twitter"
-        return critical_instr.get(platform_lower, [])
+        return cls._template(protocol_name).critical_instructions.get(platform_lower, ())
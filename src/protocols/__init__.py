@@ -0,0 +1,21 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Protocol bundles for multi-protocol serving.
+
+"""
+protocols package: preloaded per-protocol resources (ProtocolBundle) and the registry
+holding a bundle for every protocol under data/protocols/.
+"""
+
+from .bundle import (
+    ProtocolBundle,
+    ProtocolRegistry,
+    get_protocol_bundle,
+    get_protocol_registry,
+)
+
+__all__ = [
+    "ProtocolBundle",
+    "ProtocolRegistry",
+    "get_protocol_bundle",
+    "get_protocol_registry",
+]
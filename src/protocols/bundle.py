@@ -0,0 +1,281 @@
+# Changelog:
+# - 2026-10-19: Initial creation. ProtocolBundle and ProtocolRegistry for serving several protocols per process.
+# - 2026-10-19: Bundles expose a CategoryCatalog (category lookup and suggestions).
+# - 2026-10-19: Lazy %-style logging arguments.
+
+"""
+Protocol resource bundles.
+
+A ProtocolBundle holds everything generation needs for one protocol directory under
+data/protocols/: its categories, knowledge sources (knowledge.json and docs.md), parsed
+relevancy facts and parsed mode instructions. All files are read when the bundle is built,
+so generating with a bundle does no file I/O and does not depend on the global
+'default_protocol' setting. Prompt templates stay in the TemplateRegistry and are looked up
+by the bundle's name.
+
+The ProtocolRegistry builds a bundle for every protocol directory. Like the TemplateRegistry
+it publishes bundles as one dict that is replaced, never mutated, so worker threads serving
+different protocols read without locking. Bundles are immutable; reload() builds new ones
+(with a higher version, so compiled prompt plans for the old bundle are not reused).
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.ai.prompt_engineering import (
+    InteractionMode,
+    ModeInstructions,
+    mode_file_name,
+    read_mode_instructions,
+)
+from src.ai.relevancy import FactRules, match_facts, parse_relevancy_facts
+from src.knowledge import KnowledgeRetriever, KnowledgeSource, StaticJSONKnowledgeSource, YieldFiDocsKnowledgeSource
+from src.models.category import CategoryCatalog, CategorySuggestion, TweetCategory, load_categories
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PROTOCOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'protocols'))
+
+# Knowledge files are at either location depending on the protocol
+_KNOWLEDGE_PATHS = (("knowledge", "knowledge.json"), ("knowledge.json",))
+
+
+def _mode_key(mode: str) -> str:
+    return mode.strip().capitalize().replace(" ", "")
+
+
+def _normalize_name(name: str) -> str:
+    """'Yield-Fi', 'yield_fi' and 'yieldfi' all normalize to 'yieldfi'."""
+    return name.lower().replace("-", "").replace("_", "")
+
+
+@dataclass(frozen=True)
+class ProtocolBundle:
+    """Preloaded, read-only resources of one protocol."""
+    name: str
+    path: str
+    version: int = 1
+    categories: Tuple[TweetCategory, ...] = ()
+    knowledge_sources: Tuple[KnowledgeSource, ...] = ()
+    relevancy_rules: FactRules = ()
+    mode_instructions: Mapping[str, ModeInstructions] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def load(cls, name: str, path: str, version: int = 1) -> "ProtocolBundle":
+        """
+        Reads and indexes one protocol directory.
+
+        Args:
+            name: Protocol name (the directory name, used for template lookups).
+            path: The protocol directory.
+            version: Version stamp; the registry increments it on reload.
+
+        Returns:
+            The bundle. Missing files leave the corresponding resource empty.
+        """
+        categories_path = os.path.join(path, "categories.json")
+        categories = tuple(load_categories(categories_path)) if os.path.exists(categories_path) else ()
+
+        sources: List[KnowledgeSource] = []
+        for parts in _KNOWLEDGE_PATHS:
+            knowledge_path = os.path.join(path, *parts)
+            if os.path.exists(knowledge_path):
+                sources.append(StaticJSONKnowledgeSource(knowledge_path))
+                break
+        docs_path = os.path.join(path, "docs.md")
+        if os.path.exists(docs_path):
+            sources.append(YieldFiDocsKnowledgeSource(docs_path, protocol=name))
+
+        rules: FactRules = ()
+        facts_path = os.path.join(path, "relevancy_facts.json")
+        if os.path.exists(facts_path):
+            try:
+                with open(facts_path, 'r') as f:
+                    rules = parse_relevancy_facts(json.load(f))
+            except json.JSONDecodeError as e:
+                logger.error("Invalid relevancy facts for protocol '%s' at %s: %s", name, facts_path, e)
+
+        modes: Dict[str, ModeInstructions] = {}
+        modes_dir = os.path.join(path, "mode-instructions")
+        file_names = set(os.listdir(modes_dir)) if os.path.isdir(modes_dir) else set()
+        for mode in InteractionMode:
+            if mode_file_name(mode.value) in file_names:
+                modes[_mode_key(mode.value)] = read_mode_instructions(mode.value, os.path.join(modes_dir, mode_file_name(mode.value)))
+        for file_name in sorted(file_names):
+            if file_name.startswith("InstructionsFor") and file_name.endswith(".md"):
+                mode = file_name[len("InstructionsFor"):-len(".md")]
+                if _mode_key(mode) not in modes:
+                    modes[_mode_key(mode)] = read_mode_instructions(mode, os.path.join(modes_dir, file_name))
+
+        bundle = cls(
+            name=name,
+            path=path,
+            version=version,
+            categories=categories,
+            knowledge_sources=tuple(sources),
+            relevancy_rules=rules,
+            mode_instructions=MappingProxyType(modes),
+        )
+        object.__setattr__(bundle, "_retriever", KnowledgeRetriever(list(sources)))
+        object.__setattr__(bundle, "_catalog", CategoryCatalog(categories))
+        logger.info("Loaded protocol bundle '%s' v%d: %d categories, %d knowledge sources, %d relevancy facts, "
+                    "modes %s", name, version, len(categories), len(sources), len(rules), sorted(modes))
+        return bundle
+
+    @property
+    def plan_key(self) -> str:
+        """Stands in for the protocol name in prompt plan cache keys."""
+        return f"{self.name}@bundle-v{self.version}"
+
+    @property
+    def retriever(self) -> KnowledgeRetriever:
+        retriever = self.__dict__.get("_retriever")
+        if retriever is None:
+            retriever = KnowledgeRetriever(list(self.knowledge_sources))
+            object.__setattr__(self, "_retriever", retriever)
+        return retriever
+
+    @property
+    def catalog(self) -> CategoryCatalog:
+        catalog = self.__dict__.get("_catalog")
+        if catalog is None:
+            catalog = CategoryCatalog(self.categories)
+            object.__setattr__(self, "_catalog", catalog)
+        return catalog
+
+    def get_mode_instructions(self, mode: str) -> ModeInstructions:
+        """Parsed instructions for a mode; a missing mode gets the same fallback as the file-based lookup."""
+        instructions = self.mode_instructions.get(_mode_key(mode))
+        if instructions is None:
+            # Not cached: modes without a file are rare and get_mode_instructions() warns for them too
+            return read_mode_instructions(mode, os.path.join(self.path, "mode-instructions", mode_file_name(mode)))
+        return instructions
+
+    def get_facts(self, content: str) -> List[str]:
+        """Relevancy facts whose condition appears in content."""
+        return match_facts(self.relevancy_rules, content)
+
+    def get_category(self, name: str) -> Optional[TweetCategory]:
+        """The category with this name (case-insensitive), or None."""
+        return self.catalog.get(name)
+
+    def suggest_categories(self, topic_text: str, k: int = 3) -> List[CategorySuggestion]:
+        """Categories of this protocol ranked for a topic; see CategoryCatalog.suggest_categories."""
+        return self.catalog.suggest_categories(topic_text, k)
+
+    # Knowledge retriever interface used by the response generator
+
+    def get_relevant_knowledge(self, query: str, limit: int = 1) -> Optional[str]:
+        """Best-matching knowledge chunks for a post, joined into one snippet (None if nothing matches)."""
+        chunks = self.retriever.retrieve_knowledge(query, top_k_per_source=limit, global_top_k=limit)
+        return "\n\n".join(chunk.content for chunk in chunks) or None
+
+    def search_knowledge_for_topic(self, topic: str, category_name: Optional[str] = None) -> Optional[str]:
+        """Knowledge for a new tweet topic."""
+        return self.get_relevant_knowledge(topic)
+
+
+class ProtocolRegistry:
+    """
+    Bundles for every protocol directory, built up front.
+
+    Lookups read `self._bundles`, a dict that is only ever replaced as a whole (under `_lock`).
+    Names match case-insensitively and ignoring '-'/'_' ('yieldfi' finds 'yield-fi').
+    """
+
+    def __init__(self, protocols_dir: Optional[str] = None):
+        """
+        Args:
+            protocols_dir: Directory holding one sub-directory per protocol. Defaults to data/protocols.
+        """
+        self.protocols_dir = protocols_dir or DEFAULT_PROTOCOLS_DIR
+        self._lock = threading.Lock()
+        self._bundles: Dict[str, ProtocolBundle] = {}
+        self._aliases: Dict[str, str] = {}
+
+    def _discover(self) -> List[str]:
+        if not os.path.isdir(self.protocols_dir):
+            logger.warning("Protocols directory not found: %s", self.protocols_dir)
+            return []
+        return sorted(entry for entry in os.listdir(self.protocols_dir)
+                      if os.path.isdir(os.path.join(self.protocols_dir, entry)) and not entry.startswith(("_", ".")))
+
+    def preload(self) -> "ProtocolRegistry":
+        """Builds a bundle for every protocol directory."""
+        return self.reload()
+
+    def reload(self, names: Optional[Iterable[str]] = None) -> "ProtocolRegistry":
+        """
+        Rebuilds bundles from disk and swaps them in.
+
+        Args:
+            names: Protocols to rebuild; None rescans the directory and rebuilds all of them.
+        """
+        with self._lock:
+            bundles = dict(self._bundles)
+            if names is None:
+                targets = self._discover()
+                bundles = {name: bundle for name, bundle in bundles.items() if name in targets}
+            else:
+                targets = [self._resolve(name, bundles) or name for name in names]
+            for name in targets:
+                previous = bundles.get(name)
+                path = os.path.join(self.protocols_dir, name)
+                if not os.path.isdir(path):
+                    logger.warning("Protocol directory not found: %s", path)
+                    continue
+                bundles[name] = ProtocolBundle.load(name, path, previous.version + 1 if previous else 1)
+            self._bundles = bundles
+            self._aliases = {_normalize_name(name): name for name in bundles}
+        return self
+
+    def _resolve(self, name: str, bundles: Dict[str, ProtocolBundle]) -> Optional[str]:
+        if name in bundles:
+            return name
+        return self._aliases.get(_normalize_name(name))
+
+    def get(self, name: str) -> Optional[ProtocolBundle]:
+        """The bundle for a protocol, or None if there is no such protocol directory."""
+        bundles = self._bundles
+        resolved = self._resolve(name, bundles) if name else None
+        return bundles.get(resolved) if resolved else None
+
+    def __getitem__(self, name: str) -> ProtocolBundle:
+        bundle = self.get(name)
+        if bundle is None:
+            raise KeyError(f"Unknown protocol '{name}'. Available: {', '.join(self.protocols())}")
+        return bundle
+
+    def protocols(self) -> List[str]:
+        return sorted(self._bundles)
+
+
+_REGISTRY: Optional[ProtocolRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_protocol_registry() -> ProtocolRegistry:
+    """Returns the process-wide registry, building all bundles on first use."""
+    global _REGISTRY
+    registry = _REGISTRY
+    if registry is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = ProtocolRegistry().preload()
+            registry = _REGISTRY
+    return registry
+
+
+def get_protocol_bundle(name: str) -> ProtocolBundle:
+    """
+    Returns the shared bundle for a protocol.
+
+    Raises:
+        KeyError: If data/protocols has no such protocol.
+    """
+    return get_protocol_registry()[name]
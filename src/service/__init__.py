@@ -0,0 +1,24 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Headless generation service (HTTP/JSON API over a job queue).
+# - 2026-10-19: Export SQLiteJobQueue (durable job queue).
+
+"""
+service package: runs generation jobs from a bounded queue on a worker pool and serves
+them over a local HTTP/JSON API (GenerationService), without the Streamlit UI.
+SQLiteJobQueue keeps jobs on disk for crash-safe batch runs across worker processes.
+"""
+
+from .jobs import Job, JobQueue, JobValidationError, QueueFullError, WorkerPool, parse_job_request
+from .server import GenerationService
+from .sqlite_queue import SQLiteJobQueue
+
+__all__ = [
+    "GenerationService",
+    "Job",
+    "JobQueue",
+    "JobValidationError",
+    "QueueFullError",
+    "SQLiteJobQueue",
+    "WorkerPool",
+    "parse_job_request",
+]
@@ -0,0 +1,408 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Generation jobs, a bounded in-process job queue and a worker pool.
+#   - Job requests are validated on submission (persona, protocol, category).
+#   - JobQueue: bounded FIFO of job ids plus the job table; QueueFullError when full.
+#   - WorkerPool: threads that claim jobs and run generate_tweet_reply / generate_new_tweet.
+#   - ServiceMetrics: queue depth, throughput and queue-wait / run / end-to-end latencies.
+# - 2026-10-19: parse_job_request() takes an existing job_id (jobs re-resolved from the SQLite queue);
+#   Job.lease_owner; JobQueue.stats(); WorkerPool counts jobs put back for retry as "requeued".
+# - 2026-10-19: WorkerPool threads survive queue errors (e.g. a locked SQLite database): they log and back off.
+
+"""
+Generation jobs for the headless worker service.
+
+A job is a reply or new-tweet request. parse_job_request() validates the JSON request and
+resolves it into generation arguments when it is submitted, so malformed requests are
+rejected before they are queued. JobQueue holds the jobs: a bounded FIFO of queued job ids
+(a full queue rejects new jobs instead of growing) and a table of every job's state for
+polling. WorkerPool threads claim jobs and call the generation functions; every worker uses
+the process-wide shared state (protocol bundles with their knowledge indexes, the
+completion batcher and coalescing, the stage pool), so adding workers adds no per-worker
+setup. Finished jobs are kept for 'service.result_ttl_seconds' and then dropped.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.ai import response_generator
+from src.ai.hedging import LatencyTracker
+from src.models.account import Account, AccountType
+from src.models.category import get_category_catalog
+from src.models.tweet import Tweet, TweetMetadata
+from src.protocols.bundle import get_protocol_bundle
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_REPLY = "reply"
+JOB_NEW_TWEET = "new_tweet"
+JOB_TYPES = (JOB_REPLY, JOB_NEW_TWEET)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_RESULT_TTL = 3600.0
+QUEUE_ERROR_BACKOFF = 0.5       # Seconds a worker waits after a failed claim/finish, doubling per failure
+QUEUE_ERROR_MAX_BACKOFF = 10.0
+FINISH_ATTEMPTS = 5
+
+
+class JobValidationError(ValueError):
+    """A job request that cannot be run (unknown type, persona, protocol or category, missing fields)."""
+
+
+class QueueFullError(Exception):
+    """The job queue is at capacity."""
+
+
+@dataclass
+class Job:
+    """One generation request and its outcome."""
+    job_id: str
+    job_type: str
+    request: Dict[str, Any]                      # The submitted JSON, as received
+    kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)  # Resolved generation arguments
+    status: str = JOB_QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None      # AIResponse.to_dict()
+    error: Optional[str] = None
+    attempts: int = 0
+    lease_owner: Optional[str] = field(default=None, repr=False)  # Set by SQLiteJobQueue.claim()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "type": self.job_type,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _account_type(value: Any, field_name: str) -> AccountType:
+    text = str(value or "").strip()
+    for account_type in AccountType:
+        if text.lower() in (account_type.value.lower(), account_type.name.lower()):
+            return account_type
+    raise JobValidationError(f"Unknown account type '{text}' for '{field_name}'. "
+                             f"Expected one of {[t.value for t in AccountType]}")
+
+
+def persona_account(account_type: AccountType) -> Account:
+    """The YieldFi account generating as `account_type` (as the Streamlit UI builds it)."""
+    return Account(
+        account_id=f"yieldfi_{account_type.value.lower()}",
+        username=f"YieldFi{account_type.value.capitalize()}",
+        display_name=f"YieldFi {account_type.value.capitalize()}",
+        account_type=account_type,
+        platform="Twitter",
+        follower_count=100000,
+        bio="YieldFi Agent Account",
+        interaction_history=[],
+        tags=[],
+    )
+
+
+def parse_job_request(request: Any, job_id: Optional[str] = None) -> Job:
+    """
+    Validates a job request and resolves it into generation arguments.
+
+    Requests are JSON objects with "type" ("reply" or "new_tweet") and optionally
+    "responding_as" (account type, default "Official"), "interaction_mode" and "protocol".
+    Replies need "tweet" (text) and may give "tweet_id", "author" and "author_type"; new
+    tweets need "category" and may give "topic".
+
+    Args:
+        request: The decoded JSON request.
+        job_id: Id of an already stored job being resolved again; a new id by default.
+
+    Returns:
+        A queued Job.
+
+    Raises:
+        JobValidationError: If the request is invalid.
+    """
+    if not isinstance(request, dict):
+        raise JobValidationError("A job must be a JSON object")
+    job_type = request.get("type")
+    if job_type not in JOB_TYPES:
+        raise JobValidationError(f"Unknown job type '{job_type}'. Expected one of {list(JOB_TYPES)}")
+
+    kwargs: Dict[str, Any] = {
+        "responding_as": persona_account(_account_type(request.get("responding_as", "Official"), "responding_as")),
+        "interaction_mode": str(request.get("interaction_mode") or "Default"),
+    }
+    bundle = None
+    if request.get("protocol"):
+        try:
+            bundle = get_protocol_bundle(str(request["protocol"]))
+        except KeyError:
+            raise JobValidationError(f"Unknown protocol '{request['protocol']}'") from None
+        kwargs["bundle"] = bundle
+
+    job_id = job_id or uuid.uuid4().hex
+    if job_type == JOB_REPLY:
+        content = request.get("tweet")
+        if not isinstance(content, str) or not content.strip():
+            raise JobValidationError("Reply jobs need a non-empty 'tweet'")
+        kwargs["original_tweet"] = Tweet(
+            content=content.strip(),
+            metadata=TweetMetadata(tweet_id=str(request.get("tweet_id") or f"job_{job_id}"),
+                                   author_username=str(request.get("author") or "unknown")),
+        )
+        if request.get("author") and request.get("author_type"):
+            author = str(request["author"])
+            kwargs["target_account"] = Account(
+                account_id=f"service_{author}", username=author, display_name=author,
+                account_type=_account_type(request["author_type"], "author_type"), platform="Twitter",
+                follower_count=0, bio="", interaction_history=[], tags=[],
+            )
+    else:
+        name = request.get("category")
+        category = None
+        if isinstance(name, str) and name.strip():
+            category = bundle.get_category(name) if bundle is not None else get_category_catalog().get(name)
+        if category is None:
+            raise JobValidationError(f"Unknown category '{name}'")
+        kwargs["category"] = category
+        kwargs["topic"] = str(request["topic"]).strip() if request.get("topic") else None
+    return Job(job_id=job_id, job_type=job_type, request=request, kwargs=kwargs)
+
+
+def run_job(job: Job) -> Dict[str, Any]:
+    """Generates the job's response and returns it as a dict."""
+    if job.job_type == JOB_REPLY:
+        response = response_generator.generate_tweet_reply(**job.kwargs)
+    else:
+        response = response_generator.generate_new_tweet(**job.kwargs)
+    return response.to_dict()
+
+
+class ServiceMetrics:
+    """Counters and recent latencies of the job service."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "requeued": 0}
+        self.queue_wait = LatencyTracker(window)
+        self.run_time = LatencyTracker(window)
+        self.end_to_end = LatencyTracker(window)
+        self._finished: Deque[float] = deque(maxlen=window)  # Finish times, for recent throughput
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe(self, job: Job) -> None:
+        """Records a finished job."""
+        with self._lock:
+            self.counters["completed" if job.status == JOB_DONE else "failed"] += 1
+            self._finished.append(job.finished_at)
+        self.queue_wait.record(job.started_at - job.submitted_at)
+        self.run_time.record(job.finished_at - job.started_at)
+        self.end_to_end.record(job.finished_at - job.submitted_at)
+
+    def snapshot(self, queue_depth: int, running: int, workers: int, window_seconds: float = 60.0) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            counters = dict(self.counters)
+            recent = sum(1 for finished in self._finished if now - finished <= window_seconds)
+        uptime = max(now - self.started_at, 1e-9)
+
+        def summary(tracker: LatencyTracker) -> Dict[str, Optional[float]]:
+            return {f"p{pct}": (None if tracker.percentile(pct) is None else tracker.percentile(pct) * 1000.0)
+                    for pct in (50, 90, 99)}
+
+        return {
+            "queue_depth": queue_depth,
+            "running": running,
+            "workers": workers,
+            **counters,
+            "uptime_seconds": uptime,
+            "throughput_per_second": (counters["completed"] + counters["failed"]) / uptime,
+            "recent_throughput_per_second": recent / min(window_seconds, uptime),
+            "latency_ms": {
+                "queue_wait": summary(self.queue_wait),
+                "run": summary(self.run_time),
+                "end_to_end": summary(self.end_to_end),
+            },
+        }
+
+
+class JobQueue:
+    """Bounded FIFO of queued jobs plus the state of every known job."""
+
+    def __init__(self, max_size: int = DEFAULT_QUEUE_SIZE, result_ttl: float = DEFAULT_RESULT_TTL):
+        """
+        Args:
+            max_size: Most jobs waiting at once.
+            result_ttl: Seconds finished jobs stay available for polling.
+        """
+        self.max_size = max(1, int(max_size))
+        self.result_ttl = float(result_ttl)
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=self.max_size)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+
+    def submit(self, job: Job) -> Job:
+        """
+        Queues a job.
+
+        Raises:
+            QueueFullError: If max_size jobs are already waiting.
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job
+        try:
+            self._queue.put_nowait(job.job_id)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.job_id]
+            raise QueueFullError(f"Job queue is full ({self.max_size} jobs waiting)") from None
+        return job
+
+    def claim(self, timeout: Optional[float] = None) -> Optional[Job]:
+        """Takes the oldest queued job and marks it running; None if none arrives within timeout."""
+        try:
+            job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            job.attempts += 1
+            return job
+
+    def finish(self, job: Job, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Records a job's outcome (failed when error is given)."""
+        with self._lock:
+            job.result, job.error = result, error
+            job.status = JOB_FAILED if error is not None else JOB_DONE
+            job.finished_at = time.time()
+            self._expire()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def running(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == JOB_RUNNING)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue backend, queued and running jobs, and the age of the oldest queued job (lag)."""
+        now = time.time()
+        with self._lock:
+            queued = [job.submitted_at for job in self._jobs.values() if job.status == JOB_QUEUED]
+            running = sum(1 for job in self._jobs.values() if job.status == JOB_RUNNING)
+        return {
+            "backend": "memory",
+            "queued": len(queued),
+            "running": running,
+            "lag_seconds": now - min(queued) if queued else 0.0,
+        }
+
+    def _expire(self) -> None:
+        # Caller holds self._lock
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class WorkerPool:
+    """Threads that run jobs from a JobQueue."""
+
+    def __init__(self, jobs: JobQueue, workers: int, metrics: ServiceMetrics,
+                 runner: Callable[[Job], Dict[str, Any]] = run_job):
+        """
+        Args:
+            jobs: The queue to serve.
+            workers: Number of worker threads.
+            metrics: Where finished jobs are recorded.
+            runner: Runs one job and returns its result (run_job by default).
+        """
+        self.jobs = jobs
+        self.workers = max(1, int(workers))
+        self.metrics = metrics
+        self.runner = runner
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "WorkerPool":
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stops claiming jobs and waits for running ones to finish."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _backoff(self, failures: int) -> None:
+        self._stop.wait(min(QUEUE_ERROR_BACKOFF * 2 ** (failures - 1), QUEUE_ERROR_MAX_BACKOFF))
+
+    def _work(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                job = self.jobs.claim(timeout=0.2)
+            except Exception as e:
+                failures += 1
+                logger.error("Claiming a job failed (%d in a row): %s", failures, e, exc_info=True)
+                self._backoff(failures)
+                continue
+            failures = 0
+            if job is None:
+                continue
+            try:
+                result, error = self.runner(job), None
+            except Exception as e:
+                logger.error("Job %s (%s) failed: %s", job.job_id, job.job_type, e, exc_info=True)
+                result, error = None, str(e)
+            if not self._finish(job, result, error):
+                continue
+            if job.status in (JOB_DONE, JOB_FAILED):
+                self.metrics.observe(job)
+            else:
+                self.metrics.count("requeued")  # Put back for a retry, or its lease went to another worker
+
+    def _finish(self, job: Job, result: Optional[Dict[str, Any]], error: Optional[str]) -> bool:
+        """Records the outcome, retrying queue errors; False if it could not be recorded."""
+        for attempt in range(1, FINISH_ATTEMPTS + 1):
+            try:
+                self.jobs.finish(job, result=result, error=error)
+                return True
+            except Exception as e:
+                logger.error("Recording job %s failed (attempt %d of %d): %s",
+                             job.job_id, attempt, FINISH_ATTEMPTS, e, exc_info=True)
+                self._backoff(attempt)
+        logger.error("Giving up on recording job %s; it runs again once its lease expires", job.job_id)
+        return False
@@ -0,0 +1,231 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Headless HTTP/JSON generation service (stdlib http.server).
+# - 2026-10-19: Durable SQLite job queue selectable with 'service.queue_backend'; /metrics reports queue stats.
+# - 2026-10-19: Oversized and malformed request bodies close the connection or answer 400 instead of
+#   desynchronizing keep-alive connections or killing the handler.
+
+"""
+Headless generation service.
+
+GenerationService serves the generation pipeline over HTTP/JSON without Streamlit:
+
+    POST /jobs           one job request (see src/service/jobs.py) -> 202 {"job_id", "status"}
+    POST /jobs/batch     {"jobs": [...]} -> 202 {"jobs": [{"job_id", "status"} or {"error"}, ...]}
+    GET  /jobs/<id>      the job, with "result" (AIResponse.to_dict()) once done
+    GET  /jobs?ids=a,b   several jobs at once
+    GET  /metrics        queue depth, throughput and latency percentiles (JSON)
+    GET  /healthz        {"status": "ok"}
+
+Jobs go to a bounded queue served by a pool of worker threads. When the queue is full,
+submissions get 503 with Retry-After instead of waiting; invalid requests get 400. The
+queue is in memory unless 'service.queue_backend' is "sqlite", which keeps jobs in the
+database at 'service.sqlite.path' (see src/service/sqlite_queue.py) so they survive a
+restart and can also be worked by other processes (scripts/job_queue.py).
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.config.settings import get_config
+from src.service.jobs import (
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_RESULT_TTL,
+    JobQueue,
+    JobValidationError,
+    QueueFullError,
+    ServiceMetrics,
+    WorkerPool,
+    parse_job_request,
+)
+from src.service.sqlite_queue import open_job_queue
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_WORKERS = 4
+QUEUE_BACKENDS = ("memory", "sqlite")
+DEFAULT_MAX_BATCH = 100
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class GenerationService:
+    """HTTP front end, job queue and worker pool in one process."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        runner: Optional[Any] = None,
+    ):
+        """
+        Args:
+            host: Interface to bind.
+            port: Port to bind (0 picks a free port).
+            workers: Worker threads. Defaults to config 'service.workers'.
+            queue_size: Most queued jobs. Defaults to config 'service.queue_size'.
+            runner: Replaces run_job (for tests).
+
+        Raises:
+            ValueError: If 'service.queue_backend' is not "memory" or "sqlite".
+        """
+        max_size = queue_size or get_config("service.queue_size", DEFAULT_QUEUE_SIZE)
+        backend = get_config("service.queue_backend", "memory")
+        if backend not in QUEUE_BACKENDS:
+            raise ValueError(f"Unknown service.queue_backend '{backend}'. Expected one of {list(QUEUE_BACKENDS)}")
+        if backend == "sqlite":
+            self.jobs = open_job_queue(max_size=max_size)
+        else:
+            self.jobs = JobQueue(max_size=max_size,
+                                 result_ttl=get_config("service.result_ttl_seconds", DEFAULT_RESULT_TTL))
+        self.metrics = ServiceMetrics()
+        pool_options = {"runner": runner} if runner is not None else {}
+        self.pool = WorkerPool(self.jobs, workers or get_config("service.workers", DEFAULT_WORKERS),
+                               self.metrics, **pool_options)
+        self.max_batch = int(get_config("service.max_batch", DEFAULT_MAX_BATCH) or DEFAULT_MAX_BATCH)
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GenerationService":
+        self.pool.start()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="generation-service", daemon=True)
+        self._thread.start()
+        logger.info("Generation service listening on %s with %d workers", self.base_url, self.pool.workers)
+        return self
+
+    def serve_forever(self) -> None:
+        """Runs the service on the calling thread until interrupted."""
+        self.pool.start()
+        logger.info("Generation service listening on %s with %d workers", self.base_url, self.pool.workers)
+        try:
+            self._server.serve_forever()
+        finally:
+            self.pool.stop()
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.pool.stop()
+
+    def __enter__(self) -> "GenerationService":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # --- API ---
+
+    def submit(self, request: Any) -> Tuple[int, Dict[str, Any]]:
+        """Validates and queues one job request; returns (HTTP status, body)."""
+        try:
+            job = self.jobs.submit(parse_job_request(request))
+        except JobValidationError as e:
+            self.metrics.count("rejected")
+            return 400, {"error": str(e)}
+        except QueueFullError as e:
+            self.metrics.count("rejected")
+            return 503, {"error": str(e)}
+        self.metrics.count("submitted")
+        return 202, {"job_id": job.job_id, "status": job.status}
+
+    def submit_batch(self, body: Any) -> Tuple[int, Dict[str, Any]]:
+        requests = body.get("jobs") if isinstance(body, dict) else None
+        if not isinstance(requests, list) or not requests:
+            return 400, {"error": "Expected {\"jobs\": [...]} with at least one job"}
+        if len(requests) > self.max_batch:
+            return 400, {"error": f"At most {self.max_batch} jobs per batch"}
+        results = []
+        for request in requests:
+            status, result = self.submit(request)
+            results.append({**result, "http_status": status} if status != 202 else result)
+        accepted = sum(1 for result in results if "job_id" in result)
+        return (202 if accepted else 503 if all(r["http_status"] == 503 for r in results) else 400), {"jobs": results}
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        snapshot = self.metrics.snapshot(self.jobs.depth(), self.jobs.running(), self.pool.workers)
+        snapshot["queue"] = self.jobs.stats()
+        return snapshot
+
+    def _make_handler(self):
+        service = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                path = urlparse(self.path).path.rstrip("/")
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_BYTES:
+                    # The body is left unread, so the connection cannot carry another request
+                    self.close_connection = True
+                    if length < 0:
+                        self._reply(400, {"error": "Invalid Content-Length"})
+                    else:
+                        self._reply(413, {"error": "Request body too large"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:  # JSONDecodeError, or UnicodeDecodeError for bodies that are not UTF-8
+                    self._reply(400, {"error": "Invalid JSON body"})
+                    return
+                if path == "/jobs":
+                    self._reply(*service.submit(body))
+                elif path == "/jobs/batch":
+                    self._reply(*service.submit_batch(body))
+                else:
+                    self._reply(404, {"error": f"Unknown path {self.path}"})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path.rstrip("/")
+                if path == "/healthz":
+                    self._reply(200, {"status": "ok"})
+                elif path == "/metrics":
+                    self._reply(200, service.metrics_snapshot())
+                elif path == "/jobs":
+                    ids = [i for value in parse_qs(url.query).get("ids", []) for i in value.split(",") if i]
+                    jobs = {job_id: service.jobs.get(job_id) for job_id in ids}
+                    self._reply(200, {"jobs": [job.to_dict() if job else {"job_id": job_id, "status": "unknown"}
+                                               for job_id, job in jobs.items()]})
+                elif path.startswith("/jobs/"):
+                    job = service.jobs.get(path[len("/jobs/"):])
+                    if job is None:
+                        self._reply(404, {"error": "Unknown job"})
+                    else:
+                        self._reply(200, job.to_dict())
+                else:
+                    self._reply(404, {"error": f"Unknown path {self.path}"})
+
+            def _reply(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 503:
+                    self.send_header("Retry-After", "1")
+                if self.close_connection:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("service: " + format, *args)
+
+        return _Handler
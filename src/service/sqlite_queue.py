@@ -0,0 +1,375 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Durable generation job queue in SQLite (WAL).
+#   - Lease-based claiming with visibility timeouts; expired leases are reclaimed.
+#   - Failed jobs are retried with backoff up to max_attempts.
+#   - stats(): job counts, lag and recent throughput across every worker process.
+# - 2026-10-19: Idle polls check for a runnable job with a read before taking the write lock; a failed
+#   COMMIT rolls the transaction back so the connection stays usable.
+
+"""
+Durable generation job queue.
+
+SQLiteJobQueue keeps jobs in a SQLite database (WAL mode) instead of process memory, so a
+large reply campaign survives a crash or restart and can be worked by several local worker
+processes at once. It has the JobQueue interface (submit / claim / finish / get / depth /
+running / stats) and works with WorkerPool and GenerationService unchanged.
+
+Claiming takes a lease: the job is marked running with a lease owner and an expiry
+('service.sqlite.lease_seconds'). A worker that crashes never finishes the job, its lease
+runs out and the next claim hands the job to another worker (the visibility timeout), so
+the lease must be longer than the slowest job. A result from a worker whose lease was
+taken over is discarded. Jobs that fail are queued again after
+'service.sqlite.retry_delay_seconds' (doubling with each attempt) until
+'service.sqlite.max_attempts' attempts have been made, then marked failed.
+
+Only the submitted JSON request is stored; claim() resolves it again with
+parse_job_request(), so queued jobs pick up the current protocol bundles and categories.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.settings import get_config
+from src.service.jobs import (
+    DEFAULT_RESULT_TTL,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    Job,
+    JobValidationError,
+    QueueFullError,
+    parse_job_request,
+)
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = "data/output/jobs.db"
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 5.0
+DEFAULT_POLL_INTERVAL = 0.1
+PURGE_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    submitted_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (status, lease_expires_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+_COLUMNS = ("job_id, job_type, request, status, attempts, submitted_at, lease_owner, "
+            "started_at, finished_at, result, error")
+
+
+class SQLiteJobQueue:
+    """Job queue in a SQLite database, shared by every worker process that opens it."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        max_size: Optional[int] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        result_ttl: Optional[float] = DEFAULT_RESULT_TTL,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            path: Database file (created with its directory if missing).
+            max_size: Most jobs waiting at once; None for no limit.
+            lease_seconds: How long a claimed job stays invisible to other workers.
+            max_attempts: Runs (including lease expiries) before a job is marked failed.
+            retry_delay: Seconds before the first retry; doubles for each later one.
+            result_ttl: Seconds finished jobs are kept; None keeps them.
+            poll_interval: Seconds between checks while claim() waits for a job.
+        """
+        self.path = str(path)
+        self.max_size = int(max_size) if max_size else None
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.result_ttl = float(result_ttl) if result_ttl else None
+        self.poll_interval = max(0.001, float(poll_interval))
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._submitted = threading.Event()  # Wakes local workers waiting in claim()
+        self._last_purge = 0.0
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    # --- Connections ---
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are not shared between threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable across crashes of the process in WAL mode
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """A write transaction, taking the database write lock up front."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    # --- Queue interface ---
+
+    def submit(self, job: Job) -> Job:
+        """
+        Stores a queued job.
+
+        Raises:
+            QueueFullError: If max_size jobs are already waiting.
+        """
+        with self._transaction() as conn:
+            if self.max_size is not None:
+                queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+                if queued >= self.max_size:
+                    raise QueueFullError(f"Job queue is full ({self.max_size} jobs waiting)")
+            conn.execute(
+                "INSERT INTO jobs (job_id, job_type, request, status, submitted_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job.job_id, job.job_type, json.dumps(job.request), JOB_QUEUED, job.submitted_at, job.submitted_at),
+            )
+        self._submitted.set()
+        return job
+
+    def claim(self, timeout: Optional[float] = None) -> Optional[Job]:
+        """
+        Leases the oldest runnable job: a queued one whose retry delay has passed, or a
+        running one whose lease expired. Waits up to timeout seconds (None waits forever).
+
+        Returns:
+            The job with its generation arguments resolved, or None if none became available.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._submitted.clear()
+            row = self._lease_next()
+            if row is not None:
+                job = self._resolve(row)
+                if job is not None:
+                    return job
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._submitted.wait(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+    def _has_runnable(self, now: float) -> bool:
+        """Read-only check for a claimable job; WAL readers never wait for the write lock."""
+        conn = self._connection()
+        return (conn.execute("SELECT 1 FROM jobs WHERE status = ? AND available_at <= ? LIMIT 1",
+                             (JOB_QUEUED, now)).fetchone() is not None
+                or conn.execute("SELECT 1 FROM jobs WHERE status = ? AND lease_expires_at < ? LIMIT 1",
+                                (JOB_RUNNING, now)).fetchone() is not None)
+
+    def _lease_next(self) -> Optional[sqlite3.Row]:
+        now = time.time()
+        if not self._has_runnable(now):
+            return None  # Idle polls from every worker would otherwise serialize on the write lock
+        owner = f"{os.getpid()}:{threading.current_thread().name}:{uuid.uuid4().hex[:8]}"
+        with self._transaction() as conn:
+            # Expired leases that used up their attempts are given up on rather than reclaimed
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, lease_owner = NULL, "
+                "error = COALESCE(error, 'Lease expired ' || attempts || ' times') "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (JOB_FAILED, now, JOB_RUNNING, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? AND lease_expires_at < ? ORDER BY lease_expires_at LIMIT 1",
+                (JOB_RUNNING, now),
+            ).fetchone()
+            if row is not None:
+                logger.warning("Lease on job %s expired; reclaiming it", row["job_id"])
+            else:
+                row = conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? AND available_at <= ? ORDER BY available_at LIMIT 1",
+                    (JOB_QUEUED, now),
+                ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?, "
+                "started_at = ? WHERE job_id = ?",
+                (JOB_RUNNING, owner, now + self.lease_seconds, now, row["job_id"]),
+            )
+            return conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+
+    def _resolve(self, row: sqlite3.Row) -> Optional[Job]:
+        """The leased row as a runnable Job; a request that no longer validates fails the job."""
+        job = self._row_to_job(row)
+        try:
+            job.kwargs = parse_job_request(job.request, job_id=job.job_id).kwargs
+        except JobValidationError as e:
+            logger.error("Job %s can no longer run: %s", job.job_id, e)
+            self._record(job, JOB_FAILED, error=str(e))
+            return None
+        return job
+
+    def finish(self, job: Job, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """
+        Records a job's outcome. A failed job with attempts left is queued again after its
+        retry delay. Ignored (job.status stays running) if the job's lease was taken over.
+        """
+        if error is not None and job.attempts < self.max_attempts:
+            delay = self.retry_delay * 2 ** (job.attempts - 1)
+            logger.info("Job %s failed (attempt %d of %d); retrying in %.1fs",
+                        job.job_id, job.attempts, self.max_attempts, delay)
+            self._record(job, JOB_QUEUED, error=error, available_at=time.time() + delay)
+        else:
+            self._record(job, JOB_FAILED if error is not None else JOB_DONE, result=result, error=error)
+        self._purge()
+
+    def _record(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None, available_at: Optional[float] = None) -> None:
+        now = time.time()
+        finished_at = now if status in (JOB_DONE, JOB_FAILED) else None
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "available_at = COALESCE(?, available_at), lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE job_id = ? AND lease_owner = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, finished_at,
+                 available_at, job.job_id, job.lease_owner),
+            ).rowcount
+        if not updated:
+            logger.warning("Lease on job %s was lost; discarding this attempt's outcome", job.job_id)
+            return
+        job.status, job.result, job.error, job.finished_at = status, result, error, finished_at
+        if status == JOB_QUEUED:
+            self._submitted.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute(f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def depth(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+
+    def running(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_expires_at >= ?", (JOB_RUNNING, time.time())
+        ).fetchone()[0]
+
+    def stats(self, window_seconds: float = 60.0) -> Dict[str, Any]:
+        """
+        Queue state across every process using the database.
+
+        Returns:
+            backend, job counts by status, retrying (queued after a failure), expired_leases,
+            lag_seconds (age of the oldest runnable queued job), finished_recently and
+            throughput_per_second over the last window_seconds.
+        """
+        now = time.time()
+        conn = self._connection()
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+        counts.update(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        retrying = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND attempts > 0",
+                                (JOB_QUEUED,)).fetchone()[0]
+        expired = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_expires_at < ?",
+                               (JOB_RUNNING, now)).fetchone()[0]
+        oldest = conn.execute("SELECT MIN(submitted_at) FROM jobs WHERE status = ? AND available_at <= ?",
+                              (JOB_QUEUED, now)).fetchone()[0]
+        recent = conn.execute("SELECT COUNT(*) FROM jobs WHERE finished_at >= ?", (now - window_seconds,)).fetchone()[0]
+        return {
+            "backend": "sqlite",
+            **counts,
+            "retrying": retrying,
+            "expired_leases": expired,
+            "lag_seconds": now - oldest if oldest is not None else 0.0,
+            "finished_recently": recent,
+            "throughput_per_second": recent / window_seconds,
+        }
+
+    # --- Helpers ---
+
+    def _purge(self) -> None:
+        """Deletes finished jobs older than result_ttl (at most once per PURGE_INTERVAL)."""
+        now = time.time()
+        if self.result_ttl is None or now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.result_ttl,))
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            job_type=row["job_type"],
+            request=json.loads(row["request"]),
+            status=row["status"],
+            submitted_at=row["submitted_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            attempts=row["attempts"],
+            lease_owner=row["lease_owner"],
+        )
+
+
+def open_job_queue(path: Optional[str] = None, max_size: Optional[int] = None) -> SQLiteJobQueue:
+    """
+    Opens the durable job queue configured under 'service.sqlite'.
+
+    Args:
+        path: Database file. Defaults to config 'service.sqlite.path'.
+        max_size: Most jobs waiting at once; None for no limit.
+    """
+    return SQLiteJobQueue(
+        path=path or get_config("service.sqlite.path", DEFAULT_DB_PATH),
+        max_size=max_size,
+        lease_seconds=get_config("service.sqlite.lease_seconds", DEFAULT_LEASE_SECONDS),
+        max_attempts=get_config("service.sqlite.max_attempts", DEFAULT_MAX_ATTEMPTS),
+        retry_delay=get_config("service.sqlite.retry_delay_seconds", DEFAULT_RETRY_DELAY),
+        result_ttl=get_config("service.result_ttl_seconds", DEFAULT_RESULT_TTL),
+    )
@@ -6,6 +6,9 @@
 # 2025-05-08 01:15 - User Request - Fix ImportError for TWEET_CATEGORIES, ensure use of load_tweet_categories.
 # 2025-05-08 HH:MM - Bugfix - Remove references to non-existent response.error attribute.
 # 2025-05-19 12:50 - Step 25 - Added support for interaction modes.
+# 2026-10-19 - Categories and their JSON path follow config changes (data_paths.input, default_protocol).
+# 2026-10-19 - Suggest categories for the entered topic from the cached CategoryCatalog.
+# 2026-10-19 - Poster images render in the background; shown via poster_image() with a status check.
 
 """
 UI for generating new tweets based on categories.
@@ -25,15 +28,15 @@ import time # For unique keys if needed, though st.session_state is better
 from datetime import datetime, timezone
 import os # IMPORT OS HERE for os.path.exists
 
-from src.models.category import TweetCategory, load_categories
+from src.models.category import TweetCategory, get_category_catalog, load_categories
 from src.models.account import Account, AccountType
 from src.models.response import AIResponse
 from src.ai.response_generator import generate_new_tweet
 # from src.ai.prompt_engineering import TWEET_CATEGORIES # REMOVE THIS LINE - Causes ImportError
-from src.ui.components import status_badge, copy_button # Reusing components
+from src.ui.components import status_badge, copy_button, poster_image # Reusing components
 from src.utils.logging import get_logger
 from src.utils.error_handling import APIError # IMPORT APIError
-from src.config.settings import get_config # Added
+from src.config.settings import get_config, subscribe # Added
 
 logger = get_logger(__name__)
 
@@ -45,9 +48,21 @@ logger.info(f"Categories JSON path set to: {DATA_CATEGORIES_PATH}")
 # if the list of categories is static during the app's runtime.
 AVAILABLE_CATEGORIES: List[TweetCategory] = load_categories()
 
+def _on_config_change(changes: Dict[str, Any]) -> None:
+    """Re-resolves the categories path and reloads categories when their config keys change."""
+    global DATA_CATEGORIES_PATH, AVAILABLE_CATEGORIES
+    if "data_paths.input" in changes:
+        DATA_CATEGORIES_PATH = get_config("data_paths.input", "data/input") + "/categories.json"
+        logger.info(f"Categories JSON path set to: {DATA_CATEGORIES_PATH}")
+    if "default_protocol" in changes:
+        AVAILABLE_CATEGORIES = load_categories()
+
+subscribe(("data_paths.input", "default_protocol"), _on_config_change)
+
 @st.cache_data(ttl=3600) # Cache for 1 hour to avoid frequent reloads
-def load_tweet_categories(file_path: str = DATA_CATEGORIES_PATH) -> List[TweetCategory]:
-    """Loads tweet categories from the specified JSON file."""
+def load_tweet_categories(file_path: Optional[str] = None) -> List[TweetCategory]:
+    """Loads tweet categories from the specified JSON file (default: DATA_CATEGORIES_PATH)."""
+    file_path = file_path or DATA_CATEGORIES_PATH
     logger.info(f"Attempting to load tweet categories from: {file_path}")
     categories: List[TweetCategory] = []
     try:
@@ -156,6 +171,10 @@ def display_category_tweet_ui(active_account_type: AccountType, interaction_mode
         key="new_tweet_topic_input",
         height=100
     )
+    if topic_brief.strip():
+        suggestions = get_category_catalog().suggest_categories(topic_brief, k=3)
+        if suggestions:
+            st.caption("Suggested categories: " + ", ".join(s.category.name for s in suggestions))
 
     # Option to generate a poster image
     generate_image = st.checkbox("Generate Poster Image", key="generate_image_new_tweet")
@@ -265,14 +284,8 @@ def display_category_tweet_ui(active_account_type: AccountType, interaction_mode
         if st.session_state.get("generated_new_tweet_model"):
             st.caption(f"Generated using: {st.session_state.generated_new_tweet_model}")
         
-        # Display generated poster image if available
-        if "full_new_tweet_response" in st.session_state and hasattr(st.session_state.full_new_tweet_response, 'image_url') and st.session_state.full_new_tweet_response.image_url:
-            st.markdown("**Generated Poster Image:**")
-            st.image(st.session_state.full_new_tweet_response.image_url, caption="Poster Image")
-            copy_button(st.session_state.full_new_tweet_response.image_url, "Copy Image URL")
-        elif generate_image:  # Check if image was requested but not generated
-            logger.warning("Image was requested, but no image_url found in full response.")
-            st.warning("Poster image was requested but could not be generated or found.")
+        # Display generated poster image, or its rendering status while the image job runs
+        poster_image(st.session_state.get("full_new_tweet_response"), generate_image, key="new_tweet")
         
         # Add debug information in an expandable section
         if "full_new_tweet_response" in st.session_state:
@@ -1,5 +1,6 @@
 # Changelog:
 # 2025-05-07 21:05 - Step 14.1 - Created UI components file with placeholder and basic utility components.
+# 2026-10-19 - Added poster_image() to show background-rendered poster images and poll their jobs.
 
 """
 UI Components for YieldFi AI Agent.
@@ -112,6 +113,32 @@ def copy_button(text: str, button_text: str = "Copy"):
         unsafe_allow_html=True
     )
 
+def poster_image(response: Any, requested: bool, key: str):
+    """
+    Display a response's poster image, or the state of its background image job.
+
+    Args:
+        response: The AIResponse (image_url and extra_context['image_job_id'] are read)
+        requested: Whether the user asked for an image
+        key: Unique widget key prefix
+    """
+    from src.ai.image_generation import JOB_FAILED, get_image_job
+
+    image_url = getattr(response, 'image_url', None) if response else None
+    if image_url:
+        st.markdown("**Generated Poster Image:**")
+        st.image(image_url, caption="Poster Image")
+        copy_button(image_url, "Copy Image URL")
+        return
+    job_id = (getattr(response, 'extra_context', None) or {}).get('image_job_id') if response else None
+    job = get_image_job(job_id) if job_id else None
+    if job is not None and not job.done():
+        st.info(f"🎨 Poster image is rendering (job {job.job_id}, {job.status})...")
+        if st.button("Check image", key=f"{key}_check_image"):
+            st.rerun()
+    elif requested or (job is not None and job.status == JOB_FAILED):
+        st.warning("Poster image was requested but could not be generated or found.")
+
 # Example usage in __main__ for testing
 if __name__ == "__main__":
     st.set_page_config(page_title="UI Components Test", layout="wide")
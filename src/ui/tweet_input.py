@@ -2,6 +2,7 @@
 # 2025-05-07 21:10 - Step 15.1 - Implemented tweet input interface UI.
 # 2025-05-07 21:20 - Step 15.2 - Added target account metadata inputs and integration into reply generation.
 # 2025-05-19 12:45 - Step 25 - Added support for interaction modes.
+# 2026-10-19 - Poster images render in the background; shown via poster_image() with a status check.
 
 from typing import Optional
 import streamlit as st
@@ -12,7 +13,7 @@ from src.data_sources.mock import MockTweetDataSource
 from src.ai.response_generator import generate_tweet_reply
 from src.models.tweet import Tweet
 from src.models.account import Account, AccountType
-from src.ui.components import status_badge, collapsible_container, copy_button
+from src.ui.components import status_badge, collapsible_container, copy_button, poster_image
 from src.utils.logging import get_logger
 
 # Initialize logger
@@ -224,15 +225,8 @@ def display_tweet_reply_ui(active_account_type: AccountType, interaction_mode: s
             # Add copy button for easy copying
             copy_button(generated_content, "Copy Tweet")
 
-        # Display generated poster image if available
-        if hasattr(st.session_state, 'full_ai_response') and st.session_state.full_ai_response and hasattr(st.session_state.full_ai_response, 'image_url') and st.session_state.full_ai_response.image_url:
-            logger.info(f"Displaying poster image. URL: {st.session_state.full_ai_response.image_url}")
-            st.markdown("**Generated Poster Image:**")
-            st.image(st.session_state.full_ai_response.image_url, caption="Poster Image")
-            copy_button(st.session_state.full_ai_response.image_url, "Copy Image URL") # Updated button text
-        elif generate_image: # Check if image was requested but not generated
-             logger.warning("Image was requested, but no image_url found in session state.")
-             st.warning("Poster image was requested but could not be generated or found.")
+        # Display generated poster image, or its rendering status while the image job runs
+        poster_image(st.session_state.get('full_ai_response'), generate_image, key="reply")
 
         # Add debug information in an expandable section
         with st.expander("Debug Information", expanded=False):
@@ -1,18 +1,59 @@
+# Changelog:
+# 2026-10-19 - Queue-based handlers (QueueHandler/QueueListener) and sampled full-prompt logging.
+
 """
 Logging utilities for the YieldFi AI Agent.
 
 This module provides functions for setting up and managing application logging.
+
+Request threads only put records on a queue (QueueHandler); a QueueListener thread writes
+them to the log file and console, so disk and terminal I/O stay off the request path.
+Set 'logging.queue: false' to attach the handlers directly instead.
+
+Hot-path code logs with lazy %-style arguments, so disabled levels cost no formatting, and
+uses log_sampled_prompt() to log full prompts for only 1 in 'logging.prompt_sample_every'
+calls.
 """
 
+import atexit
+import itertools
 import os
 import logging
+import queue
 import datetime # Added for timestamp
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
-from src.config.settings import get_config
+from src.config.settings import get_config, subscribe
 
 LOG_DIRECTORY = "logs" # Define a constant for the logs directory
 
+DEFAULT_PROMPT_SAMPLE_EVERY = 100
+
+_LISTENER: Optional[QueueListener] = None
+_PROMPT_SAMPLE_EVERY = int(get_config('logging.prompt_sample_every', DEFAULT_PROMPT_SAMPLE_EVERY) or 0)
+_PROMPT_COUNTER = itertools.count()
+
+
+def _on_config_change(changes: Dict[str, Any]) -> None:
+    """Follows logging.prompt_sample_every when the configuration changes."""
+    global _PROMPT_SAMPLE_EVERY
+    _PROMPT_SAMPLE_EVERY = int(get_config('logging.prompt_sample_every', DEFAULT_PROMPT_SAMPLE_EVERY) or 0)
+
+
+subscribe('logging.prompt_sample_every', _on_config_change)
+
+
+def stop_log_listener() -> None:
+    """Stops the queue listener (flushing queued records), if one is running."""
+    global _LISTENER
+    listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        listener.stop()
+
+
+atexit.register(stop_log_listener)
+
 def setup_logging() -> None:
     """Set up logging for the application.
     
@@ -41,6 +82,7 @@ def setup_logging() -> None:
     root_logger.setLevel(log_level) # Set level on root logger
     
     # Clear existing handlers from root logger (if any, to avoid duplication during re-runs/hot reloads)
+    stop_log_listener()
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
 
@@ -50,7 +92,6 @@ def setup_logging() -> None:
     file_handler = logging.FileHandler(log_file_path)
     file_handler.setLevel(log_level) # Set level for file handler
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
     
     # Stream Handler (Console)
     stream_handler = logging.StreamHandler()
@@ -59,7 +100,17 @@ def setup_logging() -> None:
     console_log_level = getattr(logging, console_log_level_str.upper(), log_level)
     stream_handler.setLevel(console_log_level)
     stream_handler.setFormatter(formatter) # Can use a simpler formatter for console if desired
-    root_logger.addHandler(stream_handler)
+
+    if get_config('logging.queue', True):
+        # Request threads only enqueue; the listener thread does the writes
+        global _LISTENER
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root_logger.addHandler(QueueHandler(log_queue))
+        _LISTENER = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+        _LISTENER.start()
+    else:
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(stream_handler)
     
     # Set lower log level for external libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -86,4 +137,27 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     
     # Prepend the application name to the logger name
     app_name = get_config('app.name', 'YieldFi AI Agent').replace(' ', '_').lower()
-    return logging.getLogger(f"{app_name}.{name}") 
\ No newline at end of file
+    return logging.getLogger(f"{app_name}.{name}")
+
+
+def log_sampled_prompt(logger: logging.Logger, label: str, prompt: str) -> bool:
+    """
+    Logs a full prompt at INFO for 1 in 'logging.prompt_sample_every' calls (0 disables).
+
+    The counter is shared by all callers, so the sample rate is per process rather than per call site.
+
+    Args:
+        logger: Logger to write to.
+        label: What the prompt is for (e.g. "xAI completion").
+        prompt: The prompt text.
+
+    Returns:
+        True if this prompt was logged.
+    """
+    every = _PROMPT_SAMPLE_EVERY
+    if every <= 0 or not logger.isEnabledFor(logging.INFO):
+        return False
+    if next(_PROMPT_COUNTER) % every:
+        return False
+    logger.info("Sampled full %s prompt (1 in %d, %d chars):\n%s", label, every, len(prompt), prompt)
+    return True
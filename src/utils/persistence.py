@@ -1,11 +1,26 @@
 """
 Persistence utilities for saving generated AI responses.
+
+Every save rewrites the whole replies file, so saves are serialized: generation runs on
+several worker threads (and image jobs update saved records from theirs), and the durable
+job queue runs several worker processes. A module lock orders the threads and, where fcntl
+is available, a lock on the output directory orders the processes.
 """
 import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still serialized
+    fcntl = None
 
-from src.config.settings import get_config
+from src.config.settings import get_config, subscribe
 from src.models.response import AIResponse
 import logging
 
@@ -15,6 +30,35 @@ logger = logging.getLogger(__name__)
 OUTPUT_DIR = Path(get_config('data_paths.output', 'data/output'))
 # Use a fixed file name; could make configurable
 GENERATED_FILE = OUTPUT_DIR / 'replies_to_tweets.json'
+# Serializes the read-modify-write of GENERATED_FILE between threads
+_FILE_LOCK = threading.Lock()
+
+
+def _refresh_output_paths(changes: Dict[str, Any]) -> None:
+    """Follows data_paths.output when the configuration changes."""
+    global OUTPUT_DIR, GENERATED_FILE
+    OUTPUT_DIR = Path(get_config('data_paths.output', 'data/output'))
+    GENERATED_FILE = OUTPUT_DIR / 'replies_to_tweets.json'
+
+
+subscribe('data_paths.output', _refresh_output_paths)
+
+
+@contextmanager
+def _locked_file() -> Iterator[None]:
+    """Holds GENERATED_FILE for a read-modify-write, against other threads and processes."""
+    with _FILE_LOCK:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        # The file itself is replaced on every write, so the lock is taken on its directory
+        dir_fd = os.open(OUTPUT_DIR, os.O_RDONLY)
+        try:
+            fcntl.flock(dir_fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(dir_fd)  # Releases the lock
 
 
 def save_response(
@@ -29,63 +73,100 @@ def save_response(
         metadata: A dict of metadata about the generation (e.g., original input, mode, responding_as, target_account).
     """
     try:
-        # Ensure output directory exists
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        
         # Prepare the new entry
         entry: Dict[str, Any] = {
             'saved_at': response.generation_time.isoformat(),
             'metadata': metadata,
             'response': response.to_dict()
         }
-        
-        # If file doesn't exist, create a new list
-        if not GENERATED_FILE.exists():
-            logger.info(f"Creating new file: {GENERATED_FILE}")
-            with open(GENERATED_FILE, 'w') as f:
-                json.dump([entry], f, indent=2)
-            logger.info(f"Created generated tweets file and saved entry: {GENERATED_FILE}")
-            return
-            
-        # Load existing data
-        try:
-            with open(GENERATED_FILE, 'r') as f:
-                try:
-                    data = json.load(f)
-                    # Verify it's a list
-                    if not isinstance(data, list):
-                        logger.warning(f"File {GENERATED_FILE} doesn't contain a valid list, resetting to empty list")
-                        data = []
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Could not decode JSON from {GENERATED_FILE}: {e}. Resetting to empty list.")
+        with _locked_file():
+            _append_entry(entry)
+    except Exception as e:
+        logger.error(f"Failed to save response to {GENERATED_FILE}: {e}", exc_info=True)
+
+
+def _append_entry(entry: Dict[str, Any]) -> None:
+    """Adds an entry to GENERATED_FILE (the caller holds _locked_file())."""
+    # If file doesn't exist, create a new list
+    if not GENERATED_FILE.exists():
+        logger.info(f"Creating new file: {GENERATED_FILE}")
+        with open(GENERATED_FILE, 'w') as f:
+            json.dump([entry], f, indent=2)
+        logger.info(f"Created generated tweets file and saved entry: {GENERATED_FILE}")
+        return
+
+    # Load existing data and append new entry
+    data = _read_entries()
+    data.append(entry)
+    _write_entries(data)
+    logger.info(f"Successfully saved response to {GENERATED_FILE} (now contains {len(data)} entries)")
+
+
+def update_saved_image_url(image_job_id: str, image_url: Optional[str]) -> int:
+    """
+    Sets image_url on saved responses whose image job has finished.
+
+    Responses are saved before their background image is ready; this fills the URL in
+    afterwards. Every record of the job is updated (identical image prompts share a job).
+
+    Args:
+        image_job_id: The job id recorded in the response's extra_context["image_job_id"].
+        image_url: The finished job's URL.
+
+    Returns:
+        The number of records updated.
+    """
+    if not image_url or not GENERATED_FILE.exists():
+        return 0
+    try:
+        with _locked_file():
+            data = _read_entries()
+            updated = 0
+            for entry in data:
+                saved = entry.get('response') if isinstance(entry, dict) else None
+                if isinstance(saved, dict) and (saved.get('extra_context') or {}).get('image_job_id') == image_job_id:
+                    saved['image_url'] = image_url
+                    updated += 1
+            if updated:
+                _write_entries(data)
+        return updated
+    except Exception as e:
+        logger.error("Failed to save image URL for job %s to %s: %s", image_job_id, GENERATED_FILE, e, exc_info=True)
+        return 0
+
+
+def _read_entries() -> List[Any]:
+    """The saved entries, or an empty list if the file is unreadable or not a list."""
+    try:
+        with open(GENERATED_FILE, 'r') as f:
+            try:
+                data = json.load(f)
+                # Verify it's a list
+                if not isinstance(data, list):
+                    logger.warning(f"File {GENERATED_FILE} doesn't contain a valid list, resetting to empty list")
                     data = []
-        except Exception as e:
-            logger.error(f"Error reading {GENERATED_FILE}: {e}")
-            data = []
-                
-        # Append new entry
-        data.append(entry)
-        
-        # Write back to file - use a temporary file to prevent corruption if process is interrupted
-        import tempfile
-        import os
-        import shutil
+            except json.JSONDecodeError as e:
+                logger.warning(f"Could not decode JSON from {GENERATED_FILE}: {e}. Resetting to empty list.")
+                data = []
+    except Exception as e:
+        logger.error(f"Error reading {GENERATED_FILE}: {e}")
+        data = []
+    return data
+
+
+def _write_entries(data: List[Any]) -> None:
+    """Replaces the saved entries, through a temporary file so an interrupted write cannot corrupt them."""
+    temp_fd, temp_path = tempfile.mkstemp(prefix='tweets_', suffix='.json', dir=OUTPUT_DIR)
+    try:
+        # Write to temp file first
+        with os.fdopen(temp_fd, 'w') as temp_file:
+            json.dump(data, temp_file, indent=2)
         
-        temp_fd, temp_path = tempfile.mkstemp(prefix='tweets_', suffix='.json', dir=OUTPUT_DIR)
-        try:
-            # Write to temp file first
-            with os.fdopen(temp_fd, 'w') as temp_file:
-                json.dump(data, temp_file, indent=2)
-            
-            # Replace original file with temp file
-            shutil.move(temp_path, GENERATED_FILE)
-            logger.info(f"Successfully saved response to {GENERATED_FILE} (now contains {len(data)} entries)")
-        except Exception as e:
-            logger.error(f"Error writing to temporary file {temp_path}: {e}")
-            # Try to clean up temp file if it still exists
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            raise
-            
+        # Replace original file with temp file
+        shutil.move(temp_path, GENERATED_FILE)
     except Exception as e:
-        logger.error(f"Failed to save response to {GENERATED_FILE}: {e}", exc_info=True) 
\ No newline at end of file
+        logger.error(f"Error writing to temporary file {temp_path}: {e}")
+        # Try to clean up temp file if it still exists
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,339 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Per-stage timing spans for the generation pipeline.
+#   - start_trace()/finish_trace() bracket one generation; span()/timed() time its stages.
+#   - Stage durations aggregate into in-process histograms (Prometheus text export).
+#   - Finished traces can be appended to a JSONL trace file.
+# - 2026-10-19: write_trace() logs write failures with lazy %-style arguments.
+
+"""
+Stage timing for the generation pipeline.
+
+generate_tweet_reply / generate_new_tweet open a trace per call with start_trace() and
+time each stage (tone, knowledge, facts, prompt, completion, clean, image, persist) with
+span() or the timed() decorator. The trace's per-stage milliseconds are stored on
+AIResponse.extra_context["stage_timings_ms"]; finish_trace() adds them to the process-wide
+StageMetrics histograms and, if 'tracing.trace_file' is set, appends one JSON line.
+
+Tracing is off unless config 'tracing.enabled' is true. When it is off start_trace()
+returns None and span() returns a shared no-op context manager, so an instrumented stage
+costs one context variable lookup. The current trace lives in a ContextVar: each worker
+thread (and asyncio task) sees only its own trace.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config.settings import get_config, subscribe
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                                      1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_METRIC = "generation_stage_duration_seconds"
+TOTAL_METRIC = "generation_duration_seconds"
+
+_TRACING_ENABLED = bool(get_config("tracing.enabled", False))
+_TRACE_FILE: Optional[str] = get_config("tracing.trace_file")
+
+_CURRENT: ContextVar[Optional["StageTrace"]] = ContextVar("generation_trace", default=None)
+
+
+def _on_config_change(changes: Dict[str, Any]) -> None:
+    """Follows tracing.enabled / tracing.trace_file when the configuration changes."""
+    global _TRACING_ENABLED, _TRACE_FILE
+    _TRACING_ENABLED = bool(get_config("tracing.enabled", False))
+    _TRACE_FILE = get_config("tracing.trace_file")
+
+
+subscribe("tracing", _on_config_change)
+
+
+def tracing_enabled() -> bool:
+    return _TRACING_ENABLED
+
+
+class _NoopSpan:
+    """Returned by span() when no trace is active."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "start")
+
+    def __init__(self, trace: "StageTrace", stage: str):
+        self.trace = trace
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.trace.add(self.stage, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class StageTrace:
+    """Stage durations of one generation call."""
+    __slots__ = ("trace_id", "operation", "attributes", "stages", "started_at", "duration_ms", "_start", "_token")
+
+    def __init__(self, operation: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.operation = operation
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.stages: Dict[str, float] = {}  # stage -> milliseconds; repeated stages accumulate
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        self._token = None
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def add(self, stage: str, elapsed_ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + elapsed_ms
+
+    def to_record(self) -> Dict[str, Any]:
+        """The JSONL trace record."""
+        return {
+            "trace_id": self.trace_id,
+            "operation": self.operation,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "stages_ms": dict(self.stages),
+            **self.attributes,
+        }
+
+
+class Histogram:
+    """Cumulative-bucket histogram (not thread-safe on its own; StageMetrics locks around it)."""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le label, cumulative count) pairs, ending with '+Inf'."""
+        pairs = []
+        running = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            pairs.append(("+Inf" if bound == float("inf") else repr(bound), running))
+        return pairs
+
+
+class StageMetrics:
+    """Process-wide stage and total duration histograms, keyed by operation."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages: Dict[Tuple[str, str], Histogram] = {}
+        self._totals: Dict[str, Histogram] = {}
+
+    def observe_trace(self, trace: StageTrace) -> None:
+        with self._lock:
+            for stage, elapsed_ms in trace.stages.items():
+                histogram = self._stages.get((trace.operation, stage))
+                if histogram is None:
+                    histogram = self._stages[(trace.operation, stage)] = Histogram(self.buckets)
+                histogram.observe(elapsed_ms / 1000.0)
+            if trace.duration_ms is not None:
+                total = self._totals.get(trace.operation)
+                if total is None:
+                    total = self._totals[trace.operation] = Histogram(self.buckets)
+                total.observe(trace.duration_ms / 1000.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{operation: {stage: {count, sum_seconds, buckets}}}; the total is under stage 'total'."""
+        with self._lock:
+            entries = [((operation, stage), h) for (operation, stage), h in self._stages.items()]
+            entries += [((operation, "total"), h) for operation, h in self._totals.items()]
+            result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (operation, stage), histogram in entries:
+                result.setdefault(operation, {})[stage] = {
+                    "count": histogram.count,
+                    "sum_seconds": histogram.sum,
+                    "buckets": dict(histogram.cumulative()),
+                }
+        return result
+
+    def render_prometheus(self) -> str:
+        """The histograms in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            sections = (
+                (STAGE_METRIC, "Time spent in each generation stage.",
+                 [({"operation": op, "stage": stage}, h) for (op, stage), h in sorted(self._stages.items())]),
+                (TOTAL_METRIC, "End-to-end generation time.",
+                 [({"operation": op}, h) for op, h in sorted(self._totals.items())]),
+            )
+            for name, help_text, series in sections:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series:
+                    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+                    for le, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{label_text},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{label_text}}} {histogram.sum!r}")
+                    lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages = {}
+            self._totals = {}
+
+
+_METRICS = StageMetrics()
+_TRACE_FILE_LOCK = threading.Lock()
+
+
+def get_stage_metrics() -> StageMetrics:
+    return _METRICS
+
+
+def start_trace(operation: str, **attributes: Any) -> Optional[StageTrace]:
+    """
+    Opens a trace for one generation call and makes it current.
+
+    Args:
+        operation: Pipeline name ("reply", "new_tweet").
+        **attributes: Extra fields for the JSONL record (interaction mode, protocol, ...).
+
+    Returns:
+        The trace, or None when tracing is disabled.
+    """
+    if not _TRACING_ENABLED:
+        return None
+    trace = StageTrace(operation, attributes)
+    trace._token = _CURRENT.set(trace)
+    return trace
+
+
+def finish_trace(trace: Optional[StageTrace], **attributes: Any) -> None:
+    """
+    Closes a trace: records its histograms and appends it to the trace file if one is configured.
+
+    Args:
+        trace: The value returned by start_trace() (None is ignored).
+        **attributes: Fields known only at the end (e.g. the error message).
+    """
+    if trace is None:
+        return
+    trace.duration_ms = (time.perf_counter() - trace._start) * 1000.0
+    trace.attributes.update(attributes)
+    try:
+        _CURRENT.reset(trace._token)
+    except ValueError:  # Finished from another context
+        _CURRENT.set(None)
+    _METRICS.observe_trace(trace)
+    if _TRACE_FILE:
+        write_trace(trace, _TRACE_FILE)
+
+
+def current_trace() -> Optional[StageTrace]:
+    return _CURRENT.get()
+
+
+def span(stage: str):
+    """
+    Times a block as `stage` of the current trace.
+
+    Usage:
+        with span("knowledge"):
+            snippet = retriever.get_relevant_knowledge(text)
+
+    Without a current trace this returns a shared no-op context manager.
+    """
+    trace = _CURRENT.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, stage)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator form of span(): every call of the function is timed as `stage`."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _CURRENT.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(stage, (time.perf_counter() - start) * 1000.0)
+        return wrapper
+    return decorator
+
+
+def stage_timings(trace: Optional[StageTrace]) -> Dict[str, Any]:
+    """
+    extra_context entry for a trace.
+
+    The returned dict shares the trace's stage dict, so stages that finish after the
+    AIResponse is built (image, persist) still show up on it. Empty when tracing is off.
+    """
+    if trace is None:
+        return {}
+    return {"trace_id": trace.trace_id, "stage_timings_ms": trace.stages}
+
+
+def write_trace(trace: StageTrace, path: str) -> None:
+    """Appends one trace as a JSON line. Errors are logged, never raised."""
+    line = json.dumps(trace.to_record(), default=str)
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _TRACE_FILE_LOCK:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning("Could not write trace to %s: %s", path, e)
+
+
+def export_prometheus(path: str) -> None:
+    """Writes the current histograms to `path` (replacing it) in Prometheus text format."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_METRICS.render_prometheus())
+    os.replace(tmp_path, path)
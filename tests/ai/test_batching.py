@@ -0,0 +1,145 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for multi-prompt completions and the completion micro-batcher.
+# - 2026-10-19: Clients that cannot batch bypass the batcher.
+# - 2026-10-19: A batch response that is not a JSON object raises APIError.
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from src.ai.batching import CompletionBatcher
+from src.ai.xai_client import XAIClient, split_batch_response
+from src.evaluation.llm_stub import StubConfig, StubLLMServer
+from src.utils.error_handling import APIError
+
+
+def _client(**attributes):
+    defaults = dict(xai_base_url="http://stub", xai_api_key="key", use_fallback=False, xai_model="grok-test",
+                    default_temperature=0.7, supports_batching=True)
+    return mock.MagicMock(**{**defaults, **attributes})
+
+
+class TestSplitBatchResponse(unittest.TestCase):
+
+    def test_demultiplexes_by_index(self):
+        raw = {"id": "cmpl-1", "model": "grok", "usage": {"total_tokens": 9},
+               "choices": [{"index": 2, "text": "c"}, {"index": 0, "text": "a"}]}
+        parts = split_batch_response(raw, 3)
+        self.assertEqual([p["choices"] for p in parts],
+                         [[{"index": 0, "text": "a"}], [], [{"index": 0, "text": "c"}]])
+        self.assertEqual(parts[2]["id"], "cmpl-1")
+        self.assertEqual(parts[2]["batch"], {"size": 3, "index": 2, "usage": {"total_tokens": 9}})
+        self.assertNotIn("usage", parts[0])
+
+    def test_several_choices_per_prompt(self):
+        raw = {"choices": [{"index": i, "text": str(i)} for i in range(4)]}
+        parts = split_batch_response(raw, 2, choices_per_prompt=2)
+        self.assertEqual([[c["text"] for c in p["choices"]] for p in parts], [["0", "1"], ["2", "3"]])
+        self.assertEqual([c["index"] for c in parts[1]["choices"]], [0, 1])
+
+
+class TestGetCompletions(unittest.TestCase):
+
+    def test_one_request_for_all_prompts(self):
+        config = StubConfig(latency_distribution="fixed", latency_ms=0,
+                            replies=[("alpha", "Reply A"), ("beta", "Reply B")])
+        with StubLLMServer(config) as stub:
+            client = XAIClient(api_key="key")
+            client.use_fallback = False
+            client.xai_base_url = stub.base_url
+            results = client.get_completions(["about beta", "about alpha"], max_tokens=50)
+            self.assertEqual(stub.stats()["requests"], 1)
+        self.assertEqual([r["choices"][0]["text"] for r in results], ["Reply B", "Reply A"])
+
+    def test_non_object_response_raises_api_error(self):
+        client = XAIClient(api_key="key")
+        client.use_fallback = False
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = [{"text": "a"}, {"text": "b"}]
+        with mock.patch("src.ai.xai_client.requests.post", return_value=response):
+            with self.assertRaises(APIError) as raised:
+                client.get_completions(["a", "b"])
+        self.assertEqual(raised.exception.status_code, 502)
+
+    def test_supports_batching(self):
+        client = XAIClient(api_key="key")
+        client.use_fallback = False
+        self.assertTrue(client.supports_batching)
+        client.use_fallback = True
+        self.assertFalse(client.supports_batching)
+        client.use_fallback, client.xai_api_key = False, None
+        self.assertFalse(client.supports_batching)
+
+    def test_single_prompt_uses_get_completion(self):
+        client = XAIClient(api_key="key")
+        with mock.patch.object(client, "get_completion", return_value={"choices": [{"text": "gm"}]}) as single:
+            self.assertEqual(client.get_completions(["Say gm"]), [{"choices": [{"text": "gm"}]}])
+        single.assert_called_once_with("Say gm", max_tokens=None, temperature=None)
+        self.assertEqual(client.get_completions([]), [])
+
+
+class TestCompletionBatcher(unittest.TestCase):
+
+    def _run_concurrently(self, batcher, client, prompts):
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            futures = [executor.submit(batcher.complete, client, prompt, 100) for prompt in prompts]
+            return [f.exception() or f.result() for f in futures]
+
+    def test_concurrent_prompts_share_one_request(self):
+        client = _client()
+        client.get_completions.side_effect = lambda prompts, **kwargs: [
+            {"choices": [{"text": f"re: {p}"}]} for p in prompts]
+        batcher = CompletionBatcher(max_batch_size=3, max_wait=5.0)
+        start = time.perf_counter()
+        results = self._run_concurrently(batcher, client, ["a", "b", "c"])
+        self.assertLess(time.perf_counter() - start, 2.0)  # A full batch is sent without waiting out max_wait
+        self.assertEqual([r["choices"][0]["text"] for r in results], ["re: a", "re: b", "re: c"])
+        client.get_completions.assert_called_once()
+        client.get_completion.assert_not_called()
+        self.assertEqual(batcher.stats(), {"prompts": 3, "requests": 1, "batched_prompts": 3})
+
+    def test_lone_prompt_sent_after_max_wait(self):
+        client = _client()
+        client.get_completion.return_value = {"choices": [{"text": "gm"}]}
+        batcher = CompletionBatcher(max_batch_size=8, max_wait=0.01)
+        self.assertEqual(batcher.complete(client, "Say gm", 100), {"choices": [{"text": "gm"}]})
+        client.get_completion.assert_called_once_with(prompt="Say gm", max_tokens=100)
+        client.get_completions.assert_not_called()
+
+    def test_different_parameters_are_not_batched(self):
+        client = _client()
+        client.get_completion.side_effect = lambda prompt, max_tokens: {"choices": [{"text": str(max_tokens)}]}
+        batcher = CompletionBatcher(max_batch_size=2, max_wait=0.05)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(batcher.complete, client, "p", tokens) for tokens in (10, 20)]
+            results = [f.result() for f in futures]
+        self.assertEqual([r["choices"][0]["text"] for r in results], ["10", "20"])
+        self.assertEqual(batcher.stats()["requests"], 2)
+
+    def test_unbatchable_client_bypasses_the_batcher(self):
+        client = _client(use_fallback=True, supports_batching=False)
+        client.get_completion.side_effect = lambda prompt, max_tokens: {"choices": [{"text": f"re: {prompt}"}]}
+        batcher = CompletionBatcher(max_batch_size=3, max_wait=5.0)
+        start = time.perf_counter()
+        results = self._run_concurrently(batcher, client, ["a", "b"])
+        self.assertLess(time.perf_counter() - start, 2.0)  # Nobody waits out max_wait for a batch
+        self.assertEqual([r["choices"][0]["text"] for r in results], ["re: a", "re: b"])
+        client.get_completions.assert_not_called()
+        self.assertEqual(batcher.stats(), {"prompts": 2, "requests": 2, "batched_prompts": 0})
+
+    def test_errors(self):
+        client = _client()
+        client.get_completions.side_effect = lambda prompts, **kwargs: [
+            {"choices": [{"text": "ok"}] if p == "a" else []} for p in prompts]
+        results = self._run_concurrently(CompletionBatcher(max_batch_size=2, max_wait=5.0), client, ["a", "b"])
+        self.assertEqual(results[0]["choices"][0]["text"], "ok")
+        self.assertIsInstance(results[1], APIError)
+
+        client.get_completions.side_effect = APIError("API down", status_code=500)
+        results = self._run_concurrently(CompletionBatcher(max_batch_size=2, max_wait=5.0), client, ["a", "b"])
+        self.assertTrue(all(isinstance(r, APIError) for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
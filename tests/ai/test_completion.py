@@ -0,0 +1,84 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for CompletionResult parsing and token usage accounting.
+
+import unittest
+from unittest import mock
+
+from src.ai import completion as completion_module
+from src.ai import response_generator, xai_client
+from src.ai.completion import (BACKEND_PALM, SHAPE_EMPTY_MESSAGE, SHAPE_MESSAGE, SHAPE_REASONING, SHAPE_TEXT,
+                               SHAPE_UNRECOGNIZED, CompletionResult, TokenUsage, as_completion_result)
+from src.ai.xai_client import XAIClient
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+
+
+class TestCompletionResult(unittest.TestCase):
+
+    def test_shapes(self):
+        text = CompletionResult({"choices": [{"text": "  gm frens ", "finish_reason": "stop"}],
+                                 "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15,
+                                           "prompt_tokens_details": {"cached_tokens": 8}}})
+        self.assertEqual((text.shape, text.text, text.finish_reason, text.backend), (SHAPE_TEXT, "gm frens", "stop", "xai"))
+        self.assertEqual(text.usage, {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15, "cached_tokens": 8})
+
+        message = as_completion_result({"choices": [{"message": {"content": "Vaults are live."}}]})
+        self.assertEqual((message.shape, message.text), (SHAPE_MESSAGE, "Vaults are live."))
+
+        reasoning = as_completion_result({"choices": [{"finish_reason": "length",
+                                                       "message": {"content": "", "reasoning_content": " thinking "}}]})
+        self.assertEqual((reasoning.shape, reasoning.reasoning, reasoning.truncated), (SHAPE_REASONING, "thinking", True))
+        self.assertIsNone(reasoning.text)
+
+        self.assertEqual(as_completion_result({"choices": [{"message": {"content": " "}}]}).shape, SHAPE_EMPTY_MESSAGE)
+        palm = as_completion_result({"candidates": [{"output": "From PaLM"}]})
+        self.assertEqual((palm.text, palm.backend), ("From PaLM", BACKEND_PALM))
+        self.assertEqual(as_completion_result(None).shape, SHAPE_UNRECOGNIZED)
+
+    def test_is_the_response_dict(self):
+        raw = {"choices": [{"text": "gm"}], "id": "cmpl-1"}
+        result = as_completion_result(raw)
+        self.assertEqual(result, raw)
+        self.assertIs(as_completion_result(result), result)
+        self.assertEqual(result.all_texts(), ["gm"])
+
+    def test_token_usage_totals(self):
+        usage = TokenUsage()
+        usage.record({"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15})
+        usage.record({})
+        snapshot = usage.snapshot()
+        self.assertEqual((snapshot["responses"], snapshot["reported"], snapshot["total_tokens"]), (2, 1, 15))
+
+
+class TestParsedOnce(unittest.TestCase):
+
+    def test_client_returns_parsed_result(self):
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = {"choices": [{"text": "gm"}], "usage": {"total_tokens": 7}}
+        client = XAIClient(api_key="key")
+        client.use_fallback = False
+        with mock.patch.object(xai_client.requests, "post", return_value=response), \
+                mock.patch.object(xai_client, "record_token_usage") as record:
+            result = client.get_completion("Say gm")
+        self.assertIsInstance(result, CompletionResult)
+        self.assertEqual(result.text, "gm")
+        record.assert_called_once_with({"total_tokens": 7})
+
+    def test_reply_consumes_result_without_reparsing(self):
+        completion = CompletionResult({"choices": [{"text": "Staking is live."}],
+                                       "usage": {"prompt_tokens": 40, "completion_tokens": 4, "total_tokens": 44}})
+        client = mock.MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = completion
+        tweet = Tweet(content="Is staking live?", tone="neutral", metadata=TweetMetadata(tweet_id="t", author_username="u"))
+        account = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        with mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "save_response"), \
+                mock.patch.object(completion_module, "parse_usage") as parse:  # Called by every CompletionResult()
+            response = response_generator.generate_tweet_reply(tweet, account)
+        parse.assert_not_called()
+        self.assertEqual(response.content, "Staking is live.")
+        self.assertEqual(response.extra_context["usage"]["total_tokens"], 44)
+
+
+if __name__ == '__main__':
+    unittest.main()
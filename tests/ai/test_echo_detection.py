@@ -0,0 +1,90 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for shingle-based echo detection.
+# - 2026-10-19: Only the windows of a long prompt are normalized.
+# - 2026-10-19: Background checks beyond max_pending are dropped and counted.
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.ai import echo_detection
+from src.ai.echo_detection import (ECHO_EXACT, ECHO_NONE, ECHO_PARTIAL, ECHO_SUSPICIOUS, TextFingerprint,
+                                   check_echo, detect_echo, echo_check_stats, shingle_hashes)
+
+PROMPT = ("You are the official YieldFi account. Reply to the tweet below in a friendly tone.\n"
+          "Keep it under 280 characters and do not use hashtags.\n"
+          "Tweet: How do I stake my yUSD?")
+
+
+def _wait_for_pending_checks(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while echo_check_stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestDetectEcho(unittest.TestCase):
+
+    def test_levels(self):
+        self.assertEqual(detect_echo(PROMPT, "  " + PROMPT.upper() + "\n").level, ECHO_EXACT)
+        self.assertEqual(detect_echo(PROMPT, "Head to the Vaults tab, pick yUSD and hit Stake!").level, ECHO_NONE)
+        self.assertEqual(detect_echo(PROMPT, PROMPT[:120] + " sure thing").level, ECHO_SUSPICIOUS)
+        partial = detect_echo(PROMPT, "Keep it under 280 characters and do not use hashtags. Staking is in the Vaults tab.")
+        self.assertEqual(partial.level, ECHO_PARTIAL)
+        self.assertTrue(detect_echo(PROMPT, "Tweet: How do I stake my yUSD?\nGreat question!").continuation)
+        self.assertEqual(detect_echo("", "anything").level, ECHO_NONE)
+
+    def test_cost_bounded_by_window(self):
+        long_prompt = "intro words here " * 5000 + PROMPT
+        with mock.patch.object(echo_detection, "shingle_hashes", wraps=shingle_hashes) as hashes:
+            detect_echo(long_prompt, "Tweet: How do I stake my yUSD? yes", max_chars=500)
+        self.assertLessEqual(len(hashes.call_args_list[0][0][0]), 1001)
+
+        with mock.patch.object(echo_detection, "_normalize", wraps=echo_detection._normalize) as normalize:
+            report = detect_echo(long_prompt, "Tweet: How do I stake my yUSD?\nyes", max_chars=500)
+        self.assertTrue(report.continuation)
+        self.assertTrue(all(len(call[0][0]) <= 500 for call in normalize.call_args_list))
+
+    def test_background_and_disabled(self):
+        with mock.patch.object(echo_detection, "log_echo") as log_echo, \
+                mock.patch.object(echo_detection, "get_config", side_effect=lambda key, default=None: False):
+            check_echo(PROMPT, PROMPT)
+        log_echo.assert_not_called()
+
+        config = {"ai.echo_check.enabled": True, "ai.echo_check.background": False}
+        with mock.patch.object(echo_detection, "log_echo") as log_echo, \
+                mock.patch.object(echo_detection, "get_config", side_effect=lambda key, default=None: config.get(key, default)):
+            check_echo(PROMPT, PROMPT)
+        log_echo.assert_called_once_with(PROMPT, PROMPT)
+
+    def test_pending_background_checks_are_capped(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        config = {"ai.echo_check.enabled": True, "ai.echo_check.background": True, "ai.echo_check.max_pending": 2}
+        _wait_for_pending_checks()
+        dropped_before = echo_check_stats()["dropped"]
+        with mock.patch.object(echo_detection, "log_echo", side_effect=lambda *args: release.wait(5)) as log_echo, \
+                mock.patch.object(echo_detection, "get_config", side_effect=lambda key, default=None: config.get(key, default)):
+            for _ in range(5):
+                check_echo(PROMPT, "gm")
+            stats = echo_check_stats()
+            release.set()
+            _wait_for_pending_checks()
+        self.assertEqual(stats["pending"], 2)
+        self.assertEqual(stats["dropped"] - dropped_before, 3)
+        self.assertEqual(log_echo.call_count, 2)
+        self.assertEqual(echo_check_stats()["pending"], 0)
+
+
+class TestTextFingerprint(unittest.TestCase):
+
+    def test_matches_ignoring_case_and_whitespace(self):
+        fingerprint = TextFingerprint("  GM frens ")
+        self.assertTrue(fingerprint.matches("gm FRENS"))
+        self.assertFalse(fingerprint.matches("gm frens!"))
+        self.assertFalse(TextFingerprint(None).matches("gm"))
+        self.assertFalse(TextFingerprint("   ").matches("   "))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for hedged completion requests.
+# - 2026-10-19: Primaries do not queue behind the hedge pool; unhedgeable calls run on the caller's thread.
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.ai import xai_client
+from src.ai.hedging import BACKEND_PALM, Hedger, LatencyTracker
+from src.ai.xai_client import XAIClient
+
+
+def _warm(hedger, seconds=0.01, samples=5):
+    for _ in range(samples):
+        hedger.latencies.record(seconds)
+
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_percentile_over_window(self):
+        tracker = LatencyTracker(window=4)
+        self.assertIsNone(tracker.percentile(95))
+        for seconds in (9.0, 1.0, 2.0, 3.0, 4.0):
+            tracker.record(seconds)
+        self.assertEqual(len(tracker), 4)
+        self.assertEqual(tracker.percentile(50), 2.0)
+        self.assertEqual(tracker.percentile(95), 4.0)
+
+
+class TestHedger(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _hedger(self, **options):
+        hedger = Hedger(**{"min_delay": 0.02, "min_samples": 5, "max_extra_ratio": 1.0, **options})
+        self.addCleanup(hedger.shutdown)
+        _warm(hedger)
+        return hedger
+
+    def test_slow_primary_loses_to_hedge(self):
+        hedger = self._hedger()
+        start = time.perf_counter()
+        result = hedger.run(lambda: self.release.wait(5) and "primary", lambda: "hedge")
+        self.assertEqual(result, "hedge")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual({k: hedger.stats()[k] for k in ("requests", "hedged", "hedge_wins")},
+                         {"requests": 1, "hedged": 1, "hedge_wins": 1})
+
+    def test_fast_primary_is_not_hedged(self):
+        hedger = self._hedger(min_delay=1.0)
+        hedge = mock.Mock()
+        self.assertEqual(hedger.run(lambda: "primary", hedge), "primary")
+        hedge.assert_not_called()
+        self.assertEqual(hedger.stats()["hedged"], 0)
+
+    def test_no_hedging_before_min_samples(self):
+        hedger = Hedger(min_delay=0.0, min_samples=50)
+        self.addCleanup(hedger.shutdown)
+        hedge = mock.Mock()
+        self.assertEqual(hedger.run(lambda: time.sleep(0.05) or "primary", hedge), "primary")
+        hedge.assert_not_called()
+        self.assertIsNone(hedger.stats()["delay_ms"])
+
+    def test_budget_limits_hedges(self):
+        hedger = self._hedger(max_extra_ratio=0.5, burst=1.0)
+        _warm(hedger, samples=100)  # Keeps p95 low while slow primaries are recorded
+        slow = lambda: time.sleep(0.1) or "primary"
+        results = [hedger.run(slow, lambda: "hedge") for _ in range(4)]
+        self.assertEqual(results, ["primary", "hedge", "primary", "hedge"])
+        self.assertEqual(hedger.stats()["budget_denied"], 2)
+
+    def test_primaries_do_not_queue_on_the_hedge_pool(self):
+        hedger = self._hedger(min_delay=1.0, max_workers=1)
+        before = len(hedger.latencies)
+        threads = [threading.Thread(target=hedger.run, args=(lambda: time.sleep(0.1), mock.Mock()))
+                   for _ in range(6)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(len(hedger.latencies), before + 6)
+        self.assertLess(hedger.latencies.percentile(100), 0.3)
+
+    def test_unhedgeable_call_runs_on_caller_thread(self):
+        hedger = self._hedger(max_extra_ratio=0.0)
+        self.assertIs(hedger.run(threading.current_thread, mock.Mock()), threading.current_thread())
+        self.assertEqual(hedger.stats()["budget_denied"], 0)  # Fast enough not to need a hedge
+
+    def test_hedge_failure_falls_back_to_primary(self):
+        hedger = self._hedger()
+
+        def failing_hedge():
+            raise RuntimeError("hedge failed")
+
+        self.assertEqual(hedger.run(lambda: time.sleep(0.1) or "primary", failing_hedge), "primary")
+        self.assertEqual(hedger.stats()["hedge_wins"], 0)
+
+    def test_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            Hedger(backend="bard")
+
+
+class TestHedgedClient(unittest.TestCase):
+
+    def test_palm_hedge_answers_slow_xai_call(self):
+        hedger = Hedger(min_delay=0.02, min_samples=1, max_extra_ratio=1.0, backend=BACKEND_PALM)
+        self.addCleanup(hedger.shutdown)
+        _warm(hedger, samples=1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def post(url, **kwargs):
+            response = mock.MagicMock(status_code=200)
+            if "generateText" in url:
+                response.json.return_value = {"candidates": [{"output": "from palm"}]}
+            else:
+                release.wait(5)
+                response.json.return_value = {"choices": [{"text": "from xai"}]}
+            return response
+
+        client = XAIClient(api_key="key", google_api_key="gkey")
+        client.use_fallback = False
+        with mock.patch.object(xai_client, "get_completion_hedger", return_value=hedger), \
+                mock.patch.object(xai_client.requests, "post", side_effect=post):
+            self.assertEqual(client.get_completion("Say gm"), {"candidates": [{"output": "from palm"}]})
+        self.assertEqual(hedger.stats()["hedge_wins"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
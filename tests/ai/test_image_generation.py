@@ -1,11 +1,21 @@
 # Changelog:
 # 2025-05-09 - Step 20 - Add tests for image generation module.
+# 2026-10-19 - Tests for background image jobs (cache, coalescing, polling, generator hand-off).
+# 2026-10-19 - The reply is persisted right away; its saved image_url is filled in when the image job finishes.
 
+import json
+import tempfile
+import threading
 import unittest
 import os
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from src.ai.image_generation import get_poster_image
+from src.ai import response_generator
+from src.ai.image_generation import JOB_DONE, JOB_FAILED, ImageJobQueue, get_poster_image
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+from src.utils import persistence
 
 class TestImageGeneration(unittest.TestCase):
     @patch.dict(os.environ, {"GROK_IMAGE_API_KEY": "dummy_key"})
@@ -35,5 +45,73 @@ class TestImageGeneration(unittest.TestCase):
         url = get_poster_image("Another test prompt.")
         self.assertTrue(url.startswith("https://placehold.co/512x512?text=Image+Error"))
 
+class TestImageJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.render = MagicMock(side_effect=lambda prompt: self.release.wait(5) and f"http://img/{len(prompt)}.png")
+        self.queue = ImageJobQueue(max_workers=2, render=self.render)
+        self.addCleanup(self.queue.shutdown)
+        self.addCleanup(self.release.set)
+
+    def test_identical_prompts_share_one_render_and_hit_cache(self):
+        first = self.queue.submit("Poster about staking")
+        second = self.queue.submit("Poster  about staking")  # Same prompt after whitespace normalization
+        self.assertIs(first, second)
+        self.assertFalse(first.done())
+        self.assertIn(self.queue.poll(first.job_id)["status"], ("pending", "running"))
+
+        self.release.set()
+        self.assertEqual(first.result(timeout=5), "http://img/20.png")
+        cached = self.queue.submit("Poster about staking")
+        self.assertTrue(cached.done() and cached.cached)
+        self.assertEqual(cached.url, "http://img/20.png")
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(self.queue.stats["coalesced"], 1)
+        self.assertEqual(self.queue.stats["cache_hits"], 1)
+
+    def test_placeholders_and_errors_fail_without_caching(self):
+        self.render.side_effect = ["https://placehold.co/512x512?text=Image+Error", RuntimeError("down")]
+        job = self.queue.submit("prompt")
+        job.result(timeout=5)
+        self.assertEqual(job.status, JOB_FAILED)
+        retry = self.queue.submit("prompt")
+        retry.result(timeout=5)
+        self.assertEqual(retry.status, JOB_FAILED)
+        self.assertEqual(retry.error, "down")
+        self.assertTrue(retry.url.startswith("https://placehold.co/"))
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_poll_unknown_job(self):
+        self.assertIsNone(self.queue.poll("missing"))
+
+    def test_reply_returns_before_image_is_rendered(self):
+        client = MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = {"choices": [{"text": "New vault is live."}]}
+        tweet = Tweet(content="Any news?", metadata=TweetMetadata(tweet_id="t1", author_username="u"), tone="neutral")
+        account = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(persistence, "OUTPUT_DIR", Path(tmp_dir)), \
+                patch.object(persistence, "GENERATED_FILE", Path(tmp_dir) / "replies.json"), \
+                patch.object(response_generator, "XAIClient", return_value=client), \
+                patch('src.ai.image_generation.submit_poster_image', side_effect=self.queue.submit):
+            response = response_generator.generate_tweet_reply(tweet, account, generate_image=True)
+
+            self.assertIsNone(response.image_url)
+            with open(persistence.GENERATED_FILE) as f:
+                saved = json.load(f)  # The text is saved before the image is ready
+            self.assertEqual(saved[0]["response"]["content"], "New vault is live.")
+            self.assertIsNone(saved[0]["response"]["image_url"])
+            job = self.queue.get(response.extra_context["image_job_id"])
+            self.release.set()
+            job.result(timeout=5)
+            self.assertEqual(job.status, JOB_DONE)
+            self.assertEqual(response.image_url, job.url)
+            with open(persistence.GENERATED_FILE) as f:
+                records = json.load(f)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["response"]["image_url"], job.url)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
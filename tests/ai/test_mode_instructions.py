@@ -0,0 +1,104 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the parsed mode instruction cache.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.ai import prompt_engineering
+from src.ai.prompt_engineering import (
+    clear_mode_instruction_cache,
+    clear_prompt_plan_cache,
+    get_base_yieldfi_persona,
+    get_mode_instructions,
+    get_prompt_plan,
+    load_mode_instructions,
+    parse_mode_instructions,
+)
+from src.models.account import AccountType
+
+DEGEN_TEXT = """# Degen Mode Instructions
+
+Intro text.
+
+## Tone Guidelines
+- Hype it up
+
+## Examples
+- gm frens
+
+## Style Points
+- Emojis welcome
+"""
+
+
+class TestModeInstructionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "InstructionsForDegen.md")
+        self._write(DEGEN_TEXT)
+        clear_mode_instruction_cache()
+        clear_prompt_plan_cache()
+        patches = [
+            mock.patch('src.config.get_protocol_path', side_effect=lambda *parts: os.path.join(self.tmp.name, parts[-1])),
+            mock.patch.object(prompt_engineering, 'MODE_INSTRUCTION_CHECK_INTERVAL', 0.0),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        clear_mode_instruction_cache()
+        clear_prompt_plan_cache()
+        self.tmp.cleanup()
+
+    def _write(self, text: str, mtime_offset: int = 0):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        if mtime_offset:
+            stat = os.stat(self.path)
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 1_000_000_000))
+
+    def test_parse_splits_sections_and_indexes_headings(self):
+        parsed = parse_mode_instructions("Degen", DEGEN_TEXT)
+        self.assertEqual(len(parsed.sections), 4)
+        self.assertEqual(parsed.headings["examples"], "Examples\n- gm frens")
+        self.assertEqual(parsed.find_section("TONE GUIDELINES"), "Tone Guidelines\n- Hype it up")
+        self.assertEqual(parsed.find_section("missing"), "")
+
+    def test_file_read_once_while_unchanged(self):
+        with mock.patch.object(prompt_engineering, '_read_mode_instructions',
+                               wraps=prompt_engineering._read_mode_instructions) as reader:
+            for _ in range(5):
+                get_base_yieldfi_persona(AccountType.OFFICIAL, "Degen")
+            self.assertEqual(load_mode_instructions("Degen"), DEGEN_TEXT)
+        self.assertEqual(reader.call_count, 1)
+
+    def test_reload_on_file_change_drops_compiled_plans(self):
+        plan = get_prompt_plan("new_tweet", "ethena", AccountType.OFFICIAL, None, "Degen", "Twitter")
+        self.assertIs(get_prompt_plan("new_tweet", "ethena", AccountType.OFFICIAL, None, "Degen", "Twitter"), plan)
+
+        self._write(DEGEN_TEXT.replace("gm frens", "wagmi"), mtime_offset=5)
+        self.assertIn("wagmi", get_mode_instructions("Degen").find_section("examples"))
+        self.assertIsNot(get_prompt_plan("new_tweet", "ethena", AccountType.OFFICIAL, None, "Degen", "Twitter"), plan)
+
+    def test_check_interval_skips_stat_calls(self):
+        get_mode_instructions("Degen")
+        with mock.patch.object(prompt_engineering, 'MODE_INSTRUCTION_CHECK_INTERVAL', 3600.0), \
+                mock.patch.object(prompt_engineering, '_file_signature') as signature:
+            get_mode_instructions("Degen")
+        signature.assert_not_called()
+
+    def test_missing_file_uses_fallback_and_warns_once(self):
+        with mock.patch.object(prompt_engineering, 'logger') as logger:
+            first = get_mode_instructions("Professional")
+            second = get_mode_instructions("Professional")
+        self.assertIs(first, second)
+        self.assertIn("fallback instruction set for 'Professional'", first.text)
+        self.assertEqual(logger.warning.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
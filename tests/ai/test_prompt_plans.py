@@ -0,0 +1,174 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for compiled prompt plans.
+# - 2026-10-19: Tests for the stable static prefix and prefix reuse stats.
+# - 2026-10-19: Plan cache counters stay exact under concurrent lookups.
+# - 2026-10-19: A plan compiled while the templates reload is not cached.
+
+import threading
+import unittest
+from unittest import mock
+
+from src.ai import prompt_engineering
+from src.ai.prompt_engineering import (
+    clear_prompt_plan_cache,
+    generate_interaction_prompt,
+    generate_new_tweet_prompt,
+    get_prompt_plan,
+    get_prompt_plan_cache_stats,
+    get_prefix_reuse_stats,
+    reset_prefix_reuse_stats,
+)
+from src.models.account import Account, AccountType
+from src.models.category import TweetCategory
+
+
+class TestPromptPlans(unittest.TestCase):
+
+    def setUp(self):
+        clear_prompt_plan_cache()
+        self.official = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        self.institution = Account(account_id="i", username="BigBank", account_type=AccountType.INSTITUTION, bio="A bank")
+        self.category = TweetCategory(name="Product Update", description="New releases", prompt_keywords=[],
+                                      style_guidelines={"tone": "Exciting", "hashtags": ["DeFi"], "length": "Short"})
+
+    def tearDown(self):
+        clear_prompt_plan_cache()
+
+    def _reply(self, post: str, mode: str = "Professional") -> str:
+        return generate_interaction_prompt(
+            original_post_content=post,
+            active_account_info=self.official,
+            target_account_info=self.institution,
+            yieldfi_knowledge_snippet="Knowledge",
+            interaction_details={"tone": "calm"},
+            mode=mode,
+            protocol_name="ethena",
+        )
+
+    def test_cached_prompt_matches_freshly_compiled(self):
+        first = self._reply("What is the APY?")
+        second = self._reply("What is the APY?")
+        clear_prompt_plan_cache()
+        self.assertEqual(second, first)
+        self.assertEqual(self._reply("What is the APY?"), first)
+
+    def test_only_dynamic_fields_change(self):
+        prompt = self._reply("Is it audited?")
+        self.assertIn('Original Post to Reply To: "Is it audited?"', prompt)
+        self.assertIn("Target Account: @BigBank (Type: Institution), Bio: A bank", prompt)
+        self.assertIn("Use a calm tone.", prompt)
+        self.assertEqual(self._reply("Is it audited?").replace("Is it audited?", "Other"), self._reply("Other"))
+
+    def test_plan_reused_per_key(self):
+        self._reply("one")
+        self._reply("two")
+        self._reply("three", mode="Degen")
+        stats = get_prompt_plan_cache_stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["plans"], 2)
+
+    def test_plan_stats_exact_under_concurrency(self):
+        args = ("interaction", "ethena", AccountType.OFFICIAL, AccountType.INSTITUTION, None, "Twitter")
+        get_prompt_plan(*args)
+
+        def lookups():
+            for _ in range(500):
+                get_prompt_plan(*args)
+
+        threads = [threading.Thread(target=lookups) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = get_prompt_plan_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (8 * 500, 1))
+
+    def test_plan_compiled_across_a_reload_is_not_cached(self):
+        args = ("interaction", "ethena", AccountType.OFFICIAL, AccountType.INSTITUTION, None, "Twitter")
+        compile_plan = prompt_engineering._compile_prompt_plan
+
+        def compile_during_reload(*compile_args):
+            plan = compile_plan(*compile_args)
+            prompt_engineering._drop_stale_plans()  # A template reload lands mid-compile
+            return plan
+
+        with mock.patch.object(prompt_engineering, "_compile_prompt_plan", side_effect=compile_during_reload):
+            get_prompt_plan(*args)
+        self.assertEqual(get_prompt_plan_cache_stats()["plans"], 0)
+        get_prompt_plan(*args)
+        self.assertEqual(get_prompt_plan_cache_stats()["plans"], 1)
+
+    def test_static_sections_compiled_once(self):
+        with mock.patch.object(prompt_engineering, 'get_base_yieldfi_persona',
+                               wraps=prompt_engineering.get_base_yieldfi_persona) as persona:
+            for i in range(5):
+                generate_new_tweet_prompt(category=self.category, topic=f"topic {i}", active_account_info=self.official,
+                                          mode="Degen", protocol_name="ethena")
+        self.assertEqual(persona.call_count, 1)
+
+    def test_plan_keys(self):
+        plan = get_prompt_plan("interaction", "ethena", AccountType.OFFICIAL, AccountType.INSTITUTION, None, "Twitter")
+        self.assertEqual(plan.key, ("interaction", "ethena", "OFFICIAL", "INSTITUTION", None, "Twitter"))
+        self.assertIsNotNone(plan.instructions_part)
+        new_tweet_plan = get_prompt_plan("new_tweet", "ethena", AccountType.OFFICIAL, None, "Degen", "Discord")
+        self.assertIsNone(new_tweet_plan.instructions_part)
+        self.assertIn("Discord post", new_tweet_plan.task_intro)
+        self.assertEqual(new_tweet_plan.mode_task_line, "Use the Degen interaction style as detailed above.")
+
+
+class TestStablePrefix(unittest.TestCase):
+
+    def setUp(self):
+        clear_prompt_plan_cache()
+        reset_prefix_reuse_stats()
+        self.official = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        self.institution = Account(account_id="i", username="BigBank", account_type=AccountType.INSTITUTION)
+
+    def tearDown(self):
+        clear_prompt_plan_cache()
+        reset_prefix_reuse_stats()
+
+    def _reply(self, post: str, knowledge: str = "Knowledge", mode: str = "Degen"):
+        return generate_interaction_prompt(
+            original_post_content=post,
+            active_account_info=self.official,
+            target_account_info=self.institution,
+            yieldfi_knowledge_snippet=knowledge,
+            interaction_details={},
+            mode=mode,
+            protocol_name="ethena",
+        )
+
+    def test_static_sections_precede_dynamic_content(self):
+        prompt = self._reply("When mainnet?")
+        plan = get_prompt_plan("interaction", "ethena", AccountType.OFFICIAL, AccountType.INSTITUTION, "Degen", "Twitter")
+        self.assertTrue(prompt.startswith(plan.prefix))
+        self.assertIn(plan.instructions_part, plan.prefix)
+        self.assertNotIn("When mainnet?", plan.prefix)
+        self.assertLess(prompt.index(plan.mode_parts[-1]), prompt.index("When mainnet?"))
+        self.assertTrue(prompt.endswith(plan.response_prefix))
+
+    def test_prefix_is_byte_identical_across_requests(self):
+        first = self._reply("one", knowledge="alpha")
+        second = self._reply("a completely different post", knowledge="beta")
+        self.assertEqual(first.prefix_hash, second.prefix_hash)
+        self.assertEqual(first[:first.prefix_chars], second[:second.prefix_chars])
+        clear_prompt_plan_cache()
+        self.assertEqual(self._reply("three").prefix_hash, first.prefix_hash)
+        self.assertNotEqual(self._reply("one", mode="Professional").prefix_hash, first.prefix_hash)
+
+    def test_prefix_reuse_stats(self):
+        for post in ("one", "two", "three"):
+            self._reply(post)
+        self._reply("four", mode="Professional")
+        stats = get_prefix_reuse_stats()
+        self.assertEqual(stats["prompts"], 4)
+        self.assertEqual(stats["reused"], 2)
+        self.assertEqual(stats["distinct_prefixes"], 2)
+        self.assertAlmostEqual(stats["reuse_rate"], 0.5)
+        self.assertGreater(stats["reused_char_ratio"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
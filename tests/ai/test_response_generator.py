@@ -1,5 +1,7 @@
 # Changelog:
 # 2025-05-07 HH:MM - Step 9 - Initial implementation of tests for ResponseGenerator.
+# 2026-10-19 - Prompt prefix hash and provider cached tokens in extra_context.
+# 2026-10-19 - Relevancy facts and token budget passed to the prompt builder; token estimates recorded.
 
 import unittest
 from unittest.mock import patch, MagicMock, ANY
@@ -14,6 +16,7 @@ from src.models.tweet import Tweet, TweetMetadata # type: ignore
 from src.models.account import Account, AccountType # type: ignore
 from src.models.response import AIResponse, ResponseType # type: ignore
 from src.ai.xai_client import APIError as XAIAPIError # type: ignore
+from src.ai.prompt_engineering import RenderedPrompt # type: ignore
 
 # Dummy Account and Tweet instances for testing
 OFFICIAL_ACCOUNT = Account(
@@ -166,5 +169,26 @@ class TestResponseGenerator(unittest.TestCase):
         response = generate_tweet_reply(ORIGINAL_TWEET_NEUTRAL, OFFICIAL_ACCOUNT)
         self.assertIn("[Warning: AI response structure not recognized]", response.content)
 
+    @patch('src.ai.response_generator.get_facts', return_value=["Fact"])
+    @patch('src.ai.response_generator.XAIClient')
+    @patch('src.ai.response_generator.generate_interaction_prompt')
+    @patch('src.ai.response_generator.analyze_tweet_tone')
+    def test_generate_tweet_reply_records_prompt_prefix(self, mock_analyze_tone, mock_gen_prompt, MockXAI, mock_facts):
+        mock_analyze_tone.return_value = ORIGINAL_TWEET_NEUTRAL
+        mock_gen_prompt.return_value = RenderedPrompt("<Static Prefix>\n\n<Dynamic>", prefix_hash="abc123", prefix_chars=15)
+        MockXAI.return_value.get_completion.return_value = {
+            "choices": [{"text": "AI Reply Content"}],
+            "usage": {"prompt_tokens": 40, "prompt_tokens_details": {"cached_tokens": 32}},
+        }
+
+        response = generate_tweet_reply(ORIGINAL_TWEET_NEUTRAL, OFFICIAL_ACCOUNT)
+        self.assertEqual(response.extra_context["prompt_prefix_hash"], "abc123")
+        self.assertEqual(response.extra_context["prompt_prefix_chars"], 15)
+        self.assertEqual(response.extra_context["prompt_cached_tokens"], 32)
+        self.assertEqual(mock_gen_prompt.call_args.kwargs["relevancy_facts"], ["Fact"])
+        self.assertGreater(mock_gen_prompt.call_args.kwargs["token_budget"], 0)
+        self.assertEqual(response.extra_context["estimated_completion_tokens"], 3)
+        self.assertEqual(response.extra_context["max_completion_tokens"], 512)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,95 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for single-flight coalescing of identical generation requests.
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from src.ai import response_generator
+from src.ai.single_flight import SingleFlight, get_completion_flight
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _run_concurrently(self, key, func, callers):
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            futures = [executor.submit(self.flight.do, key, func) for _ in range(callers)]
+            _wait_for(lambda: self.flight.stats()["requests"] == callers)
+            self.release.set()
+            return [f.exception() or f.result() for f in futures]
+
+    def test_concurrent_callers_share_one_call(self):
+        func = mock.Mock(side_effect=lambda: self.release.wait(5) and {"choices": []})
+        results = self._run_concurrently("key", func, 5)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+        self.assertEqual(self.flight.stats(), {"requests": 5, "executed": 1, "saved": 4})
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_error_reaches_every_caller(self):
+        def failing():
+            self.release.wait(5)
+            raise RuntimeError("API down")
+
+        results = self._run_concurrently("key", failing, 3)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_finished_calls_are_not_cached(self):
+        func = mock.Mock(return_value="done")
+        self.assertEqual(self.flight.do("key", func), ("done", False))
+        self.assertEqual(self.flight.do("key", func), ("done", False))
+        self.assertEqual(func.call_count, 2)
+
+
+class TestCoalescedReplies(unittest.TestCase):
+
+    def test_identical_replies_share_completion(self):
+        flight = get_completion_flight()
+        flight.reset_stats()
+        self.addCleanup(flight.reset_stats)
+
+        def completion(prompt, max_tokens):
+            _wait_for(lambda: flight.stats()["requests"] == 3)
+            return {"choices": [{"text": "Thanks for the love, fren!"}]}
+
+        client = mock.MagicMock(xai_model="grok-test", xai_base_url="http://stub", use_fallback=False,
+                                default_temperature=0.7)
+        client.get_completion.side_effect = completion
+        account = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+
+        def reply(_):
+            tweet = Tweet(content="YieldFi is on fire today!", tone="positive",
+                          metadata=TweetMetadata(tweet_id="viral", author_username="u"))
+            return response_generator.generate_tweet_reply(tweet, account, interaction_mode="Degen")
+
+        with mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "save_response"), \
+                ThreadPoolExecutor(max_workers=3) as executor:
+            responses = list(executor.map(reply, range(3)))
+
+        self.assertEqual(client.get_completion.call_count, 1)
+        self.assertEqual([r.content for r in responses], ["Thanks for the love, fren!"] * 3)
+        self.assertEqual(sum(bool(r.extra_context.get("completion_shared")) for r in responses), 2)
+        self.assertEqual(flight.stats()["saved"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the concurrent enrichment stage graph.
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.ai import response_generator
+from src.ai.stage_graph import STATUS_ERROR, STATUS_TIMEOUT, Stage, StageGraph
+from src.config.settings import get_config, set_config_value
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+from src.utils.tracing import finish_trace, start_trace
+
+
+def _sleeping(seconds, value):
+    def func(inputs):
+        time.sleep(seconds)
+        return value
+    return func
+
+
+class TestStageGraphDeclaration(unittest.TestCase):
+
+    def test_rejects_invalid_graphs(self):
+        noop = lambda inputs: None
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("a", noop), Stage("a", noop)])
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("a", noop, depends_on=("missing",))])
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("a", noop, depends_on=("b",)), Stage("b", noop, depends_on=("a",))])
+
+    def test_order_and_with_stage(self):
+        graph = StageGraph([Stage("b", len, depends_on=("a",)), Stage("a", len)])
+        self.assertEqual(graph.order, ["a", "b"])
+        extended = graph.with_stage(Stage("c", len))
+        self.assertEqual(sorted(extended.stages), ["a", "b", "c"])
+        self.assertEqual(sorted(graph.stages), ["a", "b"])
+
+
+class TestStageGraphRun(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_independent_stages_run_concurrently(self):
+        graph = StageGraph([Stage(name, _sleeping(0.2, name)) for name in ("tone", "knowledge", "facts")])
+        start = time.perf_counter()
+        run = graph.run({})
+        self.assertLess(time.perf_counter() - start, 0.45)
+        self.assertEqual([run[name] for name in ("tone", "knowledge", "facts")], ["tone", "knowledge", "facts"])
+        self.assertEqual(run.degraded(), {})
+
+    def test_dependents_receive_values(self):
+        graph = StageGraph([
+            Stage("words", lambda inputs: inputs["text"].split()),
+            Stage("count", lambda inputs: len(inputs["words"]), depends_on=("words",)),
+        ])
+        self.assertEqual(graph.run({"text": "gm frens"})["count"], 2)
+
+    def test_deadline_falls_back_to_default(self):
+        graph = StageGraph([
+            Stage("slow", lambda inputs: self.release.wait(5), deadline=0.05, default="fallback"),
+            Stage("fast", lambda inputs: "ok"),
+        ])
+        start = time.perf_counter()
+        run = graph.run({})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(run["slow"], "fallback")
+        self.assertEqual(run["fast"], "ok")
+        self.assertEqual(run.degraded(), {"slow": STATUS_TIMEOUT})
+
+    def test_errors(self):
+        def boom(inputs):
+            raise RuntimeError("boom")
+
+        run = StageGraph([Stage("optional", boom, default=[])]).run({})
+        self.assertEqual(run["optional"], [])
+        self.assertEqual(run.outcomes["optional"].status, STATUS_ERROR)
+        with self.assertRaises(RuntimeError):
+            StageGraph([Stage("required", boom, required=True)]).run({})
+
+    def test_inline_when_concurrency_disabled(self):
+        previous = get_config("pipeline.concurrent")
+        self.addCleanup(set_config_value, "pipeline.concurrent", previous)
+        set_config_value("pipeline.concurrent", False)
+        threads = []
+        graph = StageGraph([Stage("a", lambda inputs: threads.append(threading.current_thread()))])
+        graph.run({})
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_durations_added_to_trace(self):
+        previous = get_config("tracing.enabled")
+        self.addCleanup(set_config_value, "tracing.enabled", previous)
+        set_config_value("tracing.enabled", True)
+        trace = start_trace("reply")
+        StageGraph([Stage("tone", _sleeping(0.01, "neutral"))]).run({})
+        finish_trace(trace)
+        self.assertGreaterEqual(trace.stages["tone"], 10.0)
+
+
+class TestReplyEnrichment(unittest.TestCase):
+
+    def test_slow_knowledge_does_not_block_reply(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        retriever = mock.MagicMock()
+        retriever.get_relevant_knowledge.side_effect = lambda query: release.wait(5) and "late"
+        client = mock.MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = {"choices": [{"text": "Staking is live."}]}
+        tweet = Tweet(content="How does staking work?", metadata=TweetMetadata(tweet_id="t1", author_username="u"),
+                      tone="neutral")
+        account = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+
+        with mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "save_response"), \
+                mock.patch.object(response_generator, "get_stage_deadlines", return_value={"knowledge": 0.05}):
+            response = response_generator.generate_tweet_reply(tweet, account, knowledge_retriever=retriever)
+
+        self.assertEqual(response.content, "Staking is live.")
+        self.assertEqual(response.tone, "neutral")
+        self.assertEqual(response.extra_context["degraded_stages"], {"knowledge": STATUS_TIMEOUT})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for token estimation and budget-aware prompt assembly.
+
+import unittest
+from unittest import mock
+
+from src.ai.prompt_engineering import clear_prompt_plan_cache, generate_interaction_prompt
+from src.ai.token_budget import (
+    PRIORITY_MODE_EXAMPLES,
+    PRIORITY_RELEVANCY_FACTS,
+    PromptSection,
+    assemble_sections,
+    estimate_tokens,
+    get_prompt_token_budget,
+    get_token_budget,
+    knowledge_section,
+)
+from src.models.account import Account, AccountType
+
+
+def _facts(*facts):
+    items = [f"- {fact}" for fact in facts]
+    return PromptSection("facts", "Facts:\n" + "\n".join(items), PRIORITY_RELEVANCY_FACTS, items, header="Facts:\n")
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_counts(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens(None), 0)
+        self.assertEqual(estimate_tokens("Hello world"), 2)
+        self.assertEqual(estimate_tokens("APY is 12%."), 5)
+        self.assertEqual(estimate_tokens("1234567"), 3)
+        self.assertGreater(estimate_tokens("decentralization"), 1)
+        self.assertGreater(estimate_tokens("🚀"), 1)
+
+    def test_roughly_four_characters_per_token_for_prose(self):
+        prose = ("YieldFi is a decentralized finance platform focused on user empowerment and transparency. "
+                 "It offers competitive staking rewards on various assets.") * 10
+        ratio = len(prose) / estimate_tokens(prose)
+        self.assertTrue(3.5 <= ratio <= 6.5, ratio)
+
+
+class TestTokenBudgetConfig(unittest.TestCase):
+
+    def test_budget_lookup(self):
+        budgets = {"default": 1000, "big-model": 8000}
+        with mock.patch('src.ai.token_budget.get_config', return_value=budgets):
+            self.assertEqual(get_token_budget("big-model"), 8000)
+            self.assertEqual(get_token_budget("other"), 1000)
+            self.assertEqual(get_prompt_token_budget("big-model", 512), 7488)
+            self.assertEqual(get_prompt_token_budget("other", 5000), 0)
+
+
+class TestAssembleSections(unittest.TestCase):
+
+    def setUp(self):
+        self.sections = [
+            PromptSection("persona", "Persona: " + "helpful " * 20),
+            PromptSection("mode_examples", "Examples: " + "gm " * 30, PRIORITY_MODE_EXAMPLES),
+            knowledge_section("knowledge", "Knowledge: ", "First fact here. Second fact here. Third fact here."),
+            PromptSection("task", "Task: reply."),
+            _facts("one", "two", "three"),
+        ]
+        self.full = assemble_sections(self.sections)
+
+    def test_fits_unchanged(self):
+        self.assertEqual(self.full.text, "\n\n".join(s.text for s in self.sections))
+        result = assemble_sections(self.sections, budget=self.full.estimated_tokens)
+        self.assertEqual(result.text, self.full.text)
+        self.assertEqual(result.dropped, [])
+        self.assertEqual(result.trimmed, {})
+
+    def test_lowest_priority_shrinks_first(self):
+        result = assemble_sections(self.sections, budget=self.full.estimated_tokens - 5)
+        self.assertEqual(result.dropped, ["mode_examples"])
+        self.assertIn("Third fact here.", result.text)
+        self.assertLessEqual(result.estimated_tokens, result.budget)
+
+    def test_knowledge_trimmed_by_chunk_before_facts(self):
+        examples_tokens = estimate_tokens(self.sections[1].text)
+        result = assemble_sections(self.sections, budget=self.full.estimated_tokens - examples_tokens - 2)
+        self.assertEqual(result.trimmed, {"knowledge": 1})
+        self.assertIn("Knowledge: First fact here. Second fact here.\n\nTask", result.text)
+        self.assertIn("- three", result.text)
+        self.assertFalse(result.over_budget)
+
+    def test_required_sections_always_kept(self):
+        result = assemble_sections(self.sections, budget=5)
+        self.assertTrue(result.over_budget)
+        self.assertEqual(result.dropped, ["mode_examples", "knowledge", "facts"])
+        self.assertEqual(result.text, self.sections[0].text + "\n\n" + "Task: reply.")
+        # Inputs are not modified
+        self.assertEqual(len(self.sections[4].items), 3)
+
+    def test_report(self):
+        report = assemble_sections(self.sections, budget=5).report()
+        self.assertEqual(report["prompt_token_budget"], 5)
+        self.assertEqual(report["prompt_items_trimmed"], {"knowledge": 3, "facts": 3})
+
+    def test_knowledge_section_chunks(self):
+        paragraphs = knowledge_section("k", "K: ", "Para one.\n\nPara two.")
+        self.assertEqual(paragraphs.items, ["Para one.", "Para two."])
+        self.assertEqual(paragraphs.text, "K: Para one.\n\nPara two.")
+        paragraphs.trim_last_item()
+        self.assertEqual(paragraphs.text, "K: Para one.")
+
+
+class TestBudgetedPrompts(unittest.TestCase):
+
+    def setUp(self):
+        clear_prompt_plan_cache()
+        self.official = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+
+    def tearDown(self):
+        clear_prompt_plan_cache()
+
+    def _prompt(self, token_budget=None):
+        return generate_interaction_prompt(
+            "Is it safe?", self.official, None, "Audited. Insured. Monitored.", {}, "Twitter", "Degen", "ethena",
+            relevancy_facts=["Fact A", "Fact B"], token_budget=token_budget,
+        )
+
+    def test_large_budget_matches_unbudgeted_prompt(self):
+        unbudgeted = self._prompt()
+        budgeted = self._prompt(token_budget=100000)
+        self.assertEqual(budgeted, unbudgeted)
+        self.assertEqual(budgeted.prefix_hash, unbudgeted.prefix_hash)
+        self.assertTrue(unbudgeted.endswith("Relevancy Facts:\n- Fact A\n- Fact B"))
+        self.assertEqual(budgeted.budget_report["prompt_sections_dropped"], [])
+
+    def test_tight_budget_trims_and_rehashes_prefix(self):
+        unbudgeted = self._prompt()
+        budget = estimate_tokens(unbudgeted) - 1
+        budgeted = self._prompt(token_budget=budget)
+        self.assertLessEqual(budgeted.budget_report["estimated_prompt_tokens"], budget)
+        self.assertIn("mode_examples", budgeted.budget_report["prompt_sections_dropped"])
+        self.assertNotEqual(budgeted.prefix_hash, unbudgeted.prefix_hash)
+        self.assertIn("Mode-Specific Examples", unbudgeted)
+        self.assertNotIn("Mode-Specific Examples", budgeted)
+        self.assertIn("Relevancy Facts:", budgeted)
+
+
+if __name__ == '__main__':
+    unittest.main()
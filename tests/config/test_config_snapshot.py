@@ -0,0 +1,105 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the immutable, flattened config snapshot.
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.config import settings as config_settings
+from src.config.settings import ConfigSnapshot
+
+SAMPLE = {
+    "AI": {"Provider": "xai", "token_budgets": {"default": 4096}},
+    "ai": {"provider": "shadowed", "extra": 1},
+    "evaluation": {"metrics": ["bleu", "rouge"]},
+    "empty": None,
+}
+
+
+class TestConfigSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = ConfigSnapshot(SAMPLE, version=1)
+
+    def test_case_insensitive_dotted_lookup(self):
+        self.assertEqual(self.snapshot.get("ai.provider"), "xai")
+        self.assertEqual(self.snapshot.get("AI.PROVIDER"), "xai")
+        self.assertEqual(self.snapshot.get("ai.token_budgets.default"), 4096)
+        self.assertIsNone(self.snapshot.get("empty", "fallback"))
+        self.assertEqual(self.snapshot.get("ai.provider.deeper", "d"), "d")
+
+    def test_first_matching_key_wins_like_linear_scan(self):
+        # "AI" comes first, so "ai.extra" (only under the later "ai") is not reachable
+        self.assertEqual(self.snapshot.get("ai.extra", "missing"), "missing")
+
+    def test_values_are_read_only(self):
+        section = self.snapshot.get("ai")
+        with self.assertRaises(TypeError):
+            section["provider"] = "other"
+        self.assertEqual(self.snapshot.get("evaluation.metrics"), ("bleu", "rouge"))
+        self.assertEqual(self.snapshot.to_dict()["evaluation"]["metrics"], ["bleu", "rouge"])
+
+    def test_source_mutation_does_not_leak_into_snapshot(self):
+        source = {"a": {"b": [1]}}
+        snapshot = ConfigSnapshot(source, version=1)
+        source["a"]["b"].append(2)
+        self.assertEqual(snapshot.get("a.b"), (1,))
+
+
+class TestSnapshotPublishing(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = (config_settings._CONFIG, config_settings._CONFIG_LOADED, config_settings._SNAPSHOT)
+        config_settings._CONFIG = {"ai": {"provider": "xai"}}
+        config_settings._CONFIG_LOADED = True
+        config_settings._SNAPSHOT = None
+
+    def tearDown(self):
+        config_settings._CONFIG, config_settings._CONFIG_LOADED, config_settings._SNAPSHOT = self._saved
+
+    def test_set_config_value_swaps_snapshot(self):
+        before = config_settings.get_config_snapshot()
+        config_settings.set_config_value("ai.provider", "palm")
+        after = config_settings.get_config_snapshot()
+        self.assertIsNot(before, after)
+        self.assertEqual(after.version, before.version + 1)
+        self.assertEqual(before.get("ai.provider"), "xai")
+        self.assertEqual(config_settings.get_config("ai.provider"), "palm")
+
+    def test_reassigned_config_is_picked_up(self):
+        config_settings.get_config("ai.provider")
+        config_settings._CONFIG = {"ai": {"provider": "replaced"}}
+        self.assertEqual(config_settings.get_config("ai.provider"), "replaced")
+
+    def test_reload_config_publishes_new_snapshot(self):
+        before = config_settings.get_config_snapshot()
+        with patch.object(config_settings, '_load_config_locked',
+                          side_effect=lambda: config_settings._publish_snapshot()):
+            after = config_settings.reload_config()
+        self.assertIs(after, config_settings.get_config_snapshot())
+        self.assertGreater(after.version, before.version)
+
+    def test_readers_never_see_partial_updates(self):
+        config_settings.set_config_value("pair", {"left": 0, "right": 0})
+        mismatches = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                snapshot = config_settings.get_config_snapshot()
+                if snapshot.get("pair.left") != snapshot.get("pair.right"):
+                    mismatches.append(snapshot.version)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(1, 200):
+            config_settings.set_config_value("pair", {"left": i, "right": i})
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(mismatches, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for config change subscriptions.
+
+import copy
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.config import settings as config_settings
+from src.config.settings import ConfigSnapshot, subscribe
+
+
+class TestSnapshotDiff(unittest.TestCase):
+
+    def test_diff_reports_added_removed_and_changed_leaves(self):
+        old = ConfigSnapshot({"ai": {"provider": "xai", "model": "m1"}, "gone": 1}, version=1)
+        new = ConfigSnapshot({"ai": {"provider": "xai", "model": "m2"}, "new": {"key": True}}, version=2)
+        self.assertEqual(new.diff(old), {
+            "ai.model": ("m1", "m2"),
+            "new.key": (None, True),
+            "gone": (1, None),
+        })
+        self.assertEqual(new.diff(new), {})
+
+
+class TestSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = (config_settings._CONFIG, config_settings._CONFIG_LOADED, config_settings._SNAPSHOT,
+                       list(config_settings._SUBSCRIPTIONS))
+        config_settings._CONFIG = {"ai": {"provider": "xai", "model": "m1"}, "data_paths": {"output": "out"}}
+        config_settings._CONFIG_LOADED = True
+        config_settings._SNAPSHOT = None
+        config_settings._SUBSCRIPTIONS[:] = []
+        config_settings.get_config_snapshot()
+        self.calls = []
+
+    def tearDown(self):
+        (config_settings._CONFIG, config_settings._CONFIG_LOADED, config_settings._SNAPSHOT,
+         config_settings._SUBSCRIPTIONS[:]) = self._saved
+
+    def test_notified_only_for_matching_prefixes(self):
+        subscribe("ai", self.calls.append)
+        config_settings.set_config_value("data_paths.output", "elsewhere")
+        self.assertEqual(self.calls, [])
+        config_settings.set_config_value("AI.Model", "m2")
+        self.assertEqual(self.calls, [{"ai.model": ("m1", "m2")}])
+
+    def test_prefix_matches_whole_segments(self):
+        subscribe("ai", self.calls.append)
+        config_settings.set_config_value("aim", 1)
+        self.assertEqual(self.calls, [])
+
+    def test_unchanged_value_does_not_notify(self):
+        subscribe("", self.calls.append)
+        config_settings.set_config_value("ai.provider", "xai")
+        self.assertEqual(self.calls, [])
+
+    def test_unsubscribe(self):
+        subscription = subscribe(["ai.model", "data_paths"], self.calls.append)
+        config_settings.set_config_value("ai.model", "m2")
+        subscription.unsubscribe()
+        config_settings.set_config_value("ai.model", "m3")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_failing_subscriber_does_not_block_others(self):
+        def broken(changes):
+            raise RuntimeError("boom")
+        subscribe("ai", broken)
+        subscribe("ai", self.calls.append)
+        with patch.object(config_settings._logger, 'exception') as log:
+            config_settings.set_config_value("ai.model", "m2")
+        log.assert_called_once()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_subscriber_can_read_new_value(self):
+        seen = []
+        subscribe("ai.model", lambda changes: seen.append(config_settings.get_config("ai.model")))
+        config_settings.set_config_value("ai.model", "m2")
+        self.assertEqual(seen, ["m2"])
+
+    def test_load_config_notifies_with_diff(self):
+        subscribe("ai", self.calls.append)
+
+        def fake_load():
+            config_settings._CONFIG = {"ai": {"provider": "palm", "model": "m1"}}
+            config_settings._CONFIG_LOADED = True
+            return config_settings._publish_snapshot()
+
+        with patch.object(config_settings, '_load_config_locked', side_effect=fake_load):
+            config_settings.load_config()
+        self.assertEqual(self.calls, [{"ai.provider": ("xai", "palm")}])
+
+
+class TestComponentRefresh(unittest.TestCase):
+
+    def setUp(self):
+        config_settings.get_config_snapshot()
+        self._saved = copy.deepcopy(config_settings._CONFIG)
+
+    def tearDown(self):
+        # Reassigning _CONFIG publishes a new snapshot and notifies components of the restore
+        config_settings._CONFIG = self._saved
+        config_settings.get_config_snapshot()
+
+    def test_persistence_output_dir_follows_config(self):
+        from src.utils import persistence
+        config_settings.set_config_value("data_paths.output", "data/other_output")
+        self.assertEqual(persistence.OUTPUT_DIR, Path("data/other_output"))
+        self.assertEqual(persistence.GENERATED_FILE, Path("data/other_output/replies_to_tweets.json"))
+
+    def test_core_message_change_drops_compiled_plans(self):
+        from src.ai import prompt_engineering
+        from src.models.account import AccountType
+        prompt_engineering.get_prompt_plan("new_tweet", None, AccountType.OFFICIAL, None, "Default", "Twitter")
+        self.assertTrue(prompt_engineering._PROMPT_PLAN_CACHE)
+        config_settings.set_config_value("yieldfi.core_message", "New mission.")
+        self.assertEqual(prompt_engineering.YIELDFI_CORE_MESSAGE, "New mission.")
+        self.assertFalse(prompt_engineering._PROMPT_PLAN_CACHE)
+
+
+if __name__ == '__main__':
+    unittest.main()
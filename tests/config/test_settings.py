@@ -2,12 +2,15 @@
 # 2025-05-07 HH:MM - Step 20 (Initial) - Added comprehensive tests for config loading.
 # 2025-05-07 HH:MM - Step 20 (Fix) - Patched DEFAULT_TEMPLATE in setUp for test isolation.
 # 2025-05-07 HH:MM - Step 20 (Fix) - Adjusted tests for lowercase key normalization and fixed print assertion.
+# 2026-10-19 - get_config now returns read-only views for sections; copy test updated accordingly.
+# 2026-10-19 - unset_config_value removes keys and the sections it leaves empty.
 
 import unittest
 from unittest.mock import patch, mock_open, call
 import os
 import yaml
 import copy
+from collections.abc import Mapping
 
 # Ensure the test can find the src modules
 import sys
@@ -241,8 +244,8 @@ class TestConfigSettings(unittest.TestCase):
         self.assertIsNone(config_settings.get_config('level1.level2.non_existent'))
         self.assertEqual(config_settings.get_config('level1.non_existent.level3', 'default'), 'default')
         
-    def test_get_config_returns_copy_not_original_dict(self):
-        """Test that get_config returns a copy for dictionary values to prevent modification."""
+    def test_get_config_returns_read_only_view(self):
+        """Test that get_config returns a read-only view for dictionary values to prevent modification."""
         config_settings.load_config()
         ai_config_retrieved = config_settings.get_config('ai') # Should be lowercase 'ai' from normalized env
         self.assertIsNotNone(ai_config_retrieved) # Ensure 'ai' key exists
@@ -253,15 +256,19 @@ class TestConfigSettings(unittest.TestCase):
             # Ensure it retrieves the correct dict (which includes .env overrides)
             self.assertEqual(ai_config_retrieved['provider'], 'env_provider')
             self.assertEqual(ai_config_retrieved['xai_api_key'], 'env_xai_key')
-            
-            # Modify the retrieved dict
-            ai_config_retrieved['new_test_key'] = 'test_value'
-            ai_config_retrieved['provider'] = 'modified_provider_in_retrieved'
-            
-            # Verify the original dict in the module is unchanged
+
+            # Modifying the retrieved view is rejected
+            with self.assertRaises(TypeError):
+                ai_config_retrieved['new_test_key'] = 'test_value'
+            with self.assertRaises(TypeError):
+                ai_config_retrieved['provider'] = 'modified_provider_in_retrieved'
+
+            # A mutable copy can be changed without touching the module's config
+            ai_config_copy = dict(ai_config_retrieved)
+            ai_config_copy['provider'] = 'modified_provider_in_retrieved'
             self.assertNotEqual(original_ai_config_in_module.get('provider'), 'modified_provider_in_retrieved')
             self.assertNotIn('new_test_key', original_ai_config_in_module)
-            
+
             # Verify that a subsequent call to get_config returns the original, unmodified value
             ai_config_retrieved_again = config_settings.get_config('ai')
             self.assertEqual(ai_config_retrieved_again['provider'], 'env_provider') # Should be original
@@ -331,14 +338,28 @@ class TestConfigSettings(unittest.TestCase):
         
         # Check if parent dicts were created
         new_parent_config = config_settings.get_config('new_parent')
-        self.assertIsInstance(new_parent_config, dict)
+        self.assertIsInstance(new_parent_config, Mapping)
         self.assertIn('new_child', new_parent_config)
-        self.assertIsInstance(new_parent_config['new_child'], dict)
+        self.assertIsInstance(new_parent_config['new_child'], Mapping)
         
         # Override existing nested value
         config_settings.set_config_value('ai.provider', 'runtime_ai_provider')
         self.assertEqual(config_settings.get_config('ai.provider'), 'runtime_ai_provider')
 
+    def test_unset_config_value(self):
+        """Test removing runtime values, including sections left empty."""
+        config_settings.load_config()
+        config_settings.set_config_value('new_parent.new_child.deep_setting', 'deep_value')
+        config_settings.unset_config_value('new_parent.new_child.deep_setting')
+        self.assertIsNone(config_settings.get_config('new_parent'))
+        self.assertNotIn('new_parent', config_settings.get_config_snapshot().keys())
+
+        config_settings.set_config_value('ai.runtime_only', True)
+        config_settings.unset_config_value('ai.runtime_only')
+        self.assertIsNone(config_settings.get_config('ai.runtime_only'))
+        self.assertIsNotNone(config_settings.get_config('ai.provider'))
+        config_settings.unset_config_value('missing.key')  # No-op
+
     def test_set_config_value_does_not_affect_loaded_copy(self):
         """Test that set_config_value modifies the internal _CONFIG, not copies from get_config."""
         config1 = config_settings.load_config()
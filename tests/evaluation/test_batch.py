@@ -0,0 +1,119 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests that the vectorized batch engine matches the scalar metrics.
+
+import json
+import random
+import unittest
+from typing import Any, Dict, List, Optional
+
+from src.evaluation.batch import BatchMetricsEngine
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.metrics import calculate_factual_accuracy_score, calculate_relevance_score
+
+
+class MockAIResponseForEval:
+    def __init__(self, content: str, tone: Optional[str]):
+        self.content = content
+        self.tone = tone
+
+
+class TestBatchMetricsEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = BatchMetricsEngine()
+        self.cases = [
+            ("This is a great and awesome product with many features.",
+             "The product is awesome and has great features.", "It was released last year."),
+            ("Weather is sunny today and very warm.", "Is it raining today? What is the weather like?", None),
+            ("", "some context", None),
+            ("some generated", "", None),
+            ("", "", None),
+            ("is a the", "an the is of", ""),
+            ("completely different", "topic is new", "unrelated knowledge"),
+            ("YieldFi is great", "yieldfi IS great!", None),
+            ("Alpha beta", "Alpha beta gamma delta", None),
+        ]
+
+    def test_relevance_matches_scalar(self):
+        generated, contexts, knowledge = zip(*self.cases)
+        batch_scores = self.engine.relevance_scores(generated, contexts, knowledge)
+        for (gen, ctx, know), score in zip(self.cases, batch_scores):
+            self.assertEqual(score, calculate_relevance_score(gen, ctx, know), msg=f"Mismatch for {gen!r}")
+
+    def test_relevance_matches_scalar_random(self):
+        rng = random.Random(7)
+        words = ["yield", "apy", "vault", "the", "secure", "is", "staking", "token", "a", "audit", "defi", "!", "2023"]
+        texts = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 12))) for _ in range(200)]
+        generated, contexts = texts[:100], texts[100:]
+        knowledge = [rng.choice([None, "", "audited vault"]) for _ in range(100)]
+        batch_scores = self.engine.relevance_scores(generated, contexts, knowledge)
+        expected = [calculate_relevance_score(g, c, k) for g, c, k in zip(generated, contexts, knowledge)]
+        self.assertEqual(batch_scores.tolist(), expected)
+
+    def test_relevance_empty_batch(self):
+        self.assertEqual(self.engine.relevance_scores([], []).tolist(), [])
+
+    def test_relevance_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.engine.relevance_scores(["a"], ["a", "b"])
+
+    def test_factual_accuracy_matches_scalar(self):
+        text = "YieldFi was founded in 2023. It offers high APY. The CEO is Satoshi."
+        fact_lists: List[Optional[List[str]]] = [
+            ["founded in 2023", "high APY", "CEO is Satoshi"],
+            ["founded in 2023", "low APY"],
+            ["audited by XYZ", "based in London"],
+            [],
+            None,
+            ["FOUNDED IN 2023", "ceo is SATOSHI"],
+            [" founded in 2023 "],
+        ]
+        texts = [text] * len(fact_lists) + [""]
+        fact_lists.append(["fact1"])
+        batch_scores = self.engine.factual_accuracy_scores(texts, fact_lists)
+        expected = [calculate_factual_accuracy_score(t, f) for t, f in zip(texts, fact_lists)]
+        self.assertEqual(batch_scores.tolist(), expected)
+
+    def test_factual_accuracy_no_facts(self):
+        self.assertEqual(self.engine.factual_accuracy_scores(["a", "b"], [None, []]).tolist(), [1.0, 1.0])
+
+
+class TestEvaluatorBatch(unittest.TestCase):
+
+    def _golden_batch(self) -> List[Any]:
+        with open("data/input/evaluation_golden_set.json", 'r') as f:
+            cases: List[Dict[str, Any]] = json.load(f)
+        return [
+            (MockAIResponseForEval(c["ai_response_content"], c["ai_response_analyzed_tone"]),
+             c["original_tweet_content"], c.get("knowledge_snippet_used"), c["ground_truth_data"])
+            for c in cases
+        ]
+
+    def test_vectorized_batch_matches_per_item(self):
+        batch = self._golden_batch()
+        batch.append((MockAIResponseForEval("No context here.", None), None, None, None))
+        batch.append((MockAIResponseForEval("Facts only.", "neutral"), "ctx", None, {'ground_truth_facts': ["facts"]}))
+        evaluator = Evaluator()
+        self.assertEqual(
+            evaluator.run_batch_evaluation(batch),
+            evaluator.run_batch_evaluation(batch, vectorized=False)
+        )
+
+    def test_vectorized_batch_missing_attributes(self):
+        class NoAttributes:
+            pass
+        batch = [(NoAttributes(), "context", None, {'expected_tone': 'positive'})]
+        evaluator = Evaluator()
+        self.assertEqual(
+            evaluator.run_batch_evaluation(batch),
+            evaluator.run_batch_evaluation(batch, vectorized=False)
+        )
+
+    def test_vectorized_batch_respects_metric_selection(self):
+        evaluator = Evaluator(metrics_to_run=['factual_accuracy'])
+        results = evaluator.run_batch_evaluation(self._golden_batch())
+        self.assertTrue(all(list(r.keys()) == ['factual_accuracy'] for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the LLM stub server and the generation benchmark.
+# - 2026-10-19: Stub requests are checked against the batcher's request count.
+# - 2026-10-19: Token usage reported by the stub is totalled in the report.
+# - 2026-10-19: The run leaves the config and the caller's StubConfig as they were.
+# - 2026-10-19: The report test turns batching on (it is off by default).
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from src.ai import response_generator
+from src.ai.xai_client import XAIClient, extract_responses
+from src.config.settings import get_config, get_config_snapshot, set_config_value
+from src.evaluation.benchmark import (
+    BenchmarkConfig,
+    compare_reports,
+    latency_summary,
+    percentile,
+    run_benchmark,
+)
+from src.evaluation.llm_stub import StubConfig, StubLLMServer
+from src.utils import persistence
+from src.utils.error_handling import APIError
+
+GOLDEN_SET_PATH = "data/input/evaluation_golden_set.json"
+
+
+def _stub_client(stub: StubLLMServer) -> XAIClient:
+    client = XAIClient(api_key="test-key")
+    client.use_fallback = False
+    client.xai_base_url = stub.base_url
+    return client
+
+
+class TestStubLLMServer(unittest.TestCase):
+
+    def test_response_shapes(self):
+        for shape in ("text", "message", "reasoning", "truncated"):
+            config = StubConfig(latency_distribution="fixed", latency_ms=0, shape_weights={shape: 1.0},
+                                replies=[("YieldFi", "Stub reply about YieldFi yields.")])
+            with StubLLMServer(config) as stub:
+                body = _stub_client(stub).get_completion("Tell me about YieldFi")
+            choice = body["choices"][0]
+            if shape == "text":
+                self.assertEqual(choice["text"], "Stub reply about YieldFi yields.")
+            elif shape == "message":
+                self.assertEqual(choice["message"]["content"], "Stub reply about YieldFi yields.")
+            elif shape == "reasoning":
+                self.assertEqual(choice["message"]["content"], "")
+                self.assertIn("Stub reply", choice["message"]["reasoning_content"])
+                self.assertEqual(choice["finish_reason"], "length")
+            else:
+                self.assertEqual(choice["finish_reason"], "length")
+            self.assertTrue(extract_responses(body) or shape == "reasoning")
+            self.assertEqual(stub.stats()[f"shape_{shape}"], 1)
+
+    def test_injected_errors_raise_api_error(self):
+        config = StubConfig(latency_distribution="fixed", latency_ms=0, error_rate=1.0)
+        with StubLLMServer(config) as stub:
+            with self.assertRaises(APIError) as ctx:
+                _stub_client(stub).get_completion("hello")
+            self.assertEqual(ctx.exception.status_code, 500)
+            self.assertEqual(stub.stats()["errors_500"], 1)
+
+    def test_unknown_path_and_invalid_config(self):
+        with StubLLMServer(StubConfig(latency_ms=0)) as stub:
+            response = requests.post(f"{stub.base_url}/chat", json={}, timeout=5)
+            self.assertEqual(response.status_code, 404)
+        with self.assertRaises(ValueError):
+            StubConfig(shape_weights={"unknown": 1.0})
+        with self.assertRaises(ValueError):
+            StubConfig(latency_distribution="pareto")
+
+
+class TestGenerationBenchmark(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_SET_PATH, 'r') as f:
+            cls.cases = json.load(f)
+
+    def test_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(latency_summary([3.0, 1.0, 2.0])["max"], 3.0)
+
+    def test_run_benchmark_report(self):
+        output_file = persistence.GENERATED_FILE
+        existed = os.path.exists(output_file)
+        config = BenchmarkConfig(
+            concurrency=2,
+            iterations=2,
+            stub=StubConfig(latency_distribution="fixed", latency_ms=1, shape_weights={"text": 1.0, "message": 1.0}),
+        )
+        self.addCleanup(set_config_value, "ai.batching.enabled", get_config("ai.batching.enabled", False))
+        set_config_value("ai.batching.enabled", True)  # Off by default; the report covers it when on
+        config_before = get_config_snapshot().to_dict()
+        report = run_benchmark(self.cases, config)
+
+        expected_requests = 2 * len(self.cases) * 2
+        self.assertEqual(report["requests"], expected_requests)
+        batching = report["batching"]
+        self.assertEqual(report["stub"]["requests"], batching["requests"])
+        self.assertEqual(batching["prompts"] + report["coalescing"]["saved"], expected_requests)
+        self.assertEqual(report["tokens"]["responses"], batching["requests"])
+        self.assertGreater(report["tokens"]["total_tokens"], 0)
+        self.assertEqual(report["outcomes"]["error"], 0)
+        self.assertGreater(report["throughput_rps"], 0)
+        self.assertIn("completion", report["stages_ms"])
+        self.assertIn("prompt", report["stages_ms"])
+        self.assertEqual(set(report["by_operation"]), {"reply", "new_tweet"})
+        self.assertEqual(report["evaluation"]["evaluated"], expected_requests)
+        self.assertIn("avg_factual_accuracy", report["evaluation"])
+        json.dumps(report)  # Reports must be serializable for storage
+
+        # Stage wrappers and persistence redirection are removed afterwards
+        self.assertEqual(XAIClient.get_completion.__qualname__, "XAIClient.get_completion")
+        self.assertFalse(hasattr(response_generator.get_facts, "__wrapped__"))
+        self.assertEqual(persistence.GENERATED_FILE, output_file)
+        self.assertEqual(os.path.exists(output_file), existed)
+        self.assertEqual(get_config_snapshot().to_dict(), config_before)
+        self.assertEqual(config.stub.replies, [])
+
+    def test_injected_errors_are_counted(self):
+        config = BenchmarkConfig(
+            concurrency=2,
+            operations=["reply"],
+            stub=StubConfig(latency_distribution="fixed", latency_ms=0, error_rate=1.0),
+        )
+        with patch('src.ai.xai_client.logger'), patch.object(response_generator, 'logger'):
+            report = run_benchmark(self.cases, config)
+        self.assertEqual(report["error_rate"], 1.0)
+        self.assertEqual(report["evaluation"], {})
+
+    def test_compare_reports(self):
+        baseline = {"throughput_rps": 10.0, "error_rate": 0.0, "latency_ms": {"p50": 100.0, "p95": 200.0, "p99": 300.0},
+                    "stages_ms": {"completion": {"mean": 80.0}}, "evaluation": {"avg_relevance": 0.5, "evaluated": 4}}
+        current = {"throughput_rps": 12.0, "error_rate": 0.1, "latency_ms": {"p50": 90.0, "p95": 200.0, "p99": 310.0},
+                   "stages_ms": {"completion": {"mean": 70.0}}, "evaluation": {"avg_relevance": 0.6, "evaluated": 4}}
+        comparison = compare_reports(current, baseline)
+        self.assertAlmostEqual(comparison["throughput_rps"]["delta_pct"], 20.0)
+        self.assertIsNone(comparison["error_rate"]["delta_pct"])
+        self.assertAlmostEqual(comparison["stage_completion_mean_ms"]["delta"], -10.0)
+        self.assertAlmostEqual(comparison["eval_avg_relevance"]["current"], 0.6)
+        self.assertNotIn("eval_evaluated", comparison)
+
+
+if __name__ == '__main__':
+    unittest.main()
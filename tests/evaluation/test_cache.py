@@ -0,0 +1,114 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the evaluation result cache.
+# - 2026-10-19: SQLite-backed cache: persistence across instances and unflushed entries.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.evaluation import metrics
+from src.evaluation.cache import EvaluationCache, case_input_hash, evaluate_with_cache
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.streaming import create_ai_response_from_case, stream_evaluate
+
+GOLDEN_SET_PATH = "data/input/evaluation_golden_set.json"
+
+
+def _batch(cases):
+    return [(create_ai_response_from_case(c), c["original_tweet_content"],
+             c.get("knowledge_snippet_used"), c["ground_truth_data"]) for c in cases]
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_SET_PATH, 'r') as f:
+            cls.cases = json.load(f)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "cache", "eval.db")
+        self.evaluator = Evaluator()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_input_hash_changes_with_any_input(self):
+        base = ("reply", "Informative", "tweet", "snippet", {"ground_truth_facts": ["a"]})
+        digest = case_input_hash(*base)
+        self.assertEqual(digest, case_input_hash(*base))
+        for i, changed in enumerate(["reply!", "Witty", "tweet?", None, {"ground_truth_facts": ["b"]}]):
+            variant = list(base)
+            variant[i] = changed
+            self.assertNotEqual(digest, case_input_hash(*variant))
+
+    def test_cached_results_match_fresh_and_skip_scoring(self):
+        batch = _batch(self.cases)
+        expected = self.evaluator.run_batch_evaluation(batch)
+
+        cache = EvaluationCache(self.cache_path)
+        self.assertEqual(evaluate_with_cache(self.evaluator, batch, cache), expected)
+        cache.flush()
+
+        reloaded = EvaluationCache(self.cache_path)
+        with patch.object(self.evaluator, 'run_batch_evaluation') as mock_run:
+            self.assertEqual(evaluate_with_cache(self.evaluator, batch, reloaded), expected)
+        mock_run.assert_not_called()
+        self.assertEqual(reloaded.hits, len(batch))
+
+    def test_only_changed_cases_are_rescored(self):
+        cache = EvaluationCache(self.cache_path)
+        evaluate_with_cache(self.evaluator, _batch(self.cases), cache)
+
+        changed = [dict(c) for c in self.cases]
+        changed[1]["ai_response_content"] += " Learn more about yields."
+        batch = _batch(changed)
+        with patch.object(self.evaluator, 'run_batch_evaluation',
+                          wraps=self.evaluator.run_batch_evaluation) as mock_run:
+            results = evaluate_with_cache(self.evaluator, batch, cache)
+        self.assertEqual(len(mock_run.call_args[0][0]), 1)
+        self.assertEqual(results, self.evaluator.run_batch_evaluation(batch))
+
+    def test_metric_version_bump_invalidates(self):
+        cache = EvaluationCache()
+        batch = _batch(self.cases)
+        evaluate_with_cache(self.evaluator, batch, cache)
+        with patch.dict(metrics.METRIC_VERSIONS, {'relevance': '2'}):
+            evaluate_with_cache(self.evaluator, batch, cache)
+        self.assertEqual(cache.misses, 2 * len(batch))
+
+    def test_errors_not_cached_and_only_flushed_entries_persist(self):
+        cache = EvaluationCache(self.cache_path)
+        cache.store("abc", {"relevance": "Error: boom", "tone_match": 1.0})
+        self.assertEqual(cache.lookup("abc", ["tone_match"]), {"tone_match": 1.0})
+        self.assertEqual(len(EvaluationCache(self.cache_path)), 0)
+        cache.flush()
+        cache.store("def", {"tone_match": 0.5})
+        reloaded = EvaluationCache(self.cache_path)
+        self.assertEqual(len(reloaded), 1)
+        self.assertIsNone(reloaded.lookup("abc", ["relevance"]))
+        self.assertIsNone(reloaded.lookup("def", ["tone_match"]))
+        cache.store("abc", {"tone_match": 0.0})
+        cache.compact()
+        self.assertEqual(EvaluationCache(self.cache_path).lookup("abc", ["tone_match"]), {"tone_match": 0.0})
+        self.assertEqual(len(EvaluationCache(self.cache_path)), 2)
+
+    def test_stream_evaluate_uses_cache(self):
+        cache = EvaluationCache(self.cache_path)
+        first = stream_evaluate(iter(self.cases), io.StringIO(), chunk_size=2, cache=cache)
+        self.assertEqual(first.cached, 0)
+
+        output = io.StringIO()
+        second = stream_evaluate(iter(self.cases), output, chunk_size=2, cache=EvaluationCache(self.cache_path))
+        self.assertEqual(second.cached, len(self.cases))
+        self.assertEqual(second.to_dict(), first.to_dict())
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertTrue(all(r["cached"] for r in records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for offline NLTK resource resolution.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.evaluation import resources
+from src.evaluation.resources import (
+    FALLBACK_STOP_WORDS,
+    get_nltk_data_dir,
+    get_text_resources,
+    reset_text_resources,
+)
+
+
+class TestTextResources(unittest.TestCase):
+
+    def setUp(self):
+        reset_text_resources()
+
+    def tearDown(self):
+        reset_text_resources()
+
+    def test_resolution_never_downloads(self):
+        if resources.nltk is None:
+            self.skipTest("NLTK not installed")
+        with patch.object(resources.nltk, 'download', side_effect=AssertionError("network access")) as mock_download:
+            text_resources = get_text_resources()
+        mock_download.assert_not_called()
+        self.assertIn(text_resources.tokenizer_name, ("nltk", "regex"))
+
+    def test_regex_fallback_when_nltk_data_missing(self):
+        if resources.nltk is None:
+            self.skipTest("NLTK not installed")
+        with patch.object(resources.nltk, 'word_tokenize', side_effect=LookupError("punkt missing")):
+            text_resources = get_text_resources()
+        self.assertFalse(text_resources.nltk_available)
+        self.assertEqual(text_resources.tokenizer_name, "regex")
+        self.assertEqual(text_resources.stop_words, FALLBACK_STOP_WORDS)
+        self.assertEqual(text_resources.tokenize("great, awesome product!"), ["great", "awesome", "product"])
+
+    def test_regex_fallback_without_nltk(self):
+        with patch.object(resources, 'nltk', None):
+            text_resources = get_text_resources()
+        self.assertEqual(text_resources.tokenizer_name, "regex")
+        self.assertIn("the", text_resources.stop_words)
+
+    def test_resources_are_cached(self):
+        self.assertIs(get_text_resources(), get_text_resources())
+
+    def test_nltk_data_dir_from_config(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch.object(resources, 'get_config', return_value=tmp_dir):
+                self.assertEqual(get_nltk_data_dir(), tmp_dir)
+        with patch.object(resources, 'get_config', return_value="vendor/nltk"):
+            self.assertTrue(get_nltk_data_dir().endswith(os.path.join("vendor", "nltk")))
+        with patch.object(resources, 'get_config', return_value=None):
+            self.assertEqual(get_nltk_data_dir(), resources.DEFAULT_NLTK_DATA_DIR)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for streaming golden-set evaluation.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.evaluation import streaming
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.streaming import (
+    RunningSummary,
+    chunked,
+    create_ai_response_from_case,
+    iter_golden_cases,
+    stream_evaluate,
+)
+
+GOLDEN_SET_PATH = "data/input/evaluation_golden_set.json"
+
+
+class TestStreamingEvaluation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_SET_PATH, 'r') as f:
+            cls.cases = json.load(f)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_iter_json_array_matches_json_load(self):
+        self.assertEqual(list(iter_golden_cases(GOLDEN_SET_PATH)), self.cases)
+
+    def test_iter_json_array_across_read_boundaries(self):
+        path = self._write("cases.json", json.dumps(self.cases, indent=2))
+        with patch.object(streaming, '_READ_CHUNK_CHARS', 7):
+            self.assertEqual(list(iter_golden_cases(path)), self.cases)
+
+    def test_iter_jsonl(self):
+        path = self._write("cases.jsonl", "\n".join(json.dumps(c) for c in self.cases) + "\n\n")
+        self.assertEqual(list(iter_golden_cases(path)), self.cases)
+
+    def test_iter_empty_files(self):
+        self.assertEqual(list(iter_golden_cases(self._write("empty.json", "  \n"))), [])
+        self.assertEqual(list(iter_golden_cases(self._write("empty_array.json", "[ ]"))), [])
+
+    def test_iter_truncated_array_raises(self):
+        path = self._write("bad.json", json.dumps(self.cases)[:-5])
+        with self.assertRaises(ValueError):
+            list(iter_golden_cases(path))
+
+    def test_chunked(self):
+        self.assertEqual([len(c) for c in chunked(range(7), 3)], [3, 3, 1])
+
+    def test_running_summary_matches_batch_summary(self):
+        evaluator = Evaluator()
+        batch = [(create_ai_response_from_case(c), c["original_tweet_content"],
+                  c.get("knowledge_snippet_used"), c["ground_truth_data"]) for c in self.cases]
+        results = evaluator.run_batch_evaluation(batch)
+
+        summary = RunningSummary()
+        for scores in results:
+            summary.add(scores)
+        expected = {}
+        for metric in ('tone_match', 'relevance', 'factual_accuracy'):
+            values = [r[metric] for r in results if isinstance(r[metric], (int, float))]
+            expected[f"avg_{metric}"] = sum(values) / len(values)
+            expected[f"min_{metric}"] = min(values)
+            expected[f"max_{metric}"] = max(values)
+        self.assertEqual(summary.to_dict(), expected)
+
+        left, right = RunningSummary(), RunningSummary()
+        for i, scores in enumerate(results):
+            (left if i % 2 else right).add(scores)
+        left.merge(right)
+        self.assertEqual(left.cases, summary.cases)
+        for key, value in expected.items():
+            self.assertAlmostEqual(left.to_dict()[key], value)
+
+    def test_stream_evaluate_writes_jsonl(self):
+        cases = self.cases * 3 + [{"id": "broken", "description": "missing fields"}]
+        output = io.StringIO()
+        summary = stream_evaluate(iter(cases), output, chunk_size=2)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(records), len(cases))
+        self.assertEqual([r["id"] for r in records], [c["id"] for c in cases])
+        self.assertIn("error", records[-1])
+        self.assertEqual(summary.cases, len(cases))
+        self.assertEqual(summary.errors, 1)
+        self.assertEqual(set(records[0]["scores"]), {'tone_match', 'relevance', 'factual_accuracy'})
+
+    def test_stream_evaluate_metric_selection(self):
+        output = io.StringIO()
+        stream_evaluate(iter(self.cases), output, metrics_to_run=['tone_match'], chunk_size=3)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertTrue(all(list(r["scores"]) == ['tone_match'] for r in records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for CategoryCatalog and the cached catalog lookup.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.models import category as category_module
+from src.models.category import CategoryCatalog, TweetCategory, clear_category_catalog_cache, get_category_catalog
+
+CATEGORIES = [
+    TweetCategory("Governance Vote", "Votes", ["Vote live", "proposal ENA-", "risk parameter vote"]),
+    TweetCategory("Security & Risk Alert", "Security", ["audit complete", "risk parameter update", "phishing alert"]),
+    TweetCategory("Yield Update", "Yield", ["sUSDe APY spikes", "monthly yield report", "new reward epoch"]),
+]
+
+
+class TestCategoryCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = CategoryCatalog(CATEGORIES)
+
+    def test_suggest_ranks_by_keyword_overlap(self):
+        suggestions = self.catalog.suggest_categories("New proposal: vote on the risk parameter change", k=2)
+        self.assertEqual([s.category.name for s in suggestions], ["Governance Vote", "Security & Risk Alert"])
+        self.assertGreater(suggestions[0].score, suggestions[1].score)
+        self.assertIn("vote", suggestions[0].matched_words)
+
+    def test_plural_folding_and_case(self):
+        top = self.catalog.suggest_categories("Monthly REWARDS and yields")[0]
+        self.assertEqual(top.category.name, "Yield Update")
+
+    def test_no_match_and_k(self):
+        self.assertEqual(self.catalog.suggest_categories("gm frens"), [])
+        self.assertEqual(self.catalog.suggest_categories(""), [])
+        self.assertEqual(len(self.catalog.suggest_categories("risk vote audit apy", k=1)), 1)
+
+    def test_full_phrase_scores_higher_than_partial(self):
+        full = self.catalog.suggest_categories("phishing alert")[0]
+        partial = self.catalog.suggest_categories("phishing")[0]
+        self.assertAlmostEqual(full.score - partial.score,
+                               category_module.PHRASE_BONUS + self.catalog._index["alert"][0][1], places=3)
+
+    def test_get_by_name(self):
+        self.assertIs(self.catalog.get("yield update"), CATEGORIES[2])
+        self.assertIsNone(self.catalog.get("Missing"))
+
+    def test_bulk_and_grouping(self):
+        topics = ["audit complete for v2", "vote live now", "audit complete for v2", "hello world"]
+        with mock.patch.object(self.catalog, 'suggest_categories', wraps=self.catalog.suggest_categories) as suggest:
+            results = self.catalog.suggest_bulk(topics)
+        self.assertEqual(suggest.call_count, 3)
+        self.assertEqual([r[0].category.name if r else None for r in results],
+                         ["Security & Risk Alert", "Governance Vote", "Security & Risk Alert", None])
+        self.assertEqual(self.catalog.group_topics(topics), {
+            "Governance Vote": ["vote live now"],
+            "Security & Risk Alert": ["audit complete for v2", "audit complete for v2"],
+            None: ["hello world"],
+        })
+
+
+class TestCategoryCatalogCache(unittest.TestCase):
+
+    def setUp(self):
+        clear_category_catalog_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "categories.json")
+        self._write([{"name": "One", "prompt_keywords": ["alpha"]}])
+
+    def tearDown(self):
+        clear_category_catalog_cache()
+        self.tmp.cleanup()
+
+    def _write(self, data, mtime_offset=0):
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+        if mtime_offset:
+            stat = os.stat(self.path)
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 1_000_000_000))
+
+    def test_parsed_once_until_file_changes(self):
+        with mock.patch.object(category_module, 'load_categories', wraps=category_module.load_categories) as loader:
+            first = get_category_catalog(categories_file_path=self.path)
+            self.assertIs(get_category_catalog(categories_file_path=self.path), first)
+            self.assertEqual(loader.call_count, 1)
+            self._write([{"name": "One"}, {"name": "Two", "prompt_keywords": ["beta"]}], mtime_offset=5)
+            second = get_category_catalog(categories_file_path=self.path)
+        self.assertEqual(second.names(), ["One", "Two"])
+        self.assertEqual(loader.call_count, 2)
+
+    def test_protocol_catalog(self):
+        catalog = get_category_catalog("ethena")
+        self.assertTrue(catalog.get("Governance Vote"))
+        self.assertIs(get_category_catalog("ethena"), catalog)
+
+
+if __name__ == '__main__':
+    unittest.main()
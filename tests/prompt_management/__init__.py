@@ -0,0 +1 @@
+# This file makes the tests/prompt_management directory a Python package 
\ No newline at end of file
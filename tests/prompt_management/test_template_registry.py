@@ -0,0 +1,161 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the frozen, hot-reloading template registry.
+# - 2026-10-19: PromptTemplate follows DEFAULT_PROTOCOL config changes.
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.config.settings import get_config, set_config_value, unset_config_value
+from src.prompt_management import PromptKey, PromptTemplate, TemplateRegistry
+from src.prompt_management.template_loader import EMPTY_TEMPLATE
+
+ALPHA = {
+    "persona": {"OFFICIAL": "Alpha official"},
+    "core_message": "Alpha core",
+    "interaction_modes": {"DEGEN": {"tone": "wild", "examples": ["gm"]}},
+    "instruction_sets": {"OFFICIAL_TO_PARTNER": "Be a good partner"},
+    "critical_instructions": {"Twitter": ["Only the tweet"]},
+    "fallbacks": {"persona": "Fallback persona", "instruction_set": "Fallback set",
+                  "interaction_mode": {"tone": "neutral"}, "response_prefix": "Reply:"},
+}
+
+
+class TestTemplateRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self._write("alpha", ALPHA)
+        self._write("beta", {"core_message": "Beta core"})
+        os.makedirs(os.path.join(self.tmp.name, "no_templates"))
+        self.registry = TemplateRegistry(self.tmp.name, check_interval=3600)
+        self.registry.preload()
+
+    def _write(self, protocol, data, bump_mtime=0):
+        directory = os.path.join(self.tmp.name, protocol)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "prompt_templates.json")
+        with open(path, "w") as f:
+            json.dump(data, f)
+        if bump_mtime:
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_mtime * 1_000_000_000))
+
+    def test_preloads_every_protocol(self):
+        self.assertEqual(self.registry.protocols(), ["alpha", "beta"])
+
+    def test_templates_are_frozen_and_resolved(self):
+        template = self.registry.get_template("alpha")
+        with self.assertRaises(TypeError):
+            template.data["core_message"] = "changed"
+        self.assertEqual(template.critical_instructions["twitter"], ("Only the tweet",))
+        self.assertEqual(template.interaction_modes["DEGEN"]["examples"], ("gm",))
+        self.assertEqual(template.resolved["response_prefix"], "Reply:")
+        self.assertEqual(template.instruction_sets[("OFFICIAL", "PARTNER")], "Be a good partner")
+
+    def test_missing_protocol_resolves_once(self):
+        with mock.patch("src.prompt_management.template_loader.logger") as logger:
+            first = self.registry.get_template("gamma", "alpha")
+            second = self.registry.get_template("gamma", "alpha")
+            missing = self.registry.get_template("gamma2", "delta")
+        self.assertIs(first, self.registry.get_template("alpha"))
+        self.assertIs(second, first)
+        self.assertIs(missing, EMPTY_TEMPLATE)
+        self.assertEqual(logger.warning.call_count, 2)
+
+    def test_changed_file_swaps_snapshot_and_notifies(self):
+        listener = mock.Mock()
+        self.registry.add_reload_listener(listener)
+        old = self.registry.get_template("beta")
+        self.assertFalse(self.registry.check_for_changes())
+
+        self._write("beta", {"core_message": "Beta core v2"}, bump_mtime=5)
+        self._write("gamma", {"core_message": "Gamma core"})
+        self.assertTrue(self.registry.check_for_changes())
+        listener.assert_called_once_with()
+        self.assertEqual(old.resolved["core_message"], "Beta core")  # Readers holding the old one are unaffected
+        self.assertEqual(self.registry.get_template("beta").resolved["core_message"], "Beta core v2")
+        self.assertIn("gamma", self.registry.protocols())
+
+    def test_invalid_edit_keeps_previous_version(self):
+        path = os.path.join(self.tmp.name, "beta", "prompt_templates.json")
+        with open(path, "w") as f:
+            f.write("{not json")
+        self.assertFalse(self.registry.check_for_changes())
+        self.assertEqual(self.registry.get_template("beta").resolved["core_message"], "Beta core")
+
+    def test_concurrent_reads_during_reloads(self):
+        self.registry.check_interval = 0
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    value = self.registry.get_template("beta").resolved["core_message"]
+                    if not value.startswith("Beta core"):
+                        errors.append(value)
+                except Exception as e:  # pragma: no cover - failure path
+                    errors.append(repr(e))
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(20):
+            self._write("beta", {"core_message": f"Beta core {i}"}, bump_mtime=i + 1)
+            self.registry.check_for_changes()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertGreaterEqual(self.registry.reloads, 1)
+
+
+class TestPromptTemplateLookups(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, "alpha"))
+        with open(os.path.join(tmp.name, "alpha", "prompt_templates.json"), "w") as f:
+            json.dump(ALPHA, f)
+        registry = TemplateRegistry(tmp.name, check_interval=3600)
+        registry.preload()
+        patcher = mock.patch("src.prompt_management.template_loader.get_template_registry", return_value=registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups(self):
+        self.assertEqual(PromptTemplate.get(PromptKey.CORE_MESSAGE, "alpha"), "Alpha core")
+        self.assertEqual(PromptTemplate.get(PromptKey.RESPONSE_PREFIX, "alpha"), "Reply:")
+        self.assertEqual(PromptTemplate.get("interaction_modes", "alpha", "DEGEN", "tone"), "wild")
+        self.assertIsNone(PromptTemplate.get("interaction_modes", "alpha", "MISSING"))
+        self.assertEqual(PromptTemplate.get_persona("OFFICIAL", "alpha"), "Alpha official")
+        self.assertEqual(PromptTemplate.get_persona("INTERN", "alpha"), "Fallback persona")
+        self.assertEqual(PromptTemplate.get_interaction_mode("degen", "alpha")["tone"], "wild")
+        self.assertEqual(PromptTemplate.get_interaction_mode("Professional", "alpha")["tone"], "neutral")
+        self.assertEqual(PromptTemplate.get_instruction_set("OFFICIAL", "PARTNER", "alpha"), "Be a good partner")
+        self.assertEqual(PromptTemplate.get_instruction_set("OFFICIAL", "KOL", "alpha"), "Fallback set")
+        self.assertEqual(PromptTemplate.get_critical_instructions("Twitter", "alpha"), ("Only the tweet",))
+        self.assertEqual(PromptTemplate.get_critical_instructions("discord", "alpha"), ())
+
+    def test_default_protocol_follows_config(self):
+        previous = get_config("DEFAULT_PROTOCOL")
+        if previous is None:
+            self.addCleanup(unset_config_value, "default_protocol")
+        else:
+            self.addCleanup(set_config_value, "default_protocol", previous)
+        set_config_value("default_protocol", "missing")
+        self.assertIsNone(PromptTemplate.get(PromptKey.CORE_MESSAGE))
+        set_config_value("default_protocol", "alpha")
+        self.assertEqual(PromptTemplate.default_protocol(), "alpha")
+        self.assertEqual(PromptTemplate.get(PromptKey.CORE_MESSAGE), "Alpha core")
+        self.assertEqual(PromptTemplate.get(PromptKey.CORE_MESSAGE, "unknown"), "Alpha core")  # Falls back to it
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+# This file makes the tests/protocols directory a Python package
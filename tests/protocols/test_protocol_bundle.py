@@ -0,0 +1,111 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for protocol bundles and the protocol registry.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.ai.prompt_engineering import clear_prompt_plan_cache, generate_interaction_prompt
+from src.ai.response_generator import generate_tweet_reply
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+from src.protocols import ProtocolRegistry
+
+DEGEN = """# Degen Mode
+
+## Tone Guidelines
+- Alpha-{name} energy
+
+## Examples
+- gm from {name}
+"""
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+
+
+class TestProtocolRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name in ("alpha-one", "beta"):
+            root = os.path.join(self.tmp.name, name)
+            _write(os.path.join(root, "categories.json"),
+                   [{"name": f"{name} News", "description": "Updates", "prompt_keywords": ["update"]}])
+            _write(os.path.join(root, "relevancy_facts.json"), {"vault": f"{name} vault fact"})
+            _write(os.path.join(root, "docs.md"), f"{name} vaults are audited.\n\nUnrelated paragraph.")
+            _write(os.path.join(root, "mode-instructions", "InstructionsForDegen.md"), DEGEN.format(name=name))
+        _write(os.path.join(self.tmp.name, "beta", "knowledge", "knowledge.json"), {"faq": "beta vaults pay weekly"})
+        self.registry = ProtocolRegistry(self.tmp.name).preload()
+        self.official = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        clear_prompt_plan_cache()
+
+    def tearDown(self):
+        clear_prompt_plan_cache()
+        self.tmp.cleanup()
+
+    def test_bundles_load_every_resource(self):
+        self.assertEqual(self.registry.protocols(), ["alpha-one", "beta"])
+        bundle = self.registry["beta"]
+        self.assertEqual(bundle.get_category("BETA news").description, "Updates")
+        self.assertEqual(bundle.get_facts("Is the Vault safe?"), ["beta vault fact"])
+        self.assertEqual(len(bundle.knowledge_sources), 2)
+        self.assertIn("gm from beta", bundle.get_mode_instructions("degen").find_section("examples"))
+        self.assertIn("fallback instruction set", bundle.get_mode_instructions("Professional").text)
+
+    def test_name_aliases_and_unknown_protocols(self):
+        self.assertIs(self.registry.get("Alpha_One"), self.registry["alpha-one"])
+        self.assertIsNone(self.registry.get("gamma"))
+        with self.assertRaises(KeyError):
+            self.registry["gamma"]
+
+    def test_bundles_do_no_file_io_per_request(self):
+        bundle = self.registry["alpha-one"]
+        with mock.patch('builtins.open', side_effect=AssertionError("file read")):
+            self.assertEqual(bundle.get_facts("vault"), ["alpha-one vault fact"])
+            self.assertIn("audited", bundle.get_relevant_knowledge("vaults audited"))
+            prompt = generate_interaction_prompt("gm", self.official, None, None, {}, "Twitter", "Degen", bundle=bundle)
+        self.assertIn("Alpha-alpha-one energy", prompt)
+
+    def test_prompts_follow_bundle_not_default_protocol(self):
+        alpha = generate_interaction_prompt("gm", self.official, mode="Degen", bundle=self.registry["alpha-one"])
+        beta = generate_interaction_prompt("gm", self.official, mode="Degen", bundle=self.registry["beta"])
+        self.assertIn("gm from alpha-one", alpha)
+        self.assertIn("gm from beta", beta)
+        self.assertNotIn("gm from alpha-one", beta)
+
+    def test_reload_bumps_version_and_refreshes_content(self):
+        old = self.registry["beta"]
+        _write(os.path.join(self.tmp.name, "beta", "relevancy_facts.json"), {"vault": "updated fact"})
+        self.registry.reload(["beta"])
+        new = self.registry["beta"]
+        self.assertEqual(new.version, old.version + 1)
+        self.assertNotEqual(new.plan_key, old.plan_key)
+        self.assertEqual(new.get_facts("vault"), ["updated fact"])
+        self.assertEqual(old.get_facts("vault"), ["beta vault fact"])
+        self.assertEqual(self.registry["alpha-one"].version, 1)
+
+    @mock.patch('src.ai.response_generator.save_response')
+    @mock.patch('src.ai.response_generator.XAIClient')
+    def test_generate_tweet_reply_with_bundle(self, mock_client_cls, _save):
+        client = mock_client_cls.return_value
+        client.xai_model = "grok-3-mini-fast-beta"
+        client.get_completion.return_value = {"choices": [{"text": "Audited and weekly payouts."}]}
+        tweet = Tweet(content="When do vaults pay?", tone="neutral",
+                      metadata=TweetMetadata(tweet_id="t1", author_username="user"))
+
+        response = generate_tweet_reply(tweet, self.official, bundle=self.registry["beta"])
+
+        self.assertEqual(response.extra_context["protocol"], "beta")
+        prompt = client.get_completion.call_args.kwargs["prompt"]
+        self.assertIn("beta vaults pay weekly", prompt)
+        self.assertIn("- beta vault fact", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
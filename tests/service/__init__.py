@@ -0,0 +1 @@
+# This file makes the tests/service directory a Python package
@@ -0,0 +1,131 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for job request parsing, the bounded job queue and the worker pool.
+# - 2026-10-19: Workers running the real generation path persist every reply.
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.ai import response_generator
+from src.models.account import AccountType
+from src.service.jobs import (JOB_DONE, JOB_FAILED, JOB_QUEUED, JobQueue, JobValidationError, QueueFullError,
+                              ServiceMetrics, WorkerPool, parse_job_request)
+from src.utils import persistence
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class TestParseJobRequest(unittest.TestCase):
+
+    def test_reply(self):
+        job = parse_job_request({"type": "reply", "tweet": " How do I stake? ", "responding_as": "intern",
+                                 "author": "alice", "author_type": "KOL", "interaction_mode": "Degen"})
+        self.assertEqual(job.status, JOB_QUEUED)
+        self.assertEqual(job.kwargs["original_tweet"].content, "How do I stake?")
+        self.assertEqual(job.kwargs["responding_as"].account_type, AccountType.INTERN)
+        self.assertEqual(job.kwargs["target_account"].account_type, AccountType.KOL)
+        self.assertEqual(job.kwargs["interaction_mode"], "Degen")
+
+    def test_new_tweet_with_protocol(self):
+        job = parse_job_request({"type": "new_tweet", "category": "product update", "protocol": "ethena",
+                                 "topic": "New vault"})
+        self.assertEqual(job.kwargs["category"].name, "Product Update")
+        self.assertEqual(job.kwargs["bundle"].name, "ethena")
+        self.assertEqual(job.kwargs["topic"], "New vault")
+
+    def test_invalid_requests(self):
+        for request in ([], {"type": "thread"}, {"type": "reply"}, {"type": "reply", "tweet": "gm", "responding_as": "bot"},
+                        {"type": "new_tweet", "category": "Nope"}, {"type": "new_tweet", "category": "Product Update",
+                                                                   "protocol": "missing"}):
+            with self.assertRaises(JobValidationError, msg=request):
+                parse_job_request(request)
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def _job(self):
+        return parse_job_request({"type": "reply", "tweet": "gm"})
+
+    def test_bounded(self):
+        jobs = JobQueue(max_size=2)
+        first = jobs.submit(self._job())
+        jobs.submit(self._job())
+        with self.assertRaises(QueueFullError):
+            jobs.submit(self._job())
+        self.assertEqual(jobs.depth(), 2)
+        claimed = jobs.claim(timeout=0)
+        self.assertIs(claimed, first)
+        self.assertEqual((jobs.depth(), jobs.running(), claimed.attempts), (1, 1, 1))
+
+    def test_finished_jobs_expire(self):
+        jobs = JobQueue(result_ttl=0.0)
+        job = jobs.submit(self._job())
+        jobs.finish(jobs.claim(timeout=0), result={"content": "gm"})
+        self.assertEqual(job.status, JOB_DONE)
+        time.sleep(0.01)
+        jobs.submit(self._job())
+        jobs.finish(jobs.claim(timeout=0), error="boom")
+        self.assertIsNone(jobs.get(job.job_id))
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def test_workers_run_jobs_concurrently(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        started = []
+
+        def runner(job):
+            started.append(job.job_id)
+            release.wait(5)
+            if job.request.get("tweet") == "fail":
+                raise RuntimeError("generation failed")
+            return {"content": "gm"}
+
+        jobs, metrics = JobQueue(), ServiceMetrics()
+        pool = WorkerPool(jobs, workers=3, metrics=metrics, runner=runner).start()
+        self.addCleanup(pool.stop)
+        submitted = [jobs.submit(parse_job_request({"type": "reply", "tweet": tweet})) for tweet in ("a", "b", "fail")]
+        _wait_for(lambda: len(started) == 3)
+        release.set()
+        _wait_for(lambda: all(job.finished_at for job in submitted))
+
+        self.assertEqual([job.status for job in submitted], [JOB_DONE, JOB_DONE, JOB_FAILED])
+        self.assertEqual(submitted[2].error, "generation failed")
+        snapshot = metrics.snapshot(jobs.depth(), jobs.running(), pool.workers)
+        self.assertEqual((snapshot["completed"], snapshot["failed"], snapshot["queue_depth"]), (2, 1, 0))
+        self.assertIsNotNone(snapshot["latency_ms"]["end_to_end"]["p50"])
+
+    def test_workers_persist_every_reply(self):
+        client = mock.MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = {"choices": [{"text": "Vaults tab."}]}
+        jobs = JobQueue()
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(persistence, "OUTPUT_DIR", Path(tmp_dir)), \
+                mock.patch.object(persistence, "GENERATED_FILE", Path(tmp_dir) / "replies.json"), \
+                mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "get_completion_batcher", return_value=None):
+            pool = WorkerPool(jobs, workers=4, metrics=ServiceMetrics()).start()  # The default runner: run_job
+            self.addCleanup(pool.stop)
+            submitted = [jobs.submit(parse_job_request({"type": "reply", "tweet": f"How do I stake? #{i}"}))
+                         for i in range(40)]
+            _wait_for(lambda: all(job.finished_at for job in submitted), timeout=30)
+            with open(persistence.GENERATED_FILE) as f:
+                records = json.load(f)
+        self.assertEqual({job.status for job in submitted}, {JOB_DONE})
+        self.assertEqual(sorted(record["metadata"]["original_input"] for record in records),
+                         sorted(job.request["tweet"] for job in submitted))
+
+
+if __name__ == '__main__':
+    unittest.main()
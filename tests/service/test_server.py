@@ -0,0 +1,110 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the headless generation service HTTP API.
+# - 2026-10-19: Oversized, negative-length and non-UTF-8 request bodies.
+
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from src.ai import response_generator
+from src.service import server
+from src.service.server import GenerationService
+
+
+def _raw_exchange(service, request: bytes) -> bytes:
+    """Sends raw bytes on one connection and returns everything received until the server closes it."""
+    host, port = service._server.server_address[:2]
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall(request)
+        sock.shutdown(socket.SHUT_WR)
+        received = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return received
+            received += chunk
+
+
+def _poll(base_url, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = requests.get(f"{base_url}/jobs/{job_id}", timeout=5).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestGenerationService(unittest.TestCase):
+
+    def test_submit_poll_and_metrics(self):
+        client = mock.MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = {"choices": [{"text": "Staking lives in the Vaults tab."}]}
+        with mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "save_response"), \
+                GenerationService(workers=2) as service:
+            url = service.base_url
+            self.assertEqual(requests.get(f"{url}/healthz", timeout=5).json(), {"status": "ok"})
+            created = requests.post(f"{url}/jobs", json={"type": "reply", "tweet": "How do I stake?"}, timeout=5)
+            self.assertEqual(created.status_code, 202)
+            job = _poll(url, created.json()["job_id"])
+            self.assertEqual(job["status"], "done")
+            self.assertEqual(job["result"]["content"], "Staking lives in the Vaults tab.")
+
+            batch = requests.post(f"{url}/jobs/batch", timeout=5, json={"jobs": [
+                {"type": "new_tweet", "category": "Product Update", "topic": "vaults"},
+                {"type": "new_tweet", "category": "Unknown"},
+            ]})
+            self.assertEqual(batch.status_code, 202)
+            first, second = batch.json()["jobs"]
+            self.assertEqual(second["http_status"], 400)
+            _poll(url, first["job_id"])
+            polled = requests.get(f"{url}/jobs", params={"ids": f"{first['job_id']},missing"}, timeout=5).json()
+            self.assertEqual([j["status"] for j in polled["jobs"]], ["done", "unknown"])
+
+            metrics = requests.get(f"{url}/metrics", timeout=5).json()
+        self.assertEqual((metrics["submitted"], metrics["rejected"], metrics["completed"]), (2, 1, 2))
+        self.assertEqual(metrics["workers"], 2)
+        self.assertIn("p99", metrics["latency_ms"]["run"])
+
+    def test_full_queue_and_bad_requests(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        service = GenerationService(workers=1, queue_size=1, runner=lambda job: release.wait(5) and {})
+        with service:
+            url = service.base_url
+            statuses = []
+            for _ in range(3):
+                statuses.append(requests.post(f"{url}/jobs", json={"type": "reply", "tweet": "gm"}, timeout=5).status_code)
+                time.sleep(0.1)  # Lets the worker claim the first job
+            self.assertEqual(statuses, [202, 202, 503])
+            self.assertEqual(requests.post(f"{url}/jobs", data="{", timeout=5).status_code, 400)
+            self.assertEqual(requests.get(f"{url}/jobs/nope", timeout=5).status_code, 404)
+            self.assertEqual(requests.get(f"{url}/metrics", timeout=5).json()["queue_depth"], 1)
+            release.set()
+
+
+    def test_malformed_bodies(self):
+        smuggled = b"GET /healthz HTTP/1.1\r\nHost: x\r\n\r\n"
+        with mock.patch.object(server, "MAX_BODY_BYTES", 10), \
+                GenerationService(workers=1, runner=lambda job: {}) as service:
+            oversized = _raw_exchange(service, b"POST /jobs HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s"
+                                      % (len(smuggled), smuggled))
+            self.assertTrue(oversized.startswith(b"HTTP/1.1 413"))
+            self.assertIn(b"Connection: close", oversized)
+            self.assertEqual(oversized.count(b"HTTP/1.1 "), 1)  # The unread body is not served as a request
+
+            negative = _raw_exchange(service, b"POST /jobs HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n")
+            self.assertTrue(negative.startswith(b"HTTP/1.1 400"))
+
+            response = requests.post(f"{service.base_url}/jobs", data=b"\xff\xfe\x00", timeout=5)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "Invalid JSON body"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for the durable SQLite job queue.
+# - 2026-10-19: Idle claims skip the write lock; workers survive queue errors.
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.service import jobs as jobs_module
+from src.service.jobs import (JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, QueueFullError, ServiceMetrics,
+                              WorkerPool, parse_job_request)
+from src.service.sqlite_queue import SQLiteJobQueue
+
+REPLY = {"type": "reply", "tweet": "How do I stake yUSD?"}
+
+
+class TestSQLiteJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "jobs.db")
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def _queue(self, **options):
+        jobs = SQLiteJobQueue(self.path, poll_interval=0.01, **options)
+        self.addCleanup(jobs.close)
+        return jobs
+
+    def test_jobs_survive_reopening(self):
+        jobs = self._queue()
+        first = jobs.submit(parse_job_request(REPLY))
+        second = jobs.submit(parse_job_request({**REPLY, "tweet": "gm"}))
+        claimed = jobs.claim(timeout=0)
+        self.assertEqual(claimed.job_id, first.job_id)
+        self.assertEqual(claimed.kwargs["original_tweet"].content, "How do I stake yUSD?")
+        jobs.finish(claimed, result={"content": "Vaults tab."})
+        jobs.close()
+
+        reopened = self._queue()
+        self.assertEqual(reopened.get(first.job_id).status, JOB_DONE)
+        self.assertEqual(reopened.get(first.job_id).result, {"content": "Vaults tab."})
+        self.assertEqual(reopened.depth(), 1)
+        self.assertEqual(reopened.claim(timeout=0).job_id, second.job_id)
+        self.assertIsNone(reopened.claim(timeout=0.02))
+
+    def test_expired_lease_is_reclaimed_and_stale_result_discarded(self):
+        crashed = self._queue(lease_seconds=0.05)
+        crashed.submit(parse_job_request(REPLY))
+        stale = crashed.claim(timeout=0)
+        self.assertEqual(crashed.running(), 1)
+        time.sleep(0.1)
+
+        other = self._queue(lease_seconds=60)
+        self.assertEqual(other.stats()["expired_leases"], 1)
+        reclaimed = other.claim(timeout=0)
+        self.assertEqual((reclaimed.job_id, reclaimed.attempts), (stale.job_id, 2))
+        crashed.finish(stale, result={"content": "late"})
+        self.assertEqual(stale.status, JOB_RUNNING)  # Outcome discarded: the lease moved on
+        other.finish(reclaimed, result={"content": "fresh"})
+        self.assertEqual(other.get(stale.job_id).result, {"content": "fresh"})
+
+    def test_failed_jobs_are_retried_then_failed(self):
+        jobs = self._queue(max_attempts=2, retry_delay=0.05)
+        job = jobs.submit(parse_job_request(REPLY))
+        jobs.finish(jobs.claim(timeout=0), error="timeout")
+        self.assertEqual(jobs.get(job.job_id).status, JOB_QUEUED)
+        self.assertEqual(jobs.stats()["retrying"], 1)
+        self.assertIsNone(jobs.claim(timeout=0))  # Still inside the retry delay
+        retry = jobs.claim(timeout=1)
+        self.assertEqual(retry.attempts, 2)
+        jobs.finish(retry, error="timeout again")
+        self.assertEqual((jobs.get(job.job_id).status, jobs.get(job.job_id).error), (JOB_FAILED, "timeout again"))
+
+    def test_bounded_and_stats(self):
+        jobs = self._queue(max_size=2)
+        jobs.submit(parse_job_request(REPLY))
+        jobs.submit(parse_job_request(REPLY))
+        with self.assertRaises(QueueFullError):
+            jobs.submit(parse_job_request(REPLY))
+        jobs.finish(jobs.claim(timeout=0), result={})
+        stats = jobs.stats()
+        self.assertEqual((stats["queued"], stats["running"], stats["done"]), (1, 0, 1))
+        self.assertGreater(stats["lag_seconds"], 0)
+        self.assertEqual(stats["finished_recently"], 1)
+
+    def test_concurrent_workers_run_each_job_once(self):
+        submitter = self._queue()
+        submitted = {submitter.submit(parse_job_request({**REPLY, "tweet": f"q{i}"})).job_id for i in range(40)}
+        runs = []
+        runs_lock = threading.Lock()
+
+        def runner(job):
+            with runs_lock:
+                runs.append(job.job_id)
+            return {"content": job.request["tweet"]}
+
+        # Separate queue instances stand in for separate worker processes
+        pools = [WorkerPool(self._queue(), 3, ServiceMetrics(), runner=runner).start() for _ in range(3)]
+        deadline = time.monotonic() + 10
+        while submitter.stats()["done"] < len(submitted) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for pool in pools:
+            pool.stop()
+        self.assertEqual(sorted(runs), sorted(submitted))
+        self.assertEqual(submitter.stats()["done"], len(submitted))
+
+    def test_idle_claim_does_not_wait_for_the_write_lock(self):
+        jobs = self._queue()
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute("BEGIN IMMEDIATE")  # Another process holding the write lock
+        start = time.monotonic()
+        self.assertIsNone(jobs.claim(timeout=0))
+        self.assertLess(time.monotonic() - start, 1.0)
+        writer.execute("ROLLBACK")
+
+    def test_workers_survive_queue_errors(self):
+        jobs = self._queue()
+        job = jobs.submit(parse_job_request(REPLY))
+        real_claim, real_finish = jobs.claim, jobs.finish
+        claim_errors = [sqlite3.OperationalError("database is locked")] * 2
+        finish_errors = [sqlite3.OperationalError("database is locked")]
+
+        def flaky(errors, call):
+            def wrapper(*args, **kwargs):
+                if errors:
+                    raise errors.pop()
+                return call(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(jobs, "claim", side_effect=flaky(claim_errors, real_claim)), \
+                mock.patch.object(jobs, "finish", side_effect=flaky(finish_errors, real_finish)), \
+                mock.patch.object(jobs_module, "QUEUE_ERROR_BACKOFF", 0.01), \
+                self.assertLogs(jobs_module.logger, level="ERROR"):
+            pool = WorkerPool(jobs, 1, ServiceMetrics(), runner=lambda job: {"content": "ok"}).start()
+            deadline = time.monotonic() + 5
+            while jobs.get(job.job_id).status != JOB_DONE and time.monotonic() < deadline:
+                time.sleep(0.01)
+            pool.stop()
+        self.assertEqual(jobs.get(job.job_id).result, {"content": "ok"})
+        self.assertEqual((claim_errors, finish_errors), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for queue-based logging setup, prompt sampling and lazy hot-path logging.
+
+import logging
+import logging.handlers
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.ai import xai_client
+from src.ai.xai_client import XAIClient
+from src.utils import logging as app_logging
+from src.utils.logging import get_logger, log_sampled_prompt, setup_logging, stop_log_listener
+
+
+class TestPromptSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        self.logger.isEnabledFor.return_value = True
+        patches = [
+            mock.patch.object(app_logging, "_PROMPT_SAMPLE_EVERY", 3),
+            mock.patch.object(app_logging, "_PROMPT_COUNTER", app_logging.itertools.count()),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_logs_one_in_n(self):
+        logged = [log_sampled_prompt(self.logger, "completion", f"prompt {i}") for i in range(6)]
+        self.assertEqual(logged, [True, False, False, True, False, False])
+        self.assertEqual(self.logger.info.call_count, 2)
+        self.assertEqual(self.logger.info.call_args[0][-1], "prompt 3")
+
+    def test_disabled(self):
+        with mock.patch.object(app_logging, "_PROMPT_SAMPLE_EVERY", 0):
+            self.assertFalse(log_sampled_prompt(self.logger, "completion", "prompt"))
+        self.logger.isEnabledFor.return_value = False
+        self.assertFalse(log_sampled_prompt(self.logger, "completion", "prompt"))
+        self.logger.info.assert_not_called()
+
+
+class TestQueueLogging(unittest.TestCase):
+
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = (root.level, list(root.handlers))
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(app_logging, "LOG_DIRECTORY", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        stop_log_listener()
+        root = logging.getLogger()
+        for handler in root.handlers:
+            handler.close()
+        root.setLevel(self.saved[0])
+        root.handlers[:] = self.saved[1]
+        self.tmp.cleanup()
+
+    def test_records_written_by_listener(self):
+        with mock.patch("sys.stderr"):
+            setup_logging()
+            handlers = logging.getLogger().handlers
+            self.assertEqual(len(handlers), 1)
+            self.assertIsInstance(handlers[0], logging.handlers.QueueHandler)
+
+            get_logger("queue_test").warning("queued %s", "record")
+            stop_log_listener()  # Drains the queue
+        (log_file,) = os.listdir(self.tmp.name)
+        with open(os.path.join(self.tmp.name, log_file)) as f:
+            self.assertIn("queued record", f.read())
+
+
+class TestLazyClientLogging(unittest.TestCase):
+
+    def test_response_body_not_read_when_debug_disabled(self):
+        response = mock.MagicMock(status_code=200)
+        response.json.return_value = {"choices": [{"text": "gm"}]}
+        text = mock.PropertyMock(return_value='{"choices": []}')
+        type(response).text = text
+        client = XAIClient(api_key="key")
+        client.use_fallback = False
+        with mock.patch.object(xai_client.requests, "post", return_value=response), \
+                mock.patch.object(xai_client.logger, "isEnabledFor", side_effect=lambda level: level >= logging.INFO):
+            self.assertEqual(client.get_completion("Say gm"), {"choices": [{"text": "gm"}]})
+        text.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,12 @@
 import os
 import json
 import tempfile
+import threading
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
 
-from src.utils.persistence import save_response
+from src.utils.persistence import save_response, update_saved_image_url
 from src.models.response import AIResponse, ResponseType
 
 class TestPersistence(unittest.TestCase):
@@ -145,4 +146,51 @@ class TestPersistence(unittest.TestCase):
             data = json.load(f)
             self.assertIsInstance(data, list)
             self.assertEqual(len(data), 1)
-            self.assertEqual(data[0]['response']['content'], "New tweet content") 
\ No newline at end of file
+            self.assertEqual(data[0]['response']['content'], "New tweet content") 
+
+    def test_update_saved_image_url(self):
+        """Test that a finished image job fills in image_url on the records saved with it."""
+        from src.utils.persistence import GENERATED_FILE
+
+        for content, job_id in (("With image", "job-1"), ("Other image", "job-2")):
+            response = AIResponse(
+                content=content,
+                response_type=ResponseType.TWEET_REPLY,
+                model_used="test-model",
+                prompt_used="test prompt",
+                generation_time=datetime.now(timezone.utc),
+                extra_context={'image_job_id': job_id}
+            )
+            save_response(response, {'original_input': content})
+
+        self.assertEqual(update_saved_image_url("job-1", "https://img.example/1.png"), 1)
+        self.assertEqual(update_saved_image_url("job-2", None), 0)
+        with open(GENERATED_FILE, 'r') as f:
+            data = json.load(f)
+            self.assertEqual([entry['response']['image_url'] for entry in data], ["https://img.example/1.png", None])
+
+    def test_concurrent_saves_keep_every_entry(self):
+        """Test that saves from several threads do not overwrite each other."""
+        from src.utils.persistence import GENERATED_FILE
+
+        def save_many(worker):
+            for i in range(10):
+                response = AIResponse(
+                    content=f"Reply {worker}-{i}",
+                    response_type=ResponseType.TWEET_REPLY,
+                    model_used="test-model",
+                    prompt_used="test prompt",
+                    generation_time=datetime.now(timezone.utc)
+                )
+                save_response(response, {'original_input': f"{worker}-{i}"})
+
+        threads = [threading.Thread(target=save_many, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(GENERATED_FILE, 'r') as f:
+            data = json.load(f)
+            self.assertEqual(len(data), 40)
+            self.assertEqual(len({entry['response']['content'] for entry in data}), 40)
@@ -0,0 +1,170 @@
+# Changelog:
+# - 2026-10-19: Initial creation. Tests for generation stage tracing, histograms and exports.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.ai import response_generator
+from src.config.settings import get_config, set_config_value
+from src.models.account import Account, AccountType
+from src.models.tweet import Tweet, TweetMetadata
+from src.utils import tracing
+from src.utils.tracing import (
+    Histogram,
+    StageMetrics,
+    export_prometheus,
+    finish_trace,
+    get_stage_metrics,
+    span,
+    start_trace,
+    timed,
+)
+
+
+class _TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = {key: get_config(key) for key in ("tracing.enabled", "tracing.trace_file")}
+        self.tmp = tempfile.TemporaryDirectory()
+        get_stage_metrics().reset()
+
+    def tearDown(self):
+        for key, value in self.previous.items():
+            set_config_value(key, value)
+        get_stage_metrics().reset()
+        self.tmp.cleanup()
+
+
+class TestTracingDisabled(_TracingTestCase):
+
+    def test_no_trace_and_noop_spans(self):
+        set_config_value("tracing.enabled", False)
+        self.assertIsNone(start_trace("reply"))
+        self.assertIs(span("tone"), span("knowledge"))
+        with span("tone"):
+            pass
+        finish_trace(None)
+        self.assertEqual(get_stage_metrics().snapshot(), {})
+
+    def test_timed_function_runs_unchanged(self):
+        set_config_value("tracing.enabled", False)
+        self.assertEqual(timed("clean")(lambda text: text.upper())("gm"), "GM")
+
+
+class TestStageTrace(_TracingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        set_config_value("tracing.enabled", True)
+
+    def test_spans_accumulate_per_stage(self):
+        trace = start_trace("reply", interaction_mode="Degen")
+        with mock.patch.object(tracing.time, "perf_counter", side_effect=[0.0, 0.010, 0.020, 0.025]):
+            with span("clean"):
+                pass
+            with span("clean"):
+                pass
+        self.assertIs(tracing.current_trace(), trace)
+        finish_trace(trace, error=None)
+        self.assertIsNone(tracing.current_trace())
+        self.assertAlmostEqual(trace.stages["clean"], 15.0)
+        record = trace.to_record()
+        self.assertEqual(record["operation"], "reply")
+        self.assertEqual(record["interaction_mode"], "Degen")
+        self.assertIn("error", record)
+
+    def test_timed_records_even_when_function_raises(self):
+        @timed("prompt")
+        def failing():
+            raise ValueError("boom")
+
+        trace = start_trace("reply")
+        with self.assertRaises(ValueError):
+            failing()
+        finish_trace(trace)
+        self.assertIn("prompt", trace.stages)
+
+    def test_finish_feeds_histograms_and_trace_file(self):
+        path = os.path.join(self.tmp.name, "traces", "trace.jsonl")
+        set_config_value("tracing.trace_file", path)
+        for _ in range(2):
+            trace = start_trace("new_tweet", category="Announcements")
+            trace.add("completion", 30.0)
+            finish_trace(trace)
+
+        snapshot = get_stage_metrics().snapshot()["new_tweet"]
+        self.assertEqual(snapshot["completion"]["count"], 2)
+        self.assertAlmostEqual(snapshot["completion"]["sum_seconds"], 0.06)
+        self.assertEqual(snapshot["completion"]["buckets"]["0.025"], 0)
+        self.assertEqual(snapshot["completion"]["buckets"]["0.05"], 2)
+        self.assertEqual(snapshot["total"]["count"], 2)
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["stages_ms"], {"completion": 30.0})
+        self.assertEqual(records[0]["category"], "Announcements")
+        self.assertNotEqual(records[0]["trace_id"], records[1]["trace_id"])
+
+
+class TestPrometheusExport(unittest.TestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [("0.1", 1), ("1.0", 3), ("+Inf", 4)])
+
+    def test_render_and_export(self):
+        metrics = StageMetrics(buckets=(0.1,))
+        trace = tracing.StageTrace("reply")
+        trace.add("tone", 50.0)
+        trace.duration_ms = 200.0
+        metrics.observe_trace(trace)
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE generation_stage_duration_seconds histogram", text)
+        self.assertIn('generation_stage_duration_seconds_bucket{operation="reply",stage="tone",le="0.1"} 1', text)
+        self.assertIn('generation_stage_duration_seconds_count{operation="reply",stage="tone"} 1', text)
+        self.assertIn('generation_duration_seconds_bucket{operation="reply",le="0.1"} 0', text)
+        self.assertIn('generation_duration_seconds_bucket{operation="reply",le="+Inf"} 1', text)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "metrics.prom")
+            with mock.patch.object(tracing, "_METRICS", metrics):
+                export_prometheus(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+
+class TestGenerationStages(_TracingTestCase):
+
+    def _reply(self):
+        client = mock.MagicMock(xai_model="grok-test")
+        client.get_completion.return_value = {"choices": [{"text": "YieldFi keeps your yield safe."}]}
+        tweet = Tweet(content="Is staking on YieldFi safe?", metadata=TweetMetadata(tweet_id="t1", author_username="user"))
+        account = Account(account_id="o", username="Official", account_type=AccountType.OFFICIAL)
+        with mock.patch.object(response_generator, "XAIClient", return_value=client), \
+                mock.patch.object(response_generator, "save_response"):
+            return response_generator.generate_tweet_reply(tweet, account)
+
+    def test_reply_records_stage_timings(self):
+        set_config_value("tracing.enabled", True)
+        response = self._reply()
+        stages = response.extra_context["stage_timings_ms"]
+        for stage in ("tone", "knowledge", "facts", "prompt", "completion", "clean", "persist"):
+            self.assertIn(stage, stages)
+        self.assertIn("trace_id", response.extra_context)
+        self.assertEqual(get_stage_metrics().snapshot()["reply"]["completion"]["count"], 1)
+
+    def test_reply_without_tracing_has_no_timings(self):
+        set_config_value("tracing.enabled", False)
+        response = self._reply()
+        self.assertNotIn("stage_timings_ms", response.extra_context)
+        self.assertEqual(get_stage_metrics().snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()